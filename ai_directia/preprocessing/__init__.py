@@ -1,29 +1,53 @@
 """
 Text preprocessing and feature extraction modules
+
+The feature extractor pulls in scikit-learn, so its names are resolved on
+first access: importing the text cleaner (as the server does at start-up)
+does not load sklearn.
 """
 
+import importlib
+
 from .text_cleaner import (
     clean_text,
+    clean_text_batch,
     preprocess_text,
+    preprocess_batch,
+    normalize_tokens,
     tokenize_simple,
     remove_stopwords,
     normalize_whitespace,
     to_lowercase,
 )
-from .feature_extractor import (
-    extract_features,
-    TfidfFeatureExtractor,
-    load_vectorizer,
-)
+from .stopwords import get_stopwords
+
+_LAZY = {
+    'extract_features': '.feature_extractor',
+    'TfidfFeatureExtractor': '.feature_extractor',
+    'load_vectorizer': '.feature_extractor',
+}
 
 __all__ = [
     'clean_text',
+    'clean_text_batch',
     'preprocess_text',
+    'preprocess_batch',
+    'normalize_tokens',
     'tokenize_simple',
     'remove_stopwords',
     'normalize_whitespace',
     'to_lowercase',
+    'get_stopwords',
     'extract_features',
     'TfidfFeatureExtractor',
     'load_vectorizer',
 ]
+
+
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
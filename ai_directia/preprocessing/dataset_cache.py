@@ -0,0 +1,176 @@
+"""
+Columnar cache of the processed dataset splits
+
+Reading ``train.csv`` / ``val.csv`` / ``test.csv`` and cleaning every row is
+repeated by training, evaluation and retraining. ``load_split`` does it once
+and stores the result as Parquet next to the CSV (``.cache/`` directory) with
+two extra columns:
+
+- ``text_clean``: ``clean_text`` with the default operations
+- ``text_preprocessed``: ``preprocess_text`` (tokens joined by spaces, Spanish
+  stopwords removed), the input of the TF-IDF vectorizers
+
+The cache file name contains a key derived from the cleaner version (source
+of the cleaning modules and stopword lists) and the CSV contents, so editing
+either one invalidates the cache automatically.
+
+Usage:
+    python -m ai_directia.preprocessing.dataset_cache src/ia/datasets/processed
+"""
+
+import argparse
+import hashlib
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from . import stopwords, text_cleaner
+from .text_cleaner import clean_text_batch, preprocess_batch
+
+
+CLEAN_COLUMN = 'text_clean'
+PREPROCESSED_COLUMN = 'text_preprocessed'
+
+CACHE_DIRNAME = '.cache'
+SPLITS = ('train', 'val', 'test')
+
+# Bump to invalidate every cache when the cached columns change
+CACHE_FORMAT = 1
+
+_cleaner_version = None
+
+
+def _hash_file(path, digest):
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+
+
+def cleaner_version():
+    """
+    Hash of everything that changes the cleaned columns: the cleaner and
+    stopword modules, the vendored stopword lists and the cache format
+
+    Returns:
+        Hex digest (computed once per process)
+    """
+    global _cleaner_version
+    if _cleaner_version is None:
+        digest = hashlib.sha256(f'format={CACHE_FORMAT}'.encode())
+        sources = [Path(text_cleaner.__file__), Path(stopwords.__file__)]
+        sources += sorted(stopwords.STOPWORDS_DIR.glob('*.txt'))
+        for path in sources:
+            digest.update(path.name.encode())
+            _hash_file(path, digest)
+        _cleaner_version = digest.hexdigest()
+    return _cleaner_version
+
+
+def cache_key(csv_path):
+    """Key of the cached split: cleaner version + CSV contents"""
+    digest = hashlib.sha256(cleaner_version().encode())
+    _hash_file(csv_path, digest)
+    return digest.hexdigest()[:16]
+
+
+def cache_path(csv_path, key=None):
+    csv_path = Path(csv_path)
+    key = key or cache_key(csv_path)
+    return csv_path.parent / CACHE_DIRNAME / f'{csv_path.stem}.{key}.parquet'
+
+
+def build_split(df):
+    """
+    Add the cleaned text columns to a split
+
+    Args:
+        df: DataFrame with a 'text' column
+
+    Returns:
+        Copy of the DataFrame with text_clean and text_preprocessed
+    """
+    df = df.copy()
+    texts = df['text'].fillna('').astype(str).tolist()
+    df[CLEAN_COLUMN] = clean_text_batch(texts)
+    df[PREPROCESSED_COLUMN] = preprocess_batch(texts, remove_stop=True, language='spanish')
+    return df
+
+
+def load_split(csv_path, columns=None, use_cache=True):
+    """
+    Load a processed split with its cleaned text columns
+
+    The first call for a given CSV and cleaner version writes the Parquet
+    cache; later calls only read it.
+
+    Args:
+        csv_path: Path to the split CSV
+        columns: Columns to return (default: all)
+        use_cache: Read/write the Parquet cache (False: always rebuild)
+
+    Returns:
+        DataFrame with the CSV columns plus text_clean and text_preprocessed
+    """
+    csv_path = Path(csv_path)
+    if not use_cache:
+        df = build_split(pd.read_csv(csv_path))
+        return df[list(columns)] if columns is not None else df
+
+    target = cache_path(csv_path)
+    if target.exists():
+        try:
+            return pd.read_parquet(target, columns=list(columns) if columns is not None else None)
+        except Exception as e:
+            print(f"[WARNING] Unreadable dataset cache {target.name}, rebuilding: {e}")
+
+    df = build_split(pd.read_csv(csv_path))
+    _write_cache(df, target)
+    return df[list(columns)] if columns is not None else df
+
+
+def _write_cache(df, target):
+    target.parent.mkdir(parents=True, exist_ok=True)
+
+    # Caches of older versions of the same split are stale
+    for stale in target.parent.glob(f'{target.name.split(".")[0]}.*.parquet'):
+        if stale != target:
+            stale.unlink()
+
+    tmp = target.with_name(f'.{target.name}.{os.getpid()}.tmp')
+    try:
+        df.to_parquet(tmp, index=False, compression='zstd')
+        os.replace(tmp, target)
+    except Exception as e:
+        # Without pyarrow the splits still load, just uncached
+        print(f"[WARNING] Could not write dataset cache {target.name}: {e}")
+        if tmp.exists():
+            tmp.unlink()
+
+
+def load_splits(data_dir, splits=SPLITS, columns=None):
+    """
+    Load several splits of a processed dataset directory
+
+    Returns:
+        Tuple of DataFrames in the order of ``splits``
+    """
+    data_dir = Path(data_dir)
+    return tuple(load_split(data_dir / f'{split}.csv', columns=columns) for split in splits)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the columnar cache of processed datasets')
+    parser.add_argument('data_dirs', nargs='+', help='Directories with train/val/test CSV files')
+    args = parser.parse_args()
+
+    for data_dir in args.data_dirs:
+        for split in SPLITS:
+            csv_path = Path(data_dir) / f'{split}.csv'
+            if csv_path.exists():
+                df = load_split(csv_path)
+                print(f"[OK] {csv_path}: {len(df)} rows -> {cache_path(csv_path).name}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Stopword lists loaded once per process
+
+Lists are read the first time a language is requested and kept as frozensets.
+Vendored lists in ``ai_directia/config/stopwords/<language>.txt`` are used
+first (the Spanish one is the Snowball list shipped by NLTK), so the default
+language works offline. Other languages fall back to an already installed
+NLTK corpus; nothing is ever downloaded while classifying documents.
+"""
+
+import threading
+from pathlib import Path
+
+
+STOPWORDS_DIR = Path(__file__).resolve().parent.parent / 'config' / 'stopwords'
+
+_cache = {}
+_lock = threading.Lock()
+
+
+def _load_vendored(language):
+    """
+    Read a vendored stopword file (one word per line, '#' for comments)
+
+    Returns:
+        frozenset or None if there is no vendored list for the language
+    """
+    path = STOPWORDS_DIR / f'{language}.txt'
+    if not path.exists():
+        return None
+
+    with open(path, 'r', encoding='utf-8') as f:
+        return frozenset(
+            line.strip() for line in f
+            if line.strip() and not line.startswith('#')
+        )
+
+
+def _load_nltk(language):
+    """
+    Read a stopword list from a locally installed NLTK corpus
+
+    Returns:
+        frozenset or None if NLTK or the corpus is not available
+    """
+    try:
+        from nltk.corpus import stopwords
+        return frozenset(stopwords.words(language))
+    except (ImportError, LookupError, OSError):
+        return None
+
+
+def get_stopwords(language='spanish'):
+    """
+    Get the stopword set for a language
+
+    Args:
+        language: Language name ('spanish', 'english', ...)
+
+    Returns:
+        frozenset of stopwords (empty for unknown languages)
+    """
+    stop_words = _cache.get(language)
+    if stop_words is not None:
+        return stop_words
+
+    with _lock:
+        stop_words = _cache.get(language)
+        if stop_words is None:
+            stop_words = _load_vendored(language)
+            if stop_words is None:
+                stop_words = _load_nltk(language)
+            if stop_words is None:
+                print(f"[WARNING] No stopword list available for '{language}'")
+                stop_words = frozenset()
+            _cache[language] = stop_words
+
+    return stop_words
+
+
+def download_stopwords(language='spanish'):
+    """
+    Download the NLTK stopword corpus and refresh the cached list
+
+    Meant for setup scripts, never for the request path.
+
+    Args:
+        language: Language to reload after downloading
+    """
+    import nltk
+
+    nltk.download('stopwords', quiet=True)
+    with _lock:
+        _cache.pop(language, None)
+
+    return get_stopwords(language)
@@ -1,10 +1,93 @@
 """
 Text cleaning and preprocessing module
+
+All regular expressions are compiled once at import time and character-level
+operations (accent folding, special character filtering) go through cached
+``str.translate`` tables, so each cleaning step is a single C-level pass over
+the text. ``normalize_tokens`` fuses the whole ``preprocess_text`` chain into
+one tokenisation pass that yields the tokens directly.
 """
 
 import re
 import unicodedata
 
+from .stopwords import get_stopwords
+
+
+# Precompiled patterns
+_SPACES_RE = re.compile(r'[ \t]+')
+_BLANK_LINES_RE = re.compile(r'\n\s*\n+')
+_URL_RE = re.compile(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+')
+_EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+_NUMBERS_RE = re.compile(r'\d+')
+_TOKEN_RE = re.compile(r'\b\w+\b')
+_EXTRA_LINES_RE = {}
+
+# Characters kept by remove_special_characters (besides whitespace)
+_ALLOWED_CHARS = frozenset('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ'
+                           'áéíóúüñÁÉÍÓÚÜÑ0123456789')
+_ALLOWED_PUNCTUATION = frozenset('.,;:!?-€$%')
+
+
+class _CharFilterTable(dict):
+    """
+    Lazily populated ``str.translate`` table that deletes disallowed characters
+
+    Each code point is classified the first time it is seen and the decision
+    is memoised, so the table only grows with the alphabet actually found in
+    the documents.
+    """
+
+    def __init__(self, allowed):
+        super().__init__()
+        self.allowed = allowed
+
+    def __missing__(self, codepoint):
+        char = chr(codepoint)
+        value = codepoint if (char in self.allowed or char.isspace()) else None
+        self[codepoint] = value
+        return value
+
+
+_FILTER_WITH_PUNCTUATION = _CharFilterTable(_ALLOWED_CHARS | _ALLOWED_PUNCTUATION)
+_FILTER_ALPHANUMERIC = _CharFilterTable(_ALLOWED_CHARS)
+
+
+def _strip_marks(text):
+    """Reference accent stripping: NFD decomposition without nonspacing marks"""
+    nfd = unicodedata.normalize('NFD', text)
+    return ''.join(char for char in nfd if unicodedata.category(char) != 'Mn')
+
+
+def _build_accent_table():
+    """
+    Build a ``str.translate`` table folding accented Latin letters to ASCII
+
+    Only characters whose NFD form is an ASCII starter followed by combining
+    marks are folded, plus the combining diacritics block itself. Anything
+    else is left for the generic NFD path in ``remove_accents``.
+    """
+    table = {}
+    for block in (range(0x00C0, 0x0250), range(0x1E00, 0x1F00)):
+        for codepoint in block:
+            char = chr(codepoint)
+            decomposed = unicodedata.normalize('NFD', char)
+            folded = _strip_marks(char)
+            if folded != char and folded.isascii() and decomposed[0] == folded[:1]:
+                table[codepoint] = folded
+
+    for codepoint in range(0x0300, 0x0370):
+        char = chr(codepoint)
+        # U+034F (combining grapheme joiner) has combining class 0 and
+        # affects canonical reordering, so it stays on the generic path
+        if unicodedata.category(char) == 'Mn' and unicodedata.combining(char):
+            table[codepoint] = None
+
+    return table
+
+
+_ACCENT_TABLE = _build_accent_table()
+
 
 def normalize_whitespace(text):
     """
@@ -14,10 +97,10 @@ def normalize_whitespace(text):
     - Normalize line breaks
     """
     # Replace multiple spaces with single space
-    text = re.sub(r'[ \t]+', ' ', text)
+    text = _SPACES_RE.sub(' ', text)
 
     # Normalize line breaks
-    text = re.sub(r'\n\s*\n+', '\n\n', text)
+    text = _BLANK_LINES_RE.sub('\n\n', text)
 
     # Remove leading/trailing whitespace from each line
     lines = [line.strip() for line in text.split('\n')]
@@ -39,18 +122,18 @@ def remove_special_characters(text, keep_punctuation=True):
     """
     if keep_punctuation:
         # Keep letters, numbers, spaces, and basic punctuation
-        text = re.sub(r'[^a-záéíóúüñA-ZÁÉÍÓÚÜÑ0-9\s.,;:!?\-€$%]', '', text)
-    else:
-        # Keep only letters, numbers, and spaces
-        text = re.sub(r'[^a-záéíóúüñA-ZÁÉÍÓÚÜÑ0-9\s]', '', text)
+        return text.translate(_FILTER_WITH_PUNCTUATION)
 
-    return text
+    # Keep only letters, numbers, and spaces
+    return text.translate(_FILTER_ALPHANUMERIC)
 
 
 def normalize_unicode(text):
     """
     Normalize unicode characters (NFD -> NFC)
     """
+    if text.isascii():
+        return text
     return unicodedata.normalize('NFC', text)
 
 
@@ -58,8 +141,15 @@ def remove_accents(text):
     """
     Remove accents from characters
     """
-    nfd = unicodedata.normalize('NFD', text)
-    return ''.join(char for char in nfd if unicodedata.category(char) != 'Mn')
+    if text.isascii():
+        return text
+
+    text = text.translate(_ACCENT_TABLE)
+    if text.isascii():
+        return text
+
+    # Characters outside the precomputed table (other scripts, ligatures...)
+    return _strip_marks(text)
 
 
 def to_lowercase(text):
@@ -73,32 +163,68 @@ def remove_numbers(text):
     """
     Remove all numbers from text
     """
-    return re.sub(r'\d+', '', text)
+    return _NUMBERS_RE.sub('', text)
 
 
 def remove_urls(text):
     """
     Remove URLs from text
     """
-    url_pattern = r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+'
-    return re.sub(url_pattern, '', text)
+    # Every match starts with the literal 'http', skip the regex otherwise
+    if 'http' not in text:
+        return text
+    return _URL_RE.sub('', text)
 
 
 def remove_emails(text):
     """
     Remove email addresses from text
     """
-    email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-    return re.sub(email_pattern, '', text)
+    if '@' not in text:
+        return text
+    return _EMAIL_RE.sub('', text)
 
 
 def remove_extra_lines(text, max_consecutive_newlines=2):
     """
     Remove excessive line breaks
     """
-    pattern = r'\n{' + str(max_consecutive_newlines + 1) + r',}'
+    pattern = _EXTRA_LINES_RE.get(max_consecutive_newlines)
+    if pattern is None:
+        pattern = re.compile(r'\n{' + str(max_consecutive_newlines + 1) + r',}')
+        _EXTRA_LINES_RE[max_consecutive_newlines] = pattern
+
     replacement = '\n' * max_consecutive_newlines
-    return re.sub(pattern, replacement, text)
+    return pattern.sub(replacement, text)
+
+
+_OPERATIONS = {
+    'normalize_whitespace': normalize_whitespace,
+    'normalize_unicode': normalize_unicode,
+    'remove_special_chars': lambda text: remove_special_characters(text, keep_punctuation=True),
+    'remove_special_chars_all': lambda text: remove_special_characters(text, keep_punctuation=False),
+    'remove_urls': remove_urls,
+    'remove_emails': remove_emails,
+    'remove_numbers': remove_numbers,
+    'remove_accents': remove_accents,
+    'lowercase': to_lowercase,
+    'remove_extra_lines': remove_extra_lines,
+}
+
+DEFAULT_OPERATIONS = (
+    'normalize_unicode',
+    'normalize_whitespace',
+    'remove_urls',
+    'remove_emails',
+    'remove_extra_lines',
+)
+
+
+def _resolve_operations(operations):
+    """Map operation names to functions, ignoring unknown names"""
+    if operations is None:
+        operations = DEFAULT_OPERATIONS
+    return [_OPERATIONS[op] for op in operations if op in _OPERATIONS]
 
 
 def clean_text(text, operations=None):
@@ -122,42 +248,36 @@ def clean_text(text, operations=None):
     Returns:
         Cleaned text
     """
-    if operations is None:
-        # Default cleaning pipeline
-        operations = [
-            'normalize_unicode',
-            'normalize_whitespace',
-            'remove_urls',
-            'remove_emails',
-            'remove_extra_lines',
-        ]
-
-    # Apply operations in order
-    for op in operations:
-        if op == 'normalize_whitespace':
-            text = normalize_whitespace(text)
-        elif op == 'normalize_unicode':
-            text = normalize_unicode(text)
-        elif op == 'remove_special_chars':
-            text = remove_special_characters(text, keep_punctuation=True)
-        elif op == 'remove_special_chars_all':
-            text = remove_special_characters(text, keep_punctuation=False)
-        elif op == 'remove_urls':
-            text = remove_urls(text)
-        elif op == 'remove_emails':
-            text = remove_emails(text)
-        elif op == 'remove_numbers':
-            text = remove_numbers(text)
-        elif op == 'remove_accents':
-            text = remove_accents(text)
-        elif op == 'lowercase':
-            text = to_lowercase(text)
-        elif op == 'remove_extra_lines':
-            text = remove_extra_lines(text)
+    for func in _resolve_operations(operations):
+        text = func(text)
 
     return text
 
 
+def clean_text_batch(texts, operations=None):
+    """
+    Clean a list of documents with the same operations
+
+    Operations are resolved once for the whole batch.
+
+    Args:
+        texts: Iterable of input texts
+        operations: Same as ``clean_text``
+
+    Returns:
+        List of cleaned texts
+    """
+    funcs = _resolve_operations(operations)
+    cleaned = []
+
+    for text in texts:
+        for func in funcs:
+            text = func(text)
+        cleaned.append(text)
+
+    return cleaned
+
+
 def tokenize_simple(text):
     """
     Simple word tokenization
@@ -166,7 +286,34 @@ def tokenize_simple(text):
         List of tokens
     """
     # Split on whitespace and punctuation
-    tokens = re.findall(r'\b\w+\b', text.lower())
+    tokens = _TOKEN_RE.findall(text.lower())
+    return tokens
+
+
+def normalize_tokens(text, stop_words=None):
+    """
+    Fused normalisation and tokenisation used by ``preprocess_text``
+
+    Produces the same tokens as ``tokenize_simple`` applied to
+    ``clean_text`` with unicode, whitespace, URL, email and lowercase
+    operations. Whitespace normalisation is skipped because it never changes
+    word boundaries, and the URL/email passes only run when the text can
+    contain a match.
+
+    Args:
+        text: Raw input text
+        stop_words: Optional set of tokens to drop
+
+    Returns:
+        List of tokens
+    """
+    text = normalize_unicode(text)
+    text = remove_urls(text)
+    text = remove_emails(text)
+    tokens = _TOKEN_RE.findall(text.lower())
+
+    if stop_words:
+        return [token for token in tokens if token not in stop_words]
     return tokens
 
 
@@ -181,40 +328,8 @@ def remove_stopwords(tokens, language='spanish'):
     Returns:
         List of tokens without stopwords
     """
-    try:
-        import nltk
-        from nltk.corpus import stopwords
-
-        # Download stopwords if not already downloaded
-        try:
-            stop_words = set(stopwords.words(language))
-        except LookupError:
-            nltk.download('stopwords', quiet=True)
-            stop_words = set(stopwords.words(language))
-
-        return [token for token in tokens if token not in stop_words]
-
-    except ImportError:
-        # If NLTK is not available, use a basic Spanish stopwords list
-        spanish_stopwords = {
-            'el', 'la', 'de', 'que', 'y', 'a', 'en', 'un', 'ser', 'se', 'no', 'haber',
-            'por', 'con', 'su', 'para', 'como', 'estar', 'tener', 'le', 'lo', 'todo',
-            'pero', 'más', 'hacer', 'o', 'poder', 'decir', 'este', 'ir', 'otro', 'ese',
-            'la', 'si', 'me', 'ya', 'ver', 'porque', 'dar', 'cuando', 'él', 'muy',
-            'sin', 'vez', 'mucho', 'saber', 'qué', 'sobre', 'mi', 'alguno', 'mismo',
-            'yo', 'también', 'hasta', 'año', 'dos', 'querer', 'entre', 'así', 'primero',
-            'desde', 'grande', 'eso', 'ni', 'nos', 'llegar', 'pasar', 'tiempo', 'ella',
-            'sí', 'día', 'uno', 'bien', 'poco', 'deber', 'entonces', 'poner', 'cosa',
-            'tanto', 'hombre', 'parecer', 'nuestro', 'tan', 'donde', 'ahora', 'parte',
-            'después', 'vida', 'quedar', 'siempre', 'creer', 'hablar', 'llevar', 'dejar',
-        }
-
-        if language == 'spanish':
-            stop_words = spanish_stopwords
-        else:
-            stop_words = set()  # Empty set for unknown languages
-
-        return [token for token in tokens if token not in stop_words]
+    stop_words = get_stopwords(language)
+    return [token for token in tokens if token not in stop_words]
 
 
 def preprocess_text(text, remove_stop=True, language='spanish'):
@@ -229,21 +344,27 @@ def preprocess_text(text, remove_stop=True, language='spanish'):
     Returns:
         Preprocessed text string
     """
-    # Clean text
-    cleaned = clean_text(text, operations=[
-        'normalize_unicode',
-        'normalize_whitespace',
-        'remove_urls',
-        'remove_emails',
-        'lowercase',
-    ])
-
-    # Tokenize
-    tokens = tokenize_simple(cleaned)
-
-    # Remove stopwords if requested
-    if remove_stop:
-        tokens = remove_stopwords(tokens, language=language)
+    # Stopwords are dropped in the same pass that produces the tokens
+    stop_words = get_stopwords(language) if remove_stop else None
+    tokens = normalize_tokens(text, stop_words=stop_words)
 
     # Join back to string
     return ' '.join(tokens)
+
+
+def preprocess_batch(texts, remove_stop=True, language='spanish'):
+    """
+    Preprocess a list of documents
+
+    Equivalent to calling ``preprocess_text`` on every document.
+
+    Args:
+        texts: Iterable of input texts
+        remove_stop: Whether to remove stopwords
+        language: Language for stopwords
+
+    Returns:
+        List of preprocessed text strings
+    """
+    stop_words = get_stopwords(language) if remove_stop else None
+    return [' '.join(normalize_tokens(text, stop_words=stop_words)) for text in texts]
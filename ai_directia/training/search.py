@@ -0,0 +1,412 @@
+"""
+Parallel hyperparameter search for document classification models
+
+The corpus is preprocessed once and each distinct TF-IDF configuration is
+fitted once; the resulting matrices are cached on disk and shared by every
+model trained on them. Vectorizers and models are fitted on a process pool.
+
+Results are written as a leaderboard (CSV + JSON) with validation accuracy,
+F1, single-document inference latency and serialized model size, so models
+can be chosen on speed as well as quality.
+
+Usage:
+    python -m ai_directia.training.search
+    python -m ai_directia.training.search --search random --n-iter 12 --workers 4
+    python -m ai_directia.training.search --save-best ai_directia/models/v2_search
+"""
+
+import argparse
+import itertools
+import json
+import os
+import pickle
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from ai_directia.preprocessing.dataset_cache import PREPROCESSED_COLUMN, load_split
+from ai_directia.preprocessing.text_cleaner import preprocess_batch
+
+
+DEFAULT_DATA_DIR = Path(__file__).parent.parent / 'datasets' / 'processed'
+DEFAULT_OUTPUT_DIR = Path(__file__).parent.parent / 'models' / 'search'
+
+# Search space: TF-IDF configurations x model families
+VECTORIZER_SPACE = {
+    'max_features': [2000, 5000, 10000],
+    'ngram_range': [(1, 1), (1, 2)],
+}
+
+MODEL_SPACE = {
+    'linear_svc': {'C': [0.1, 1.0, 10.0]},
+    'naive_bayes': {'alpha': [0.1, 1.0]},
+    'random_forest': {'n_estimators': [100, 200]},
+}
+
+# Documents timed one by one to measure inference latency
+LATENCY_SAMPLES = 50
+
+
+def build_vectorizer(max_features=5000, ngram_range=(1, 2)):
+    """TF-IDF vectorizer with the same settings as TfidfFeatureExtractor"""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    return TfidfVectorizer(
+        max_features=max_features,
+        ngram_range=tuple(ngram_range),
+        min_df=2,
+        max_df=0.8,
+        sublinear_tf=True,
+        lowercase=True,
+        strip_accents='unicode',
+        token_pattern=r'\b\w+\b'
+    )
+
+
+def build_model(family, params):
+    """
+    Create an untrained model
+
+    Args:
+        family: 'linear_svc', 'naive_bayes' or 'random_forest'
+        params: Hyperparameters of the family
+
+    Returns:
+        Scikit-learn estimator
+    """
+    if family == 'linear_svc':
+        from sklearn.svm import LinearSVC
+        return LinearSVC(C=params['C'], class_weight='balanced', max_iter=2000, random_state=42)
+    if family == 'naive_bayes':
+        from sklearn.naive_bayes import MultinomialNB
+        return MultinomialNB(alpha=params['alpha'])
+    if family == 'random_forest':
+        from sklearn.ensemble import RandomForestClassifier
+        # One core per model: the pool already runs one model per core
+        return RandomForestClassifier(n_estimators=params['n_estimators'], class_weight='balanced',
+                                      random_state=42, n_jobs=1)
+    raise ValueError(f"Unknown model family: {family}")
+
+
+def vectorizer_key(params):
+    return f"tfidf_{params['max_features']}_{params['ngram_range'][0]}{params['ngram_range'][1]}"
+
+
+def _grid(space):
+    names = sorted(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))]
+
+
+def build_experiments(vectorizer_space=None, model_space=None, search='grid', n_iter=10, seed=42):
+    """
+    Experiments of the search: one (vectorizer params, family, model params) per entry
+
+    Args:
+        vectorizer_space: Values per TF-IDF parameter
+        model_space: Values per hyperparameter, per model family
+        search: 'grid' (every combination) or 'random' (n_iter combinations)
+        n_iter: Number of experiments in random search
+        seed: Random seed of the random search
+
+    Returns:
+        List of experiment dicts
+    """
+    vectorizer_space = vectorizer_space or VECTORIZER_SPACE
+    model_space = model_space or MODEL_SPACE
+
+    experiments = [
+        {'vectorizer': vectorizer_params, 'family': family, 'params': model_params}
+        for vectorizer_params in _grid(vectorizer_space)
+        for family, space in model_space.items()
+        for model_params in _grid(space)
+    ]
+    if search == 'random' and n_iter < len(experiments):
+        experiments = random.Random(seed).sample(experiments, n_iter)
+    elif search not in ('grid', 'random'):
+        raise ValueError("search must be 'grid' or 'random'")
+    return experiments
+
+
+class CorpusCache:
+    """
+    Preprocessed texts and fitted TF-IDF matrices stored in a directory
+
+    Every process of the pool reads the same files, so the corpus is
+    cleaned once and each vectorizer is fitted once per search.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def save_corpus(self, train_texts, y_train, val_texts, y_val):
+        # Matrices of a previous corpus are no longer valid
+        for path in self.cache_dir.glob('tfidf_*'):
+            path.unlink()
+        joblib.dump({
+            'train_texts': list(train_texts),
+            'y_train': np.asarray(y_train),
+            'val_texts': list(val_texts),
+            'y_val': np.asarray(y_val),
+        }, self.cache_dir / 'corpus.pkl')
+
+    def load_corpus(self):
+        return joblib.load(self.cache_dir / 'corpus.pkl')
+
+    def _paths(self, key):
+        return (self.cache_dir / f'{key}.train.npz', self.cache_dir / f'{key}.val.npz',
+                self.cache_dir / f'{key}.vectorizer.pkl')
+
+    def has_matrices(self, key):
+        return all(path.exists() for path in self._paths(key))
+
+    def save_matrices(self, key, X_train, X_val, vectorizer):
+        train_path, val_path, vectorizer_path = self._paths(key)
+        sparse.save_npz(train_path, X_train.tocsr())
+        sparse.save_npz(val_path, X_val.tocsr())
+        joblib.dump(vectorizer, vectorizer_path)
+
+    def load_matrices(self, key):
+        train_path, val_path, vectorizer_path = self._paths(key)
+        return sparse.load_npz(train_path), sparse.load_npz(val_path), joblib.load(vectorizer_path)
+
+
+# Per-process memo of the cache contents (each worker loads a file once)
+_worker_cache = {}
+
+
+def _cached(cache_dir, key, loader):
+    memo_key = (str(cache_dir), key)
+    if memo_key not in _worker_cache:
+        _worker_cache[memo_key] = loader()
+    return _worker_cache[memo_key]
+
+
+def fit_vectorizer(cache_dir, vectorizer_params):
+    """Pool task: fit one TF-IDF configuration and cache its matrices"""
+    cache = CorpusCache(cache_dir)
+    key = vectorizer_key(vectorizer_params)
+    if cache.has_matrices(key):
+        return key
+
+    corpus = _cached(cache_dir, 'corpus', cache.load_corpus)
+    vectorizer = build_vectorizer(**vectorizer_params)
+    X_train = vectorizer.fit_transform(corpus['train_texts'])
+    X_val = vectorizer.transform(corpus['val_texts'])
+    cache.save_matrices(key, X_train, X_val, vectorizer)
+    return key
+
+
+def run_experiment(cache_dir, experiment):
+    """
+    Pool task: train one model on cached matrices and measure it
+
+    Returns:
+        Leaderboard row (dict)
+    """
+    from sklearn.metrics import accuracy_score, f1_score
+
+    cache = CorpusCache(cache_dir)
+    key = vectorizer_key(experiment['vectorizer'])
+    corpus = _cached(cache_dir, 'corpus', cache.load_corpus)
+    X_train, X_val, vectorizer = _cached(cache_dir, key, lambda: cache.load_matrices(key))
+
+    model = build_model(experiment['family'], experiment['params'])
+    start = time.perf_counter()
+    model.fit(X_train, corpus['y_train'])
+    train_seconds = time.perf_counter() - start
+
+    y_pred = model.predict(X_val)
+
+    # Latency of one document as served: vectorize + predict
+    samples = corpus['val_texts'][:LATENCY_SAMPLES]
+    latencies = []
+    for text in samples:
+        start = time.perf_counter()
+        model.predict(vectorizer.transform([text]))
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    return {
+        'experiment': f"{experiment['family']}[{_format_params(experiment['params'])}] {key}",
+        'family': experiment['family'],
+        'params': experiment['params'],
+        'vectorizer': experiment['vectorizer'],
+        'accuracy': float(accuracy_score(corpus['y_val'], y_pred)),
+        'f1_macro': float(f1_score(corpus['y_val'], y_pred, average='macro', zero_division=0)),
+        'f1_weighted': float(f1_score(corpus['y_val'], y_pred, average='weighted', zero_division=0)),
+        'latency_ms_p50': float(np.percentile(latencies, 50)) if latencies else 0.0,
+        'latency_ms_p95': float(np.percentile(latencies, 95)) if latencies else 0.0,
+        'model_size_kb': round(len(pickle.dumps((model, vectorizer), protocol=pickle.HIGHEST_PROTOCOL)) / 1024, 1),
+        'train_seconds': round(train_seconds, 3),
+    }
+
+
+def _format_params(params):
+    return ','.join(f'{name}={value}' for name, value in sorted(params.items()))
+
+
+def _preprocessed(df):
+    """Preprocessed texts, taken from the dataset cache column when present"""
+    if PREPROCESSED_COLUMN in df.columns:
+        return df[PREPROCESSED_COLUMN].tolist()
+    return preprocess_batch(df['text'], remove_stop=True, language='spanish')
+
+
+def _label_column(df, label_column):
+    if label_column in df.columns:
+        return label_column
+    # src/ia/datasets uses 'label' instead of 'category'
+    for candidate in ('category', 'label'):
+        if candidate in df.columns:
+            return candidate
+    raise KeyError(f"Label column '{label_column}' not found")
+
+
+def run_search(train_df, val_df, experiments, output_dir=DEFAULT_OUTPUT_DIR, workers=None,
+               label_column='category'):
+    """
+    Run the experiments on a process pool and write the leaderboard
+
+    Args:
+        train_df: Training DataFrame ('text' + label column)
+        val_df: Validation DataFrame
+        experiments: Output of build_experiments()
+        output_dir: Directory for the cache and the leaderboard
+        workers: Pool size (default: number of CPUs)
+        label_column: Label column name
+
+    Returns:
+        Leaderboard DataFrame, best first (F1 macro, then latency)
+    """
+    output_dir = Path(output_dir)
+    cache = CorpusCache(output_dir / 'cache')
+
+    print(f"Preprocessing {len(train_df) + len(val_df)} documents (once)...")
+    train_texts = _preprocessed(train_df)
+    val_texts = _preprocessed(val_df)
+    cache.save_corpus(train_texts, train_df[_label_column(train_df, label_column)],
+                      val_texts, val_df[_label_column(val_df, label_column)])
+
+    vectorizer_configs = list({vectorizer_key(exp['vectorizer']): exp['vectorizer'] for exp in experiments}.values())
+    workers = workers or os.cpu_count() or 1
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        print(f"Fitting {len(vectorizer_configs)} TF-IDF configurations on {workers} workers...")
+        list(pool.map(fit_vectorizer, [cache.cache_dir] * len(vectorizer_configs), vectorizer_configs))
+
+        print(f"Training {len(experiments)} models...")
+        rows = list(pool.map(run_experiment, [cache.cache_dir] * len(experiments), experiments))
+
+    leaderboard = pd.DataFrame(rows).sort_values(
+        ['f1_macro', 'accuracy', 'latency_ms_p50'], ascending=[False, False, True]
+    ).reset_index(drop=True)
+
+    save_leaderboard(leaderboard, output_dir)
+    return leaderboard
+
+
+def save_leaderboard(leaderboard, output_dir):
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    flat = leaderboard.copy()
+    flat['params'] = flat['params'].apply(_format_params)
+    flat['vectorizer'] = flat['vectorizer'].apply(vectorizer_key)
+    flat.to_csv(output_dir / 'leaderboard.csv', index=False)
+
+    with open(output_dir / 'leaderboard.json', 'w', encoding='utf-8') as f:
+        json.dump({
+            'created_at': datetime.now().isoformat(),
+            'results': leaderboard.to_dict(orient='records'),
+        }, f, indent=2, ensure_ascii=False)
+
+    print(f"[OK] Leaderboard saved to {output_dir / 'leaderboard.csv'}")
+
+
+def save_best(leaderboard, cache_dir, model_dir):
+    """
+    Retrain the top experiment on its cached matrices and save it in the
+    format loaded by the inference pipeline (model.pkl, vectorizer.pkl,
+    metadata.json)
+    """
+    from sklearn.preprocessing import LabelEncoder
+
+    best = leaderboard.iloc[0]
+    cache = CorpusCache(cache_dir)
+    corpus = cache.load_corpus()
+    X_train, _, vectorizer = cache.load_matrices(vectorizer_key(best['vectorizer']))
+
+    label_encoder = LabelEncoder().fit(corpus['y_train'])
+    model = build_model(best['family'], best['params'])
+    model.fit(X_train, label_encoder.transform(corpus['y_train']))
+
+    model_path = Path(model_dir)
+    model_path.mkdir(parents=True, exist_ok=True)
+    joblib.dump({'model': model, 'label_encoder': label_encoder}, model_path / 'model.pkl')
+    joblib.dump(vectorizer, model_path / 'vectorizer.pkl')
+
+    metadata = {
+        'model_type': type(model).__name__,
+        'training_date': datetime.now().isoformat(),
+        'vocabulary_size': len(vectorizer.vocabulary_),
+        'hyperparameters': {'vectorizer': best['vectorizer'], 'model': best['params']},
+        'metrics': {'validation': {name: float(best[name]) for name in ('accuracy', 'f1_macro', 'f1_weighted')}},
+        'latency_ms_p50': float(best['latency_ms_p50']),
+    }
+    with open(model_path / 'metadata.json', 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, indent=2, ensure_ascii=False)
+
+    print(f"[OK] Best model ({best['experiment']}) saved to {model_path}")
+
+
+def main():
+    """Main search function"""
+    parser = argparse.ArgumentParser(description='Hyperparameter search for document classification')
+    parser.add_argument('--data-dir', type=str, default=str(DEFAULT_DATA_DIR),
+                        help='Directory with processed datasets')
+    parser.add_argument('--output-dir', type=str, default=str(DEFAULT_OUTPUT_DIR),
+                        help='Directory for the cache and the leaderboard')
+    parser.add_argument('--search', type=str, default='grid', choices=['grid', 'random'],
+                        help='Grid search or random search')
+    parser.add_argument('--n-iter', type=int, default=10,
+                        help='Number of experiments in random search')
+    parser.add_argument('--families', nargs='+', default=list(MODEL_SPACE),
+                        choices=list(MODEL_SPACE), help='Model families to try')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Process pool size (default: number of CPUs)')
+    parser.add_argument('--save-best', type=str, default=None,
+                        help='Save the best model to this directory')
+
+    args = parser.parse_args()
+
+    data_path = Path(args.data_dir)
+    train_df = load_split(data_path / 'train.csv')
+    val_df = load_split(data_path / 'val.csv')
+
+    experiments = build_experiments(
+        model_space={family: MODEL_SPACE[family] for family in args.families},
+        search=args.search,
+        n_iter=args.n_iter,
+    )
+
+    leaderboard = run_search(train_df, val_df, experiments, output_dir=args.output_dir, workers=args.workers)
+
+    columns = ['experiment', 'accuracy', 'f1_macro', 'latency_ms_p50', 'model_size_kb']
+    print(f"\n{'='*70}")
+    print("LEADERBOARD (top 10)")
+    print(f"{'='*70}")
+    print(leaderboard[columns].head(10).to_string(index=False))
+
+    if args.save_best:
+        save_best(leaderboard, Path(args.output_dir) / 'cache', args.save_best)
+
+
+if __name__ == '__main__':
+    main()
@@ -2,7 +2,6 @@
 Model training script for document classification
 """
 
-import pandas as pd
 import numpy as np
 from pathlib import Path
 import json
@@ -23,8 +22,9 @@ from sklearn.metrics import (
 import sys
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
-from ai.preprocessing.text_cleaner import preprocess_text
-from ai.preprocessing.feature_extractor import TfidfFeatureExtractor
+from ai_directia.preprocessing.text_cleaner import preprocess_batch
+from ai_directia.preprocessing.dataset_cache import PREPROCESSED_COLUMN, load_splits
+from ai_directia.preprocessing.feature_extractor import TfidfFeatureExtractor
 
 
 def load_data(data_dir='ai/datasets/processed'):
@@ -34,11 +34,8 @@ def load_data(data_dir='ai/datasets/processed'):
     Returns:
         train_df, val_df, test_df
     """
-    data_path = Path(data_dir)
-
-    train_df = pd.read_csv(data_path / 'train.csv')
-    val_df = pd.read_csv(data_path / 'val.csv')
-    test_df = pd.read_csv(data_path / 'test.csv')
+    # Parquet cache with the preprocessed text (rebuilt when the CSV or the cleaner change)
+    train_df, val_df, test_df = load_splits(data_dir)
 
     print(f"[OK] Data loaded:")
     print(f"  Train: {len(train_df)} documents")
@@ -51,7 +48,7 @@ def load_data(data_dir='ai/datasets/processed'):
 
 def preprocess_data(df, verbose=True):
     """
-    Preprocess text data
+    Preprocess text data (already done for splits loaded from the dataset cache)
 
     Args:
         df: DataFrame with 'text' column
@@ -60,15 +57,15 @@ def preprocess_data(df, verbose=True):
     Returns:
         List of preprocessed texts
     """
+    if PREPROCESSED_COLUMN in df.columns:
+        return df[PREPROCESSED_COLUMN].tolist()
+
     if verbose:
         print(f"Preprocessing {len(df)} documents...")
 
     from tqdm import tqdm
-    processed_texts = []
-
-    for text in tqdm(df['text'], desc="Preprocessing", disable=not verbose):
-        processed = preprocess_text(text, remove_stop=True, language='spanish')
-        processed_texts.append(processed)
+    texts = tqdm(df['text'], desc="Preprocessing", disable=not verbose)
+    processed_texts = preprocess_batch(texts, remove_stop=True, language='spanish')
 
     return processed_texts
 
@@ -0,0 +1,4 @@
+"""
+Benchmarks reproducibles de los caminos críticos (extracción, limpieza,
+vectorización y clasificación). Ver ``python -m benchmarks --help``.
+"""
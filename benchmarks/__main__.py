@@ -0,0 +1,132 @@
+"""
+Suite de benchmarks del procesamiento de documentos (sin red).
+
+Uso:
+    python -m benchmarks
+    python -m benchmarks --groups cleaning classification --docs 500
+    python -m benchmarks --save-baseline
+    python -m benchmarks --compare --tolerance 0.3
+
+Los resultados se escriben en JSON (``benchmarks/results/latest.json`` por
+defecto). Con ``--compare`` se comparan con la baseline guardada
+(``benchmarks/baseline.json``, versionada) y el proceso termina con código 1
+si algún benchmark empeora más allá de la tolerancia, o con código 2 si no
+encuentra la baseline.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from .harness import compare
+from .suites import GROUPS, run_suite
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+DEFAULT_OUTPUT = BENCHMARKS_DIR / "results" / "latest.json"
+DEFAULT_BASELINE = BENCHMARKS_DIR / "baseline.json"
+
+
+def environment() -> dict:
+    """Versiones y máquina, para saber si dos ejecuciones son comparables."""
+    import numpy
+    import sklearn
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "numpy": numpy.__version__,
+        "sklearn": sklearn.__version__,
+    }
+
+
+def write_json(data, path: Path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def print_results(results):
+    print(f"\n{'Benchmark':<34} {'Modo':<7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'items/s':>10} {'pico KB':>9}")
+    print("-" * 93)
+    for row in results:
+        if row.get("skipped"):
+            print(f"{row['name']:<34} {row['mode']:<7} (omitido: {row['skipped']})")
+            continue
+        latency = row["latency_ms"]
+        print(f"{row['name']:<34} {row['mode']:<7} {latency['p50']:>9.3f} {latency['p95']:>9.3f} "
+              f"{latency['p99']:>9.3f} {row['throughput']:>10.1f} {row['peak_alloc_kb']:>9.0f}")
+
+
+def print_comparison(comparisons):
+    regressions = [row for row in comparisons if row["regression"]]
+    print(f"\nComparación con la baseline: {len(comparisons)} métricas, {len(regressions)} regresiones")
+    for row in regressions:
+        print(f"   [REGRESIÓN] {row['name']} {row['metric']}: {row['baseline']} -> {row['current']} "
+              f"({row['change']:+.1%})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks del procesamiento de documentos")
+    parser.add_argument("--groups", nargs="+", choices=GROUPS, default=list(GROUPS))
+    parser.add_argument("--docs", type=int, default=200, help="Documentos del dataset procesado")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--repeat", type=int, default=1, help="Pasadas mínimas por benchmark")
+    parser.add_argument("--min-time", type=float, default=0.5, help="Segundos mínimos por benchmark")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Guardar los resultados como baseline")
+    parser.add_argument("--compare", action="store_true", help="Comparar con la baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Empeoramiento relativo permitido")
+    args = parser.parse_args(argv)
+
+    # Sin baseline no hay nada que comparar: una puerta de CI no debe pasar en verde
+    if args.compare and not args.baseline.exists():
+        print(f"[ERROR] No hay baseline en {args.baseline} (usa --save-baseline)")
+        return 2
+
+    results = [result.to_dict() for result in run_suite(
+        groups=args.groups,
+        docs=args.docs,
+        batch_size=args.batch_size,
+        repeat=args.repeat,
+        min_time=args.min_time,
+    )]
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "environment": environment(),
+        "config": {"groups": args.groups, "docs": args.docs, "batch_size": args.batch_size,
+                   "repeat": args.repeat, "min_time": args.min_time},
+        "results": results,
+    }
+
+    print_results(results)
+
+    exit_code = 0
+    if args.compare:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        comparisons = compare(results, baseline["results"], tolerance=args.tolerance)
+        report["comparison"] = {"baseline": str(args.baseline), "tolerance": args.tolerance,
+                                "rows": comparisons}
+        print_comparison(comparisons)
+        if any(row["regression"] for row in comparisons):
+            exit_code = 1
+
+    write_json(report, args.output)
+    print(f"\n[OK] Resultados guardados en {args.output}")
+    if args.save_baseline:
+        write_json(report, args.baseline)
+        print(f"[OK] Baseline guardada en {args.baseline}")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
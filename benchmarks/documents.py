@@ -0,0 +1,115 @@
+"""
+Documentos de prueba para los benchmarks de extracción.
+
+Se construyen en memoria a partir de los textos de ``tests/fixtures`` para
+que la suite funcione sin red ni archivos binarios versionados:
+
+- TXT: el texto tal cual (UTF-8)
+- DOCX: un párrafo por línea con python-docx
+- PDF nativo: PDF mínimo con capa de texto (Helvetica), escrito a mano
+- Imagen escaneada: el texto renderizado en PNG con Pillow
+"""
+
+import io
+from pathlib import Path
+from typing import Dict, List
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+FIXTURES_DIR = BASE_DIR / "tests" / "fixtures"
+PROCESSED_DIR = BASE_DIR / "src" / "ia" / "datasets" / "processed"
+
+
+def fixture_texts() -> Dict[str, str]:
+    """Textos de ``tests/fixtures`` (nombre del archivo -> contenido)."""
+    return {path.stem: path.read_text(encoding="utf-8") for path in sorted(FIXTURES_DIR.glob("*.txt"))}
+
+
+def dataset_texts(split: str = "test", limit: int = 500) -> List[str]:
+    """
+    Textos del dataset procesado (vía la caché Parquet) o, si no existe, las
+    fixtures repetidas hasta ``limit``.
+    """
+    csv_path = PROCESSED_DIR / f"{split}.csv"
+    if csv_path.exists():
+        from ai_directia.preprocessing.dataset_cache import load_split
+
+        return load_split(csv_path, columns=("text",))["text"].fillna("").astype(str).tolist()[:limit]
+
+    texts = list(fixture_texts().values())
+    return (texts * (limit // max(len(texts), 1) + 1))[:limit]
+
+
+def make_txt(text: str) -> bytes:
+    return text.encode("utf-8")
+
+
+def make_docx(text: str) -> bytes:
+    from docx import Document
+
+    document = Document()
+    for line in text.splitlines():
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def _pdf_escape(line: str) -> str:
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(text: str) -> bytes:
+    """PDF de una página con el texto como capa de texto (latin-1)."""
+    lines = [_pdf_escape(line.encode("latin-1", "replace").decode("latin-1")) for line in text.splitlines()]
+    stream = "BT /F1 10 Tf 14 TL 50 800 Td " + " ".join(f"({line}) '" for line in lines) + " ET"
+    stream_bytes = stream.encode("latin-1")
+
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+        b"/Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+        b"<< /Length " + str(len(stream_bytes)).encode() + b" >>\nstream\n" + stream_bytes + b"\nendstream",
+    ]
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(f"{number} 0 obj\n".encode() + body + b"\nendobj\n")
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    for offset in offsets:
+        out.write(f"{offset:010d} 00000 n \n".encode())
+    out.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+    return out.getvalue()
+
+
+def make_scanned_image(text: str) -> bytes:
+    """PNG en escala de grises con el texto (simula una página escaneada)."""
+    from PIL import Image, ImageDraw
+
+    lines = text.splitlines()
+    image = Image.new("L", (1240, 40 + 24 * len(lines)), color=255)
+    draw = ImageDraw.Draw(image)
+    for index, line in enumerate(lines):
+        draw.text((40, 20 + 24 * index), line, fill=0)
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+BUILDERS = {
+    "txt": make_txt,
+    "docx": make_docx,
+    "pdf": make_pdf,
+    "png": make_scanned_image,
+}
+
+
+def build_documents() -> Dict[str, List[bytes]]:
+    """Documentos de cada formato (extensión -> lista de bytes) a partir de las fixtures."""
+    texts = list(fixture_texts().values())
+    return {extension: [builder(text) for text in texts] for extension, builder in BUILDERS.items()}
@@ -0,0 +1,191 @@
+"""
+Medición de benchmarks: latencias por llamada, throughput y memoria.
+
+Cada benchmark se ejecuta en dos pasadas:
+
+1. Pasada cronometrada (``time.perf_counter`` por llamada) tras unas
+   llamadas de calentamiento, de la que salen p50/p95/p99 y throughput.
+2. Pasada con ``tracemalloc`` para el pico de memoria reservada por Python
+   (incluye los buffers de numpy/scipy). Va aparte porque ``tracemalloc``
+   ralentiza las llamadas y falsearía las latencias.
+
+Además se guarda el máximo RSS del proceso (``ru_maxrss``), que es monótono:
+indica la marca de agua alta acumulada hasta ese benchmark.
+"""
+
+import math
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+@dataclass
+class BenchmarkResult:
+    """Resultado de un benchmark."""
+
+    name: str
+    group: str
+    mode: str
+    calls: int = 0
+    items: int = 0
+    total_s: float = 0.0
+    throughput: float = 0.0
+    latency_ms: Dict[str, float] = field(default_factory=dict)
+    peak_alloc_kb: float = 0.0
+    max_rss_kb: float = 0.0
+    skipped: Optional[str] = None
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        if self.skipped is None:
+            data.pop("skipped")
+        return data
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """
+    Percentil con interpolación lineal (mismo criterio que ``numpy.percentile``).
+
+    Args:
+        values: Muestras
+        q: Percentil en [0, 100]
+
+    Returns:
+        Valor del percentil (0.0 si no hay muestras)
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    low = math.floor(rank)
+    high = math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def max_rss_kb() -> float:
+    """Máximo RSS del proceso en KB (0.0 donde no está disponible)."""
+    if resource is None:
+        return 0.0
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux lo da en KB, macOS en bytes
+    return rss / 1024 if sys.platform == "darwin" else float(rss)
+
+
+def measure(name: str, group: str, fn: Callable, inputs: List, mode: str = "single",
+            items_per_call: Optional[Sequence[int]] = None, warmup: int = 3,
+            repeat: int = 1, min_time: float = 0.0) -> BenchmarkResult:
+    """
+    Mide ``fn`` sobre cada elemento de ``inputs``.
+
+    Args:
+        name: Nombre del benchmark (clave para comparar con la baseline)
+        group: Grupo (extraction, cleaning, vectorization, classification...)
+        fn: Función a medir; recibe un elemento de ``inputs``
+        inputs: Entradas; en modo batch, cada una es un lote
+        mode: 'single' o 'batch'
+        items_per_call: Documentos que procesa cada llamada (por defecto 1)
+        warmup: Llamadas de calentamiento (no cuentan)
+        repeat: Pasadas mínimas sobre ``inputs``
+        min_time: Segundos mínimos de medición (se repiten pasadas hasta llegar)
+
+    Returns:
+        BenchmarkResult con latencias en ms por llamada
+    """
+    items_per_call = list(items_per_call) if items_per_call is not None else [1] * len(inputs)
+
+    for i in range(min(warmup, len(inputs))):
+        fn(inputs[i])
+
+    latencies = []
+    items = 0
+    started = time.perf_counter()
+    passes = 0
+    while passes < repeat or (time.perf_counter() - started) < min_time:
+        for value, count in zip(inputs, items_per_call):
+            call_start = time.perf_counter()
+            fn(value)
+            latencies.append((time.perf_counter() - call_start) * 1000)
+            items += count
+        passes += 1
+    total = time.perf_counter() - started
+
+    # Pasada de memoria
+    tracemalloc.start()
+    try:
+        for value in inputs:
+            fn(value)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return BenchmarkResult(
+        name=name,
+        group=group,
+        mode=mode,
+        calls=len(latencies),
+        items=items,
+        total_s=round(total, 4),
+        throughput=round(items / total, 2) if total > 0 else 0.0,
+        latency_ms={
+            "mean": round(sum(latencies) / len(latencies), 4) if latencies else 0.0,
+            "p50": round(percentile(latencies, 50), 4),
+            "p95": round(percentile(latencies, 95), 4),
+            "p99": round(percentile(latencies, 99), 4),
+            "max": round(max(latencies), 4) if latencies else 0.0,
+        },
+        peak_alloc_kb=round(peak / 1024, 1),
+        max_rss_kb=round(max_rss_kb(), 1),
+    )
+
+
+def skipped(name: str, group: str, mode: str, reason: str) -> BenchmarkResult:
+    """Resultado de un benchmark que no se pudo ejecutar (dependencia ausente...)."""
+    return BenchmarkResult(name=name, group=group, mode=mode, skipped=reason)
+
+
+def compare(results: List[Dict], baseline: List[Dict], tolerance: float = 0.25,
+            metrics: Sequence[str] = ("p50", "p95")) -> List[Dict]:
+    """
+    Compara resultados con una baseline guardada.
+
+    Un benchmark regresa si algún percentil de ``metrics`` crece más de
+    ``tolerance`` (0.25 = 25 %) o si el throughput cae en la misma proporción.
+    Los benchmarks que faltan en uno de los dos lados o están marcados como
+    ``skipped`` se ignoran.
+
+    Args:
+        results: Resultados actuales (``BenchmarkResult.to_dict``)
+        baseline: Resultados de referencia
+        tolerance: Margen relativo permitido
+        metrics: Percentiles de latencia a comparar
+
+    Returns:
+        Lista de comparaciones con 'name', 'metric', 'baseline', 'current',
+        'change' (relativo) y 'regression'
+    """
+    reference = {row["name"]: row for row in baseline if not row.get("skipped")}
+    comparisons = []
+    for row in results:
+        base = reference.get(row["name"])
+        if base is None or row.get("skipped"):
+            continue
+
+        for metric in metrics:
+            old = base["latency_ms"].get(metric, 0.0)
+            new = row["latency_ms"].get(metric, 0.0)
+            change = (new - old) / old if old else 0.0
+            comparisons.append({"name": row["name"], "metric": f"latency_{metric}", "baseline": old,
+                                "current": new, "change": round(change, 4), "regression": change > tolerance})
+
+        old, new = base.get("throughput", 0.0), row.get("throughput", 0.0)
+        change = (new - old) / old if old else 0.0
+        comparisons.append({"name": row["name"], "metric": "throughput", "baseline": old, "current": new,
+                            "change": round(change, 4), "regression": new * (1 + tolerance) < old})
+    return comparisons
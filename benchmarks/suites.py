@@ -0,0 +1,199 @@
+"""
+Benchmarks de los caminos críticos del procesamiento de documentos.
+
+Grupos:
+- extraction: TXT, DOCX, PDF nativo e imagen escaneada (OCR)
+- cleaning: ``clean_text`` y ``preprocess_text`` (por documento y por lotes)
+- vectorization: TF-IDF del modelo servido por el pipeline
+- classification: cada clasificador disponible (SVM del pipeline, modelo de
+  ``src/ia/models``, keywords, incremental y BETO)
+
+Los que dependen de algo ausente (Tesseract, transformers, un modelo sin
+entrenar) se registran como ``skipped`` con el motivo, para que la salida
+siempre tenga las mismas claves.
+"""
+
+import shutil
+from typing import Callable, Dict, List
+
+from .documents import build_documents, dataset_texts
+from .harness import BenchmarkResult, measure, skipped
+
+
+def _batches(values: List, size: int) -> List[List]:
+    return [values[i:i + size] for i in range(0, len(values), size)]
+
+
+def _single_and_batch(name: str, group: str, single_fn: Callable, batch_fn: Callable, texts: List[str],
+                      batch_size: int, **options) -> List[BenchmarkResult]:
+    batches = _batches(texts, batch_size)
+    return [
+        measure(f"{name}.single", group, single_fn, texts, mode="single", **options),
+        measure(f"{name}.batch", group, batch_fn, batches, mode="batch",
+                items_per_call=[len(batch) for batch in batches], **options),
+    ]
+
+
+def extraction_benchmarks(options: Dict) -> List[BenchmarkResult]:
+    from ai_directia.extractors.unified_extractor import extract_text_from_bytes
+
+    results = []
+    for extension, documents in build_documents().items():
+        name = f"extract.{extension}"
+        if extension == "png" and shutil.which("tesseract") is None:
+            results.append(skipped(name, "extraction", "single", "tesseract no instalado"))
+            continue
+        inputs = documents * options["document_repeat"]
+        results.append(measure(name, "extraction", lambda data, ext=extension: extract_text_from_bytes(data, ext),
+                               inputs, **options["measure"]))
+    return results
+
+
+def cleaning_benchmarks(texts: List[str], options: Dict) -> List[BenchmarkResult]:
+    from ai_directia.preprocessing.text_cleaner import (
+        clean_text, clean_text_batch, preprocess_batch, preprocess_text
+    )
+
+    return (
+        _single_and_batch("clean_text", "cleaning", clean_text, clean_text_batch, texts,
+                          options["batch_size"], **options["measure"])
+        + _single_and_batch("preprocess_text", "cleaning", preprocess_text, preprocess_batch, texts,
+                            options["batch_size"], **options["measure"])
+    )
+
+
+def vectorization_benchmarks(texts: List[str], options: Dict) -> List[BenchmarkResult]:
+    from ai_directia.preprocessing.text_cleaner import preprocess_batch
+    from src.ia.pipeline import ModelBundle
+
+    try:
+        bundle = ModelBundle()
+    except FileNotFoundError as e:
+        return [skipped("tfidf.transform.single", "vectorization", "single", str(e)),
+                skipped("tfidf.transform.batch", "vectorization", "batch", str(e))]
+
+    normalized = preprocess_batch(texts)
+    vectorizer = bundle.vectorizer
+    return _single_and_batch("tfidf.transform", "vectorization", lambda text: vectorizer.transform([text]),
+                             vectorizer.transform, normalized, options["batch_size"], **options["measure"])
+
+
+def _pipeline_svm(texts, options):
+    from ai_directia.preprocessing.text_cleaner import preprocess_batch
+    from src.ia.pipeline import ModelBundle
+
+    bundle = ModelBundle()
+    normalized = preprocess_batch(texts)
+
+    def predict(batch):
+        features = bundle.vectorizer.transform(batch)
+        model = bundle.model
+        return model.predict_proba(features) if hasattr(model, "predict_proba") else model.decision_function(features)
+
+    return _single_and_batch("classify.pipeline_svm", "classification", lambda text: predict([text]), predict,
+                             normalized, options["batch_size"], **options["measure"])
+
+
+def _ml_classifier(texts, options):
+    from src.ia.classifier_ml import MLDocumentClassifier
+
+    classifier = MLDocumentClassifier()
+    if classifier.model is None:
+        raise FileNotFoundError("modelo tfidf_svm_v1 no disponible")
+    return _single_and_batch("classify.tfidf_svm_v1", "classification", classifier.classify_text,
+                             classifier.classify_batch, texts, options["batch_size"], **options["measure"])
+
+
+def _keyword_classifier(texts, options):
+    from src.ia.classifier_optimized import DocumentClassifier
+
+    classifier = DocumentClassifier()
+    return [measure("classify.keywords.single", "classification", classifier.classify_text, texts,
+                    **options["measure"])]
+
+
+def _incremental_classifier(texts, options):
+    from src.ia.training.incremental import INCREMENTAL_MODEL_DIR, IncrementalModel
+
+    if not (INCREMENTAL_MODEL_DIR / "model.pkl").exists():
+        raise FileNotFoundError("modelo incremental no entrenado")
+    model = IncrementalModel.load(INCREMENTAL_MODEL_DIR)
+    return _single_and_batch("classify.incremental", "classification", lambda text: model.predict([text]),
+                             model.predict, texts, options["batch_size"], **options["measure"])
+
+
+def _beto_classifier(texts, options):
+    from src.ia.clasificadores.beto.inferencia import get_classifier
+
+    # Sin torch/transformers o sin el modelo el clasificador cae a keywords:
+    # medirlo no sería BETO. Se mide classify_text y no ejecutar_beto, que
+    # captura cualquier error y devolvería el camino de error.
+    classifier = get_classifier()
+    if classifier.model is None:
+        raise ImportError("BETO no disponible (torch/transformers o el modelo no cargan)")
+
+    # BETO es mucho más lento: basta con una muestra pequeña
+    return [measure("classify.beto.single", "classification", classifier.classify_text, texts[:20],
+                    **options["measure"])]
+
+
+CLASSIFIERS = {
+    "classify.pipeline_svm": _pipeline_svm,
+    "classify.tfidf_svm_v1": _ml_classifier,
+    "classify.keywords": _keyword_classifier,
+    "classify.incremental": _incremental_classifier,
+    "classify.beto": _beto_classifier,
+}
+
+
+def classification_benchmarks(texts: List[str], options: Dict) -> List[BenchmarkResult]:
+    results = []
+    for name, run in CLASSIFIERS.items():
+        try:
+            results.extend(run(texts, options))
+        except (ImportError, OSError) as e:
+            results.append(skipped(name, "classification", "single", f"{type(e).__name__}: {e}"))
+    return results
+
+
+GROUPS = ("extraction", "cleaning", "vectorization", "classification")
+
+
+def run_suite(groups=GROUPS, docs: int = 200, batch_size: int = 32, repeat: int = 1, warmup: int = 3,
+              min_time: float = 0.0, document_repeat: int = 5) -> List[BenchmarkResult]:
+    """
+    Ejecuta los grupos de benchmarks pedidos.
+
+    Args:
+        groups: Grupos a ejecutar
+        docs: Documentos del dataset procesado para limpieza/vectorización/clasificación
+        batch_size: Tamaño de lote en modo batch
+        repeat: Pasadas mínimas sobre las entradas
+        warmup: Llamadas de calentamiento por benchmark
+        min_time: Segundos mínimos de medición por benchmark
+        document_repeat: Repeticiones de cada documento de extracción
+
+    Returns:
+        Lista de BenchmarkResult en orden de ejecución
+    """
+    options = {
+        "batch_size": batch_size,
+        "document_repeat": document_repeat,
+        "measure": {"repeat": repeat, "warmup": warmup, "min_time": min_time},
+    }
+    texts = dataset_texts(limit=docs) if set(groups) - {"extraction"} else []
+
+    results = []
+    for group in groups:
+        print(f"[INFO] Benchmarks: {group}...")
+        if group == "extraction":
+            results.extend(extraction_benchmarks(options))
+        elif group == "cleaning":
+            results.extend(cleaning_benchmarks(texts, options))
+        elif group == "vectorization":
+            results.extend(vectorization_benchmarks(texts, options))
+        elif group == "classification":
+            results.extend(classification_benchmarks(texts, options))
+        else:
+            raise ValueError(f"Grupo de benchmarks desconocido: {group}")
+    return results
@@ -0,0 +1,4 @@
+"""
+Pruebas de carga de la aplicación Flask contra sustitutos locales de
+Postgres (SQLite) y Mongo (en memoria). Ver ``python -m loadtest --help``.
+"""
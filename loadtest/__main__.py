@@ -0,0 +1,74 @@
+"""
+Prueba de carga en un solo comando (sin Postgres ni Mongo).
+
+Uso:
+    python -m loadtest
+    python -m loadtest --users 16 --duration 60
+    python -m loadtest --mix list=50,upload=25,clasificar=25 --output loadtest.json
+    python -m loadtest --url http://localhost:5001     # contra un servidor ya arrancado
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+
+from .harness import DEFAULT_MIX, parse_mix, run_load, start_server
+
+
+def print_report(report):
+    print(f"\n{'Endpoint':<12} {'Peticiones':>10} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+          f"{'Errores':>8}  Estados")
+    print("-" * 90)
+    rows = list(report["endpoints"].items()) + [("TOTAL", report)]
+    for endpoint, stats in rows:
+        latency = stats["latency_ms"]
+        statuses = " ".join(f"{code}:{count}" for code, count in stats.get("statuses", {}).items())
+        print(f"{endpoint:<12} {stats['requests']:>10} {stats['throughput_rps']:>8.1f} {latency['p50']:>9.1f} "
+              f"{latency['p95']:>9.1f} {latency['p99']:>9.1f} {stats['errors']:>8}  {statuses}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prueba de carga de la aplicación Flask")
+    parser.add_argument("--users", type=int, default=8, help="Usuarios concurrentes (hilos)")
+    parser.add_argument("--duration", type=float, default=30.0, help="Segundos de carga")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX,
+                        help="Pesos por operación: list=30,upload=20,upload_ia=10,clasificar=20,move=10,delete=10")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--url", default=None, help="Servidor ya arrancado (no levanta uno local)")
+    parser.add_argument("--workdir", default=None, help="Directorio de datos del servidor local (por defecto temporal)")
+    parser.add_argument("--output", default=None, help="Guardar el informe en JSON")
+    args = parser.parse_args(argv)
+
+    server = None
+    tmp = None
+    if args.url:
+        base_url = args.url.rstrip("/")
+    else:
+        workdir = args.workdir
+        if workdir is None:
+            tmp = tempfile.TemporaryDirectory(prefix="directia-loadtest-")
+            workdir = tmp.name
+        server = start_server(workdir)
+        base_url = server.base_url
+
+    try:
+        print(f"[INFO] {args.users} usuarios durante {args.duration:.0f}s contra {base_url}...")
+        report = run_load(base_url, users=args.users, duration=args.duration, mix=args.mix, seed=args.seed)
+    finally:
+        if server is not None:
+            server.stop()
+        if tmp is not None:
+            tmp.cleanup()
+
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n[OK] Informe guardado en {args.output}")
+
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,322 @@
+"""
+Prueba de carga de extremo a extremo de la aplicación Flask.
+
+``start_server`` arranca ``create_app`` contra sustitutos locales (SQLite
+para SQLAlchemy, ``MemoryDatabase`` para Mongo, almacenamiento y logs en un
+directorio temporal) en un servidor WSGI multihilo en un puerto libre.
+
+``run_load`` lanza N usuarios virtuales (hilos con su propia sesión HTTP)
+durante un tiempo fijo. Cada usuario elige la siguiente operación según la
+mezcla de tráfico (list, upload, upload?ia=true, clasificar, move, delete)
+y trabaja en su propia carpeta, así que mover y borrar siempre afectan a
+archivos que ese usuario subió antes.
+"""
+
+import random
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+from benchmarks.documents import BUILDERS, fixture_texts
+from benchmarks.harness import percentile
+
+
+DEFAULT_MIX = {
+    "list": 30,
+    "upload": 20,
+    "upload_ia": 10,
+    "clasificar": 20,
+    "move": 10,
+    "delete": 10,
+}
+
+# Formatos de los documentos subidos (el OCR de imágenes queda fuera: depende de Tesseract)
+UPLOAD_FORMATS = ("txt", "pdf", "docx")
+
+
+# ---------------------------------------------------------------------------
+# Servidor
+# ---------------------------------------------------------------------------
+
+@dataclass
+class LoadTestServer:
+    """Aplicación arrancada en segundo plano."""
+
+    app: object
+    server: object
+    thread: threading.Thread
+    workdir: Path
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_port}"
+
+    def stop(self) -> None:
+        from src.ia.search_index import close_indexer
+
+        self.server.shutdown()
+        self.thread.join(timeout=10)
+        # El índice vive en workdir: aplicar lo encolado antes de que se borre
+        if not close_indexer(self.app.config["SEARCH_INDEX_PATH"]):
+            print("[WARNING] El índice de búsqueda no terminó de aplicar las operaciones pendientes")
+
+
+def build_app(workdir):
+    """
+    Crea la aplicación contra los sustitutos locales.
+
+    Args:
+        workdir: Directorio temporal para SQLite, almacenamiento y logs
+
+    Returns:
+        Aplicación Flask
+    """
+    from src.app import create_app
+    from src.ia.logger import get_logger
+    from src.services import files as file_service
+
+    from .memory_mongo import MemoryDatabase
+
+    workdir = Path(workdir)
+    storage = workdir / "storage"
+    storage.mkdir(parents=True, exist_ok=True)
+
+    # El servicio de archivos usa su propia ruta base; el logger de predicciones
+    # es un singleton, así que se crea aquí antes que el pipeline
+    file_service.BASE_STORAGE_PATH = str(storage)
+    get_logger(log_dir=str(workdir / "predictions"))
+
+    return create_app(
+        config={
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{workdir / 'loadtest.sqlite3'}",
+            "STORAGE_PATH": str(storage),
+            "SECRET_KEY": "loadtest",
+            "CREATE_TABLES": True,
+            "SEARCH_INDEX_PATH": str(workdir / "search.sqlite3"),
+        },
+        mongo_db=MemoryDatabase(),
+    )
+
+
+def start_server(workdir, host: str = "127.0.0.1", port: int = 0) -> LoadTestServer:
+    """Arranca la aplicación en un servidor WSGI multihilo (puerto libre por defecto)."""
+    from werkzeug.serving import WSGIRequestHandler, make_server
+
+    class QuietHandler(WSGIRequestHandler):
+        # Una línea de log por petición distorsiona las latencias
+        def log_request(self, *args, **kwargs):
+            pass
+
+    app = build_app(workdir)
+    server = make_server(host, port, app, threaded=True, request_handler=QuietHandler)
+    thread = threading.Thread(target=server.serve_forever, name="loadtest-server", daemon=True)
+    thread.start()
+    print(f"[INFO] Aplicación de prueba en http://{host}:{server.server_port} (datos en {workdir})")
+    return LoadTestServer(app=app, server=server, thread=thread, workdir=Path(workdir))
+
+
+# ---------------------------------------------------------------------------
+# Cliente
+# ---------------------------------------------------------------------------
+
+@dataclass
+class EndpointStats:
+    latencies_ms: List[float] = field(default_factory=list)
+    statuses: Dict[int, int] = field(default_factory=lambda: defaultdict(int))
+    errors: int = 0
+
+
+class Recorder:
+    """Latencias y códigos de estado por endpoint (compartido entre hilos)."""
+
+    def __init__(self):
+        self._stats: Dict[str, EndpointStats] = defaultdict(EndpointStats)
+        self._lock = threading.Lock()
+
+    def record(self, endpoint: str, latency_ms: float, status: Optional[int]) -> None:
+        with self._lock:
+            stats = self._stats[endpoint]
+            stats.latencies_ms.append(latency_ms)
+            if status is None:
+                stats.errors += 1
+            else:
+                stats.statuses[status] += 1
+                if status >= 500:
+                    stats.errors += 1
+
+    def report(self, elapsed_s: float) -> Dict:
+        """Throughput, percentiles y estados por endpoint, más el total."""
+        endpoints = {}
+        all_latencies = []
+        with self._lock:
+            for endpoint, stats in sorted(self._stats.items()):
+                latencies = stats.latencies_ms
+                all_latencies.extend(latencies)
+                endpoints[endpoint] = {
+                    "requests": len(latencies),
+                    "throughput_rps": round(len(latencies) / elapsed_s, 2) if elapsed_s else 0.0,
+                    "latency_ms": _latency_summary(latencies),
+                    "statuses": {str(status): count for status, count in sorted(stats.statuses.items())},
+                    "errors": stats.errors,
+                }
+        return {
+            "elapsed_s": round(elapsed_s, 3),
+            "requests": len(all_latencies),
+            "throughput_rps": round(len(all_latencies) / elapsed_s, 2) if elapsed_s else 0.0,
+            "latency_ms": _latency_summary(all_latencies),
+            "errors": sum(row["errors"] for row in endpoints.values()),
+            "endpoints": endpoints,
+        }
+
+
+def _latency_summary(latencies: List[float]) -> Dict[str, float]:
+    return {
+        "p50": round(percentile(latencies, 50), 3),
+        "p95": round(percentile(latencies, 95), 3),
+        "p99": round(percentile(latencies, 99), 3),
+        "max": round(max(latencies), 3) if latencies else 0.0,
+    }
+
+
+class VirtualUser:
+    """Un usuario que repite operaciones de la mezcla sobre su carpeta."""
+
+    def __init__(self, index: int, base_url: str, mix: Dict[str, int], documents: List[Tuple[str, bytes]],
+                 recorder: Recorder, seed: int = 0, timeout: float = 60.0):
+        self.name = f"loadtest{index}"
+        self.folder = f"loadtest/{self.name}"
+        self.base_url = base_url
+        self.recorder = recorder
+        self.documents = documents
+        self.rng = random.Random(f"{seed}:{index}")
+        self.operations = list(mix)
+        self.weights = [mix[operation] for operation in self.operations]
+        self.session = requests.Session()
+        self.timeout = timeout
+        self.files: List[str] = []
+        self.counter = 0
+
+    def _request(self, endpoint: str, method: str, path: str, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, self.base_url + path, timeout=self.timeout, **kwargs)
+        except requests.RequestException:
+            self.recorder.record(endpoint, (time.perf_counter() - start) * 1000, None)
+            return None
+        self.recorder.record(endpoint, (time.perf_counter() - start) * 1000, response.status_code)
+        return response
+
+    def _document(self) -> Tuple[str, bytes]:
+        self.counter += 1
+        extension, data = self.rng.choice(self.documents)
+        return f"doc{self.counter}.{extension}", data
+
+    def upload(self, ia: bool = False) -> None:
+        filename, data = self._document()
+        response = self._request(
+            "upload_ia" if ia else "upload", "POST", "/api/files/upload" + ("?ia=true" if ia else ""),
+            files={"file": (filename, data)}, data={"folder": self.folder, "user": self.name},
+        )
+        if response is not None and response.status_code == 201:
+            self.files.append(f"{self.folder}/{response.json()['metadata']['filename']}")
+
+    def clasificar(self) -> None:
+        filename, data = self._document()
+        self._request("clasificar", "POST", "/api/clasificar", files={"file": (filename, data)},
+                      data={"user": self.name})
+
+    def list(self) -> None:
+        self._request("list", "GET", "/api/files/list")
+
+    def move(self) -> None:
+        if not self.files:
+            return self.upload()
+        source = self.files.pop(self.rng.randrange(len(self.files)))
+        target_dir = f"{self.folder}/moved" if "/moved/" not in source else self.folder
+        target = f"{target_dir}/{source.rsplit('/', 1)[-1]}"
+        response = self._request("move", "POST", "/api/files/move", json={"origen": source, "destino": target})
+        if response is not None and response.status_code == 200:
+            self.files.append(f"{target_dir}/{response.json()['filename']}")
+
+    def delete(self) -> None:
+        if not self.files:
+            return self.upload()
+        path = self.files.pop(self.rng.randrange(len(self.files)))
+        self._request("delete", "DELETE", f"/api/files/delete/{path}", params={"username": self.name})
+
+    def step(self) -> None:
+        operation = self.rng.choices(self.operations, weights=self.weights)[0]
+        if operation == "upload_ia":
+            self.upload(ia=True)
+        else:
+            getattr(self, operation)()
+
+
+def load_documents() -> List[Tuple[str, bytes]]:
+    """Documentos a subir: cada fixture de ``tests/fixtures`` en TXT, PDF y DOCX."""
+    return [(extension, BUILDERS[extension](text)) for text in fixture_texts().values()
+            for extension in UPLOAD_FORMATS]
+
+
+def run_load(base_url: str, users: int = 8, duration: float = 30.0, mix: Optional[Dict[str, int]] = None,
+             seed: int = 0, warmup_requests: int = 1) -> Dict:
+    """
+    Lanza ``users`` usuarios virtuales durante ``duration`` segundos.
+
+    Args:
+        base_url: URL de la aplicación
+        users: Hilos cliente concurrentes
+        duration: Segundos de carga (sin contar el calentamiento)
+        mix: Peso de cada operación (por defecto DEFAULT_MIX)
+        seed: Semilla de las decisiones de los usuarios
+        warmup_requests: Peticiones de calentamiento por endpoint de IA (carga del modelo)
+
+    Returns:
+        Informe con throughput y percentiles por endpoint
+    """
+    mix = mix or DEFAULT_MIX
+    unknown = set(mix) - set(DEFAULT_MIX)
+    if unknown:
+        raise ValueError(f"Operaciones desconocidas en la mezcla: {sorted(unknown)}")
+
+    documents = load_documents()
+
+    # Calentamiento fuera de la medición: el primer upload?ia/clasificar carga el modelo
+    warmup = VirtualUser(-1, base_url, {"upload": 1}, documents, Recorder(), seed)
+    for _ in range(warmup_requests):
+        warmup.upload(ia=True)
+        warmup.clasificar()
+
+    recorder = Recorder()
+    virtual_users = [VirtualUser(index, base_url, mix, documents, recorder, seed) for index in range(users)]
+    deadline = time.perf_counter() + duration
+
+    def run(user: VirtualUser):
+        while time.perf_counter() < deadline:
+            user.step()
+
+    threads = [threading.Thread(target=run, args=(user,), name=user.name) for user in virtual_users]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    report = recorder.report(elapsed)
+    report["config"] = {"users": users, "duration_s": duration, "mix": mix, "seed": seed}
+    return report
+
+
+def parse_mix(value: str) -> Dict[str, int]:
+    """'list=30,upload=20' -> {'list': 30, 'upload': 20}"""
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        mix[name.strip()] = int(weight)
+    return mix
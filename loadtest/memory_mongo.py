@@ -0,0 +1,343 @@
+"""
+Sustituto en memoria de una base de datos de PyMongo para las pruebas de
+carga (mismo espíritu que mongomock, solo con lo que usan los servicios).
+
+Soporta ``db["col"]`` / ``db.col`` y, por colección: insert_one/many,
+find_one, find (con sort/skip/limit), update_one/many (con upsert),
+delete_one/many, count_documents, distinct, bulk_write y create_index.
+
+Filtros: igualdad (incluidos campos con puntos), ``$in``, ``$nin``, ``$ne``,
+``$gt``/``$gte``/``$lt``/``$lte``, ``$exists``, ``$regex``, ``$or`` y
+``$and``. Actualizaciones: ``$set``, ``$unset``, ``$inc``, ``$push`` y
+``$setOnInsert``. Cada colección tiene un lock, así que es segura con el
+servidor multihilo.
+"""
+
+import copy
+import re
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+from bson import ObjectId
+from pymongo import ASCENDING, DeleteMany, DeleteOne, InsertOne, UpdateMany, UpdateOne
+
+
+_MISSING = object()
+
+
+@dataclass
+class InsertOneResult:
+    inserted_id: Any
+
+
+@dataclass
+class InsertManyResult:
+    inserted_ids: List[Any]
+
+
+@dataclass
+class UpdateResult:
+    matched_count: int
+    modified_count: int
+    upserted_id: Any = None
+
+
+@dataclass
+class DeleteResult:
+    deleted_count: int
+
+
+@dataclass
+class BulkWriteResult:
+    inserted_count: int = 0
+    matched_count: int = 0
+    modified_count: int = 0
+    deleted_count: int = 0
+    upserted_count: int = 0
+
+
+def _get(document: Dict, path: str):
+    value = document
+    for key in path.split("."):
+        if not isinstance(value, dict) or key not in value:
+            return _MISSING
+        value = value[key]
+    return value
+
+
+def _set(document: Dict, path: str, value) -> None:
+    keys = path.split(".")
+    for key in keys[:-1]:
+        document = document.setdefault(key, {})
+    document[keys[-1]] = value
+
+
+def _unset(document: Dict, path: str) -> None:
+    keys = path.split(".")
+    for key in keys[:-1]:
+        document = document.get(key)
+        if not isinstance(document, dict):
+            return
+    document.pop(keys[-1], None)
+
+
+def _equals(value, expected) -> bool:
+    if isinstance(value, list) and not isinstance(expected, list):
+        return expected in value
+    return value == expected
+
+
+def _match_operator(value, operator: str, argument) -> bool:
+    present = value is not _MISSING
+    if operator == "$exists":
+        return present == bool(argument)
+    if operator == "$ne":
+        return not present or not _equals(value, argument)
+    if operator == "$nin":
+        return not present or not any(_equals(value, item) for item in argument)
+    if not present:
+        return False
+    if operator == "$in":
+        return any(_equals(value, item) for item in argument)
+    if operator == "$regex":
+        return isinstance(value, str) and re.search(argument, value) is not None
+    try:
+        if operator == "$gt":
+            return value > argument
+        if operator == "$gte":
+            return value >= argument
+        if operator == "$lt":
+            return value < argument
+        if operator == "$lte":
+            return value <= argument
+    except TypeError:
+        return False
+    raise NotImplementedError(f"Operador no soportado: {operator}")
+
+
+def matches(document: Dict, query: Optional[Dict]) -> bool:
+    """True si ``document`` cumple el filtro de Mongo ``query``."""
+    for key, condition in (query or {}).items():
+        if key == "$or":
+            if not any(matches(document, sub) for sub in condition):
+                return False
+        elif key == "$and":
+            if not all(matches(document, sub) for sub in condition):
+                return False
+        elif isinstance(condition, dict) and condition and all(op.startswith("$") for op in condition):
+            value = _get(document, key)
+            for operator, argument in condition.items():
+                if operator == "$options":
+                    continue
+                if operator == "$regex" and "i" in condition.get("$options", ""):
+                    argument = re.compile(argument, re.IGNORECASE)
+                if not _match_operator(value, operator, argument):
+                    return False
+        elif isinstance(condition, re.Pattern):
+            value = _get(document, key)
+            if not isinstance(value, str) or not condition.search(value):
+                return False
+        else:
+            if not _equals(_get(document, key), condition):
+                return False
+    return True
+
+
+def _apply_update(document: Dict, update: Dict, inserting: bool = False) -> None:
+    for operator, fields in update.items():
+        if operator == "$setOnInsert" and not inserting:
+            continue
+        for path, value in fields.items():
+            if operator in ("$set", "$setOnInsert"):
+                _set(document, path, copy.deepcopy(value))
+            elif operator == "$unset":
+                _unset(document, path)
+            elif operator == "$inc":
+                current = _get(document, path)
+                _set(document, path, (0 if current is _MISSING else current) + value)
+            elif operator == "$push":
+                current = _get(document, path)
+                _set(document, path, ([] if current is _MISSING else list(current)) + [copy.deepcopy(value)])
+            else:
+                raise NotImplementedError(f"Operador de actualización no soportado: {operator}")
+
+
+def _sort_key(document: Dict, path: str):
+    # Los documentos sin el campo van primero, como en Mongo
+    value = _get(document, path)
+    return (0, 0) if value is _MISSING else (1, value)
+
+
+class MemoryCursor:
+    """Resultado de ``find``: iterable con sort/skip/limit encadenables."""
+
+    def __init__(self, documents: List[Dict]):
+        self._documents = documents
+        self._skip = 0
+        self._limit = 0
+
+    def sort(self, key_or_list, direction=ASCENDING):
+        keys = key_or_list if isinstance(key_or_list, list) else [(key_or_list, direction)]
+        for key, order in reversed(keys):
+            self._documents.sort(key=lambda doc: _sort_key(doc, key), reverse=order < 0)
+        return self
+
+    def skip(self, count: int):
+        self._skip = count
+        return self
+
+    def limit(self, count: int):
+        self._limit = count
+        return self
+
+    def __iter__(self):
+        documents = self._documents[self._skip:]
+        if self._limit:
+            documents = documents[:self._limit]
+        return iter(documents)
+
+
+class MemoryCollection:
+    def __init__(self, name: str):
+        self.name = name
+        self._documents: List[Dict] = []
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _project(document: Dict, projection: Optional[Dict]) -> Dict:
+        document = copy.deepcopy(document)
+        if not projection:
+            return document
+        included = [key for key, flag in projection.items() if flag and key != "_id"]
+        if included:
+            result = {key: document[key] for key in included if key in document}
+            if projection.get("_id", 1):
+                result["_id"] = document["_id"]
+            return result
+        for key, flag in projection.items():
+            if not flag:
+                document.pop(key, None)
+        return document
+
+    def create_index(self, *args, **kwargs) -> str:
+        return "memory_index"
+
+    def insert_one(self, document: Dict) -> InsertOneResult:
+        document.setdefault("_id", ObjectId())
+        with self._lock:
+            self._documents.append(copy.deepcopy(document))
+        return InsertOneResult(document["_id"])
+
+    def insert_many(self, documents: Iterable[Dict], ordered: bool = True) -> InsertManyResult:
+        return InsertManyResult([self.insert_one(document).inserted_id for document in documents])
+
+    def find(self, query: Optional[Dict] = None, projection: Optional[Dict] = None) -> MemoryCursor:
+        with self._lock:
+            return MemoryCursor([self._project(doc, projection) for doc in self._documents if matches(doc, query)])
+
+    def find_one(self, query: Optional[Dict] = None, projection: Optional[Dict] = None) -> Optional[Dict]:
+        with self._lock:
+            for document in self._documents:
+                if matches(document, query):
+                    return self._project(document, projection)
+        return None
+
+    def count_documents(self, query: Optional[Dict] = None) -> int:
+        with self._lock:
+            return sum(1 for document in self._documents if matches(document, query))
+
+    def distinct(self, key: str, query: Optional[Dict] = None) -> List:
+        values = []
+        with self._lock:
+            for document in self._documents:
+                value = _get(document, key)
+                if matches(document, query) and value is not _MISSING and value not in values:
+                    values.append(value)
+        return values
+
+    def _update(self, query: Dict, update: Dict, upsert: bool, many: bool) -> UpdateResult:
+        matched = 0
+        with self._lock:
+            for document in self._documents:
+                if matches(document, query):
+                    _apply_update(document, update)
+                    matched += 1
+                    if not many:
+                        break
+            if matched or not upsert:
+                return UpdateResult(matched, matched)
+
+            document = {key: value for key, value in query.items()
+                        if not key.startswith("$") and not isinstance(value, dict)}
+            _apply_update(document, update, inserting=True)
+            document.setdefault("_id", ObjectId())
+            self._documents.append(document)
+            return UpdateResult(0, 0, document["_id"])
+
+    def update_one(self, query: Dict, update: Dict, upsert: bool = False) -> UpdateResult:
+        return self._update(query, update, upsert, many=False)
+
+    def update_many(self, query: Dict, update: Dict, upsert: bool = False) -> UpdateResult:
+        return self._update(query, update, upsert, many=True)
+
+    def _delete(self, query: Dict, many: bool) -> DeleteResult:
+        with self._lock:
+            kept, deleted = [], 0
+            for document in self._documents:
+                if (many or not deleted) and matches(document, query):
+                    deleted += 1
+                else:
+                    kept.append(document)
+            self._documents = kept
+        return DeleteResult(deleted)
+
+    def delete_one(self, query: Dict) -> DeleteResult:
+        return self._delete(query, many=False)
+
+    def delete_many(self, query: Dict) -> DeleteResult:
+        return self._delete(query, many=True)
+
+    def bulk_write(self, requests: List, ordered: bool = True) -> BulkWriteResult:
+        result = BulkWriteResult()
+        with self._lock:
+            for request in requests:
+                # Las operaciones de PyMongo guardan sus argumentos en atributos privados
+                if isinstance(request, InsertOne):
+                    self.insert_one(request._doc)
+                    result.inserted_count += 1
+                elif isinstance(request, (UpdateOne, UpdateMany)):
+                    update = self._update(request._filter, request._doc, bool(request._upsert),
+                                          many=isinstance(request, UpdateMany))
+                    result.matched_count += update.matched_count
+                    result.modified_count += update.modified_count
+                    result.upserted_count += update.upserted_id is not None
+                elif isinstance(request, (DeleteOne, DeleteMany)):
+                    result.deleted_count += self._delete(request._filter,
+                                                         many=isinstance(request, DeleteMany)).deleted_count
+                else:
+                    raise NotImplementedError(f"Operación no soportada: {type(request).__name__}")
+        return result
+
+
+class MemoryDatabase:
+    """Base de datos en memoria: las colecciones se crean al primer acceso."""
+
+    def __init__(self, name: str = "directia"):
+        self.name = name
+        self._collections: Dict[str, MemoryCollection] = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, name: str) -> MemoryCollection:
+        with self._lock:
+            if name not in self._collections:
+                self._collections[name] = MemoryCollection(name)
+            return self._collections[name]
+
+    def __getattr__(self, name: str) -> MemoryCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    def list_collection_names(self) -> List[str]:
+        return list(self._collections)
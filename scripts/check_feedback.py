@@ -4,18 +4,22 @@ Script para revisar estadísticas de feedback.
 Uso:
     python scripts/check_feedback.py
     python scripts/check_feedback.py --days 30
+
+Las cifras salen de los agregados diarios (src.ia.rollups); tras migrar
+logs antiguos, reconstruirlos con: python -m src.ia.rollups backfill
 """
 
 import sys
 import os
 import argparse
-import json
-from datetime import datetime, timedelta
 from collections import Counter
 
 # Añadir src al path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
+from src.ia.log_store import FEEDBACK_DIR, PREDICTIONS_DIR, PartitionedLog
+from src.ia.rollups import days_since, get_rollups
+
 
 def main():
     parser = argparse.ArgumentParser(description="Revisar estadísticas de feedback")
@@ -29,52 +33,27 @@ def main():
 
     args = parser.parse_args()
 
-    feedback_file = "logs/user_feedback.jsonl"
-    predictions_file = "logs/predictions.jsonl"
+    feedback_log = PartitionedLog(FEEDBACK_DIR)
+    predictions_log = PartitionedLog(PREDICTIONS_DIR)
+    rollups = get_rollups()
 
     print("\n" + "=" * 70)
     print("ESTADÍSTICAS DE FEEDBACK")
     print("=" * 70)
 
     # Análisis de feedback
-    if os.path.exists(feedback_file):
+    if feedback_log.partitions():
         print(f"\n📊 Analizando feedback de últimos {args.days} días...")
 
-        cutoff_date = datetime.now() - timedelta(days=args.days)
-
+        summary = rollups.feedback_stats(since=days_since(args.days))
         feedback_stats = {
-            "total": 0,
-            "correct": 0,
-            "incorrect": 0,
-            "by_type": Counter(),
-            "corrections": Counter()
+            "total": summary["total_feedback"],
+            "correct": summary["correct_predictions"],
+            "incorrect": summary["incorrect_predictions"],
+            "by_type": Counter(summary["by_type"]),
+            "corrections": Counter(summary["corrections_by_type"])
         }
 
-        with open(feedback_file, 'r', encoding='utf-8') as f:
-            for line in f:
-                try:
-                    entry = json.loads(line)
-                    entry_date = datetime.fromisoformat(entry.get("timestamp", ""))
-
-                    if entry_date < cutoff_date:
-                        continue
-
-                    feedback_stats["total"] += 1
-
-                    if entry.get("was_correct"):
-                        feedback_stats["correct"] += 1
-                    else:
-                        feedback_stats["incorrect"] += 1
-
-                        pred = entry.get("predicted_type")
-                        actual = entry.get("actual_type")
-                        feedback_stats["corrections"][f"{pred} -> {actual}"] += 1
-
-                    feedback_stats["by_type"][entry.get("actual_type")] += 1
-
-                except Exception:
-                    continue
-
         if feedback_stats["total"] > 0:
             accuracy = feedback_stats["correct"] / feedback_stats["total"]
 
@@ -113,54 +92,22 @@ def main():
             print("\n⚠️ No hay feedback en el período especificado")
 
     else:
-        print(f"\n⚠️ No existe archivo de feedback: {feedback_file}")
+        print(f"\n⚠️ No hay particiones de feedback en: {FEEDBACK_DIR}")
 
     # Análisis de predicciones
-    if os.path.exists(predictions_file):
+    if predictions_log.partitions():
         print(f"\n📈 Analizando predicciones...")
 
-        cutoff_date = datetime.now() - timedelta(days=args.days)
-
+        summary = rollups.prediction_stats(since=days_since(args.days))
         pred_stats = {
-            "total": 0,
-            "by_type": Counter(),
-            "by_confidence": {"low": 0, "medium": 0, "high": 0},
-            "avg_confidence": []
+            "total": summary["total_predictions"],
+            "by_type": Counter(summary["by_type"]),
+            "by_confidence": summary["by_confidence"],
+            "avg_confidence": summary["avg_confidence"]
         }
 
-        with open(predictions_file, 'r', encoding='utf-8') as f:
-            for line in f:
-                try:
-                    entry = json.loads(line)
-
-                    if entry.get("type") == "error":
-                        continue
-
-                    entry_date = datetime.fromisoformat(entry.get("timestamp", ""))
-
-                    if entry_date < cutoff_date:
-                        continue
-
-                    pred_stats["total"] += 1
-
-                    pred_type = entry.get("predicted")
-                    pred_stats["by_type"][pred_type] += 1
-
-                    confidence = entry.get("confidence", 0)
-                    pred_stats["avg_confidence"].append(confidence)
-
-                    if confidence < 0.6:
-                        pred_stats["by_confidence"]["low"] += 1
-                    elif confidence < 0.8:
-                        pred_stats["by_confidence"]["medium"] += 1
-                    else:
-                        pred_stats["by_confidence"]["high"] += 1
-
-                except Exception:
-                    continue
-
         if pred_stats["total"] > 0:
-            avg_conf = sum(pred_stats["avg_confidence"]) / len(pred_stats["avg_confidence"])
+            avg_conf = pred_stats["avg_confidence"]
 
             print(f"\n✅ PREDICCIONES:")
             print(f"   Total: {pred_stats['total']}")
@@ -177,7 +124,7 @@ def main():
                 print(f"   - {doc_type}: {count} ({count/total:.1%})")
 
     else:
-        print(f"\n⚠️ No existe archivo de predicciones: {predictions_file}")
+        print(f"\n⚠️ No hay particiones de predicciones en: {PREDICTIONS_DIR}")
 
     print("\n" + "=" * 70)
 
@@ -5,6 +5,7 @@ Uso:
     python scripts/evaluate_model.py --model tfidf_svm_v1
     python scripts/evaluate_model.py --validation validation.csv
     python scripts/evaluate_model.py --compare
+    python scripts/evaluate_model.py --predictions-dir logs/evaluation
 """
 
 import sys
@@ -14,6 +15,7 @@ import argparse
 # Añadir src al path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
+from ai_directia.preprocessing.dataset_cache import load_split
 from src.ia.evaluation import (
     ModelEvaluator,
     create_validation_template,
@@ -53,6 +55,12 @@ def main():
         help="Archivo de salida para plantilla"
     )
 
+    parser.add_argument(
+        "--predictions-dir",
+        default=None,
+        help="Directorio donde guardar las predicciones por documento"
+    )
+
     args = parser.parse_args()
 
     # Crear plantilla
@@ -81,33 +89,30 @@ def main():
         import pandas as pd
 
         # Intentar cargar datos reales desde feedback
-        feedback_file = "logs/user_feedback.jsonl"
+        from src.ia.log_store import get_feedback_log
 
-        if os.path.exists(feedback_file):
+        feedback_log = get_feedback_log()
+
+        if feedback_log.partitions():
             print("\n📂 Cargando datos reales desde feedback...")
 
-            import json
             entries = []
 
-            with open(feedback_file, 'r', encoding='utf-8') as f:
-                for line in f:
-                    try:
-                        entry = json.loads(line)
-                        # Buscar texto en predictions.jsonl
-                        # (simplificado - en producción usar método completo)
-                        entries.append({
-                            "text": entry.get("comment", ""),
-                            "label": entry.get("actual_type")
-                        })
-                    except Exception:
-                        continue
+            for entry in feedback_log.read(columns=("comment", "actual_type")):
+                # Buscar texto en el log de predicciones
+                # (simplificado - en producción usar método completo)
+                entries.append({
+                    "text": entry.get("comment") or "",
+                    "label": entry.get("actual_type")
+                })
 
             if entries:
                 real_df = pd.DataFrame(entries)
                 real_df = real_df[real_df['text'] != '']
 
                 results = evaluator.compare_synthetic_vs_real(
-                    real_test_df=real_df
+                    real_test_df=real_df,
+                    predictions_dir=args.predictions_dir
                 )
             else:
                 print("\n⚠️ No hay datos reales suficientes")
@@ -116,13 +121,14 @@ def main():
 
     else:
         # Evaluación en sintéticos
-        import pandas as pd
-
         test_path = "src/ia/datasets/processed/test.csv"
 
         if os.path.exists(test_path):
-            test_df = pd.read_csv(test_path)
-            results = evaluator.evaluate_on_dataset(test_df)
+            test_df = load_split(test_path)
+            predictions_path = None
+            if args.predictions_dir:
+                predictions_path = os.path.join(args.predictions_dir, "predictions_synthetic.parquet")
+            results = evaluator.evaluate_on_dataset(test_df, predictions_path)
 
             # Identificar categorías débiles
             weak_cats = evaluator.identify_weak_categories(test_df, threshold=0.8)
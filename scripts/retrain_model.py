@@ -5,6 +5,8 @@ Uso:
     python scripts/retrain_model.py
     python scripts/retrain_model.py --days 60
     python scripts/retrain_model.py --check
+    python scripts/retrain_model.py --incremental        # feedback nuevo -> modelo incremental
+    python scripts/retrain_model.py --incremental-refit  # reajuste completo del modelo incremental
 """
 
 import sys
@@ -14,6 +16,7 @@ import argparse
 # Añadir src al path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
+from src.ia.log_store import FEEDBACK_DIR
 from src.ia.retraining import RetrainingPipeline, quick_retrain
 
 
@@ -46,10 +49,43 @@ def main():
         help="Mínimo de feedback para re-entrenar (default: 50)"
     )
 
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Incorporar el feedback nuevo al modelo incremental (partial_fit)"
+    )
+
+    parser.add_argument(
+        "--incremental-refit",
+        action="store_true",
+        help="Reajuste completo del modelo incremental (corrige la deriva)"
+    )
+
     args = parser.parse_args()
 
     pipeline = RetrainingPipeline()
 
+    # Modelo incremental
+    if args.incremental or args.incremental_refit:
+        if args.incremental_refit:
+            result = pipeline.incremental_refit()
+        else:
+            result = pipeline.incremental_update()
+
+        if "error" in result:
+            print(f"\n❌ Error: {result['error']}")
+            print("   Ejecuta: python scripts/retrain_model.py --incremental-refit")
+            return
+
+        print(f"\n✅ MODELO INCREMENTAL ACTUALIZADO")
+        print(f"   Ejemplos: {result['samples']}")
+        if "update_ms" in result:
+            print(f"   Tiempo de actualización: {result['update_ms']:.1f} ms")
+        if result.get("metrics"):
+            print(f"   Accuracy (val): {result['metrics']['accuracy']:.2%}")
+        print(f"\n💡 Para servirlo: IA_MODEL_DIR=src/ia/models/incremental")
+        return
+
     # Solo verificar
     if args.check:
         print("\n🔍 Verificando si es necesario re-entrenar...")
@@ -89,7 +125,7 @@ def main():
         print(f"\n❌ Error: {result['error']}")
         print("\nConsejos:")
         print("   - Asegúrate de tener suficiente feedback (mínimo 50 ejemplos)")
-        print("   - Verifica que el archivo logs/user_feedback.jsonl existe")
+        print(f"   - Verifica que existen particiones de feedback en {FEEDBACK_DIR}/")
         print("   - Aumenta --days para incluir más feedback")
         return
 
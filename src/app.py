@@ -2,41 +2,28 @@
 import os
 from flask import Flask
 from flask_cors import CORS
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, scoped_session
-from pymongo import MongoClient
 from src.config import ActiveConfig
+from src.db import MongoConnection, SQLDatabase, engine_options, mongo_options
+from src.migrate import migrate
 from src.routes import register_blueprints
-from src.models import Base, Role
-from sqlalchemy import inspect
 from src.routes.admin import bp as admin_bp
+from src.utils import metrics
 
 
-def init_roles(session):
-    """Inicializa los roles básicos si no existen"""
-    try:
-        admin_role = session.query(Role).filter_by(name="admin").first()
-        if not admin_role:
-            admin_role = Role(name="admin", description="Administrador del sistema")
-            session.add(admin_role)
-            print("Rol 'admin' creado")
+def create_app(config=None, mongo_db=None):
+    """
+    Crea la aplicación Flask.
 
-        user_role = session.query(Role).filter_by(name="usuario").first()
-        if not user_role:
-            user_role = Role(name="usuario", description="Usuario estándar")
-            session.add(user_role)
-            print("Rol 'usuario' creado")
-
-        session.commit()
-        print("Roles inicializados correctamente")
-    except Exception as e:
-        session.rollback()
-        print(f"Error inicializando roles: {e}")
-
-
-def create_app():
+    Args:
+        config: Valores que sobrescriben ActiveConfig (p. ej. SQLALCHEMY_DATABASE_URI
+            apuntando a SQLite en las pruebas de carga)
+        mongo_db: Base de datos Mongo ya creada; si es None se conecta a MONGO_URI
+    """
     app = Flask(__name__)
 
+    # Métricas de peticiones (/metrics); se registra antes que el resto de hooks
+    metrics.init_app(app)
+
     # Habilitar CORS para todas las rutas
     CORS(app, resources={
         r"/api/*": {
@@ -55,38 +42,38 @@ def create_app():
 
     app.register_blueprint(admin_bp)
     app.config.from_object(ActiveConfig)
+    if config:
+        app.config.update(config)
 
     storage_path = app.config.get("STORAGE_PATH", "./storage/files")
     os.makedirs(storage_path, exist_ok=True)
 
-    engine = create_engine(app.config["SQLALCHEMY_DATABASE_URI"])
-    SessionLocal = scoped_session(sessionmaker(bind=engine, autocommit=False, autoflush=False))
-    app.session = SessionLocal
+    # Engine y MongoClient se crean al primer uso en cada proceso (tras el fork
+    # de gunicorn), con los pools dimensionados por la configuración
+    database_uri = app.config["SQLALCHEMY_DATABASE_URI"]
+    app.session = SQLDatabase(database_uri, engine_options(app.config))
 
-    inspector = inspect(engine)
-    existing_tables = inspector.get_table_names()
-    defined_tables = Base.metadata.tables.keys()
+    # El esquema y los roles se crean con `python -m src.migrate`
+    if app.config.get("CREATE_TABLES"):
+        migrate(app.session.engine)
+        # No dejar conexiones abiertas que heredarían los workers
+        app.session.dispose()
 
-    missing = [t for t in defined_tables if t not in existing_tables]
-    if missing:
-        Base.metadata.create_all(engine)
-        print(f"Tablas creadas: {', '.join(missing)}")
-    else:
-        print("Todas las tablas ya existen.")
+    if mongo_db is None:
+        mongo_db = MongoConnection(app.config["MONGO_URI"], app.config.get("MONGO_DB", "directia"),
+                                   mongo_options(app.config))
+    app.mongo = mongo_db
 
-    # Inicializar roles básicos
-    session = SessionLocal()
-    init_roles(session)
-    session.close()
+    register_blueprints(app)
 
-    mongo_client = MongoClient(app.config["MONGO_URI"])
-    app.mongo = mongo_client[app.config.get("MONGO_DB", "directia")]
+    if app.config.get("IA_WARMUP"):
+        from src.ia.pipeline import warm_up
 
-    register_blueprints(app)
+        warm_up(ocr=True)
 
     @app.teardown_appcontext
     def remove_session(exception=None):
-        SessionLocal.remove()
+        app.session.remove()
 
     return app
 
@@ -0,0 +1,171 @@
+"""
+Conexiones a Postgres (SQLAlchemy) y Mongo (PyMongo) con pools configurables.
+
+Ni el engine ni el MongoClient se crean al construir la app: se crean al
+primer uso en cada proceso. Con ``gunicorn --preload`` el maestro importa la
+app sin abrir conexiones, y cada worker crea sus propios pools tras el fork
+(un pool heredado compartiría sockets entre procesos). Si un proceso hijo
+encuentra un engine creado por su padre, lo descarta sin cerrar las
+conexiones del padre.
+
+Tamaños y tiempos salen de la configuración (``DB_POOL_*`` y ``MONGO_*`` en
+``src.config``) y la ocupación de ambos pools se exporta en ``/metrics``.
+"""
+
+import os
+import threading
+from typing import Dict, Optional
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+from src.utils import metrics
+
+
+def engine_options(config) -> Dict:
+    """
+    Argumentos de ``create_engine`` según la configuración.
+
+    Args:
+        config: Mapping con SQLALCHEMY_DATABASE_URI y las claves DB_POOL_*
+
+    Returns:
+        Dict de opciones (SQLite no usa las opciones de tamaño del pool)
+    """
+    uri = config["SQLALCHEMY_DATABASE_URI"]
+    if uri.startswith("sqlite"):
+        # SQLite con el servidor multihilo: las conexiones del pool cambian de hilo
+        return {"connect_args": {"check_same_thread": False}}
+    return {
+        "pool_size": config.get("DB_POOL_SIZE", 5),
+        "max_overflow": config.get("DB_MAX_OVERFLOW", 10),
+        "pool_timeout": config.get("DB_POOL_TIMEOUT", 30),
+        "pool_recycle": config.get("DB_POOL_RECYCLE", 1800),
+        "pool_pre_ping": config.get("DB_POOL_PRE_PING", True),
+    }
+
+
+def mongo_options(config) -> Dict:
+    """Argumentos de ``MongoClient`` (tamaño del pool y timeouts) según la configuración."""
+    return {
+        "maxPoolSize": config.get("MONGO_MAX_POOL_SIZE", 50),
+        "minPoolSize": config.get("MONGO_MIN_POOL_SIZE", 0),
+        "maxIdleTimeMS": config.get("MONGO_MAX_IDLE_TIME_MS", 300000),
+        "connectTimeoutMS": config.get("MONGO_CONNECT_TIMEOUT_MS", 5000),
+        "serverSelectionTimeoutMS": config.get("MONGO_SERVER_SELECTION_TIMEOUT_MS", 5000),
+        "socketTimeoutMS": config.get("MONGO_SOCKET_TIMEOUT_MS", 30000),
+        "waitQueueTimeoutMS": config.get("MONGO_WAIT_QUEUE_TIMEOUT_MS", 10000),
+    }
+
+
+class SQLDatabase:
+    """
+    Engine y ``scoped_session`` creados al primer uso en cada proceso.
+
+    Se usa como la ``scoped_session`` de antes: ``app.session()`` devuelve la
+    sesión del hilo actual y ``app.session.remove()`` la cierra.
+    """
+
+    def __init__(self, uri: str, options: Optional[Dict] = None):
+        self.uri = uri
+        self.options = options or {}
+        self.label = "sqlite" if uri.startswith("sqlite") else "postgres"
+        self._engine = None
+        self._sessions = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _ensure(self) -> None:
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            if self._engine is not None:
+                # Engine heredado del padre: sus conexiones siguen siendo del padre
+                self._engine.dispose(close=False)
+            engine = create_engine(self.uri, **self.options)
+            metrics.instrument_engine(engine, database=self.label)
+            metrics.instrument_pool(engine, database=self.label)
+            self._sessions = scoped_session(sessionmaker(bind=engine, autocommit=False, autoflush=False))
+            self._engine = engine
+            self._pid = pid
+
+    @property
+    def engine(self):
+        self._ensure()
+        return self._engine
+
+    def __call__(self):
+        self._ensure()
+        return self._sessions()
+
+    def remove(self) -> None:
+        if self._sessions is not None and self._pid == os.getpid():
+            self._sessions.remove()
+
+    def dispose(self) -> None:
+        if self._engine is not None and self._pid == os.getpid():
+            self._sessions.remove()
+            self._engine.dispose()
+
+
+class MongoConnection:
+    """
+    Base de datos de Mongo cuyo ``MongoClient`` se crea al primer uso en cada
+    proceso. Se usa como la ``Database`` de PyMongo: ``mongo["metadata"]`` o
+    ``mongo.metadata``.
+    """
+
+    def __init__(self, uri: str, db_name: str, options: Optional[Dict] = None):
+        self._uri = uri
+        self._db_name = db_name
+        self._options = options or {}
+        self._client = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _ensure(self) -> None:
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            # PyMongo no es fork-safe: un cliente heredado no se reutiliza (ni se cierra)
+            self._client = self._create_client()
+            self._pid = pid
+
+    def _create_client(self):
+        from pymongo import MongoClient
+
+        return MongoClient(
+            self._uri,
+            event_listeners=[metrics.MongoCommandMetrics(),
+                             metrics.MongoPoolMetrics(self._options.get("maxPoolSize"))],
+            **self._options,
+        )
+
+    @property
+    def client(self):
+        self._ensure()
+        return self._client
+
+    @property
+    def database(self):
+        return self.client[self._db_name]
+
+    def __getitem__(self, name: str):
+        return self.database[name]
+
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self.database[name]
+
+    def close(self) -> None:
+        if self._client is not None and self._pid == os.getpid():
+            self._client.close()
+            self._client = None
+            self._pid = None
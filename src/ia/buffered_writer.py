@@ -0,0 +1,130 @@
+"""
+Escritura en segundo plano por lotes.
+
+``BufferedWriter`` encola entradas y un hilo las entrega en lotes a una
+función de escritura, de modo que quien las produce (una petición) no espera
+al disco. Lo usan el log de predicciones (``src.ia.logger``) y el índice de
+búsqueda (``src.ia.search_index``). Si el proceso se bifurca (gunicorn), el
+hilo se relanza en el hijo con la primera entrada.
+"""
+
+import os
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+
+# Políticas de fsync: nunca, tras cada lote o como mucho cada ``fsync_interval`` segundos
+FSYNC_POLICIES = ("never", "batch", "interval")
+
+_STOP = object()
+
+
+class BufferedWriter:
+    """
+    Cola + hilo escritor. Un lote se escribe cuando alcanza ``batch_size``
+    entradas o cuando pasan ``flush_interval`` segundos desde la primera.
+
+    Args:
+        write_batch: Función que escribe un lote: ``write_batch(entradas, fsync)``
+        name: Nombre del hilo (y de los avisos de error)
+    """
+
+    def __init__(self, write_batch: Callable[[List[Dict], bool], None], batch_size: int = 64,
+                 flush_interval: float = 1.0, fsync_policy: str = "batch", fsync_interval: float = 5.0,
+                 max_queue: int = 10000, name: str = "buffered-writer"):
+        if fsync_policy not in FSYNC_POLICIES:
+            raise ValueError(f"fsync_policy debe ser uno de {FSYNC_POLICIES}")
+        self.write_batch = write_batch
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fsync_policy = fsync_policy
+        self.fsync_interval = fsync_interval
+        self.max_queue = max_queue
+        self.name = name
+        self._last_fsync = time.monotonic()
+        self._start()
+
+    def _start(self) -> None:
+        self._pid = os.getpid()
+        self._queue = queue.Queue(maxsize=self.max_queue)
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def put(self, entry: Dict) -> None:
+        # Tras un fork el hilo escritor no existe en el hijo
+        if self._pid != os.getpid():
+            self._start()
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            # Sobrecarga: se escribe en línea antes que perder la entrada
+            self._write([entry])
+
+    def qsize(self) -> int:
+        return self._queue.qsize()
+
+    def flush(self, timeout: Optional[float] = 5.0) -> bool:
+        """Espera a que todo lo encolado hasta ahora esté escrito."""
+        if self._pid != os.getpid() or not self._thread.is_alive():
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = 5.0) -> None:
+        if self._pid != os.getpid() or not self._thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _should_fsync(self) -> bool:
+        if self.fsync_policy == "batch":
+            return True
+        if self.fsync_policy == "interval":
+            now = time.monotonic()
+            if now - self._last_fsync >= self.fsync_interval:
+                self._last_fsync = now
+                return True
+        return False
+
+    def _write(self, entries: List[Dict]) -> None:
+        if not entries:
+            return
+        try:
+            self.write_batch(entries, self._should_fsync())
+        except Exception as e:
+            print(f"[WARNING] Error al escribir un lote ({self.name}): {e}")
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            batch = []
+            waiters = []
+            stop = False
+            deadline = time.monotonic() + self.flush_interval
+
+            while True:
+                if item is _STOP:
+                    stop = True
+                    break
+                if isinstance(item, threading.Event):
+                    waiters.append(item)
+                    break
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+
+            self._write(batch)
+            for waiter in waiters:
+                waiter.set()
+            if stop:
+                return
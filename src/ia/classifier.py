@@ -1,8 +1,5 @@
 import os
 import re
-import torch
-import numpy as np
-from transformers import AutoTokenizer, AutoModel
 from typing import Dict, List, Tuple
 
 
@@ -83,9 +80,14 @@ class DocumentClassifier:
 
         self.model = None
         self.tokenizer = None
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        self.device = None
 
         try:
+            # torch y transformers solo se importan si se usa BETO
+            import torch
+            from transformers import AutoTokenizer, AutoModel
+
+            self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
             print(f"[INFO] Cargando modelo BETO: {MODEL_NAME}")
             self.tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
             self.model = AutoModel.from_pretrained(MODEL_NAME)
@@ -121,7 +123,7 @@ class DocumentClassifier:
 
         return best_type, confidence
 
-    def _extract_embeddings(self, text: str) -> np.ndarray:
+    def _extract_embeddings(self, text: str):
         """
         Extrae embeddings del texto usando BETO.
         """
@@ -129,6 +131,8 @@ class DocumentClassifier:
             return None
 
         try:
+            import torch
+
             # Tokenizar (máximo 512 tokens)
             inputs = self.tokenizer(
                 text,
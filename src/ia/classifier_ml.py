@@ -6,8 +6,37 @@ Este clasificador reemplaza o complementa el basado en keywords.
 import os
 import joblib
 import json
-from typing import Dict
-from .utils import clean_text
+import numpy as np
+from typing import Dict, List
+from .utils import clean_text, clean_text_batch
+
+
+def margin_to_confidence(margin):
+    """
+    Normaliza el margin (mejor score - segundo mejor) a confianza [0.5, 0.98].
+
+    Margins típicos en nuestro modelo:
+    - Baja confianza: margin ~ 0.1-0.5 → confidence 0.5-0.65
+    - Media confianza: margin ~ 0.5-2.0 → confidence 0.65-0.85
+    - Alta confianza: margin > 2.0 → confidence 0.85-0.98
+
+    Args:
+        margin: Margin de un documento o array de margins
+
+    Returns:
+        Confianza (float o array, según la entrada)
+    """
+    margin = np.asarray(margin, dtype=float)
+    confidence = np.where(
+        margin < 0.5,
+        0.5 + (margin / 0.5) * 0.15,
+        np.where(
+            margin < 2.0,
+            0.65 + ((margin - 0.5) / 1.5) * 0.20,
+            0.85 + np.minimum((margin - 2.0) / 3.0, 1.0) * 0.13
+        )
+    )
+    return float(confidence) if confidence.ndim == 0 else confidence
 
 
 class MLDocumentClassifier:
@@ -138,20 +167,7 @@ class MLDocumentClassifier:
                 sorted_scores = sorted(decision_scores, reverse=True)
                 margin = sorted_scores[0] - sorted_scores[1]
 
-                # Normalizar margin a confianza [0.5, 0.98]
-                # Margins típicos en nuestro modelo:
-                # - Baja confianza: margin ~ 0.1-0.5 → confidence 0.5-0.65
-                # - Media confianza: margin ~ 0.5-2.0 → confidence 0.65-0.85
-                # - Alta confianza: margin > 2.0 → confidence 0.85-0.98
-                if margin < 0.5:
-                    # Baja confianza
-                    confidence = 0.5 + (margin / 0.5) * 0.15
-                elif margin < 2.0:
-                    # Media confianza
-                    confidence = 0.65 + ((margin - 0.5) / 1.5) * 0.20
-                else:
-                    # Alta confianza
-                    confidence = 0.85 + min((margin - 2.0) / 3.0, 1.0) * 0.13
+                confidence = margin_to_confidence(margin)
 
             else:
                 # Fallback a confianza fija (para modelos sin decision_function)
@@ -175,6 +191,46 @@ class MLDocumentClassifier:
                 "error": str(e)
             }
 
+    def classify_batch(self, texts: List[str], cleaned: bool = False) -> Dict:
+        """
+        Clasifica muchos textos con una sola vectorización y una sola
+        predicción (mismos resultados que ``classify_text`` por documento).
+
+        Args:
+            texts: Textos a clasificar
+            cleaned: Los textos ya pasaron por ``clean_text``
+
+        Returns:
+            Dict con listas 'tipo_documento' y 'confianza' (en el orden de entrada)
+        """
+        texts = ["" if text is None else str(text) for text in texts]
+        labels = ["desconocido"] * len(texts)
+        confidences = np.zeros(len(texts))
+
+        if not self.model or not self.vectorizer:
+            return {"tipo_documento": ["error"] * len(texts), "confianza": confidences.tolist(),
+                    "error": "Modelo ML no disponible"}
+
+        # Los textos vacíos no se clasifican (igual que classify_text)
+        valid = [i for i, text in enumerate(texts) if text.strip()]
+        if valid:
+            batch = [texts[i] for i in valid]
+            features = self.vectorizer.transform(batch if cleaned else clean_text_batch(batch))
+            predictions = self.model.predict(features)
+
+            if hasattr(self.model, 'decision_function'):
+                scores = self.model.decision_function(features)
+                top2 = -np.partition(-scores, 1, axis=1)[:, :2]
+                batch_confidences = margin_to_confidence(top2[:, 0] - top2[:, 1])
+            else:
+                batch_confidences = np.full(len(valid), 0.85)
+
+            for i, prediction in zip(valid, predictions.tolist()):
+                labels[i] = prediction
+            confidences[valid] = batch_confidences
+
+        return {"tipo_documento": labels, "confianza": confidences.tolist()}
+
     def get_model_info(self) -> Dict:
         """
         Retorna información sobre el modelo cargado.
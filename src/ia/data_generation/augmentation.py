@@ -7,6 +7,37 @@ import random
 import re
 
 
+# Probabilidades por nivel de augmentation
+LEVEL_PROBABILITIES = {
+    "low": {"typo": 0.01, "space": 0.02, "case": 0.01, "ocr": 0.01},
+    "medium": {"typo": 0.03, "space": 0.05, "case": 0.03, "ocr": 0.03},
+    "high": {"typo": 0.07, "space": 0.10, "case": 0.07, "ocr": 0.07}
+}
+
+# Sustituciones comunes en OCR
+OCR_SUBSTITUTIONS = {
+    'o': ['0', 'O'],
+    '0': ['o', 'O'],
+    'l': ['1', 'I', '|'],
+    '1': ['l', 'I', '|'],
+    'I': ['1', 'l', '|'],
+    'S': ['5', '$'],
+    '5': ['S'],
+    'B': ['8'],
+    '8': ['B'],
+    'G': ['6'],
+    'Z': ['2'],
+    'A': ['4'],
+    'rn': ['m'],
+    'vv': ['w'],
+    'cl': ['d']
+}
+
+TYPO_TYPES = ['swap', 'duplicate', 'delete']
+
+NOISE_CHARS = ['.', ',', '-', '_', '·', '~', '`']
+
+
 def augment_text(text: str, augmentation_level: str = "medium") -> str:
     """
     Aplica data augmentation a un texto para simular variaciones reales.
@@ -20,13 +51,7 @@ def augment_text(text: str, augmentation_level: str = "medium") -> str:
     """
 
     # Configurar probabilidades según nivel
-    probs = {
-        "low": {"typo": 0.01, "space": 0.02, "case": 0.01, "ocr": 0.01},
-        "medium": {"typo": 0.03, "space": 0.05, "case": 0.03, "ocr": 0.03},
-        "high": {"typo": 0.07, "space": 0.10, "case": 0.07, "ocr": 0.07}
-    }
-
-    prob = probs.get(augmentation_level, probs["medium"])
+    prob = LEVEL_PROBABILITIES.get(augmentation_level, LEVEL_PROBABILITIES["medium"])
 
     # Aplicar transformaciones
     text = simulate_ocr_errors(text, probability=prob["ocr"])
@@ -42,24 +67,7 @@ def simulate_ocr_errors(text: str, probability: float = 0.03) -> str:
     Simula errores típicos de OCR.
     """
 
-    # Sustituciones comunes en OCR
-    ocr_substitutions = {
-        'o': ['0', 'O'],
-        '0': ['o', 'O'],
-        'l': ['1', 'I', '|'],
-        '1': ['l', 'I', '|'],
-        'I': ['1', 'l', '|'],
-        'S': ['5', '$'],
-        '5': ['S'],
-        'B': ['8'],
-        '8': ['B'],
-        'G': ['6'],
-        'Z': ['2'],
-        'A': ['4'],
-        'rn': ['m'],
-        'vv': ['w'],
-        'cl': ['d']
-    }
+    ocr_substitutions = OCR_SUBSTITUTIONS
 
     result = []
     i = 0
@@ -93,7 +101,7 @@ def add_typos(text: str, probability: float = 0.02) -> str:
 
     for word in words:
         if len(word) > 3 and random.random() < probability:
-            typo_type = random.choice(['swap', 'duplicate', 'delete'])
+            typo_type = random.choice(TYPO_TYPES)
 
             if typo_type == 'swap' and len(word) > 2:
                 # Intercambiar dos letras adyacentes
@@ -191,7 +199,7 @@ def add_noise_characters(text: str, probability: float = 0.01) -> str:
     Añade caracteres de ruido aleatorios (simular escaneos de mala calidad).
     """
 
-    noise_chars = ['.', ',', '-', '_', '·', '~', '`']
+    noise_chars = NOISE_CHARS
     result = []
 
     for char in text:
@@ -0,0 +1,387 @@
+"""
+Motor de data augmentation vectorizado.
+
+Mismas transformaciones y tablas de probabilidad que ``augmentation.py``
+(``LEVEL_PROBABILITIES``, ``OCR_SUBSTITUTIONS``, ``TYPO_TYPES``,
+``NOISE_CHARS``), pero sin recorrer el texto carácter a carácter:
+
+- el texto se convierte en un array de code points (UTF-32) y todas las
+  decisiones aleatorias de un documento (o de un lote) se sacan de una vez
+  de un ``numpy.random.Generator``;
+- las sustituciones OCR y los cambios de mayúsculas se aplican con tablas de
+  consulta indexadas por code point; el ruido se inserta con ``np.insert``;
+- las operaciones por palabra (typos, palabras pegadas) sortean todas las
+  palabras a la vez y solo tocan en Python las pocas elegidas.
+
+En modo lote (``augment_batch``) los documentos se concatenan en un único
+array, de modo que las operaciones por carácter cuestan una pasada de numpy
+para todo el lote. Con la misma semilla el resultado es reproducible.
+
+Uso:
+    engine = AugmentationEngine(seed=42)
+    engine.augment(texto, "high")
+    engine.augment_batch(textos, ["low", "medium", "high"])
+"""
+
+from typing import List, Optional, Sequence, Union
+
+import numpy as np
+
+from .augmentation import LEVEL_PROBABILITIES, NOISE_CHARS, OCR_SUBSTITUTIONS, TYPO_TYPES
+
+
+_ASCII = 128
+_BMP = 0x10000
+
+
+def _encode(text: str) -> np.ndarray:
+    return np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32).copy()
+
+
+def _decode(codes: np.ndarray) -> str:
+    return codes.astype(np.uint32).tobytes().decode("utf-32-le")
+
+
+def _build_ocr_tables():
+    """Tablas de sustitución OCR de 1 carácter (por code point) y de pares."""
+    width = max(len(options) for options in OCR_SUBSTITUTIONS.values())
+    counts = np.zeros(_ASCII, dtype=np.int64)
+    options = np.zeros((_ASCII, width), dtype=np.uint32)
+    pairs = []
+    for source, replacements in OCR_SUBSTITUTIONS.items():
+        codes = [ord(replacement) for replacement in replacements]
+        if len(source) == 1:
+            counts[ord(source)] = len(codes)
+            options[ord(source), :len(codes)] = codes
+        else:
+            pairs.append((ord(source[0]), ord(source[1]), np.array(codes, dtype=np.uint32)))
+    return counts, options, pairs
+
+
+_OCR_COUNTS, _OCR_OPTIONS, _OCR_PAIRS = _build_ocr_tables()
+_NOISE_CODES = np.array([ord(char) for char in NOISE_CHARS], dtype=np.uint32)
+
+# Tablas de mayúsculas/minúsculas del plano básico (se construyen al primer uso)
+_case_tables = None
+
+
+def _get_case_tables():
+    """
+    ``isalpha`` y carácter con el caso invertido por code point. Las
+    inversiones de más de un carácter (p. ej. 'ß' -> 'SS') se marcan con -1.
+    """
+    global _case_tables
+    if _case_tables is None:
+        alpha = np.zeros(_BMP, dtype=bool)
+        swapped = np.full(_BMP, -1, dtype=np.int64)
+        for code in range(_BMP):
+            char = chr(code)
+            if char.isalpha():
+                alpha[code] = True
+                swap = char.lower() if char.isupper() else char.upper()
+                if len(swap) == 1:
+                    swapped[code] = ord(swap)
+        _case_tables = (alpha, swapped)
+    return _case_tables
+
+
+def _swap_case(char: str) -> str:
+    return char.lower() if char.isupper() else char.upper()
+
+
+def _greedy_non_adjacent(hits: np.ndarray) -> List[int]:
+    """
+    Posiciones aceptadas recorriendo de izquierda a derecha cuando cada
+    aceptación consume también la posición siguiente.
+    """
+    accepted = []
+    last = -2
+    for position in hits.tolist():
+        if position > last + 1:
+            accepted.append(position)
+            last = position
+    return accepted
+
+
+class _Batch:
+    """Lote de documentos concatenados: code points + inicio de cada documento."""
+
+    def __init__(self, texts: Sequence[str]):
+        lengths = np.fromiter((len(text) for text in texts), dtype=np.int64, count=len(texts))
+        self.codes = _encode("".join(texts))
+        self.starts = np.concatenate(([0], np.cumsum(lengths)[:-1])) if len(texts) else np.zeros(0, dtype=np.int64)
+
+    @property
+    def lengths(self) -> np.ndarray:
+        return np.diff(np.append(self.starts, len(self.codes)))
+
+    def doc_index(self) -> np.ndarray:
+        """Documento de cada carácter."""
+        return np.repeat(np.arange(len(self.starts)), self.lengths)
+
+    def texts(self) -> List[str]:
+        text = _decode(self.codes)
+        ends = np.append(self.starts[1:], len(self.codes))
+        return [text[start:end] for start, end in zip(self.starts.tolist(), ends.tolist())]
+
+    def insert_after(self, positions: np.ndarray, values: np.ndarray) -> None:
+        """Inserta ``values`` tras ``positions`` (ordenadas) y reubica los inicios."""
+        if not len(positions):
+            return
+        self.codes = np.insert(self.codes, positions + 1, values)
+        # Un inicio se desplaza por cada inserción en o antes de su posición
+        self.starts = self.starts + np.searchsorted(positions + 1, self.starts, side="right")
+
+    def keep(self, mask: np.ndarray) -> None:
+        """Elimina los caracteres con ``mask`` a False y reubica los inicios."""
+        kept = np.concatenate(([0], np.cumsum(mask)))
+        self.codes = self.codes[mask]
+        self.starts = kept[self.starts]
+
+
+class AugmentationEngine:
+    """
+    Augmentation con ``numpy.random.Generator``: una extracción de números
+    aleatorios por operación y documento (o lote), sin bucles por carácter.
+    """
+
+    def __init__(self, seed: Optional[int] = None, rng: Optional[np.random.Generator] = None):
+        """
+        Args:
+            seed: Semilla del generador
+            rng: Generador ya creado (tiene prioridad sobre ``seed``)
+        """
+        self.rng = rng if rng is not None else np.random.default_rng(seed)
+
+    # ------------------------------------------------------------------
+    # Operaciones por carácter (sobre el lote concatenado)
+    # ------------------------------------------------------------------
+
+    def _ocr(self, batch: _Batch, probability: np.ndarray) -> None:
+        codes = batch.codes
+        n = len(codes)
+        if not n:
+            return
+        p_char = probability[batch.doc_index()]
+        u_pair, u_single, u_option = self.rng.random((3, n))
+
+        # Pares ('rn' -> 'm'...): primero, y sin cruzar el límite entre documentos
+        pair_options = {}
+        if n > 1:
+            boundary = np.zeros(n - 1, dtype=bool)
+            # Los documentos vacíos repiten inicio (o lo ponen en 0 o en n)
+            starts = batch.starts[1:]
+            boundary[starts[(starts > 0) & (starts < n)] - 1] = True
+            for first, second, options in _OCR_PAIRS:
+                match = (codes[:-1] == first) & (codes[1:] == second) & ~boundary
+                for position in np.flatnonzero(match & (u_pair[:-1] < p_char[:-1])).tolist():
+                    pair_options[position] = options
+        accepted = _greedy_non_adjacent(np.array(sorted(pair_options), dtype=np.int64))
+
+        consumed = np.zeros(n, dtype=bool)
+        if accepted:
+            positions = np.array(accepted, dtype=np.int64)
+            consumed[positions] = True
+            consumed[positions + 1] = True
+
+        # Sustituciones de 1 carácter
+        ascii_codes = np.minimum(codes, _ASCII - 1)
+        counts = np.where(codes < _ASCII, _OCR_COUNTS[ascii_codes], 0)
+        single = (counts > 0) & (u_single < p_char) & ~consumed
+        chosen = np.flatnonzero(single)
+        option = (u_option[chosen] * counts[chosen]).astype(np.int64)
+        codes[chosen] = _OCR_OPTIONS[ascii_codes[chosen], option]
+
+        if accepted:
+            for position in accepted:
+                options = pair_options[position]
+                codes[position] = options[int(u_option[position] * len(options))]
+            mask = np.ones(n, dtype=bool)
+            mask[positions + 1] = False
+            batch.keep(mask)
+
+    def _case(self, batch: _Batch, probability: np.ndarray) -> None:
+        codes = batch.codes
+        if not len(codes):
+            return
+        alpha_table, swap_table = _get_case_tables()
+        p_char = probability[batch.doc_index()]
+        u = self.rng.random(len(codes))
+
+        bmp = codes < _BMP
+        clipped = np.where(bmp, codes, 0)
+        alpha = np.where(bmp, alpha_table[clipped], False)
+        for position in np.flatnonzero(~bmp).tolist():
+            alpha[position] = chr(codes[position]).isalpha()
+
+        chosen = np.flatnonzero(alpha & (u < p_char))
+        swapped = np.where(bmp[chosen], swap_table[clipped[chosen]], -1)
+        simple = swapped >= 0
+        codes[chosen[simple]] = swapped[simple]
+
+        # Inversiones de varios caracteres o fuera del plano básico
+        extra_positions, extra_values = [], []
+        for position in chosen[~simple].tolist():
+            swap = _swap_case(chr(codes[position]))
+            codes[position] = ord(swap[0])
+            for char in swap[1:]:
+                extra_positions.append(position)
+                extra_values.append(ord(char))
+        if extra_positions:
+            batch.insert_after(np.array(extra_positions, dtype=np.int64), np.array(extra_values, dtype=np.uint32))
+
+    def _noise(self, batch: _Batch, probability: np.ndarray) -> None:
+        n = len(batch.codes)
+        if not n:
+            return
+        p_char = probability[batch.doc_index()]
+        positions = np.flatnonzero(self.rng.random(n) < p_char)
+        values = _NOISE_CODES[self.rng.integers(len(_NOISE_CODES), size=len(positions))]
+        batch.insert_after(positions, values)
+
+    # ------------------------------------------------------------------
+    # Operaciones por palabra (por documento, decisiones en bloque)
+    # ------------------------------------------------------------------
+
+    def _typos(self, words: List[str], probability: float) -> List[str]:
+        n = len(words)
+        if not n:
+            return words
+        lengths = np.fromiter((len(word) for word in words), dtype=np.int64, count=n)
+        u_hit, u_pos = self.rng.random((2, n))
+        types = self.rng.integers(len(TYPO_TYPES), size=n)
+
+        words = list(words)
+        for index in np.flatnonzero((lengths > 3) & (u_hit < probability)).tolist():
+            word = words[index]
+            size = len(word)
+            typo_type = TYPO_TYPES[types[index]]
+            if typo_type == "swap":
+                pos = int(u_pos[index] * (size - 1))
+                words[index] = word[:pos] + word[pos + 1] + word[pos] + word[pos + 2:]
+            elif typo_type == "duplicate":
+                pos = int(u_pos[index] * size)
+                words[index] = word[:pos] + word[pos] + word[pos:]
+            elif size > 4:
+                pos = 1 + int(u_pos[index] * (size - 2))
+                words[index] = word[:pos] + word[pos + 1:]
+        return words
+
+    def _spacing(self, words: List[str], probability: float) -> str:
+        # La duplicación de espacios del original desaparece al volver a
+        # separar en palabras, así que solo quedan las palabras pegadas y los
+        # saltos de línea
+        n = len(words)
+        if n > 1:
+            merges = _greedy_non_adjacent(np.flatnonzero(self.rng.random(n - 1) < probability * 0.3))
+        else:
+            merges = []
+
+        if merges:
+            separators = np.full(n, " ", dtype=object)
+            separators[-1] = ""
+            separators[merges] = ""
+            pieces = np.empty(2 * n, dtype=object)
+            pieces[0::2] = words
+            pieces[1::2] = separators
+            text = "".join(pieces)
+        else:
+            text = " ".join(words)
+
+        u_newline, u_count = self.rng.random(2)
+        if u_newline < probability * 0.5:
+            text = text.replace(". ", ".\n", 1 + int(u_count * 3))
+        return text
+
+    # ------------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _probabilities(levels: Union[str, Sequence[str]], count: int) -> List[dict]:
+        if isinstance(levels, str):
+            levels = [levels] * count
+        if len(levels) != count:
+            raise ValueError("Se necesita un nivel por documento")
+        return [LEVEL_PROBABILITIES.get(level, LEVEL_PROBABILITIES["medium"]) for level in levels]
+
+    def augment_batch(self, texts: Sequence[str], levels: Union[str, Sequence[str]] = "medium") -> List[str]:
+        """
+        Aplica la augmentation de ``augment_text`` (OCR, typos, espaciado y
+        mayúsculas) a un lote de documentos.
+
+        Args:
+            texts: Textos originales
+            levels: Nivel para todo el lote o uno por documento ("low", "medium", "high")
+
+        Returns:
+            Textos modificados, en el mismo orden
+        """
+        probs = self._probabilities(levels, len(texts))
+        if not texts:
+            return []
+
+        batch = _Batch(texts)
+        self._ocr(batch, np.array([prob["ocr"] for prob in probs]))
+
+        texts = [
+            self._spacing(self._typos(text.split(), prob["typo"]), prob["space"])
+            for text, prob in zip(batch.texts(), probs)
+        ]
+
+        batch = _Batch(texts)
+        self._case(batch, np.array([prob["case"] for prob in probs]))
+        return batch.texts()
+
+    def augment(self, text: str, augmentation_level: str = "medium") -> str:
+        """Equivalente a ``augment_text`` para un documento."""
+        return self.augment_batch([text], augmentation_level)[0]
+
+    def generate_variants(self, text: str, num_variants: int = 3) -> List[str]:
+        """Equivalente a ``generate_variants``: original + variantes low/medium/high."""
+        return self.generate_variants_batch([text], num_variants)[0]
+
+    def generate_variants_batch(self, texts: Sequence[str], num_variants: int = 3) -> List[List[str]]:
+        """
+        Variantes de muchos documentos en un único lote.
+
+        Returns:
+            Una lista por documento: [original, variante 1, ...]
+        """
+        levels = ["low", "medium", "high"]
+        sources = [text for text in texts for _ in range(num_variants)]
+        variant_levels = [levels[i % len(levels)] for _ in texts for i in range(num_variants)]
+        variants = self.augment_batch(sources, variant_levels)
+        return [
+            [text] + variants[index * num_variants:(index + 1) * num_variants]
+            for index, text in enumerate(texts)
+        ]
+
+    # Operaciones sueltas (misma firma que las funciones de augmentation.py)
+
+    def simulate_ocr_errors(self, text: str, probability: float = 0.03) -> str:
+        batch = _Batch([text])
+        self._ocr(batch, np.array([probability]))
+        return batch.texts()[0]
+
+    def add_typos(self, text: str, probability: float = 0.02) -> str:
+        return " ".join(self._typos(text.split(), probability))
+
+    def vary_spacing(self, text: str, probability: float = 0.05) -> str:
+        return self._spacing(text.split(), probability)
+
+    def vary_case(self, text: str, probability: float = 0.02) -> str:
+        batch = _Batch([text])
+        self._case(batch, np.array([probability]))
+        return batch.texts()[0]
+
+    def add_noise_characters(self, text: str, probability: float = 0.01) -> str:
+        batch = _Batch([text])
+        self._noise(batch, np.array([probability]))
+        return batch.texts()[0]
+
+    def add_noise_batch(self, texts: Sequence[str], probability: float = 0.01) -> List[str]:
+        """``add_noise_characters`` sobre un lote."""
+        batch = _Batch(texts)
+        self._noise(batch, np.full(len(texts), probability))
+        return batch.texts()
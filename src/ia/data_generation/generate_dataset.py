@@ -15,7 +15,7 @@ from .generators.recibo_generator import ReciboGenerator
 from .generators.certificado_generator import CertificadoGenerator
 from .generators.fiscal_generator import FiscalGenerator
 from .generators.notificacion_generator import NotificacionGenerator
-from .augmentation import generate_variants
+from .augmentation_engine import AugmentationEngine
 
 
 # Configuración
@@ -61,13 +61,12 @@ def generate_category_data(category: str, generator_class, num_docs: int, varian
     generator = generator_class(seed=seed)
     data = []
 
-    for i in tqdm(range(num_docs), desc=f"  {category}"):
-        # Generar documento base
-        doc = generator.generate_document()
-
-        # Generar variantes con augmentation
-        variants = generate_variants(doc, num_variants=variants_per_doc)
+    # Generar documentos base
+    docs = [generator.generate_document() for _ in tqdm(range(num_docs), desc=f"  {category}")]
 
+    # Generar variantes con augmentation (un único lote por categoría)
+    engine = AugmentationEngine(seed=seed)
+    for variants in engine.generate_variants_batch(docs, num_variants=variants_per_doc):
         for variant in variants:
             data.append((variant, category))
 
@@ -0,0 +1,334 @@
+"""
+Generación de datasets sintéticos en paralelo y reproducible.
+
+El trabajo se reparte en shards (categoría, bloque de ``chunk_size``
+documentos base). Cada shard:
+
+- fija su propia semilla, derivada de (semilla global, categoría, bloque),
+  para ``random``, la instancia de Faker y el motor de augmentation antes
+  de generar;
+- asigna cada documento base (con todas sus variantes) a train/val/test con
+  otro generador derivado de la misma semilla, sin fugas entre splits;
+- escribe sus filas en ``shards/<split>/<categoría>-<bloque>.csv``.
+
+Como cada shard se resiembra al empezar, el resultado no depende de qué
+proceso lo ejecute ni de cuántos haya: con la misma semilla y el mismo
+``chunk_size`` los archivos son idénticos byte a byte con 1 o N workers.
+Al final los shards de cada split se concatenan en ``<split>.csv`` en orden
+fijo, copiando archivos: el dataset completo nunca está en memoria.
+
+Uso:
+    python -m src.ia.data_generation.sharded --docs 200 --workers 4
+    python -m src.ia.data_generation.sharded --source ai_directia --docs 100 --variants 3
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import random
+import shutil
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+
+SPLITS = ("train", "val", "test")
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent.parent
+CATEGORIES_PATH = BASE_DIR / "ai_directia" / "config" / "categories.json"
+
+OUTPUT_DIRS = {
+    "src": BASE_DIR / "src" / "ia" / "datasets" / "processed",
+    "ai_directia": BASE_DIR / "ai_directia" / "datasets" / "processed",
+}
+
+COLUMNS = {
+    "src": ["text", "label"],
+    "ai_directia": ["text", "category", "category_name", "doc_id", "is_augmented"],
+}
+
+
+@dataclass(frozen=True)
+class Shard:
+    """Bloque de documentos base de una categoría."""
+
+    source: str
+    category: str
+    chunk: int
+    start: int
+    count: int
+    variants: int
+    seed: int
+    ratios: Tuple[float, float, float]
+
+    @property
+    def name(self) -> str:
+        return f"{self.category}-{self.chunk:05d}"
+
+
+def shard_seed(seed: int, category: str, chunk: int) -> int:
+    """Semilla de un shard (independiente del orden de ejecución)."""
+    digest = hashlib.sha256(f"{seed}:{category}:{chunk}".encode()).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
+def categories_for(source: str) -> List[str]:
+    if source == "src":
+        from .generate_dataset import GENERATORS
+        return list(GENERATORS)
+    from ai_directia.data_generation.template_generator import GENERATORS
+    return list(GENERATORS)
+
+
+def plan_shards(source: str = "src", docs_per_category: int = 200, variants: int = 2,
+                chunk_size: int = 50, seed: int = 42,
+                ratios: Tuple[float, float, float] = (0.7, 0.15, 0.15),
+                categories: Optional[List[str]] = None) -> List[Shard]:
+    """
+    Reparte la generación en shards.
+
+    Args:
+        source: 'src' (generadores de src/ia) o 'ai_directia' (plantillas)
+        docs_per_category: Documentos base por categoría
+        variants: Variantes aumentadas por documento base
+        chunk_size: Documentos base por shard (forma parte de la definición
+            del dataset: cambiarlo cambia el resultado)
+        seed: Semilla global
+        ratios: Proporciones train/val/test
+        categories: Categorías a generar (por defecto todas las de la fuente)
+
+    Returns:
+        Lista de shards en orden determinista
+    """
+    if source not in COLUMNS:
+        raise ValueError(f"source debe ser uno de {tuple(COLUMNS)}")
+    if abs(sum(ratios) - 1.0) > 0.01:
+        raise ValueError("Las proporciones deben sumar 1.0")
+
+    shards = []
+    for category in categories or categories_for(source):
+        for chunk, start in enumerate(range(0, docs_per_category, chunk_size)):
+            shards.append(Shard(
+                source=source,
+                category=category,
+                chunk=chunk,
+                start=start,
+                count=min(chunk_size, docs_per_category - start),
+                variants=variants,
+                seed=shard_seed(seed, category, chunk),
+                ratios=tuple(ratios),
+            ))
+    return shards
+
+
+# ---------------------------------------------------------------------------
+# Generación de un shard (se ejecuta en los procesos del pool)
+# ---------------------------------------------------------------------------
+
+# Generadores ya construidos en este proceso (crear Faker es caro)
+_generators = {}
+_category_names = None
+
+
+def _category_name(category: str) -> str:
+    global _category_names
+    if _category_names is None:
+        with open(CATEGORIES_PATH, "r", encoding="utf-8") as f:
+            _category_names = {cat["id"]: cat["name"] for cat in json.load(f)["categories"]}
+    return _category_names.get(category, category)
+
+
+def _src_documents(shard: Shard) -> Callable[[int], List[Dict]]:
+    from .augmentation_engine import AugmentationEngine
+    from .generate_dataset import GENERATORS
+
+    generator = _generators.get(shard.category)
+    if generator is None:
+        generator = _generators[shard.category] = GENERATORS[shard.category]()
+    generator.fake.seed_instance(shard.seed)
+    engine = AugmentationEngine(seed=shard.seed)
+
+    def build(doc_idx: int) -> List[Dict]:
+        doc = generator.generate_document()
+        return [{"text": variant, "label": shard.category}
+                for variant in engine.generate_variants(doc, num_variants=shard.variants)]
+
+    return build
+
+
+def _ai_directia_documents(shard: Shard) -> Callable[[int], List[Dict]]:
+    from ai_directia.data_generation import template_generator
+    from ai_directia.data_generation.augmentation import generate_variations
+
+    template_generator.fake.seed_instance(shard.seed)
+    name = _category_name(shard.category)
+
+    def build(doc_idx: int) -> List[Dict]:
+        base_text = template_generator.generate_document(shard.category)
+        rows = [{"text": base_text, "category": shard.category, "category_name": name,
+                 "doc_id": f"{shard.category}_{doc_idx}_orig", "is_augmented": False}]
+        for var_idx, var_text in enumerate(generate_variations(base_text, shard.variants, intensity="light")):
+            rows.append({"text": var_text, "category": shard.category, "category_name": name,
+                         "doc_id": f"{shard.category}_{doc_idx}_aug{var_idx}", "is_augmented": True})
+        return rows
+
+    return build
+
+
+def _shard_rows(shard: Shard) -> Iterator[Tuple[str, Dict]]:
+    """Filas (split, fila) del shard, con las semillas del shard."""
+    random.seed(shard.seed)
+    split_rng = random.Random(f"split:{shard.seed}")
+    build = _src_documents(shard) if shard.source == "src" else _ai_directia_documents(shard)
+
+    train_ratio, val_ratio, _ = shard.ratios
+    for doc_idx in range(shard.start, shard.start + shard.count):
+        draw = split_rng.random()
+        split = "train" if draw < train_ratio else "val" if draw < train_ratio + val_ratio else "test"
+        for row in build(doc_idx):
+            yield split, row
+
+
+def run_shard(shard: Shard, output_dir: str) -> Dict[str, int]:
+    """
+    Genera un shard y escribe sus filas por split.
+
+    Returns:
+        Dict split -> filas escritas
+    """
+    shard_dir = Path(output_dir) / "shards"
+    files = {}
+    writers = {}
+    counts = Counter()
+    try:
+        for split, row in _shard_rows(shard):
+            if split not in writers:
+                path = shard_dir / split / f"{shard.name}.csv"
+                path.parent.mkdir(parents=True, exist_ok=True)
+                files[split] = open(path, "w", encoding="utf-8", newline="")
+                writers[split] = csv.DictWriter(files[split], fieldnames=COLUMNS[shard.source])
+            writers[split].writerow(row)
+            counts[split] += 1
+    finally:
+        for f in files.values():
+            f.close()
+    return dict(counts)
+
+
+def _run_shard_task(args) -> Dict[str, int]:
+    return run_shard(*args)
+
+
+# ---------------------------------------------------------------------------
+# Driver
+# ---------------------------------------------------------------------------
+
+def merge_shards(shards: List[Shard], output_dir) -> Dict[str, Path]:
+    """Concatena los shards de cada split en ``<split>.csv`` (copia por bloques)."""
+    output_dir = Path(output_dir)
+    columns = COLUMNS[shards[0].source] if shards else COLUMNS["src"]
+    merged = {}
+    for split in SPLITS:
+        target = output_dir / f"{split}.csv"
+        tmp = target.with_name(f".{target.name}.tmp")
+        with open(tmp, "w", encoding="utf-8", newline="") as out:
+            csv.writer(out).writerow(columns)
+            for shard in shards:
+                path = output_dir / "shards" / split / f"{shard.name}.csv"
+                if path.exists():
+                    with open(path, "r", encoding="utf-8", newline="") as f:
+                        shutil.copyfileobj(f, out)
+        os.replace(tmp, target)
+        merged[split] = target
+    return merged
+
+
+def generate_sharded_dataset(output_dir=None, source: str = "src", docs_per_category: int = 200,
+                             variants: int = 2, chunk_size: int = 50, seed: int = 42,
+                             ratios: Tuple[float, float, float] = (0.7, 0.15, 0.15),
+                             workers: Optional[int] = None, categories: Optional[List[str]] = None,
+                             keep_shards: bool = False) -> Dict:
+    """
+    Genera el dataset en shards sobre un pool de procesos y escribe
+    ``train.csv``, ``val.csv`` y ``test.csv``.
+
+    Args:
+        output_dir: Directorio de salida (por defecto el ``processed`` de la fuente)
+        source: 'src' o 'ai_directia'
+        docs_per_category: Documentos base por categoría
+        variants: Variantes aumentadas por documento base
+        chunk_size: Documentos base por shard
+        seed: Semilla global
+        ratios: Proporciones train/val/test
+        workers: Procesos del pool (1: sin pool)
+        categories: Subconjunto de categorías
+        keep_shards: Conservar ``shards/`` tras la concatenación
+
+    Returns:
+        Dict con filas por split, número de shards y rutas generadas
+    """
+    output_dir = Path(output_dir or OUTPUT_DIRS[source])
+    shards = plan_shards(source, docs_per_category, variants, chunk_size, seed, ratios, categories)
+
+    # Shards de ejecuciones anteriores no deben mezclarse con los nuevos
+    shutil.rmtree(output_dir / "shards", ignore_errors=True)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    workers = workers or os.cpu_count() or 1
+    tasks = [(shard, str(output_dir)) for shard in shards]
+    print(f"[INFO] {len(shards)} shards ({source}) en {workers} procesos...")
+
+    totals = Counter()
+    if workers == 1:
+        for counts in map(_run_shard_task, tasks):
+            totals.update(counts)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for counts in pool.map(_run_shard_task, tasks):
+                totals.update(counts)
+
+    paths = merge_shards(shards, output_dir)
+    if not keep_shards:
+        shutil.rmtree(output_dir / "shards", ignore_errors=True)
+
+    print(f"[OK] Dataset generado en {output_dir}: " +
+          ", ".join(f"{split}={totals.get(split, 0)}" for split in SPLITS))
+    return {
+        "rows": {split: totals.get(split, 0) for split in SPLITS},
+        "shards": len(shards),
+        "paths": {split: str(path) for split, path in paths.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generación de datasets sintéticos en paralelo")
+    parser.add_argument("--source", choices=tuple(COLUMNS), default="src")
+    parser.add_argument("--output-dir", default=None)
+    parser.add_argument("--docs", type=int, default=200, help="Documentos base por categoría")
+    parser.add_argument("--variants", type=int, default=2, help="Variantes por documento")
+    parser.add_argument("--chunk-size", type=int, default=50, help="Documentos base por shard")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--ratios", type=float, nargs=3, default=(0.7, 0.15, 0.15), metavar=("TRAIN", "VAL", "TEST"))
+    parser.add_argument("--keep-shards", action="store_true")
+    args = parser.parse_args()
+
+    generate_sharded_dataset(
+        output_dir=args.output_dir,
+        source=args.source,
+        docs_per_category=args.docs,
+        variants=args.variants,
+        chunk_size=args.chunk_size,
+        seed=args.seed,
+        ratios=tuple(args.ratios),
+        workers=args.workers,
+        keep_shards=args.keep_shards,
+    )
+
+
+if __name__ == "__main__":
+    main()
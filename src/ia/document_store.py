@@ -0,0 +1,172 @@
+"""
+Textos completos de los documentos clasificados.
+
+Las predicciones del log guardan solo el ``document_id`` (SHA-256 del
+contenido); el texto completo normalizado se guarda una sola vez por
+documento en SQLite. El feedback lleva el mismo ``document_id``, así que el
+reentrenamiento obtiene los textos con una consulta indexada en lugar de
+recorrer el log de predicciones.
+
+Para feedback antiguo (sin ``document_id``) se mantiene un índice
+nombre de archivo → documento.
+"""
+
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ai_directia.preprocessing.text_cleaner import clean_text
+
+
+DEFAULT_DB_PATH = "logs/documents.sqlite3"
+
+# Normalización del texto guardado: la misma forma que los CSV de entrenamiento
+TEXT_OPERATIONS = ("normalize_unicode", "normalize_whitespace")
+
+# Límite de parámetros por consulta ``IN (...)``
+_CHUNK = 500
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS documents (
+        document_id TEXT PRIMARY KEY,
+        text TEXT NOT NULL,
+        created_at TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS document_files (
+        file TEXT NOT NULL,
+        document_id TEXT NOT NULL,
+        seen_at TEXT NOT NULL,
+        PRIMARY KEY (file, document_id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_document_files_file ON document_files (file, seen_at)",
+)
+
+
+def _chunks(values: List[str]) -> Iterable[List[str]]:
+    for start in range(0, len(values), _CHUNK):
+        yield values[start:start + _CHUNK]
+
+
+class DocumentStore:
+    """Texto completo por ``document_id`` (direccionado por contenido)."""
+
+    def __init__(self, db_path=DEFAULT_DB_PATH):
+        self.db_path = str(db_path)
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                for statement in _SCHEMA:
+                    conn.execute(statement)
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return clean_text(text or "", TEXT_OPERATIONS)
+
+    def put_many(self, documents: Iterable[Tuple[str, str, Optional[str]]]) -> None:
+        """
+        Guarda textos (los documentos ya conocidos no se reescriben).
+
+        Args:
+            documents: Tuplas (document_id, texto sin normalizar, nombre de archivo)
+        """
+        now = datetime.now().isoformat()
+        rows = []
+        files = []
+        for document_id, text, file_name in documents:
+            if not document_id:
+                continue
+            rows.append((document_id, self.normalize(text), now))
+            if file_name:
+                files.append((file_name, document_id, now))
+        if not rows:
+            return
+
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO documents (document_id, text, created_at) VALUES (?, ?, ?)", rows
+                )
+                conn.executemany(
+                    "INSERT OR REPLACE INTO document_files (file, document_id, seen_at) VALUES (?, ?, ?)", files
+                )
+        finally:
+            conn.close()
+
+    def put(self, document_id: str, text: str, file_name: Optional[str] = None) -> None:
+        self.put_many([(document_id, text, file_name)])
+
+    def get_texts(self, document_ids: Iterable[str]) -> Dict[str, str]:
+        """
+        Returns:
+            Dict document_id -> texto (los ids desconocidos no aparecen)
+        """
+        ids = list({document_id for document_id in document_ids if document_id})
+        texts = {}
+        conn = self._connect()
+        try:
+            for chunk in _chunks(ids):
+                rows = conn.execute(
+                    f"SELECT document_id, text FROM documents WHERE document_id IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                )
+                texts.update(rows)
+        finally:
+            conn.close()
+        return texts
+
+    def get_text(self, document_id: str) -> Optional[str]:
+        return self.get_texts([document_id]).get(document_id)
+
+    def find_by_files(self, file_names: Iterable[str]) -> Dict[str, str]:
+        """
+        Documento más reciente registrado con cada nombre de archivo.
+
+        Returns:
+            Dict nombre -> document_id
+        """
+        names = list({name for name in file_names if name})
+        found = {}
+        conn = self._connect()
+        try:
+            for chunk in _chunks(names):
+                # Con MAX() SQLite toma document_id de la fila del máximo
+                rows = conn.execute(
+                    f"SELECT file, document_id, MAX(seen_at) FROM document_files "
+                    f"WHERE file IN ({','.join('?' * len(chunk))}) GROUP BY file",
+                    chunk,
+                )
+                found.update((file, document_id) for file, document_id, _ in rows)
+        finally:
+            conn.close()
+        return found
+
+
+_stores = {}
+_lock = threading.Lock()
+
+
+def get_document_store(db_path=DEFAULT_DB_PATH) -> DocumentStore:
+    """Instancia compartida por ruta de base de datos."""
+    key = str(db_path)
+    store = _stores.get(key)
+    if store is None:
+        with _lock:
+            store = _stores.get(key)
+            if store is None:
+                store = DocumentStore(db_path)
+                _stores[key] = store
+    return store
@@ -3,10 +3,12 @@ Herramientas para evaluar modelos con datos reales.
 Permite comparar performance en documentos sintéticos vs reales.
 """
 
+import hashlib
 import os
 import pandas as pd
-import numpy as np
+from pathlib import Path
 from typing import Dict, List
+from ai_directia.preprocessing.dataset_cache import CLEAN_COLUMN, load_split
 from sklearn.metrics import (
     accuracy_score,
     precision_recall_fscore_support,
@@ -15,6 +17,108 @@ from sklearn.metrics import (
 )
 
 
+def dataset_fingerprint(test_df: pd.DataFrame) -> str:
+    """Hash del contenido (texto y etiqueta) de un dataset de evaluación."""
+    hashes = pd.util.hash_pandas_object(test_df[['text', 'label']], index=False)
+    return hashlib.sha256(hashes.to_numpy().tobytes()).hexdigest()
+
+
+def save_predictions(predictions: pd.DataFrame, path: str):
+    """
+    Guarda las predicciones por documento (Parquet si la ruta termina en
+    .parquet, CSV en otro caso).
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    if path.suffix == ".parquet":
+        predictions.to_parquet(tmp, index=False)
+    else:
+        predictions.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+    print(f"[INFO] Predicciones guardadas en {path}")
+
+
+def load_predictions(path: str) -> pd.DataFrame:
+    """Carga predicciones guardadas con ``save_predictions``."""
+    path = Path(path)
+    if path.suffix == ".parquet":
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+
+def _predictions_file(predictions_dir: str, name: str):
+    if not predictions_dir:
+        return None
+    return os.path.join(predictions_dir, f"predictions_{name}.parquet")
+
+
+def report_from_predictions(predictions: pd.DataFrame, model_name: str = None) -> Dict:
+    """
+    Calcula todas las métricas a partir de las predicciones por documento,
+    sin volver a ejecutar el modelo.
+
+    Args:
+        predictions: DataFrame con 'label', 'predicted' y 'confidence'
+        model_name: Nombre del modelo (para el informe)
+
+    Returns:
+        Dict con métricas, estadísticas de confianza, matriz de confusión y
+        reporte por clase
+    """
+    true_labels = predictions['label'].astype(str).to_numpy()
+    predicted = predictions['predicted'].astype(str).to_numpy()
+    confidences = predictions['confidence'].to_numpy(dtype=float)
+
+    accuracy = accuracy_score(true_labels, predicted)
+    precision, recall, f1, _ = precision_recall_fscore_support(
+        true_labels,
+        predicted,
+        average='weighted',
+        zero_division=0
+    )
+    cm = confusion_matrix(true_labels, predicted)
+    report = classification_report(
+        true_labels,
+        predicted,
+        output_dict=True,
+        zero_division=0
+    )
+
+    return {
+        "model_name": model_name,
+        "test_size": len(predictions),
+        "metrics": {
+            "accuracy": round(accuracy, 4),
+            "precision": round(precision, 4),
+            "recall": round(recall, 4),
+            "f1_score": round(f1, 4)
+        },
+        "confidence_stats": {
+            "average": round(float(confidences.mean()), 4),
+            "low_confidence_rate": round(float((confidences < 0.6).mean()), 4),
+            "high_confidence_rate": round(float((confidences > 0.8).mean()), 4)
+        },
+        "confusion_matrix": cm.tolist(),
+        "classification_report": report
+    }
+
+
+def print_report(results: Dict):
+    """Imprime el resumen de un informe de ``report_from_predictions``."""
+    metrics = results["metrics"]
+    confidence = results["confidence_stats"]
+    print(f"\n📊 RESULTADOS:")
+    print(f"   Accuracy:  {metrics['accuracy']:.2%}")
+    print(f"   Precision: {metrics['precision']:.2%}")
+    print(f"   Recall:    {metrics['recall']:.2%}")
+    print(f"   F1-Score:  {metrics['f1_score']:.2%}")
+    print(f"\n📈 CONFIANZA:")
+    print(f"   Promedio:       {confidence['average']:.2%}")
+    print(f"   Baja (<0.6):    {confidence['low_confidence_rate']:.2%}")
+    print(f"   Alta (>0.8):    {confidence['high_confidence_rate']:.2%}")
+
+
 class ModelEvaluator:
     """
     Evaluador de modelos de clasificación.
@@ -27,6 +131,7 @@ class ModelEvaluator:
         """
         self.model_name = model_name
         self.classifier = None
+        self._predictions = {}
         self._load_classifier()
 
     def _load_classifier(self):
@@ -38,12 +143,50 @@ class ModelEvaluator:
         except Exception as e:
             print(f"[ERROR] No se pudo cargar clasificador: {e}")
 
-    def evaluate_on_dataset(self, test_df: pd.DataFrame) -> Dict:
+    def predict_dataset(self, test_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Predice todo el dataset en una sola pasada (limpieza, vectorización y
+        predicción por lotes). El resultado se guarda en memoria por contenido
+        del dataset, así que los informes posteriores no vuelven a predecir.
+
+        Args:
+            test_df: DataFrame con columnas 'text' y 'label'
+
+        Returns:
+            DataFrame por documento con 'label', 'predicted', 'confidence' y
+            'correct' (más 'doc_id' si el dataset lo trae)
+        """
+        key = dataset_fingerprint(test_df)
+        cached = self._predictions.get(key)
+        if cached is not None:
+            return cached
+
+        # Texto ya limpio si el dataset viene de la caché (load_split)
+        if CLEAN_COLUMN in test_df.columns:
+            texts = test_df[CLEAN_COLUMN].fillna('').astype(str).tolist()
+            result = self.classifier.classify_batch(texts, cleaned=True)
+        else:
+            result = self.classifier.classify_batch(test_df['text'].fillna('').astype(str).tolist())
+
+        predictions = pd.DataFrame(index=test_df.index)
+        if 'doc_id' in test_df.columns:
+            predictions['doc_id'] = test_df['doc_id']
+        predictions['label'] = test_df['label'].astype(str)
+        predictions['predicted'] = result['tipo_documento']
+        predictions['confidence'] = result['confianza']
+        predictions['correct'] = predictions['label'] == predictions['predicted']
+
+        self._predictions[key] = predictions
+        return predictions
+
+    def evaluate_on_dataset(self, test_df: pd.DataFrame, predictions_path: str = None) -> Dict:
         """
         Evalúa el modelo en un dataset de test.
 
         Args:
             test_df: DataFrame con columnas 'text' y 'label'
+            predictions_path: Ruta donde guardar las predicciones por documento
+                (.parquet o .csv, opcional)
 
         Returns:
             Dict con métricas de evaluación
@@ -59,81 +202,20 @@ class ModelEvaluator:
         print(f"Dataset: {len(test_df)} ejemplos")
         print("=" * 70)
 
-        # Predecir
-        predictions = []
-        confidences = []
-
-        from src.ia.utils import clean_text
-
-        for idx, row in test_df.iterrows():
-            text = clean_text(row['text'])
-            result = self.classifier.classify_text(text)
-
-            predictions.append(result.get('tipo_documento', 'otro'))
-            confidences.append(result.get('confianza', 0.0))
-
-        true_labels = test_df['label'].values
-
-        # Calcular métricas
-        accuracy = accuracy_score(true_labels, predictions)
-        precision, recall, f1, support = precision_recall_fscore_support(
-            true_labels,
-            predictions,
-            average='weighted',
-            zero_division=0
-        )
-
-        # Matriz de confusión
-        cm = confusion_matrix(true_labels, predictions)
-
-        # Reporte por clase
-        report = classification_report(
-            true_labels,
-            predictions,
-            output_dict=True,
-            zero_division=0
-        )
-
-        # Análisis de confianza
-        avg_confidence = np.mean(confidences)
-        low_confidence = sum(1 for c in confidences if c < 0.6) / len(confidences)
-        high_confidence = sum(1 for c in confidences if c > 0.8) / len(confidences)
-
-        results = {
-            "model_name": self.model_name,
-            "test_size": len(test_df),
-            "metrics": {
-                "accuracy": round(accuracy, 4),
-                "precision": round(precision, 4),
-                "recall": round(recall, 4),
-                "f1_score": round(f1, 4)
-            },
-            "confidence_stats": {
-                "average": round(avg_confidence, 4),
-                "low_confidence_rate": round(low_confidence, 4),
-                "high_confidence_rate": round(high_confidence, 4)
-            },
-            "confusion_matrix": cm.tolist(),
-            "classification_report": report
-        }
-
-        # Imprimir resumen
-        print(f"\n📊 RESULTADOS:")
-        print(f"   Accuracy:  {accuracy:.2%}")
-        print(f"   Precision: {precision:.2%}")
-        print(f"   Recall:    {recall:.2%}")
-        print(f"   F1-Score:  {f1:.2%}")
-        print(f"\n📈 CONFIANZA:")
-        print(f"   Promedio:       {avg_confidence:.2%}")
-        print(f"   Baja (<0.6):    {low_confidence:.2%}")
-        print(f"   Alta (>0.8):    {high_confidence:.2%}")
+        predictions = self.predict_dataset(test_df)
+        if predictions_path:
+            save_predictions(predictions, predictions_path)
+
+        results = report_from_predictions(predictions, self.model_name)
+        print_report(results)
 
         return results
 
     def compare_synthetic_vs_real(
         self,
         synthetic_test_path: str = "src/ia/datasets/processed/test.csv",
-        real_test_df: pd.DataFrame = None
+        real_test_df: pd.DataFrame = None,
+        predictions_dir: str = None
     ) -> Dict:
         """
         Compara performance en datos sintéticos vs reales.
@@ -141,6 +223,8 @@ class ModelEvaluator:
         Args:
             synthetic_test_path: Ruta al test sintético
             real_test_df: DataFrame con test real
+            predictions_dir: Directorio donde guardar las predicciones por
+                documento de cada conjunto (opcional)
 
         Returns:
             Dict con comparación de métricas
@@ -153,15 +237,17 @@ class ModelEvaluator:
 
         # Evaluar en sintéticos
         if os.path.exists(synthetic_test_path):
-            synthetic_df = pd.read_csv(synthetic_test_path)
-            results["synthetic"] = self.evaluate_on_dataset(synthetic_df)
+            synthetic_df = load_split(synthetic_test_path)
+            results["synthetic"] = self.evaluate_on_dataset(
+                synthetic_df, _predictions_file(predictions_dir, "synthetic"))
             print("\n✅ Evaluación en datos sintéticos completada")
         else:
             print("\n⚠️ No se encontró dataset sintético")
 
         # Evaluar en reales
         if real_test_df is not None and not real_test_df.empty:
-            results["real"] = self.evaluate_on_dataset(real_test_df)
+            results["real"] = self.evaluate_on_dataset(
+                real_test_df, _predictions_file(predictions_dir, "real"))
             print("\n✅ Evaluación en datos reales completada")
         else:
             print("\n⚠️ No hay datos reales para evaluar")
@@ -196,11 +282,12 @@ class ModelEvaluator:
         Returns:
             Lista de categorías débiles
         """
-        results = self.evaluate_on_dataset(test_df)
-
-        if "classification_report" not in results:
+        if self.classifier is None or test_df.empty:
             return []
 
+        # Reutiliza las predicciones de evaluate_on_dataset si ya se hicieron
+        results = report_from_predictions(self.predict_dataset(test_df), self.model_name)
+
         weak_categories = []
 
         for category, metrics in results["classification_report"].items():
@@ -0,0 +1,317 @@
+"""
+Logs JSONL particionados por día.
+
+Cada log (predicciones, feedback) es un directorio con un archivo por día:
+
+    logs/predictions/2026-10-17.jsonl.gz   (días recientes, se añaden lotes)
+    logs/predictions/2026-09-30.parquet    (días compactados, columnar)
+
+Las lecturas filtradas por fecha solo abren las particiones del rango, así
+que una consulta de 7 días cuesta lo mismo con independencia del histórico.
+
+Cada lote se añade como un miembro gzip independiente con una única llamada
+``write()`` sobre un descriptor ``O_APPEND``; gzip admite miembros
+concatenados, por lo que varios procesos pueden escribir en el mismo día sin
+mezclar registros.
+
+Uso (compactación y migración de los logs planos antiguos):
+    python -m src.ia.log_store compact --older-than 7
+    python -m src.ia.log_store migrate logs/predictions.jsonl logs/predictions
+"""
+
+import argparse
+import gzip
+import json
+import os
+import re
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+
+PREDICTIONS_DIR = "logs/predictions"
+FEEDBACK_DIR = "logs/user_feedback"
+
+JSONL_SUFFIX = ".jsonl.gz"
+COLUMNAR_SUFFIX = ".parquet"
+# Sufijo de una partición JSONL reservada por ``compact``
+_COMPACTING = ".compacting"
+
+_PARTITION_RE = re.compile(r"^(\d{4}-\d{2}-\d{2})(\.jsonl\.gz|\.parquet)$")
+
+
+def _entry_date(entry: Dict) -> str:
+    """Fecha (YYYY-MM-DD) de la partición de una entrada."""
+    return entry.get("date") or str(entry.get("timestamp", ""))[:10] or date.today().isoformat()
+
+
+def _as_date(value) -> Optional[date]:
+    if value is None or isinstance(value, date) and not isinstance(value, datetime):
+        return value
+    if isinstance(value, datetime):
+        return value.date()
+    return date.fromisoformat(str(value)[:10])
+
+
+_JSON_COLUMNS_KEY = b"directia.json_columns"
+
+
+def _to_table(entries: List[Dict]):
+    """
+    Tabla Arrow con una columna por campo (unión de los campos de todas las
+    entradas). Los campos con tipos mezclados se guardan como texto JSON.
+    """
+    import pyarrow as pa
+
+    names = list(dict.fromkeys(name for entry in entries for name in entry))
+    arrays = {}
+    json_columns = []
+    for name in names:
+        values = [entry.get(name) for entry in entries]
+        try:
+            arrays[name] = pa.array(values)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            arrays[name] = pa.array(
+                [None if value is None else json.dumps(value, ensure_ascii=False) for value in values],
+                type=pa.string(),
+            )
+            json_columns.append(name)
+
+    table = pa.table(arrays)
+    if json_columns:
+        table = table.replace_schema_metadata({_JSON_COLUMNS_KEY: json.dumps(json_columns).encode()})
+    return table
+
+
+class PartitionedLog:
+    """Log JSONL con una partición por día."""
+
+    def __init__(self, directory: str):
+        """
+        Args:
+            directory: Directorio de las particiones (se crea si no existe)
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def partition_path(self, day, suffix: str = JSONL_SUFFIX) -> Path:
+        return self.directory / f"{_as_date(day).isoformat()}{suffix}"
+
+    # ------------------------------------------------------------------
+    # Escritura
+    # ------------------------------------------------------------------
+
+    def append(self, entries: Sequence[Dict], fsync: bool = False) -> None:
+        """
+        Añade entradas a sus particiones (una escritura por día del lote).
+
+        Args:
+            entries: Entradas a registrar
+            fsync: Forzar el volcado a disco tras escribir
+        """
+        by_day = defaultdict(list)
+        for entry in entries:
+            by_day[_entry_date(entry)].append(entry)
+
+        for day, day_entries in by_day.items():
+            payload = "".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in day_entries)
+            member = gzip.compress(payload.encode("utf-8"), compresslevel=6)
+
+            fd = os.open(self.partition_path(day), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                view = memoryview(member)
+                while view:
+                    view = view[os.write(fd, view):]
+                if fsync:
+                    os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    # ------------------------------------------------------------------
+    # Lectura
+    # ------------------------------------------------------------------
+
+    def partitions(self, since=None, until=None) -> List[Path]:
+        """
+        Particiones cuyo día está en [since, until], en orden cronológico.
+        Si un día tiene parte compactada y parte JSONL, se devuelven ambas.
+        """
+        since, until = _as_date(since), _as_date(until)
+        selected = []
+        for path in self.directory.iterdir():
+            match = _PARTITION_RE.match(path.name)
+            if not match:
+                continue
+            day = date.fromisoformat(match.group(1))
+            if since and day < since or until and day > until:
+                continue
+            # El archivo columnar va antes que el JSONL del mismo día
+            selected.append((day, match.group(2) != COLUMNAR_SUFFIX, path))
+        return [path for _, _, path in sorted(selected)]
+
+    def read(self, since=None, until=None, columns: Optional[Iterable[str]] = None) -> Iterator[Dict]:
+        """
+        Recorre las entradas de las particiones del rango.
+
+        Args:
+            since: Primer día incluido (date, datetime o 'YYYY-MM-DD')
+            until: Último día incluido
+            columns: Campos a devolver (None: todos). En las particiones
+                compactadas solo se leen esas columnas.
+
+        Yields:
+            Entradas como dicts
+        """
+        columns = list(columns) if columns is not None else None
+        for path in self.partitions(since, until):
+            if path.name.endswith(COLUMNAR_SUFFIX):
+                yield from self._read_columnar(path, columns)
+            else:
+                yield from self._read_jsonl(path, columns)
+
+    @staticmethod
+    def _read_jsonl(path: Path, columns: Optional[List[str]]) -> Iterator[Dict]:
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    if columns is not None:
+                        entry = {name: entry.get(name) for name in columns}
+                    yield entry
+        except (OSError, EOFError) as e:
+            # Un miembro truncado (proceso terminado a mitad de escritura)
+            print(f"[WARNING] Partición incompleta {path.name}: {e}")
+
+    @staticmethod
+    def _read_columnar(path: Path, columns: Optional[List[str]]) -> Iterator[Dict]:
+        import pyarrow.parquet as pq
+
+        schema = pq.read_schema(path)
+        present = [name for name in columns if name in schema.names] if columns is not None else None
+        table = pq.read_table(path, columns=present)
+
+        json_columns = set()
+        if schema.metadata and _JSON_COLUMNS_KEY in schema.metadata:
+            json_columns = set(json.loads(schema.metadata[_JSON_COLUMNS_KEY])) & set(table.column_names)
+
+        for entry in table.to_pylist():
+            for name in json_columns:
+                if entry[name] is not None:
+                    entry[name] = json.loads(entry[name])
+            if columns is not None:
+                entry = {name: entry.get(name) for name in columns}
+            yield entry
+
+    # ------------------------------------------------------------------
+    # Mantenimiento
+    # ------------------------------------------------------------------
+
+    def compact(self, older_than_days: int = 7, today: Optional[date] = None) -> List[str]:
+        """
+        Convierte las particiones JSONL anteriores a ``today - older_than_days``
+        en Parquet (una por día). Requiere pyarrow.
+
+        Cada partición se renombra (``os.replace``, atómico) a un nombre
+        privado antes de leerla y se compacta desde ahí: un lote que otro
+        proceso añada mientras tanto (p. ej. ``migrate``) crea de nuevo la
+        partición JSONL y queda para la siguiente compactación en lugar de
+        borrarse con ella. Los restos de una compactación interrumpida se
+        recogen en la siguiente.
+
+        Returns:
+            Días compactados
+        """
+        import pyarrow.parquet as pq
+
+        cutoff = (today or date.today()) - timedelta(days=max(older_than_days, 1))
+        claimed = {path.name[1:11]: path for path in self.directory.glob(f".*{JSONL_SUFFIX}{_COMPACTING}")}
+        for path in self.partitions(until=cutoff - timedelta(days=1)):
+            if not path.name.endswith(JSONL_SUFFIX):
+                continue
+            day = path.name[:10]
+            if day in claimed:
+                continue  # primero se termina lo interrumpido; esta queda para la siguiente
+            claimed[day] = path.with_name(f".{path.name}{_COMPACTING}")
+            os.replace(path, claimed[day])
+
+        compacted = []
+        for day, source in sorted(claimed.items()):
+            entries = list(self._read_jsonl(source, None))
+
+            target = self.partition_path(day, COLUMNAR_SUFFIX)
+            if target.exists():
+                entries = list(self._read_columnar(target, None)) + entries
+
+            tmp = target.with_name(f".{target.name}.tmp")
+            pq.write_table(_to_table(entries), tmp, compression="zstd")
+            os.replace(tmp, target)
+            source.unlink()
+            compacted.append(day)
+        return compacted
+
+    def import_jsonl(self, legacy_file: str) -> int:
+        """
+        Reparte un log JSONL plano (formato anterior) en particiones diarias.
+
+        Returns:
+            Número de entradas importadas
+        """
+        imported = 0
+        batch = []
+        with open(legacy_file, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    batch.append(json.loads(line))
+                except ValueError:
+                    continue
+                if len(batch) >= 1000:
+                    self.append(batch)
+                    imported += len(batch)
+                    batch = []
+        if batch:
+            self.append(batch)
+            imported += len(batch)
+        return imported
+
+
+_feedback_log = None
+
+
+def get_feedback_log(directory: str = FEEDBACK_DIR) -> PartitionedLog:
+    """Log particionado de feedback de usuarios (singleton)."""
+    global _feedback_log
+    if _feedback_log is None:
+        _feedback_log = PartitionedLog(directory)
+    return _feedback_log
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mantenimiento de logs particionados")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    compact = subparsers.add_parser("compact", help="Compactar particiones antiguas a Parquet")
+    compact.add_argument("--older-than", type=int, default=7, help="Días que se mantienen en JSONL (default: 7)")
+    compact.add_argument("--dirs", nargs="+", default=[PREDICTIONS_DIR, FEEDBACK_DIR])
+
+    migrate = subparsers.add_parser("migrate", help="Importar un log JSONL plano")
+    migrate.add_argument("legacy_file")
+    migrate.add_argument("directory")
+
+    args = parser.parse_args()
+
+    if args.command == "compact":
+        for directory in args.dirs:
+            days = PartitionedLog(directory).compact(args.older_than)
+            print(f"[INFO] {directory}: {len(days)} particiones compactadas")
+    else:
+        count = PartitionedLog(args.directory).import_jsonl(args.legacy_file)
+        os.replace(args.legacy_file, args.legacy_file + ".migrated")
+        print(f"[INFO] {count} entradas importadas en {args.directory}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,30 @@
 """
 Sistema de logging de predicciones para monitoreo de IA en producción.
+
+Las entradas se encolan y las escribe un hilo en segundo plano, de modo que
+``log_prediction`` no abre el archivo ni espera al disco. El hilo agrupa las
+entradas en lotes (por tamaño o por tiempo) y los añade a las particiones
+diarias de ``logs/predictions/`` (ver ``src.ia.log_store``) con una única
+escritura ``O_APPEND`` por día: los registros de varios workers (gunicorn)
+pueden compartir partición sin mezclarse. Al cerrar el proceso se vacía la
+cola (``atexit``).
 """
 
-import json
+import atexit
 import os
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict
+from typing import Optional, Dict, List
+
+from src.ia.buffered_writer import BufferedWriter
+from src.ia.document_store import DocumentStore, get_document_store
+from src.ia.log_store import PREDICTIONS_DIR, PartitionedLog
+from src.ia.rollups import RollupStore, days_since, get_rollups
+from src.utils import metrics as prom
+
+
+# Clave interna con el texto completo; se retira antes de escribir el log
+_TEXT_KEY = "_document_text"
 
 
 class PredictionLogger:
@@ -15,20 +33,69 @@ class PredictionLogger:
     Permite tracking de performance y análisis de errores.
     """
 
-    def __init__(self, log_file="logs/predictions.jsonl"):
+    def __init__(self, log_dir=PREDICTIONS_DIR, buffered: bool = True,
+                 batch_size: int = 64, flush_interval: float = 1.0,
+                 fsync_policy: str = "batch", fsync_interval: float = 5.0,
+                 rollups: Optional[RollupStore] = None,
+                 documents: Optional[DocumentStore] = None):
         """
         Args:
-            log_file: Ruta al archivo de log (formato JSONL)
+            log_dir: Directorio de las particiones diarias (JSONL gzip)
+            buffered: Escribir en segundo plano (False: cada entrada se escribe al momento)
+            batch_size: Entradas por lote como máximo
+            flush_interval: Segundos máximos que una entrada espera en la cola
+            fsync_policy: 'never', 'batch' (tras cada lote) o 'interval'
+            fsync_interval: Segundos entre fsync con la política 'interval'
+            rollups: Agregados diarios (por defecto ``rollups.sqlite3`` junto al directorio de logs)
+            documents: Textos completos por document_id (por defecto ``documents.sqlite3``)
         """
-        self.log_file = log_file
-        self._ensure_log_directory()
+        self.log_dir = log_dir
+        self.store = PartitionedLog(log_dir)
+        self.rollups = rollups or get_rollups(Path(log_dir).parent / "rollups.sqlite3")
+        self.documents = documents or get_document_store(Path(log_dir).parent / "documents.sqlite3")
+
+        self._writer = None
+        if buffered:
+            self._writer = BufferedWriter(self._write_batch, batch_size, flush_interval,
+                                          fsync_policy, fsync_interval, name="prediction-log-writer")
+            prom.register_queue("prediction_log", self._writer.qsize)
+            atexit.register(self.close)
+
+    def _write_batch(self, entries: List[Dict], fsync: bool = False) -> None:
+        """Guarda los textos, añade el lote al log y actualiza los agregados diarios."""
+        documents = [
+            (entry["document_id"], entry.pop(_TEXT_KEY), entry["file"])
+            for entry in entries if _TEXT_KEY in entry
+        ]
+        if documents:
+            self.documents.put_many(documents)
+        self.store.append(entries, fsync=fsync)
+        self.rollups.record_predictions(entries)
+
+    def _write(self, entry: Dict) -> None:
+        if self._writer is not None:
+            self._writer.put(entry)
+            return
+        try:
+            self._write_batch([entry])
+        except Exception as e:
+            print(f"[WARNING] Error al escribir log de predicciones: {e}")
 
-    def _ensure_log_directory(self):
-        """Crea el directorio de logs si no existe."""
-        log_dir = os.path.dirname(self.log_file)
-        if log_dir and not os.path.exists(log_dir):
-            os.makedirs(log_dir, exist_ok=True)
-            print(f"[INFO] Directorio de logs creado: {log_dir}")
+    def flush(self, timeout: Optional[float] = 5.0) -> bool:
+        """
+        Espera a que las entradas encoladas estén escritas en disco.
+
+        Returns:
+            False si no terminó dentro del timeout
+        """
+        if self._writer is None:
+            return True
+        return self._writer.flush(timeout)
+
+    def close(self) -> None:
+        """Vacía la cola y detiene el hilo escritor."""
+        if self._writer is not None:
+            self._writer.close()
 
     def log_prediction(
         self,
@@ -40,7 +107,10 @@ class PredictionLogger:
         text_preview: Optional[str] = None,
         user_feedback: Optional[str] = None,
         processing_time: Optional[float] = None,
-        classifier_type: str = "ml"
+        classifier_type: str = "ml",
+        timings: Optional[List[Dict]] = None,
+        document_id: Optional[str] = None,
+        document_text: Optional[str] = None
     ) -> None:
         """
         Registra una predicción en el log.
@@ -55,11 +125,16 @@ class PredictionLogger:
             user_feedback: Feedback del usuario (corrección manual)
             processing_time: Tiempo de procesamiento en segundos
             classifier_type: Tipo de clasificador usado ('ml' o 'keywords')
+            timings: Spans por etapa del pipeline (ver src.ia.timing)
+            document_id: SHA-256 del contenido del documento
+            document_text: Texto completo extraído; se guarda normalizado en
+                el DocumentStore (no en el log) y se recupera por document_id
         """
+        timestamp = datetime.now().isoformat()
         entry = {
-            "timestamp": datetime.now().isoformat(),
-            "date": datetime.now().strftime("%Y-%m-%d"),
-            "time": datetime.now().strftime("%H:%M:%S"),
+            "timestamp": timestamp,
+            "date": timestamp[:10],
+            "time": timestamp[11:19],
             "file": os.path.basename(file_path),
             "file_extension": Path(file_path).suffix.lower(),
             "predicted": predicted_type,
@@ -69,14 +144,15 @@ class PredictionLogger:
             "text_preview": text_preview[:200] if text_preview else None,
             "user_feedback": user_feedback,
             "processing_time_sec": round(processing_time, 3) if processing_time else None,
-            "classifier": classifier_type
+            "classifier": classifier_type,
+            "document_id": document_id
         }
+        if timings:
+            entry["timings"] = timings
+        if document_id and document_text:
+            entry[_TEXT_KEY] = document_text
 
-        try:
-            with open(self.log_file, 'a', encoding='utf-8') as f:
-                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
-        except Exception as e:
-            print(f"[WARNING] Error al escribir log de predicción: {e}")
+        self._write(entry)
 
     def log_error(
         self,
@@ -94,9 +170,10 @@ class PredictionLogger:
             username: Usuario que subió el archivo
             error_type: Tipo de error
         """
+        timestamp = datetime.now().isoformat()
         entry = {
-            "timestamp": datetime.now().isoformat(),
-            "date": datetime.now().strftime("%Y-%m-%d"),
+            "timestamp": timestamp,
+            "date": timestamp[:10],
             "type": "error",
             "file": os.path.basename(file_path),
             "error_type": error_type,
@@ -104,15 +181,12 @@ class PredictionLogger:
             "username": username
         }
 
-        try:
-            with open(self.log_file, 'a', encoding='utf-8') as f:
-                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
-        except Exception as e:
-            print(f"[WARNING] Error al escribir log de error: {e}")
+        self._write(entry)
 
     def get_stats(self, days: int = 7) -> Dict:
         """
-        Obtiene estadísticas de las predicciones de los últimos N días.
+        Obtiene estadísticas de las predicciones de los últimos N días
+        (días naturales desde ``now - days``), sumando los agregados diarios.
 
         Args:
             days: Número de días a analizar
@@ -121,65 +195,8 @@ class PredictionLogger:
             Dict con estadísticas
         """
         try:
-            from datetime import timedelta
-
-            cutoff_date = datetime.now() - timedelta(days=days)
-            stats = {
-                "total_predictions": 0,
-                "by_type": {},
-                "by_confidence": {"low": 0, "medium": 0, "high": 0},
-                "avg_confidence": 0.0,
-                "errors": 0,
-                "with_feedback": 0
-            }
-
-            if not os.path.exists(self.log_file):
-                return stats
-
-            with open(self.log_file, 'r', encoding='utf-8') as f:
-                confidences = []
-                for line in f:
-                    try:
-                        entry = json.loads(line)
-                        entry_date = datetime.fromisoformat(entry.get("timestamp", ""))
-
-                        if entry_date < cutoff_date:
-                            continue
-
-                        if entry.get("type") == "error":
-                            stats["errors"] += 1
-                            continue
-
-                        stats["total_predictions"] += 1
-
-                        # Por tipo
-                        pred_type = entry.get("predicted", "unknown")
-                        stats["by_type"][pred_type] = stats["by_type"].get(pred_type, 0) + 1
-
-                        # Por confianza
-                        confidence = entry.get("confidence", 0)
-                        confidences.append(confidence)
-
-                        if confidence < 0.6:
-                            stats["by_confidence"]["low"] += 1
-                        elif confidence < 0.8:
-                            stats["by_confidence"]["medium"] += 1
-                        else:
-                            stats["by_confidence"]["high"] += 1
-
-                        # Feedback
-                        if entry.get("user_feedback"):
-                            stats["with_feedback"] += 1
-
-                    except Exception as e:
-                        continue
-
-                # Calcular promedio de confianza
-                if confidences:
-                    stats["avg_confidence"] = round(sum(confidences) / len(confidences), 4)
-
-            return stats
-
+            self.flush()
+            return self.rollups.prediction_stats(since=days_since(days))
         except Exception as e:
             print(f"[WARNING] Error al calcular estadísticas: {e}")
             return {}
@@ -189,17 +206,17 @@ class PredictionLogger:
 _logger = None
 
 
-def get_logger(log_file="logs/predictions.jsonl") -> PredictionLogger:
+def get_logger(log_dir=PREDICTIONS_DIR) -> PredictionLogger:
     """
     Obtiene la instancia global del logger (singleton).
 
     Args:
-        log_file: Ruta al archivo de log
+        log_dir: Directorio de las particiones del log
 
     Returns:
         Instancia de PredictionLogger
     """
     global _logger
     if _logger is None:
-        _logger = PredictionLogger(log_file)
+        _logger = PredictionLogger(log_dir)
     return _logger
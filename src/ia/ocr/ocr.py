@@ -1,12 +1,33 @@
 import shutil
-import cv2
-import pytesseract
 import os
-from pdf2image import convert_from_path
 import tempfile
 
+# cv2, pytesseract y pdf2image tardan en importarse: se cargan al primer OCR
+# (o en el calentamiento del pipeline), no al arrancar el servidor
+_backends = None
+
+
+def load_backends():
+    """
+    Importa las dependencias del OCR una sola vez por proceso.
+
+    Returns:
+        Tupla (cv2, pytesseract, convert_from_path)
+    """
+    global _backends
+    if _backends is None:
+        import cv2
+        import pytesseract
+        from pdf2image import convert_from_path
+
+        _backends = (cv2, pytesseract, convert_from_path)
+    return _backends
+
+
 def ejecutar_ocr(file_path: str, lang: str = "spa") -> str:
     try:
+        cv2, pytesseract, convert_from_path = load_backends()
+
         # --- Localizar tesseract automáticamente ---
         tesseract_path = shutil.which("tesseract")
 
@@ -1,27 +1,717 @@
+"""
+Pipeline único de clasificación de documentos.
+
+Todas las rutas de IA (``/api/files/upload?ia=true`` y ``/api/clasificar``)
+pasan por ``DocumentPipeline``, que encadena cinco etapas intercambiables:
+
+    extract → normalise → featurise → classify → postprocess
+
+Cada etapa es un objeto con un atributo ``name`` y un método ``run(ctx)`` que
+lee y completa un ``DocumentContext``. Los atributos ``input_attr`` y
+``output_attr`` indican qué campos del contexto consume y produce, y se usan
+para medir los bytes de cada span (ver ``src.ia.timing``).
+
+El modelo, la caché de extracción y las métricas se cargan una sola vez por
+proceso y se comparten entre todas las peticiones.
+"""
+
+import hashlib
+import importlib
+import json
 import os
+import tempfile
+import threading
 import time
-from src.ia.ocr import extract_text
-from src.ia.utils import clean_text
-from src.ia.classifier_ml import MLDocumentClassifier
-from src.ia.classifier_optimized import DocumentClassifier
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
 from src.ia.logger import get_logger
+from src.ia.naming import extract_info_from_text, generate_filename
+from src.ia.timing import StageHistograms, Trace, payload_size
+from src.utils import metrics as prom
+
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+# IA_MODEL_DIR permite servir otro modelo (p. ej. el incremental, src/ia/models/incremental)
+DEFAULT_MODEL_DIR = Path(os.getenv("IA_MODEL_DIR", BASE_DIR / "ai_directia" / "models" / "v1_tfidf_svm"))
+DEFAULT_CONFIG_PATH = BASE_DIR / "ai_directia" / "config" / "categories.json"
+
+UNKNOWN_FOLDER = "/Documentos/Otros/"
+
+
+class PipelineError(ValueError):
+    """Error de una etapa que debe devolverse al cliente (p. ej. extracción fallida)."""
+
+
+@dataclass
+class DocumentContext:
+    """Estado de un documento mientras recorre las etapas del pipeline."""
+
+    data: bytes
+    extension: str
+    file_name: str
+    username: Optional[str] = None
+    document_id: str = ""
+    raw_text: str = ""
+    pages: int = 0
+    cache_hit: bool = False
+    text: str = ""
+    features: object = None
+    prediction: Dict = field(default_factory=dict)
+    result: Dict = field(default_factory=dict)
+    trace: Trace = field(default_factory=Trace)
+
+
+# ---------------------------------------------------------------------------
+# Capa compartida: caché y métricas
+# ---------------------------------------------------------------------------
+
+class ExtractionCache:
+    """
+    Caché LRU del texto extraído, indexada por el SHA-256 del contenido.
+    Un mismo documento subido varias veces (o clasificado y luego subido)
+    solo pasa una vez por PDF/OCR.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: Dict) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
 
+    def __len__(self) -> int:
+        return len(self._entries)
 
-# Inicializar logger
-logger = get_logger()
 
-# Inicializar clasificadores (primero ML, luego keywords como fallback)
-classifier_type = "keywords"  # Default
-try:
-    classifier_ml = MLDocumentClassifier(model_name="tfidf_svm_v1")
-    print("[INFO] Usando clasificador ML (TF-IDF + SVM)")
-    classifier = classifier_ml
+class PipelineMetrics:
+    """Contadores del pipeline compartidos por todas las peticiones."""
+
+    def __init__(self):
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return dict(self._counters)
+
+
+# ---------------------------------------------------------------------------
+# Modelo
+# ---------------------------------------------------------------------------
+
+class ModelBundle:
+    """
+    Modelo, vectorizador y metadata cargados una sola vez.
+    Lo comparten las etapas de featurización y clasificación.
+    """
+
+    def __init__(self, model_dir=DEFAULT_MODEL_DIR):
+        import joblib
+
+        self.model_dir = Path(model_dir)
+
+        model_file = self.model_dir / "model.pkl"
+        vectorizer_file = self.model_dir / "vectorizer.pkl"
+        if not model_file.exists():
+            raise FileNotFoundError(f"Modelo no encontrado en {model_file}")
+        if not vectorizer_file.exists():
+            raise FileNotFoundError(f"Vectorizador no encontrado en {vectorizer_file}")
+
+        model_data = joblib.load(model_file)
+        if isinstance(model_data, dict):
+            self.model = model_data["model"]
+            label_encoder = model_data.get("label_encoder")
+        else:
+            self.model = model_data
+            label_encoder = None
+
+        # Índice de clase del modelo -> id de categoría
+        if label_encoder is not None:
+            self.labels = [str(label) for label in label_encoder.classes_]
+        else:
+            self.labels = [str(label) for label in self.model.classes_]
+
+        vectorizer = joblib.load(vectorizer_file)
+        self.vectorizer = getattr(vectorizer, "vectorizer", vectorizer)
+
+        metadata_file = self.model_dir / "metadata.json"
+        self.metadata = {}
+        if metadata_file.exists():
+            with open(metadata_file, "r", encoding="utf-8") as f:
+                self.metadata = json.load(f)
+
+        # Versión para etiquetar métricas: la de la metadata o el nombre del directorio
+        self.version = str(self.metadata.get("version") or self.model_dir.name)
+
+        print(f"[INFO] Modelo de clasificación cargado desde {self.model_dir} "
+              f"({type(self.model).__name__}, {len(self.labels)} clases)")
+
+
+def load_categories(config_path=DEFAULT_CONFIG_PATH):
+    """
+    Carga las categorías y umbrales de confianza.
+
+    Returns:
+        Tupla (categorías por id, umbrales de confianza)
+    """
+    with open(config_path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+
+    categories = {cat["id"]: cat for cat in config["categories"]}
+    thresholds = config.get("confidence_thresholds", {"high": 0.80, "medium": 0.50, "low": 0.30})
+    return categories, thresholds
+
+
+# ---------------------------------------------------------------------------
+# Etapas
+# ---------------------------------------------------------------------------
+
+class TextExtractionStage:
+    """
+    Extrae el texto con los extractores de ``ai_directia`` (PDF, DOCX, TXT,
+    imágenes). Los PDF escaneados sin capa de texto pasan por el OCR de
+    ``src.ia.ocr``. El resultado se guarda en la caché compartida.
+    """
+
+    name = "extract"
+    input_attr = "data"
+    output_attr = "raw_text"
+
+    def __init__(self, cache: ExtractionCache, ocr_fallback: bool = True):
+        self.cache = cache
+        self.ocr_fallback = ocr_fallback
+
+    def run(self, ctx: DocumentContext) -> None:
+        ctx.document_id = hashlib.sha256(ctx.data).hexdigest()
+
+        cached = self.cache.get(ctx.document_id)
+        if cached is not None:
+            ctx.raw_text = cached["text"]
+            ctx.pages = cached["pages"]
+            ctx.cache_hit = True
+            return
+
+        from ai_directia.extractors.unified_extractor import extract_text_from_bytes
+
+        result = extract_text_from_bytes(ctx.data, ctx.extension)
+        if not result["success"]:
+            raise PipelineError(f"Text extraction failed: {result['error']}")
+
+        text = result["text"] or ""
+        pages = result.get("pages", 1)
+
+        if ctx.extension == "pdf" and not text.strip() and self.ocr_fallback:
+            with ctx.trace.span("extract.ocr", bytes_in=len(ctx.data)) as span:
+                text = self._ocr_pdf(ctx.data)
+                span.bytes_out = payload_size(text)
+                span.pages = pages
+            prom.record_ocr(pages, span.duration_ms / 1000)
+
+        ctx.raw_text = text
+        ctx.pages = pages
+        self.cache.put(ctx.document_id, {"text": text, "pages": pages})
+
+    @staticmethod
+    def _ocr_pdf(data: bytes) -> str:
+        """OCR de un PDF escaneado (sin texto embebido)."""
+        from src.ia.ocr.ocr import ejecutar_ocr
+
+        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+            tmp.write(data)
+        try:
+            return ejecutar_ocr(tmp.name)
+        finally:
+            os.unlink(tmp.name)
+
+
+class NormalizationStage:
+    """Normaliza y tokeniza el texto con el limpiador de ``ai_directia``."""
+
+    name = "normalise"
+    input_attr = "raw_text"
+    output_attr = "text"
+
+    def __init__(self, language: str = "spanish", remove_stop: bool = True):
+        self.language = language
+        self.remove_stop = remove_stop
+
+    def run(self, ctx: DocumentContext) -> None:
+        from ai_directia.preprocessing.text_cleaner import preprocess_text
+
+        ctx.text = preprocess_text(ctx.raw_text, remove_stop=self.remove_stop, language=self.language)
+
+
+class TfidfFeaturizationStage:
+    """Vectoriza el texto normalizado con el TF-IDF del modelo."""
+
+    name = "featurise"
+    input_attr = "text"
+    output_attr = "features"
+
+    def __init__(self, bundle: ModelBundle):
+        self.bundle = bundle
+
+    def run(self, ctx: DocumentContext) -> None:
+        ctx.features = self.bundle.vectorizer.transform([ctx.text])
+
+
+class ModelClassificationStage:
+    """Clasifica las features con el modelo entrenado."""
+
+    name = "classify"
     classifier_type = "ml"
-except Exception as e:
-    print(f"[WARNING] Error al cargar clasificador ML: {e}")
-    print("[INFO] Usando clasificador optimizado basado en keywords como fallback")
-    classifier = DocumentClassifier()
+    input_attr = "features"
+
+    def __init__(self, bundle: ModelBundle, top_n: int = 3):
+        self.bundle = bundle
+        self.top_n = top_n
+
+    def run(self, ctx: DocumentContext) -> None:
+        model = self.bundle.model
+
+        # La etiqueta es la de predict: con SVC calibrado (Platt) el argmax de
+        # las probabilidades puede no coincidir. Las puntuaciones solo dan la
+        # confianza y el top.
+        predicted = model.predict(ctx.features)[0]
+        best = list(model.classes_).index(predicted)
+
+        if hasattr(model, "predict_proba"):
+            scores = model.predict_proba(ctx.features)[0]
+        else:
+            import numpy as np
+
+            decision = model.decision_function(ctx.features)[0]
+            exp = np.exp(decision - decision.max())
+            scores = exp / exp.sum()
+
+        ranked = scores.argsort()[::-1]
+        ctx.prediction = {
+            "category_id": self.bundle.labels[best],
+            "confidence": float(scores[best]),
+            "top": [(self.bundle.labels[int(idx)], float(scores[idx])) for idx in ranked[:self.top_n]],
+        }
+
+
+class KeywordClassificationStage:
+    """
+    Clasificador por keywords, usado como respaldo cuando no hay modelo ML.
+    Trabaja sobre el texto original, por lo que no necesita featurización.
+    """
+
+    name = "classify"
     classifier_type = "keywords"
+    input_attr = "raw_text"
+
+    def __init__(self):
+        from src.ia.classifier_optimized import DocumentClassifier
+
+        self.classifier = DocumentClassifier()
+
+    def run(self, ctx: DocumentContext) -> None:
+        resultado = self.classifier.classify_text(ctx.raw_text)
+        tipo = resultado["tipo_documento"]
+        ctx.prediction = {
+            "category_id": tipo,
+            "confidence": float(resultado["confianza"]),
+            "top": [(tipo, float(resultado["confianza"]))],
+        }
+
+
+class PostprocessStage:
+    """
+    Convierte la predicción en la respuesta pública: nombre de categoría,
+    carpeta, nivel de confianza, top de predicciones y nombre sugerido.
+    """
+
+    name = "postprocess"
+
+    def __init__(self, categories: Dict, thresholds: Dict):
+        self.categories = categories
+        self.thresholds = thresholds
+
+    def category_info(self, category_id: str) -> Dict:
+        cat = self.categories.get(category_id)
+        if cat is None:
+            return {
+                "id": category_id,
+                "name": "Desconocido",
+                "name_en": "Unknown",
+                "folder_path": UNKNOWN_FOLDER,
+                "description": "",
+            }
+        return {
+            "id": cat["id"],
+            "name": cat["name"],
+            "name_en": cat.get("name_en", cat["name"]),
+            "folder_path": cat["folder_path"],
+            "description": cat.get("description", ""),
+        }
+
+    def confidence_level(self, confidence: float) -> str:
+        if confidence >= self.thresholds["high"]:
+            return "high"
+        elif confidence >= self.thresholds["medium"]:
+            return "medium"
+        return "low"
+
+    def run(self, ctx: DocumentContext) -> None:
+        category_id = ctx.prediction["category_id"]
+        confidence = ctx.prediction["confidence"]
+        info = self.category_info(category_id)
+
+        ctx.result = {
+            "tipo_documento": info["name"],
+            "tipo_documento_en": info["name_en"],
+            "category_id": category_id,
+            "confianza": confidence,
+            "confidence_level": self.confidence_level(confidence),
+            "carpeta_sugerida": info["folder_path"],
+            "descripcion": info["description"],
+            "nombre_sugerido": generate_filename(
+                category_id, ctx.raw_text, extract_info_from_text(ctx.raw_text, category_id)
+            ),
+            "top_predictions": [
+                {
+                    "category": self.category_info(cat_id)["name"],
+                    "category_id": cat_id,
+                    "confidence": score,
+                }
+                for cat_id, score in ctx.prediction["top"]
+            ],
+        }
+
+
+# ---------------------------------------------------------------------------
+# Pipeline
+# ---------------------------------------------------------------------------
+
+class DocumentPipeline:
+    """
+    Orquesta las etapas de clasificación y registra cada predicción.
+
+    Las etapas se inyectan en el constructor; ``featurizer`` puede ser None
+    cuando el clasificador trabaja directamente sobre el texto.
+    """
+
+    def __init__(
+        self,
+        extractor,
+        normalizer,
+        featurizer,
+        classifier,
+        postprocessor: PostprocessStage,
+        cache: Optional[ExtractionCache] = None,
+        metrics: Optional[PipelineMetrics] = None,
+        logger=None,
+        bundle: Optional[ModelBundle] = None,
+        min_text_length: int = 10,
+    ):
+        self.extractor = extractor
+        self.normalizer = normalizer
+        self.featurizer = featurizer
+        self.classifier = classifier
+        self.postprocessor = postprocessor
+        self.cache = cache
+        self.metrics = metrics or PipelineMetrics()
+        self.histograms = StageHistograms()
+        self.logger = logger or get_logger()
+        self.bundle = bundle
+        self.min_text_length = min_text_length
+
+    @property
+    def classifier_type(self) -> str:
+        return getattr(self.classifier, "classifier_type", type(self.classifier).__name__)
+
+    @property
+    def stages(self) -> List:
+        stages = [self.extractor, self.normalizer, self.featurizer, self.classifier, self.postprocessor]
+        return [stage for stage in stages if stage is not None]
+
+    @staticmethod
+    def _run_stage(stage, ctx: DocumentContext) -> None:
+        """Ejecuta una etapa dentro de un span con sus bytes de entrada y salida."""
+        input_attr = getattr(stage, "input_attr", None)
+        output_attr = getattr(stage, "output_attr", None)
+        bytes_in = payload_size(getattr(ctx, input_attr)) if input_attr else 0
+
+        with ctx.trace.span(stage.name, bytes_in=bytes_in) as span:
+            stage.run(ctx)
+            if output_attr:
+                span.bytes_out = payload_size(getattr(ctx, output_attr))
+            if stage.name == "extract":
+                span.pages = ctx.pages
+                span.cache_hit = ctx.cache_hit
+
+    @property
+    def model_version(self) -> str:
+        return self.bundle.version if self.bundle else self.classifier_type
+
+    def _observe_classifier_latency(self, trace: Trace) -> None:
+        for span in trace.spans:
+            if span.stage == "classify":
+                prom.CLASSIFIER_LATENCY.labels(self.model_version, self.classifier_type).observe(
+                    span.duration_ms / 1000
+                )
+
+    def _empty_result(self) -> Dict:
+        return {
+            "tipo_documento": "Desconocido",
+            "category_id": "desconocido",
+            "confianza": 0.0,
+            "confidence_level": "low",
+            "carpeta_sugerida": UNKNOWN_FOLDER,
+            "error": "No se pudo extraer texto suficiente del documento",
+        }
+
+    def classify_bytes(
+        self,
+        data: bytes,
+        extension: str,
+        file_name: Optional[str] = None,
+        username: Optional[str] = None,
+    ) -> Dict:
+        """
+        Clasifica un documento a partir de su contenido.
+
+        Args:
+            data: Contenido del archivo
+            extension: Extensión del archivo ('pdf', '.docx', ...)
+            file_name: Nombre original (para logs y metadata)
+            username: Usuario que envía el documento (solo para logs)
+
+        Returns:
+            Dict con la clasificación. Contiene 'error' si el documento no
+            tiene texto suficiente.
+
+        Raises:
+            PipelineError: Si la extracción de texto falla
+        """
+        extension = extension.lower().lstrip(".")
+        ctx = DocumentContext(
+            data=data,
+            extension=extension,
+            file_name=file_name or f"document.{extension}",
+            username=username,
+        )
+        self.metrics.increment("documents")
+
+        try:
+            self._run_stage(self.extractor, ctx)
+            self.metrics.increment("cache_hits" if ctx.cache_hit else "cache_misses")
+            prom.record_cache_lookup(ctx.cache_hit)
+
+            if len(ctx.raw_text.strip()) < self.min_text_length:
+                self.metrics.increment("empty_documents")
+                ctx.result = self._empty_result()
+            else:
+                for stage in self.stages[1:]:
+                    self._run_stage(stage, ctx)
+        except Exception as e:
+            self.metrics.increment("errors")
+            self.histograms.observe_trace(ctx.trace)
+            error_type = "extraction_error" if isinstance(e, PipelineError) else "classification_error"
+            self.logger.log_error(ctx.file_name, str(e), username, error_type)
+            raise
+
+        result = ctx.result
+        result["classifier"] = self.classifier_type
+        result["document_id"] = ctx.document_id
+        result["metadata"] = {
+            "file_name": ctx.file_name,
+            "file_extension": extension,
+            "text_length": len(ctx.raw_text),
+            "text_preview": ctx.raw_text[:200] + "..." if len(ctx.raw_text) > 200 else ctx.raw_text,
+            "pages": ctx.pages,
+            "cache_hit": ctx.cache_hit,
+        }
+
+        timings = ctx.trace.to_list()
+        processing_time = ctx.trace.total_ms / 1000
+        result["timings"] = timings
+        result["processing_time_ms"] = round(ctx.trace.total_ms, 3)
+
+        self.histograms.observe_trace(ctx.trace)
+        self.histograms.observe("total", ctx.trace.total_ms)
+        self._observe_classifier_latency(ctx.trace)
+        self.metrics.increment(f"predicted.{result['category_id']}")
+        self.logger.log_prediction(
+            file_path=ctx.file_name,
+            predicted_type=result["category_id"],
+            confidence=result["confianza"],
+            username=username,
+            suggested_folder=result["carpeta_sugerida"],
+            text_preview=ctx.raw_text or "[documento vacío]",
+            processing_time=processing_time,
+            classifier_type=self.classifier_type,
+            timings=timings,
+            document_id=ctx.document_id,
+            document_text=ctx.raw_text,
+        )
+
+        return result
+
+    def classify_file(self, file_path: str, username: Optional[str] = None) -> Dict:
+        """
+        Clasifica un documento guardado en disco.
+
+        Args:
+            file_path: Ruta al archivo
+            username: Usuario que sube el archivo (solo para logs)
+
+        Returns:
+            Dict con la clasificación (ver ``classify_bytes``)
+        """
+        with open(file_path, "rb") as f:
+            data = f.read()
+
+        extension = os.path.splitext(file_path)[1]
+        return self.classify_bytes(data, extension, file_name=os.path.basename(file_path), username=username)
+
+    def get_categories(self) -> List[Dict]:
+        """Lista de categorías disponibles."""
+        return [
+            self.postprocessor.category_info(category_id)
+            for category_id in self.postprocessor.categories
+        ]
+
+    def get_model_info(self) -> Dict:
+        """Información sobre el modelo cargado."""
+        metadata = self.bundle.metadata if self.bundle else {}
+        return {
+            "model_type": metadata.get("model_type", self.classifier_type),
+            "training_date": metadata.get("training_date", metadata.get("trained_at", "Unknown")),
+            "vocabulary_size": metadata.get("vocabulary_size", metadata.get("vocab_size", 0)),
+            "metrics": metadata.get("metrics", {}),
+            "model_version": self.model_version,
+            "num_categories": len(self.postprocessor.categories),
+            "classifier": self.classifier_type,
+            "stages": [type(stage).__name__ for stage in self.stages],
+        }
+
+    def get_stats(self) -> Dict:
+        """Métricas acumuladas del pipeline."""
+        stats = self.metrics.snapshot()
+        if self.cache is not None:
+            stats["cache_entries"] = len(self.cache)
+        stats["stages"] = self.histograms.snapshot()
+        return stats
+
+
+def build_pipeline(model_dir=DEFAULT_MODEL_DIR, config_path=DEFAULT_CONFIG_PATH, logger=None,
+                   cache: Optional[ExtractionCache] = None) -> DocumentPipeline:
+    """
+    Construye el pipeline por defecto: modelo TF-IDF entrenado y, si no se
+    puede cargar, clasificador por keywords como respaldo.
+    """
+    cache = cache if cache is not None else ExtractionCache()
+    categories, thresholds = load_categories(config_path)
+
+    try:
+        bundle = ModelBundle(model_dir)
+        featurizer = TfidfFeaturizationStage(bundle)
+        classifier = ModelClassificationStage(bundle)
+    except Exception as e:
+        print(f"[WARNING] Error al cargar clasificador ML: {e}")
+        print("[INFO] Usando clasificador basado en keywords como fallback")
+        bundle = None
+        featurizer = None
+        classifier = KeywordClassificationStage()
+
+    return DocumentPipeline(
+        extractor=TextExtractionStage(cache),
+        normalizer=NormalizationStage(),
+        featurizer=featurizer,
+        classifier=classifier,
+        postprocessor=PostprocessStage(categories, thresholds),
+        cache=cache,
+        logger=logger,
+        bundle=bundle,
+    )
+
+
+# Instancia global del pipeline (se carga una sola vez por proceso)
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+# Caché de extracción del proceso: la comparten el pipeline y el indexador de
+# búsqueda, así que un documento clasificado al subirlo no se extrae dos veces
+_extraction_cache = ExtractionCache()
+
+
+def get_extraction_cache() -> ExtractionCache:
+    """Caché de texto extraído compartida por el proceso."""
+    return _extraction_cache
+
+
+def get_pipeline() -> DocumentPipeline:
+    """
+    Obtiene la instancia global del pipeline (singleton).
+
+    Returns:
+        Instancia de DocumentPipeline
+    """
+    global _pipeline
+    if _pipeline is None:
+        with _pipeline_lock:
+            if _pipeline is None:
+                _pipeline = build_pipeline(cache=get_extraction_cache())
+    return _pipeline
+
+
+def warm_up(ocr: bool = False) -> Dict:
+    """
+    Carga los componentes de IA antes de la primera petición: modelo,
+    extractores de texto y, opcionalmente, las dependencias del OCR.
+    Sin llamarla, cada componente se carga en su primer uso.
+
+    Args:
+        ocr: Importar también cv2, pytesseract y pdf2image
+
+    Returns:
+        Dict con los segundos que ha tardado cada componente
+    """
+    timings = {}
+
+    start = time.perf_counter()
+    get_pipeline()
+    timings["pipeline"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    importlib.import_module("ai_directia.extractors.unified_extractor")
+    timings["extractors"] = time.perf_counter() - start
+
+    if ocr:
+        from src.ia.ocr.ocr import load_backends
+
+        start = time.perf_counter()
+        load_backends()
+        timings["ocr"] = time.perf_counter() - start
+
+    print("[OK] IA precargada: " + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in timings.items()))
+    return timings
 
 
 def analizar_documento(file_path: str, username: str = None):
@@ -35,62 +725,20 @@ def analizar_documento(file_path: str, username: str = None):
     Returns:
         Dict con tipo_documento, confianza y carpeta_sugerida
     """
-    start_time = time.time()
+    pipeline = get_pipeline()
 
     if not os.path.exists(file_path):
-        logger.log_error(file_path, "Archivo no encontrado", username, "file_not_found")
+        pipeline.logger.log_error(file_path, "Archivo no encontrado", username, "file_not_found")
         return {"error": "Archivo no encontrado"}
 
     try:
-        # Extraer texto (soporta PDF, DOCX, TXT, imágenes)
-        raw_text = extract_text(file_path)
-
-        # Limpieza de texto
-        text = clean_text(raw_text)
-
-        if not text.strip():
-            result = {
-                "tipo_documento": "desconocido",
-                "confianza": 0.0,
-                "carpeta_sugerida": "/Documentos/Otros"
-            }
-
-            # Log empty document
-            logger.log_prediction(
-                file_path=file_path,
-                predicted_type="desconocido",
-                confidence=0.0,
-                username=username,
-                suggested_folder=result["carpeta_sugerida"],
-                text_preview="[documento vacío]",
-                processing_time=time.time() - start_time,
-                classifier_type=classifier_type
-            )
-
-            return result
-
-        # Clasificar con username para generar carpeta personalizada
-        resultado = classifier.classify_text(text, username=username)
-
-        # Log successful prediction
-        processing_time = time.time() - start_time
-        logger.log_prediction(
-            file_path=file_path,
-            predicted_type=resultado.get("tipo_documento", "unknown"),
-            confidence=resultado.get("confianza", 0.0),
-            username=username,
-            suggested_folder=resultado.get("carpeta_sugerida"),
-            text_preview=text,
-            processing_time=processing_time,
-            classifier_type=classifier_type
-        )
-
-        print(f"[INFO] Documento clasificado: {resultado['tipo_documento']} "
-              f"(confianza: {resultado['confianza']:.2f}, tiempo: {processing_time:.2f}s)")
-
-        return resultado
-
+        resultado = pipeline.classify_file(file_path, username=username)
     except Exception as e:
-        # Log error
-        logger.log_error(file_path, str(e), username, "classification_error")
         return {"error": f"Error en pipeline: {str(e)}"}
+
+    carpeta = resultado["carpeta_sugerida"].rstrip("/")
+    return {
+        "tipo_documento": resultado["category_id"],
+        "confianza": resultado["confianza"],
+        "carpeta_sugerida": f"/{username}{carpeta}" if username else carpeta,
+    }
@@ -7,7 +7,11 @@ import os
 import json
 import pandas as pd
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
+
+from ai_directia.preprocessing.dataset_cache import PREPROCESSED_COLUMN, build_split, load_split
+from src.ia.document_store import get_document_store
+from src.ia.log_store import PREDICTIONS_DIR, PartitionedLog, get_feedback_log
 
 
 class RetrainingPipeline:
@@ -15,52 +19,66 @@ class RetrainingPipeline:
     Pipeline para re-entrenar el modelo con datos de feedback.
     """
 
-    def __init__(self):
-        self.feedback_file = "logs/user_feedback.jsonl"
-        self.predictions_file = "logs/predictions.jsonl"
+    def __init__(self, feedback_log=None, predictions_log=None, documents=None):
+        """
+        Args:
+            feedback_log: Log particionado de feedback (por defecto logs/user_feedback)
+            predictions_log: Log particionado de predicciones (por defecto logs/predictions)
+            documents: DocumentStore con los textos completos
+        """
+        self.feedback_log = feedback_log or get_feedback_log()
+        self.predictions_log = predictions_log or PartitionedLog(PREDICTIONS_DIR)
+        self.documents = documents or get_document_store()
 
-    def collect_feedback_data(self, min_days: int = 30) -> pd.DataFrame:
+    def collect_feedback_data(self, min_days: int = 30, after: Optional[str] = None) -> pd.DataFrame:
         """
         Recolecta datos de feedback para re-entrenamiento.
 
         Args:
             min_days: Mínimo de días de datos requeridos
+            after: Solo feedback con timestamp posterior (ISO); sustituye a ``min_days``
 
         Returns:
             DataFrame con texto y etiquetas corregidas
         """
-        if not os.path.exists(self.feedback_file):
+        if not self.feedback_log.partitions():
             print("[WARNING] No hay archivo de feedback")
             return pd.DataFrame()
 
-        cutoff_date = datetime.now() - timedelta(days=min_days)
+        if after:
+            cutoff_date = datetime.fromisoformat(after)
+            include = lambda entry_date: entry_date > cutoff_date
+        else:
+            cutoff_date = datetime.now() - timedelta(days=min_days)
+            include = lambda entry_date: entry_date >= cutoff_date
         feedback_entries = []
 
-        with open(self.feedback_file, 'r', encoding='utf-8') as f:
-            for line in f:
-                try:
-                    entry = json.loads(line)
-                    entry_date = datetime.fromisoformat(entry.get("timestamp", ""))
+        for entry in self.feedback_log.read(since=cutoff_date):
+            try:
+                entry_date = datetime.fromisoformat(entry.get("timestamp", ""))
 
-                    if entry_date >= cutoff_date:
-                        feedback_entries.append(entry)
-                except Exception:
-                    continue
+                if include(entry_date):
+                    feedback_entries.append(entry)
+            except Exception:
+                continue
 
         if not feedback_entries:
-            print(f"[WARNING] No hay feedback en los últimos {min_days} días")
+            if after:
+                print(f"[INFO] No hay feedback posterior a {after}")
+            else:
+                print(f"[WARNING] No hay feedback en los últimos {min_days} días")
             return pd.DataFrame()
 
-        # Buscar el texto original en predictions.jsonl
+        # Texto completo de cada documento (consulta indexada por document_id)
+        texts = self._resolve_texts(feedback_entries)
         feedback_with_text = []
 
-        for feedback in feedback_entries:
-            file_path = feedback.get("file_path")
-            text_preview = self._find_text_for_file(file_path)
+        for index, feedback in enumerate(feedback_entries):
+            text = texts.get(index)
 
-            if text_preview:
+            if text:
                 feedback_with_text.append({
-                    "text": text_preview,
+                    "text": text,
                     "label": feedback.get("actual_type"),  # Etiqueta corregida
                     "original_prediction": feedback.get("predicted_type"),
                     "timestamp": feedback.get("timestamp")
@@ -75,21 +93,51 @@ class RetrainingPipeline:
 
         return df
 
-    def _find_text_for_file(self, file_path: str) -> str:
-        """Busca el texto original en el log de predicciones."""
-        if not os.path.exists(self.predictions_file):
-            return ""
-
-        with open(self.predictions_file, 'r', encoding='utf-8') as f:
-            for line in f:
-                try:
-                    entry = json.loads(line)
-                    if entry.get("file") == os.path.basename(file_path):
-                        return entry.get("text_preview", "")
-                except Exception:
-                    continue
+    def _resolve_texts(self, feedback_entries: List[Dict]) -> Dict[int, str]:
+        """
+        Texto de cada entrada de feedback (por posición).
 
-        return ""
+        1. ``document_id`` del feedback → DocumentStore.
+        2. Feedback antiguo sin id: último documento registrado con ese
+           nombre de archivo (índice del DocumentStore).
+        3. Predicciones anteriores al DocumentStore: ``text_preview`` del log,
+           en una sola pasada para todos los archivos pendientes.
+        """
+        document_ids = {}
+        pending_files = {}
+        for index, feedback in enumerate(feedback_entries):
+            if feedback.get("document_id"):
+                document_ids[index] = feedback["document_id"]
+            elif feedback.get("file_path"):
+                pending_files[index] = os.path.basename(feedback["file_path"])
+
+        by_file = self.documents.find_by_files(pending_files.values())
+        for index, file_name in list(pending_files.items()):
+            if file_name in by_file:
+                document_ids[index] = by_file[file_name]
+                del pending_files[index]
+
+        stored = self.documents.get_texts(document_ids.values())
+        texts = {index: stored[doc_id] for index, doc_id in document_ids.items() if doc_id in stored}
+
+        if pending_files:
+            previews = self._find_previews(set(pending_files.values()))
+            for index, file_name in pending_files.items():
+                if previews.get(file_name):
+                    texts[index] = previews[file_name]
+
+        return texts
+
+    def _find_previews(self, file_names) -> Dict[str, str]:
+        """Preview del log de predicciones para logs sin DocumentStore."""
+        previews = {}
+        for entry in self.predictions_log.read(columns=("file", "text_preview")):
+            file_name = entry.get("file")
+            if file_name in file_names and file_name not in previews and entry.get("text_preview"):
+                previews[file_name] = entry["text_preview"]
+                if len(previews) == len(file_names):
+                    break
+        return previews
 
     def prepare_retraining_dataset(
         self,
@@ -112,7 +160,7 @@ class RetrainingPipeline:
 
         # Cargar datos originales
         if os.path.exists(original_train_path):
-            original_df = pd.read_csv(original_train_path)
+            original_df = load_split(original_train_path, columns=("text", "label"))
             print(f"[INFO] Cargados {len(original_df)} ejemplos originales")
         else:
             print("[WARNING] No se encontró dataset original")
@@ -234,6 +282,88 @@ class RetrainingPipeline:
             "test_size": len(test_df)
         }
 
+    def incremental_update(self, model_dir=None, feedback_weight: float = 5.0,
+                           trainer=None) -> Dict:
+        """
+        Incorpora al modelo incremental el feedback posterior a su último
+        checkpoint (``partial_fit``, sin recorrer el dataset original).
+
+        Args:
+            model_dir: Directorio del modelo incremental (por defecto src/ia/models/incremental)
+            feedback_weight: Peso de cada corrección frente a un paso normal del SGD
+            trainer: IncrementalTrainer ya cargado (se reutiliza el modelo en memoria)
+
+        Returns:
+            Dict con ejemplos incorporados, milisegundos de la actualización y marca de feedback
+        """
+        from src.ia.training.incremental import INCREMENTAL_MODEL_DIR, IncrementalTrainer
+
+        if trainer is None:
+            trainer = IncrementalTrainer(model_dir or INCREMENTAL_MODEL_DIR)
+        if not trainer.has_checkpoint():
+            return {"error": "No hay modelo incremental; ejecuta primero el reajuste completo"}
+
+        feedback_df = self.collect_feedback_data(after=trainer.watermark or datetime.min.isoformat())
+        if feedback_df.empty:
+            return {"samples": 0, "feedback_watermark": trainer.watermark}
+
+        result = trainer.update(
+            feedback_df["text"].tolist(),
+            feedback_df["label"].tolist(),
+            sample_weight=[feedback_weight] * len(feedback_df),
+            watermark=feedback_df["timestamp"].max(),
+        )
+        if not result["checkpointed"]:
+            trainer.checkpoint()
+        result["feedback_watermark"] = trainer.watermark
+        print(f"[INFO] Modelo incremental actualizado con {result['samples']} ejemplos "
+              f"en {result['update_ms']:.1f} ms")
+        return result
+
+    def incremental_refit(self, model_dir=None, epochs: int = 5,
+                          original_train_path: str = "src/ia/datasets/processed/train.csv",
+                          val_path: str = "src/ia/datasets/processed/val.csv") -> Dict:
+        """
+        Reajuste completo del modelo incremental (dataset original + todo el
+        feedback) para corregir la deriva de las actualizaciones parciales.
+
+        Returns:
+            Dict con ejemplos, segundos de entrenamiento, métricas de validación y ruta
+        """
+        from src.ia.training.incremental import INCREMENTAL_MODEL_DIR, IncrementalTrainer
+
+        # El dataset original sale de la caché con el texto ya preprocesado
+        columns = ("text", "label", PREPROCESSED_COLUMN)
+        frames = []
+        if os.path.exists(original_train_path):
+            frames.append(load_split(original_train_path, columns=columns))
+        feedback_df = self.collect_feedback_data(after=datetime.min.isoformat())
+        if not feedback_df.empty:
+            frames.append(build_split(feedback_df[["text", "label"]]))
+        if not frames:
+            return {"error": "No hay datos para entrenar el modelo incremental"}
+        train_df = pd.concat(frames, ignore_index=True)
+
+        if os.path.exists(val_path):
+            val_df = load_split(val_path, columns=columns)
+        else:
+            val_df = pd.DataFrame(columns=list(columns))
+
+        trainer = IncrementalTrainer(model_dir or INCREMENTAL_MODEL_DIR)
+        result = trainer.full_refit(
+            train_df[PREPROCESSED_COLUMN].tolist(),
+            train_df["label"].tolist(),
+            epochs=epochs,
+            val_texts=val_df[PREPROCESSED_COLUMN].tolist(),
+            val_labels=val_df["label"].tolist(),
+            preprocessed=True,
+            watermark=feedback_df["timestamp"].max() if not feedback_df.empty else None,
+        )
+        result["model_path"] = str(trainer.model_dir)
+        print(f"[SUCCESS] Modelo incremental reentrenado con {result['samples']} ejemplos "
+              f"en {result['train_seconds']:.1f} s")
+        return result
+
     def auto_retrain_if_needed(
         self,
         min_feedback_count: int = 50,
@@ -250,21 +380,16 @@ class RetrainingPipeline:
             True si se debe re-entrenar
         """
         # Contar feedback
-        if not os.path.exists(self.feedback_file):
+        if not self.feedback_log.partitions():
             return False
 
         feedback_count = 0
         correct_count = 0
 
-        with open(self.feedback_file, 'r', encoding='utf-8') as f:
-            for line in f:
-                try:
-                    entry = json.loads(line)
-                    feedback_count += 1
-                    if entry.get("was_correct"):
-                        correct_count += 1
-                except Exception:
-                    continue
+        for entry in self.feedback_log.read(columns=("was_correct",)):
+            feedback_count += 1
+            if entry.get("was_correct"):
+                correct_count += 1
 
         if feedback_count < min_feedback_count:
             print(f"[INFO] Solo {feedback_count}/{min_feedback_count} feedback. No re-entrenar aún.")
@@ -0,0 +1,295 @@
+"""
+Agregados diarios de predicciones y feedback.
+
+Cada lote escrito en los logs actualiza una tabla SQLite con una fila por
+(día, métrica, clave): número de eventos y suma de confianzas. Las
+estadísticas de cualquier rango de días se obtienen sumando esas filas, sin
+recorrer el histórico de logs.
+
+Métricas:
+    predictions          total de predicciones ('' ) y suma de confianza
+    by_type              predicciones por tipo
+    by_confidence        predicciones por nivel (low / medium / high)
+    errors               errores de procesamiento
+    with_feedback        predicciones con corrección del usuario
+    feedback             feedback recibido ('correct' / 'incorrect')
+    feedback_by_type     feedback por tipo real
+    corrections          pares 'predicho -> real' incorrectos
+
+Uso (reconstruir los agregados desde los logs particionados):
+    python -m src.ia.rollups backfill
+    python -m src.ia.rollups backfill --since 2026-10-01
+"""
+
+import argparse
+import sqlite3
+import threading
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from src.ia.log_store import FEEDBACK_DIR, PREDICTIONS_DIR, PartitionedLog
+
+
+DEFAULT_DB_PATH = "logs/rollups.sqlite3"
+
+# Umbrales de los niveles de confianza de las estadísticas
+LOW_CONFIDENCE = 0.6
+HIGH_CONFIDENCE = 0.8
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollups (
+    day TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    key TEXT NOT NULL DEFAULT '',
+    count INTEGER NOT NULL DEFAULT 0,
+    total REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, metric, key)
+)
+"""
+
+_UPSERT = """
+INSERT INTO rollups (day, metric, key, count, total) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (day, metric, key) DO UPDATE SET
+    count = count + excluded.count,
+    total = total + excluded.total
+"""
+
+
+def _confidence_level(confidence: float) -> str:
+    if confidence < LOW_CONFIDENCE:
+        return "low"
+    elif confidence < HIGH_CONFIDENCE:
+        return "medium"
+    return "high"
+
+
+def _day(entry: Dict) -> str:
+    return entry.get("date") or str(entry.get("timestamp", ""))[:10]
+
+
+def prediction_increments(entries: Iterable[Dict]) -> Dict[Tuple[str, str, str], list]:
+    """
+    Incrementos de agregados de un lote de entradas del log de predicciones.
+
+    Returns:
+        Dict (día, métrica, clave) -> [count, total]
+    """
+    increments = defaultdict(lambda: [0, 0.0])
+    for entry in entries:
+        day = _day(entry)
+        if entry.get("type") == "error":
+            increments[(day, "errors", "")][0] += 1
+            continue
+
+        confidence = entry.get("confidence") or 0
+        total = increments[(day, "predictions", "")]
+        total[0] += 1
+        total[1] += confidence
+        increments[(day, "by_type", entry.get("predicted") or "unknown")][0] += 1
+        increments[(day, "by_confidence", _confidence_level(confidence))][0] += 1
+        if entry.get("user_feedback"):
+            increments[(day, "with_feedback", "")][0] += 1
+    return increments
+
+
+def feedback_increments(entries: Iterable[Dict]) -> Dict[Tuple[str, str, str], list]:
+    """Incrementos de agregados de un lote de entradas de feedback."""
+    increments = defaultdict(lambda: [0, 0.0])
+    for entry in entries:
+        day = _day(entry)
+        predicted = entry.get("predicted_type")
+        actual = entry.get("actual_type")
+        if entry.get("was_correct"):
+            increments[(day, "feedback", "correct")][0] += 1
+        else:
+            increments[(day, "feedback", "incorrect")][0] += 1
+            increments[(day, "corrections", f"{predicted} -> {actual}")][0] += 1
+        increments[(day, "feedback_by_type", str(actual))][0] += 1
+    return increments
+
+
+class RollupStore:
+    """Tabla de agregados diarios en SQLite (compartida por todos los workers)."""
+
+    def __init__(self, db_path=DEFAULT_DB_PATH):
+        self.db_path = str(db_path)
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # Una conexión por operación: el hilo escritor del logger y las
+        # peticiones no comparten conexiones
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def _apply(self, increments: Dict, replace_days: Optional[Iterable[str]] = None,
+               metrics: Tuple[str, ...] = ()) -> None:
+        conn = self._connect()
+        try:
+            with conn:
+                for day in replace_days or ():
+                    conn.execute(
+                        f"DELETE FROM rollups WHERE day = ? AND metric IN ({','.join('?' * len(metrics))})",
+                        (day, *metrics),
+                    )
+                conn.executemany(
+                    _UPSERT,
+                    [(day, metric, key, count, total) for (day, metric, key), (count, total) in increments.items()],
+                )
+        finally:
+            conn.close()
+
+    def record_predictions(self, entries: Iterable[Dict]) -> None:
+        """Suma un lote de entradas del log de predicciones."""
+        increments = prediction_increments(entries)
+        if increments:
+            self._apply(increments)
+
+    def record_feedback(self, entries: Iterable[Dict]) -> None:
+        """Suma un lote de entradas de feedback."""
+        increments = feedback_increments(entries)
+        if increments:
+            self._apply(increments)
+
+    def totals(self, since=None, until=None) -> Dict[Tuple[str, str], Tuple[int, float]]:
+        """
+        Suma de los agregados de los días [since, until].
+
+        Returns:
+            Dict (métrica, clave) -> (count, total)
+        """
+        query = "SELECT metric, key, SUM(count), SUM(total) FROM rollups WHERE 1 = 1"
+        params = []
+        if since is not None:
+            query += " AND day >= ?"
+            params.append(_iso_day(since))
+        if until is not None:
+            query += " AND day <= ?"
+            params.append(_iso_day(until))
+        query += " GROUP BY metric, key"
+
+        conn = self._connect()
+        try:
+            rows = conn.execute(query, params).fetchall()
+        finally:
+            conn.close()
+        return {(metric, key): (count, total) for metric, key, count, total in rows}
+
+    def prediction_stats(self, since=None, until=None) -> Dict:
+        """Estadísticas de predicciones (mismo formato que ``PredictionLogger.get_stats``)."""
+        totals = self.totals(since, until)
+        count, confidence_sum = totals.get(("predictions", ""), (0, 0.0))
+        return {
+            "total_predictions": count,
+            "by_type": _keys(totals, "by_type"),
+            "by_confidence": {
+                level: totals.get(("by_confidence", level), (0, 0.0))[0]
+                for level in ("low", "medium", "high")
+            },
+            "avg_confidence": round(confidence_sum / count, 4) if count else 0.0,
+            "errors": totals.get(("errors", ""), (0, 0.0))[0],
+            "with_feedback": totals.get(("with_feedback", ""), (0, 0.0))[0],
+        }
+
+    def feedback_stats(self, since=None, until=None) -> Dict:
+        """Estadísticas de feedback (formato de ``/api/feedback/stats``)."""
+        totals = self.totals(since, until)
+        correct = totals.get(("feedback", "correct"), (0, 0.0))[0]
+        incorrect = totals.get(("feedback", "incorrect"), (0, 0.0))[0]
+        total = correct + incorrect
+        return {
+            "total_feedback": total,
+            "correct_predictions": correct,
+            "incorrect_predictions": incorrect,
+            "accuracy": round(correct / total, 4) if total else 0.0,
+            "corrections_by_type": _keys(totals, "corrections"),
+            "by_type": _keys(totals, "feedback_by_type"),
+        }
+
+    def backfill(self, predictions: PartitionedLog, feedback: Optional[PartitionedLog] = None,
+                 since=None, until=None) -> int:
+        """
+        Reconstruye los agregados de los días con logs en [since, until].
+        Los días se reemplazan (no se suman), así que se puede repetir.
+
+        Returns:
+            Número de días reconstruidos
+        """
+        days = set()
+        sources = [
+            (predictions, prediction_increments, ("predictions", "by_type", "by_confidence", "errors", "with_feedback")),
+        ]
+        if feedback is not None:
+            sources.append((feedback, feedback_increments, ("feedback", "feedback_by_type", "corrections")))
+
+        for log, build, metrics in sources:
+            for path in log.partitions(since, until):
+                day = path.name[:10]
+                increments = build(log.read(since=day, until=day))
+                self._apply(increments, replace_days=[day], metrics=metrics)
+                days.add(day)
+        return len(days)
+
+
+def _iso_day(value) -> str:
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)[:10]
+
+
+def _keys(totals: Dict, metric: str) -> Dict[str, int]:
+    return {key: count for (name, key), (count, _) in totals.items() if name == metric}
+
+
+def days_since(days: int) -> date:
+    """Primer día del rango de los últimos N días (``now - days``, como los lectores de logs)."""
+    return (datetime.now() - timedelta(days=days)).date()
+
+
+_rollups = {}
+_lock = threading.Lock()
+
+
+def get_rollups(db_path=DEFAULT_DB_PATH) -> RollupStore:
+    """Instancia compartida por ruta de base de datos."""
+    key = str(db_path)
+    store = _rollups.get(key)
+    if store is None:
+        with _lock:
+            store = _rollups.get(key)
+            if store is None:
+                store = RollupStore(db_path)
+                _rollups[key] = store
+    return store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Agregados diarios de predicciones y feedback")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    backfill = subparsers.add_parser("backfill", help="Reconstruir agregados desde los logs")
+    backfill.add_argument("--since", help="Primer día (YYYY-MM-DD)")
+    backfill.add_argument("--until", help="Último día (YYYY-MM-DD)")
+    backfill.add_argument("--db", default=DEFAULT_DB_PATH)
+    backfill.add_argument("--predictions-dir", default=PREDICTIONS_DIR)
+    backfill.add_argument("--feedback-dir", default=FEEDBACK_DIR)
+
+    args = parser.parse_args()
+
+    store = RollupStore(args.db)
+    days = store.backfill(
+        PartitionedLog(args.predictions_dir),
+        PartitionedLog(args.feedback_dir),
+        since=args.since,
+        until=args.until,
+    )
+    print(f"[INFO] Agregados reconstruidos para {days} días en {args.db}")
+
+
+if __name__ == "__main__":
+    main()
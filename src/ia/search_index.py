@@ -0,0 +1,473 @@
+"""
+Búsqueda de texto completo sobre el contenido de los documentos subidos.
+
+El texto extraído de cada archivo se guarda normalizado en un índice
+invertido local (SQLite FTS5, ``logs/search.sqlite3``) y se ordena por BM25.
+Cada archivo es una fila identificada por su carpeta y su nombre. La carpeta
+se guarda con la forma canónica ``/a/b/``, de modo que un filtro por carpeta
+es un rango sobre un índice (prefijo) y no un escaneo.
+
+El indexado no ocurre en la petición de subida: ``SearchIndexer`` encola el
+archivo y un hilo en segundo plano (``src.ia.buffered_writer``, como el log
+de predicciones) extrae el texto con la etapa de extracción del pipeline y su
+caché compartida. Un documento clasificado al subirlo no se vuelve a
+extraer. Borrados y movimientos pasan por la misma cola para que se apliquen
+en orden respecto a los indexados pendientes.
+"""
+
+import atexit
+import html
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.ia.document_store import DocumentStore
+from src.ia.buffered_writer import BufferedWriter
+from src.ia.pipeline import DocumentContext, PipelineError, TextExtractionStage, get_extraction_cache
+from src.utils import metrics as prom
+
+
+DEFAULT_DB_PATH = "logs/search.sqlite3"
+
+# Formatos de los que se extrae texto; del resto solo se indexa el nombre
+TEXT_EXTENSIONS = frozenset({"pdf", "docx", "doc", "txt", "text", "png", "jpg", "jpeg", "tiff", "bmp", "gif"})
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+# Tokens de contexto de cada fragmento resaltado
+SNIPPET_TOKENS = 16
+# Términos de búsqueda como máximo (el resto se ignora)
+MAX_TERMS = 16
+
+_TERM_RE = re.compile(r"\w+")
+# Marcadores de resaltado de FTS5: se sustituyen por <mark> tras escapar el HTML
+_HIGHLIGHT_START = "\x02"
+_HIGHLIGHT_END = "\x03"
+_FOLDER_END = "\U0010ffff"
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS search_files (
+        id INTEGER PRIMARY KEY,
+        folder TEXT NOT NULL,
+        filename TEXT NOT NULL,
+        file_id TEXT,
+        document_id TEXT,
+        tipo TEXT,
+        category_id TEXT,
+        user TEXT,
+        indexed_at TEXT NOT NULL,
+        UNIQUE (folder, filename)
+    )
+    """,
+    # Texto normalizado por archivo; rowid = search_files.id
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS search_text USING fts5(
+        filename, text, tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+)
+
+
+def folder_key(folder: Optional[str]) -> str:
+    """Forma canónica de una carpeta: ``a/b``, ``/a/b`` y ``/a/b/`` son ``/a/b/``."""
+    parts = [part for part in (folder or "").replace("\\", "/").split("/") if part and part != "."]
+    return "/" + "".join(f"{part}/" for part in parts)
+
+
+def split_path(path: str) -> Tuple[str, str]:
+    """Ruta relativa al almacenamiento -> (carpeta canónica, nombre)."""
+    path = path.replace("\\", "/").strip("/")
+    folder, _, filename = path.rpartition("/")
+    return folder_key(folder), filename
+
+
+def match_query(q: str) -> Optional[str]:
+    """
+    Convierte el texto del usuario en una consulta FTS5 segura: cada término
+    entre comillas (sin operadores) y todos obligatorios.
+
+    Returns:
+        Consulta MATCH o None si no hay términos
+    """
+    terms = _TERM_RE.findall((q or "").lower())[:MAX_TERMS]
+    if not terms:
+        return None
+    return " ".join(f'"{term}"' for term in terms)
+
+
+def _highlight(snippet: str) -> str:
+    escaped = html.escape(snippet or "")
+    return escaped.replace(_HIGHLIGHT_START, "<mark>").replace(_HIGHLIGHT_END, "</mark>")
+
+
+class SearchIndex:
+    """Índice invertido (FTS5 + BM25) del texto de los archivos."""
+
+    def __init__(self, db_path=DEFAULT_DB_PATH):
+        self.db_path = str(db_path)
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                for statement in _SCHEMA:
+                    conn.execute(statement)
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    @staticmethod
+    def _delete(conn: sqlite3.Connection, where: str, params: Tuple) -> int:
+        conn.execute(f"DELETE FROM search_text WHERE rowid IN (SELECT id FROM search_files WHERE {where})", params)
+        return conn.execute(f"DELETE FROM search_files WHERE {where}", params).rowcount
+
+    def index_many(self, documents: Iterable[Dict]) -> int:
+        """
+        Indexa (o reindexa) archivos en una sola transacción.
+
+        Args:
+            documents: Dicts con folder, filename y text; opcionalmente
+                file_id, document_id, tipo, category_id y user
+
+        Returns:
+            Número de archivos indexados
+        """
+        documents = list(documents)
+        if not documents:
+            return 0
+
+        now = datetime.now().isoformat()
+        conn = self._connect()
+        try:
+            with conn:
+                for doc in documents:
+                    folder = folder_key(doc["folder"])
+                    self._delete(conn, "folder = ? AND filename = ?", (folder, doc["filename"]))
+                    cursor = conn.execute(
+                        "INSERT INTO search_files (folder, filename, file_id, document_id, tipo, category_id, "
+                        "user, indexed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (folder, doc["filename"], doc.get("file_id"), doc.get("document_id"), doc.get("tipo"),
+                         doc.get("category_id"), doc.get("user"), now),
+                    )
+                    conn.execute(
+                        "INSERT INTO search_text (rowid, filename, text) VALUES (?, ?, ?)",
+                        (cursor.lastrowid, doc["filename"], DocumentStore.normalize(doc.get("text"))),
+                    )
+        finally:
+            conn.close()
+        return len(documents)
+
+    def remove(self, path: str) -> int:
+        """
+        Quita del índice un archivo o una carpeta con todo su contenido.
+
+        Args:
+            path: Ruta relativa al almacenamiento
+
+        Returns:
+            Número de archivos quitados
+        """
+        folder, filename = split_path(path)
+        prefix = folder_key(path)
+        conn = self._connect()
+        try:
+            with conn:
+                removed = self._delete(conn, "folder = ? AND filename = ?", (folder, filename))
+                removed += self._delete(conn, "folder >= ? AND folder < ?", (prefix, prefix + _FOLDER_END))
+        finally:
+            conn.close()
+        return removed
+
+    def move(self, source: str, target: str) -> int:
+        """
+        Actualiza el índice tras mover un archivo o una carpeta.
+
+        Args:
+            source: Ruta relativa de origen
+            target: Ruta relativa de destino (la ruta final, no la carpeta)
+
+        Returns:
+            Número de archivos actualizados
+        """
+        old_folder, old_name = split_path(source)
+        new_folder, new_name = split_path(target)
+        old_prefix, new_prefix = folder_key(source), folder_key(target)
+        conn = self._connect()
+        try:
+            with conn:
+                self._delete(conn, "folder = ? AND filename = ?", (new_folder, new_name))
+                moved = conn.execute(
+                    "UPDATE search_files SET folder = ?, filename = ? WHERE folder = ? AND filename = ?",
+                    (new_folder, new_name, old_folder, old_name),
+                ).rowcount
+                if moved:
+                    conn.execute(
+                        "UPDATE search_text SET filename = ? WHERE rowid IN "
+                        "(SELECT id FROM search_files WHERE folder = ? AND filename = ?)",
+                        (new_name, new_folder, new_name),
+                    )
+                moved += conn.execute(
+                    "UPDATE search_files SET folder = ? || substr(folder, ?) WHERE folder >= ? AND folder < ?",
+                    (new_prefix, len(old_prefix) + 1, old_prefix, old_prefix + _FOLDER_END),
+                ).rowcount
+        finally:
+            conn.close()
+        return moved
+
+    def search(self, q: str, folder: Optional[str] = None, tipo: Optional[str] = None,
+               limit: int = DEFAULT_LIMIT, offset: int = 0) -> Dict:
+        """
+        Busca archivos por su contenido, ordenados por relevancia (BM25).
+
+        Args:
+            q: Texto a buscar (todos los términos deben aparecer; sin
+                distinguir mayúsculas ni acentos)
+            folder: Solo archivos bajo esta carpeta (incluidas subcarpetas)
+            tipo: Solo archivos con este tipo o category_id de clasificación
+            limit: Resultados por página
+            offset: Resultados a saltar
+
+        Returns:
+            Dict con results (ruta, tipo, score y fragmento resaltado) y total
+        """
+        query = match_query(q)
+        if query is None:
+            return {"results": [], "total": 0}
+
+        where = ["search_text MATCH ?"]
+        params = [query]
+        if folder and folder_key(folder) != "/":
+            prefix = folder_key(folder)
+            where.append("f.folder >= ? AND f.folder < ?")
+            params += [prefix, prefix + _FOLDER_END]
+        if tipo:
+            where.append("(f.tipo = ? COLLATE NOCASE OR f.category_id = ? COLLATE NOCASE)")
+            params += [tipo, tipo]
+        from_where = "FROM search_text JOIN search_files f ON f.id = search_text.rowid WHERE " + " AND ".join(where)
+
+        conn = self._connect()
+        try:
+            total = conn.execute(f"SELECT COUNT(*) {from_where}", params).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT f.file_id, f.folder, f.filename, f.tipo, f.category_id, f.user, f.indexed_at, "
+                f"snippet(search_text, 1, ?, ?, '…', ?), bm25(search_text, 2.0, 1.0) AS score "
+                f"{from_where} ORDER BY score LIMIT ? OFFSET ?",
+                [_HIGHLIGHT_START, _HIGHLIGHT_END, SNIPPET_TOKENS] + params + [limit, offset],
+            ).fetchall()
+        finally:
+            conn.close()
+
+        results = [
+            {
+                "file_id": file_id,
+                "path": folder_path + filename,
+                "folder": folder_path,
+                "filename": filename,
+                "tipo": tipo_doc,
+                "category_id": category_id,
+                "user": user,
+                "indexed_at": indexed_at,
+                "snippet": _highlight(snippet),
+                "score": round(-score, 6),
+            }
+            for file_id, folder_path, filename, tipo_doc, category_id, user, indexed_at, snippet, score in rows
+        ]
+        return {"results": results, "total": total}
+
+    def __len__(self) -> int:
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT COUNT(*) FROM search_files").fetchone()[0]
+        finally:
+            conn.close()
+
+
+class SearchIndexer:
+    """
+    Indexado en segundo plano: las peticiones encolan operaciones (indexar,
+    quitar, mover) y un hilo las aplica por lotes en el índice.
+    """
+
+    def __init__(self, index: SearchIndex, cache=None, buffered: bool = True,
+                 batch_size: int = 16, flush_interval: float = 0.5):
+        """
+        Args:
+            index: Índice donde escribir
+            cache: Caché de extracción (por defecto la compartida con el pipeline)
+            buffered: Indexar en segundo plano (False: al momento, para pruebas)
+            batch_size: Operaciones por lote como máximo
+            flush_interval: Segundos máximos que una operación espera en la cola
+        """
+        self.index = index
+        self.extractor = TextExtractionStage(cache if cache is not None else get_extraction_cache())
+
+        self._writer = None
+        if buffered:
+            self._writer = BufferedWriter(self._apply_batch, batch_size, flush_interval,
+                                          fsync_policy="never", name="search-indexer")
+            prom.register_queue("search_index", self._writer.qsize)
+            atexit.register(self.close)
+
+    def _extract(self, entry: Dict) -> Optional[Dict]:
+        """Texto del archivo de una operación de indexado (None si ya no existe)."""
+        document = {key: entry.get(key) for key in ("folder", "filename", "file_id", "tipo", "category_id", "user")}
+        extension = os.path.splitext(entry["filename"])[1].lower().lstrip(".")
+        if extension not in TEXT_EXTENSIONS:
+            document["text"] = ""
+            return document
+
+        try:
+            with open(entry["file_path"], "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+
+        ctx = DocumentContext(data=data, extension=extension, file_name=entry["filename"])
+        try:
+            self.extractor.run(ctx)
+        except PipelineError as e:
+            print(f"[WARNING] No se pudo extraer el texto de {entry['filename']} para el índice: {e}")
+        document["document_id"] = ctx.document_id
+        document["text"] = ctx.raw_text
+        return document
+
+    def _index_documents(self, documents: List[Dict]) -> None:
+        """Indexa en una transacción; si falla, uno a uno para no perder el resto."""
+        try:
+            self.index.index_many(documents)
+            return
+        except Exception as e:
+            if len(documents) == 1:
+                print(f"[WARNING] No se pudo indexar {documents[0]['filename']}: {e}")
+                return
+        for document in documents:
+            try:
+                self.index.index_many([document])
+            except Exception as e:
+                print(f"[WARNING] No se pudo indexar {document['filename']}: {e}")
+
+    def _apply_batch(self, entries: List[Dict], fsync: bool = False) -> None:
+        """
+        Aplica las operaciones en orden; los indexados seguidos van en una
+        transacción. Un error en una operación se registra y no impide
+        aplicar las demás del lote.
+        """
+        pending = []
+        for entry in entries:
+            try:
+                if entry["op"] == "index":
+                    document = self._extract(entry)
+                    if document is not None:
+                        pending.append(document)
+                    continue
+                self._index_documents(pending)
+                pending = []
+                if entry["op"] == "remove":
+                    self.index.remove(entry["path"])
+                else:
+                    self.index.move(entry["source"], entry["target"])
+            except Exception as e:
+                print(f"[WARNING] Error al actualizar el índice de búsqueda ({entry['op']}): {e}")
+        self._index_documents(pending)
+
+    def _submit(self, entry: Dict) -> None:
+        if self._writer is not None:
+            self._writer.put(entry)
+            return
+        try:
+            self._apply_batch([entry])
+        except Exception as e:
+            print(f"[WARNING] Error al actualizar el índice de búsqueda: {e}")
+
+    def submit(self, file_path: str, folder: str, filename: str, file_id: Optional[str] = None,
+               tipo: Optional[str] = None, category_id: Optional[str] = None, user: Optional[str] = None) -> None:
+        """
+        Encola un archivo para indexar su contenido.
+
+        Args:
+            file_path: Ruta del archivo en disco
+            folder: Carpeta relativa al almacenamiento (``relative_path`` de la metadata)
+            filename: Nombre del archivo
+            file_id: file_id de la metadata
+            tipo: Tipo de documento clasificado (si se clasificó)
+            category_id: Id de la categoría clasificada
+            user: Usuario que subió el archivo
+        """
+        self._submit({"op": "index", "file_path": file_path, "folder": folder, "filename": filename,
+                      "file_id": file_id, "tipo": tipo, "category_id": category_id, "user": user})
+
+    def remove(self, path: str) -> None:
+        """Encola la baja de un archivo o carpeta (ruta relativa al almacenamiento)."""
+        self._submit({"op": "remove", "path": path})
+
+    def move(self, source: str, target: str) -> None:
+        """Encola el movimiento de un archivo o carpeta (rutas relativas)."""
+        self._submit({"op": "move", "source": source, "target": target})
+
+    def flush(self, timeout: Optional[float] = 5.0) -> bool:
+        """Espera a que las operaciones encoladas estén aplicadas."""
+        if self._writer is None:
+            return True
+        return self._writer.flush(timeout)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+
+
+_indexes = {}
+_indexers = {}
+_lock = threading.Lock()
+
+
+def get_search_index(db_path=DEFAULT_DB_PATH) -> SearchIndex:
+    """Instancia compartida por ruta de base de datos."""
+    key = str(db_path)
+    index = _indexes.get(key)
+    if index is None:
+        with _lock:
+            index = _indexes.get(key)
+            if index is None:
+                index = SearchIndex(db_path)
+                _indexes[key] = index
+    return index
+
+
+def get_indexer(db_path=DEFAULT_DB_PATH) -> SearchIndexer:
+    """Indexador en segundo plano compartido por ruta de base de datos."""
+    key = str(db_path)
+    indexer = _indexers.get(key)
+    if indexer is None:
+        index = get_search_index(db_path)
+        with _lock:
+            indexer = _indexers.get(key)
+            if indexer is None:
+                indexer = SearchIndexer(index)
+                _indexers[key] = indexer
+    return indexer
+
+
+def close_indexer(db_path=DEFAULT_DB_PATH, timeout: Optional[float] = 5.0) -> bool:
+    """
+    Aplica lo pendiente del indexador de ``db_path`` y lo cierra (antes de
+    borrar su base de datos, p. ej. al terminar una prueba).
+
+    Returns:
+        False si la cola no se vació a tiempo
+    """
+    key = str(db_path)
+    with _lock:
+        indexer = _indexers.pop(key, None)
+        _indexes.pop(key, None)
+    if indexer is None:
+        return True
+    flushed = indexer.flush(timeout)
+    indexer.close()
+    return flushed
@@ -0,0 +1,159 @@
+"""
+Instrumentación por etapas del pipeline de clasificación.
+
+Cada etapa se mide con un span (``Trace.span``) que guarda nombre, duración,
+bytes de entrada y salida, páginas y si hubo acierto de caché. Los spans de
+cada documento se adjuntan al log de predicciones y se agregan en
+histogramas por etapa (``StageHistograms``).
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional
+
+
+# Límites superiores de los buckets en milisegundos
+DEFAULT_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+@dataclass
+class Span:
+    """Medición de una etapa para un documento."""
+
+    stage: str
+    duration_ms: float = 0.0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    pages: Optional[int] = None
+    cache_hit: Optional[bool] = None
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        data["duration_ms"] = round(self.duration_ms, 3)
+        return {key: value for key, value in data.items() if value is not None}
+
+
+class Trace:
+    """Spans de un documento, en el orden en que se ejecutaron."""
+
+    def __init__(self):
+        self.spans: List[Span] = []
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def span(self, stage: str, bytes_in: int = 0):
+        """
+        Mide el bloque ``with`` como una etapa.
+        El span se registra aunque la etapa lance una excepción.
+
+        Args:
+            stage: Nombre de la etapa
+            bytes_in: Tamaño de la entrada de la etapa
+
+        Yields:
+            Span a completar con bytes_out, pages y cache_hit
+        """
+        span = Span(stage=stage, bytes_in=bytes_in)
+        start = time.perf_counter()
+        try:
+            yield span
+        finally:
+            span.duration_ms = (time.perf_counter() - start) * 1000
+            self.spans.append(span)
+
+    @property
+    def total_ms(self) -> float:
+        return (time.perf_counter() - self._start) * 1000
+
+    def to_list(self) -> List[Dict]:
+        return [span.to_dict() for span in self.spans]
+
+
+def payload_size(value) -> int:
+    """
+    Tamaño aproximado en bytes de la entrada o salida de una etapa.
+
+    Args:
+        value: bytes, texto, matriz dispersa u otro objeto
+
+    Returns:
+        Número de bytes (0 si no se puede medir)
+    """
+    if value is None:
+        return 0
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    data = getattr(value, "data", None)
+    if data is not None and hasattr(data, "nbytes"):
+        return int(data.nbytes)
+    return 0
+
+
+class StageHistograms:
+    """
+    Histogramas acumulados de latencia por etapa.
+    Buckets fijos para que registrar una muestra sea O(log buckets).
+    """
+
+    def __init__(self, buckets_ms=DEFAULT_BUCKETS_MS):
+        self.buckets_ms = tuple(buckets_ms)
+        self._stages = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, duration_ms: float) -> None:
+        index = bisect_left(self.buckets_ms, duration_ms)
+        with self._lock:
+            hist = self._stages.get(stage)
+            if hist is None:
+                hist = {"counts": [0] * (len(self.buckets_ms) + 1), "count": 0, "sum_ms": 0.0}
+                self._stages[stage] = hist
+            hist["counts"][index] += 1
+            hist["count"] += 1
+            hist["sum_ms"] += duration_ms
+
+    def observe_trace(self, trace: Trace) -> None:
+        for span in trace.spans:
+            self.observe(span.stage, span.duration_ms)
+
+    def _quantile(self, counts: List[int], total: int, q: float) -> Optional[float]:
+        """
+        Cuantil aproximado: límite superior del bucket que lo contiene
+        (None si cae en el bucket de desbordamiento o no hay muestras).
+        """
+        target = q * total
+        accumulated = 0
+        for index, count in enumerate(counts):
+            accumulated += count
+            if accumulated >= target:
+                if index < len(self.buckets_ms):
+                    return float(self.buckets_ms[index])
+                return None
+        return None
+
+    def snapshot(self) -> Dict:
+        """
+        Returns:
+            Dict por etapa con count, sum_ms, avg_ms, p50_ms, p95_ms y buckets
+        """
+        with self._lock:
+            stages = {name: {"counts": list(h["counts"]), "count": h["count"], "sum_ms": h["sum_ms"]}
+                      for name, h in self._stages.items()}
+
+        result = {}
+        for name, hist in stages.items():
+            count = hist["count"]
+            labels = [str(b) for b in self.buckets_ms] + ["+Inf"]
+            result[name] = {
+                "count": count,
+                "sum_ms": round(hist["sum_ms"], 3),
+                "avg_ms": round(hist["sum_ms"] / count, 3) if count else 0.0,
+                "p50_ms": self._quantile(hist["counts"], count, 0.50),
+                "p95_ms": self._quantile(hist["counts"], count, 0.95),
+                "buckets": dict(zip(labels, hist["counts"])),
+            }
+        return result
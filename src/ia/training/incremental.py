@@ -0,0 +1,352 @@
+"""
+Entrenamiento incremental del clasificador de documentos.
+
+El modelo TF-IDF + LinearSVC se reentrena desde cero cada vez (``quick_retrain``),
+y su coste crece con el histórico completo. Este módulo mantiene un modelo
+alternativo que admite actualizaciones parciales:
+
+- ``HashingVectorizer``: sin vocabulario que ajustar; un texto nuevo se
+  vectoriza igual antes y después de cada actualización.
+- ``SGDClassifier.partial_fit``: cada lote de feedback es un paso de
+  descenso de gradiente sobre el modelo activo (milisegundos por lote).
+
+El checkpoint se guarda con el formato de ``src.ia.pipeline.ModelBundle``
+(``model.pkl``, ``vectorizer.pkl``, ``metadata.json``), así que el pipeline
+puede servirlo directamente. El reajuste completo (``full_refit``) sigue
+disponible para corregir la deriva de las actualizaciones acumuladas.
+
+Uso:
+    python -m src.ia.training.incremental refit
+    python -m src.ia.training.incremental update
+"""
+
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import joblib
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+from sklearn.metrics import accuracy_score, f1_score
+
+from ai_directia.preprocessing.text_cleaner import preprocess_batch
+
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent.parent
+INCREMENTAL_MODEL_DIR = BASE_DIR / "src" / "ia" / "models" / "incremental"
+CATEGORIES_PATH = BASE_DIR / "ai_directia" / "config" / "categories.json"
+
+MODEL_TYPE = "hashing_sgd"
+
+
+def load_classes(config_path=CATEGORIES_PATH) -> List[str]:
+    """Ids de todas las categorías (``partial_fit`` necesita conocerlas desde el inicio)."""
+    with open(config_path, "r", encoding="utf-8") as f:
+        return [category["id"] for category in json.load(f)["categories"]]
+
+
+def build_vectorizer(n_features: int = 2 ** 18, ngram_range=(1, 2)) -> HashingVectorizer:
+    """Vectorizador sin estado (mismos n-gramas que el modelo TF-IDF)."""
+    return HashingVectorizer(
+        n_features=n_features,
+        ngram_range=ngram_range,
+        alternate_sign=False,
+        norm="l2",
+    )
+
+
+def build_classifier(alpha: float = 1e-5, random_state: int = 42) -> SGDClassifier:
+    """Clasificador lineal con probabilidades (``log_loss``) para los umbrales de confianza."""
+    return SGDClassifier(
+        loss="log_loss",
+        alpha=alpha,
+        random_state=random_state,
+    )
+
+
+class IncrementalModel:
+    """
+    HashingVectorizer + SGDClassifier con actualizaciones parciales y
+    checkpoints atómicos.
+    """
+
+    def __init__(self, classes: Optional[Sequence[str]] = None, vectorizer: Optional[HashingVectorizer] = None,
+                 classifier: Optional[SGDClassifier] = None, metadata: Optional[Dict] = None):
+        """
+        Args:
+            classes: Categorías posibles (por defecto las de categories.json)
+            vectorizer: HashingVectorizer (por defecto ``build_vectorizer()``)
+            classifier: SGDClassifier (por defecto ``build_classifier()``)
+            metadata: Metadata de un checkpoint cargado
+        """
+        self.classes = list(classes) if classes is not None else load_classes()
+        self.vectorizer = vectorizer or build_vectorizer()
+        self.classifier = classifier or build_classifier()
+        self.metadata = dict(metadata or {})
+        self.samples_seen = int(self.metadata.get("samples_seen", 0))
+        self.updates = int(self.metadata.get("updates", 0))
+
+    @property
+    def is_fitted(self) -> bool:
+        return hasattr(self.classifier, "coef_")
+
+    def transform(self, texts: Sequence[str], preprocessed: bool = False):
+        """
+        Vectoriza textos con el mismo preprocesado que el pipeline de inferencia.
+
+        Args:
+            texts: Textos originales (o ya preprocesados si ``preprocessed``)
+            preprocessed: Los textos ya pasaron por ``preprocess_text``
+        """
+        if not preprocessed:
+            texts = preprocess_batch(texts)
+        return self.vectorizer.transform(texts)
+
+    def _known(self, labels: Sequence[str]) -> List[int]:
+        """Posiciones de las etiquetas que son categorías conocidas."""
+        known = set(self.classes)
+        keep = [i for i, label in enumerate(labels) if label in known]
+        if len(keep) < len(labels):
+            print(f"[WARNING] {len(labels) - len(keep)} ejemplos con categoría desconocida descartados")
+        return keep
+
+    def partial_fit(self, texts: Sequence[str], labels: Sequence[str],
+                    sample_weight: Optional[Sequence[float]] = None, preprocessed: bool = False) -> int:
+        """
+        Aplica un lote al modelo activo. Las etiquetas que no son categorías
+        conocidas se descartan.
+
+        Returns:
+            Número de ejemplos usados
+        """
+        keep = self._known(labels)
+        if not keep:
+            return 0
+
+        texts = [texts[i] for i in keep]
+        labels = [labels[i] for i in keep]
+        weights = np.asarray([sample_weight[i] for i in keep], dtype=float) if sample_weight is not None else None
+
+        self.classifier.partial_fit(self.transform(texts, preprocessed), labels,
+                                    classes=self.classes, sample_weight=weights)
+        self.samples_seen += len(keep)
+        self.updates += 1
+        return len(keep)
+
+    def fit(self, texts: Sequence[str], labels: Sequence[str], epochs: int = 5,
+            batch_size: int = 256, random_state: int = 42, preprocessed: bool = False) -> "IncrementalModel":
+        """
+        Reajuste completo: descarta los pesos y recorre el corpus ``epochs``
+        veces en minilotes barajados. Los textos se preprocesan y vectorizan
+        una sola vez.
+        """
+        keep = self._known(labels)
+        features = self.transform([texts[i] for i in keep], preprocessed)
+        labels = np.asarray([labels[i] for i in keep])
+        self.classifier = build_classifier(self.classifier.alpha, random_state)
+        self.samples_seen = 0
+        self.updates = 0
+
+        rng = np.random.default_rng(random_state)
+        for _ in range(epochs):
+            order = rng.permutation(len(labels))
+            for start in range(0, len(order), batch_size):
+                batch = order[start:start + batch_size]
+                self.classifier.partial_fit(features[batch], labels[batch], classes=self.classes)
+        self.samples_seen = len(labels)
+        self.updates = 1
+        return self
+
+    def predict(self, texts: Sequence[str], preprocessed: bool = False) -> List[str]:
+        return list(self.classifier.predict(self.transform(texts, preprocessed)))
+
+    def evaluate(self, texts: Sequence[str], labels: Sequence[str], preprocessed: bool = False) -> Dict:
+        predictions = self.predict(texts, preprocessed)
+        return {
+            "accuracy": float(accuracy_score(labels, predictions)),
+            "f1_macro": float(f1_score(labels, predictions, average="macro", zero_division=0)),
+        }
+
+    # ------------------------------------------------------------------
+    # Checkpoints
+    # ------------------------------------------------------------------
+
+    def save(self, model_dir=INCREMENTAL_MODEL_DIR, **metadata) -> Path:
+        """
+        Guarda el checkpoint con el formato de ``ModelBundle``. Cada archivo se
+        escribe en un temporal y se renombra, de modo que un proceso que lea
+        el directorio nunca ve un archivo a medias.
+
+        Args:
+            model_dir: Directorio del checkpoint
+            **metadata: Campos adicionales de metadata.json (p. ej. marca de feedback)
+        """
+        model_dir = Path(model_dir)
+        model_dir.mkdir(parents=True, exist_ok=True)
+
+        saved_at = datetime.now()
+        self.metadata.update(metadata)
+        self.metadata.update({
+            "model_type": MODEL_TYPE,
+            "version": f"{MODEL_TYPE}_{saved_at.strftime('%Y%m%d_%H%M%S')}",
+            "saved_at": saved_at.isoformat(),
+            "classes": self.classes,
+            "n_features": self.vectorizer.n_features,
+            "samples_seen": self.samples_seen,
+            "updates": self.updates,
+        })
+
+        _atomic_dump(model_dir / "vectorizer.pkl", lambda path: joblib.dump(self.vectorizer, path))
+        _atomic_dump(model_dir / "model.pkl", lambda path: joblib.dump({"model": self.classifier}, path))
+        _atomic_dump(model_dir / "metadata.json", lambda path: _write_json(path, self.metadata))
+        return model_dir
+
+    @classmethod
+    def load(cls, model_dir=INCREMENTAL_MODEL_DIR) -> "IncrementalModel":
+        model_dir = Path(model_dir)
+        with open(model_dir / "metadata.json", "r", encoding="utf-8") as f:
+            metadata = json.load(f)
+        return cls(
+            classes=metadata.get("classes"),
+            vectorizer=joblib.load(model_dir / "vectorizer.pkl"),
+            classifier=joblib.load(model_dir / "model.pkl")["model"],
+            metadata=metadata,
+        )
+
+
+def _write_json(path, data) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+def _atomic_dump(target: Path, write) -> None:
+    tmp = target.with_name(f".{target.name}.tmp")
+    write(tmp)
+    os.replace(tmp, target)
+
+
+class IncrementalTrainer:
+    """
+    Modelo incremental activo + política de checkpoints: se guarda cuando se
+    acumulan ``checkpoint_every`` ejemplos o pasan ``checkpoint_interval``
+    segundos desde el último checkpoint.
+    """
+
+    def __init__(self, model_dir=INCREMENTAL_MODEL_DIR, model: Optional[IncrementalModel] = None,
+                 checkpoint_every: int = 100, checkpoint_interval: float = 300.0):
+        """
+        Args:
+            model_dir: Directorio del checkpoint
+            model: Modelo activo (por defecto se carga el checkpoint si existe)
+            checkpoint_every: Ejemplos entre checkpoints
+            checkpoint_interval: Segundos máximos entre checkpoints
+        """
+        self.model_dir = Path(model_dir)
+        if model is None:
+            model = IncrementalModel.load(self.model_dir) if self.has_checkpoint() else IncrementalModel()
+        self.model = model
+        self.checkpoint_every = checkpoint_every
+        self.checkpoint_interval = checkpoint_interval
+        self._pending = 0
+        self._last_checkpoint = time.monotonic()
+
+    def has_checkpoint(self) -> bool:
+        return (self.model_dir / "metadata.json").exists()
+
+    @property
+    def watermark(self) -> Optional[str]:
+        """Timestamp del último feedback incorporado al checkpoint."""
+        return self.model.metadata.get("feedback_watermark")
+
+    def update(self, texts: Sequence[str], labels: Sequence[str], sample_weight: Optional[Sequence[float]] = None,
+               watermark: Optional[str] = None) -> Dict:
+        """
+        Incorpora un lote al modelo activo y guarda checkpoint si toca.
+
+        Args:
+            texts: Textos originales
+            labels: Categorías reales
+            sample_weight: Peso de cada ejemplo
+            watermark: Timestamp del feedback más reciente del lote
+
+        Returns:
+            Dict con ejemplos usados, milisegundos de la actualización y si se guardó checkpoint
+        """
+        if not self.model.is_fitted:
+            raise RuntimeError("El modelo incremental no está entrenado; ejecuta full_refit() primero")
+
+        start = time.perf_counter()
+        used = self.model.partial_fit(texts, labels, sample_weight)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        if watermark:
+            self.model.metadata["feedback_watermark"] = max(watermark, self.watermark or "")
+        self._pending += used
+
+        checkpointed = False
+        if self._pending >= self.checkpoint_every or \
+                time.monotonic() - self._last_checkpoint >= self.checkpoint_interval:
+            self.checkpoint()
+            checkpointed = True
+
+        return {"samples": used, "update_ms": round(elapsed_ms, 3), "checkpointed": checkpointed}
+
+    def checkpoint(self, **metadata) -> Path:
+        path = self.model.save(self.model_dir, **metadata)
+        self._pending = 0
+        self._last_checkpoint = time.monotonic()
+        return path
+
+    def full_refit(self, texts: Sequence[str], labels: Sequence[str], epochs: int = 5,
+                   val_texts: Optional[Sequence[str]] = None, val_labels: Optional[Sequence[str]] = None,
+                   watermark: Optional[str] = None, preprocessed: bool = False) -> Dict:
+        """
+        Reentrena desde cero sobre el corpus completo (corrección de deriva)
+        y guarda checkpoint.
+
+        Returns:
+            Dict con ejemplos, segundos de entrenamiento y métricas de validación
+        """
+        start = time.perf_counter()
+        self.model.fit(texts, labels, epochs=epochs, preprocessed=preprocessed)
+        elapsed = time.perf_counter() - start
+
+        metrics = {}
+        if val_texts is not None and val_labels is not None and len(val_labels):
+            metrics = self.model.evaluate(val_texts, val_labels, preprocessed)
+
+        self.model.metadata["feedback_watermark"] = watermark
+        self.checkpoint(refit_at=datetime.now().isoformat(), metrics=metrics)
+        return {"samples": len(labels), "train_seconds": round(elapsed, 3), "metrics": metrics}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Modelo incremental (HashingVectorizer + SGD)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    refit = subparsers.add_parser("refit", help="Reajuste completo: dataset original + todo el feedback")
+    refit.add_argument("--epochs", type=int, default=5)
+    refit.add_argument("--model-dir", default=str(INCREMENTAL_MODEL_DIR))
+
+    update = subparsers.add_parser("update", help="Incorporar el feedback posterior al último checkpoint")
+    update.add_argument("--model-dir", default=str(INCREMENTAL_MODEL_DIR))
+
+    args = parser.parse_args()
+
+    from src.ia.retraining import RetrainingPipeline
+
+    pipeline = RetrainingPipeline()
+    if args.command == "refit":
+        result = pipeline.incremental_refit(model_dir=args.model_dir, epochs=args.epochs)
+    else:
+        result = pipeline.incremental_update(model_dir=args.model_dir)
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -5,7 +5,6 @@ Script de entrenamiento de modelos de clasificación de documentos.
 import os
 import json
 import joblib
-import pandas as pd
 import numpy as np
 from datetime import datetime
 from sklearn.feature_extraction.text import TfidfVectorizer
@@ -18,6 +17,7 @@ from sklearn.metrics import (
     accuracy_score,
     f1_score
 )
+from ai_directia.preprocessing.dataset_cache import CLEAN_COLUMN, load_split
 from ..utils import clean_text
 
 
@@ -41,9 +41,10 @@ def load_data(dataset_path=DATASET_PATH):
     print("CARGANDO DATASETS")
     print("=" * 70)
 
-    train_df = pd.read_csv(os.path.join(dataset_path, "train.csv"))
-    val_df = pd.read_csv(os.path.join(dataset_path, "val.csv"))
-    test_df = pd.read_csv(os.path.join(dataset_path, "test.csv"))
+    # Caché Parquet con el texto ya limpio (se regenera si cambia el CSV o el limpiador)
+    train_df = load_split(os.path.join(dataset_path, "train.csv"))
+    val_df = load_split(os.path.join(dataset_path, "val.csv"))
+    test_df = load_split(os.path.join(dataset_path, "test.csv"))
 
     print(f"   - Train: {len(train_df)} ejemplos")
     print(f"   - Validation: {len(val_df)} ejemplos")
@@ -55,7 +56,8 @@ def load_data(dataset_path=DATASET_PATH):
 
 def preprocess_data(df):
     """
-    Preprocesa los textos aplicando limpieza.
+    Preprocesa los textos aplicando limpieza. Si el DataFrame viene de la
+    caché de datasets (``load_split``) se usa su columna ya limpia.
 
     Args:
         df: DataFrame con columnas 'text' y 'label'
@@ -65,7 +67,10 @@ def preprocess_data(df):
     """
     print("\n[*] Preprocesando textos...")
 
-    X_clean = df['text'].apply(clean_text).values
+    if CLEAN_COLUMN in df.columns:
+        X_clean = df[CLEAN_COLUMN].to_numpy(dtype=object)
+    else:
+        X_clean = df['text'].apply(clean_text).values
     y = df['label'].values
 
     print(f"  [OK] {len(X_clean)} textos preprocesados")
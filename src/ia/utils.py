@@ -0,0 +1,11 @@
+"""
+Utilidades de texto compartidas por el stack de IA.
+
+La limpieza vive en ``ai_directia.preprocessing.text_cleaner`` para que el
+pipeline, el entrenamiento y la evaluación usen exactamente el mismo
+normalizador.
+"""
+
+from ai_directia.preprocessing.text_cleaner import clean_text, clean_text_batch, preprocess_text
+
+__all__ = ['clean_text', 'clean_text_batch', 'preprocess_text']
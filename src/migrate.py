@@ -0,0 +1,98 @@
+"""
+Migración del esquema de Postgres: tablas que falten, índices declarados en
+los modelos y roles básicos.
+
+Se ejecuta una vez por despliegue (o al actualizar), no en el arranque de
+cada worker:
+
+    python -m src.migrate
+
+Es idempotente: lo que ya existe no se toca. ``create_app`` la ejecuta
+también si ``CREATE_TABLES=true`` (útil en desarrollo y en las pruebas de
+carga con SQLite).
+"""
+
+import sys
+
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.orm import Session
+
+from src.models import Base, Role
+
+
+def create_missing_tables(engine):
+    """Crea las tablas de los modelos que no existan. Devuelve sus nombres."""
+    existing_tables = inspect(engine).get_table_names()
+    missing = [table for table in Base.metadata.tables if table not in existing_tables]
+    if missing:
+        Base.metadata.create_all(engine)
+    return missing
+
+
+def ensure_indexes(engine):
+    """Crea los índices declarados en los modelos que falten en tablas ya existentes"""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
+
+
+def init_roles(session):
+    """Inicializa los roles básicos si no existen. Devuelve los creados."""
+    created = []
+    try:
+        for name, description in (("admin", "Administrador del sistema"), ("usuario", "Usuario estándar")):
+            if not session.query(Role).filter_by(name=name).first():
+                session.add(Role(name=name, description=description))
+                created.append(name)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    return created
+
+
+def migrate(engine):
+    """
+    Aplica la migración completa sobre ``engine``.
+
+    Returns:
+        Dict con las tablas y roles creados
+    """
+    tables = create_missing_tables(engine)
+    if tables:
+        print(f"[OK] Tablas creadas: {', '.join(tables)}")
+    else:
+        print("[INFO] Todas las tablas ya existen.")
+    ensure_indexes(engine)
+
+    with Session(engine) as session:
+        roles = init_roles(session)
+    for role in roles:
+        print(f"[OK] Rol '{role}' creado")
+    print("[OK] Roles inicializados correctamente")
+    return {"tables": tables, "roles": roles}
+
+
+def main(argv=None):
+    import argparse
+
+    from src.config import ActiveConfig
+
+    parser = argparse.ArgumentParser(description="Crea el esquema y los roles básicos de DirectIA")
+    parser.add_argument("--database-uri", default=ActiveConfig.SQLALCHEMY_DATABASE_URI,
+                        help="URI de SQLAlchemy (por defecto la de la configuración)")
+    args = parser.parse_args(argv)
+
+    engine = create_engine(args.database_uri)
+    try:
+        migrate(engine)
+    except Exception as e:
+        print(f"[ERROR] Migración fallida: {e}")
+        return 1
+    finally:
+        engine.dispose()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -20,7 +20,7 @@ class User(Base):
     username = Column(String(50), unique=True, nullable=False)
     email = Column(String(100), unique=True, nullable=False)
     password_hash = Column(String(255), nullable=False)
-    role_id = Column(Integer, ForeignKey("roles.id"))
+    role_id = Column(Integer, ForeignKey("roles.id"), index=True)
     active = Column(Boolean, default=True)
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, onupdate=func.now())
@@ -43,7 +43,8 @@ class GroupMember(Base):
     __tablename__ = "group_members"
 
     group_id = Column(Integer, ForeignKey("groups.id"), primary_key=True)
-    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    # La PK (group_id, user_id) no sirve para buscar los grupos de un usuario
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True, index=True)
     created_at = Column(DateTime, server_default=func.now())
 
     group = relationship("Group", back_populates="members")
@@ -6,6 +6,8 @@ from .file_icons_route import bp as file_icons_bp
 from .folder_structure import bp as folder_structure_bp
 from .ia import bp as ia_bp
 from .feedback import bp as feedback_bp
+from .metrics import bp as metrics_bp
+from .search import bp as search_bp
 
 def register_blueprints(app):
     app.register_blueprint(auth_bp)
@@ -16,3 +18,5 @@ def register_blueprints(app):
     app.register_blueprint(folder_structure_bp)
     app.register_blueprint(ia_bp)
     app.register_blueprint(feedback_bp)
+    app.register_blueprint(metrics_bp)
+    app.register_blueprint(search_bp)
@@ -1,109 +1,85 @@
-import os, subprocess, json
+import os, json
 from pathlib import Path
 from flask import Blueprint, jsonify, request, render_template, abort,current_app
 from src.models import User, Role, Group, GroupMember
 from werkzeug.security import generate_password_hash
-from src.services.token import verify_token
+from src.services import admin_listings, docker_admin
+from src.utils.auth_helper import current_user, protect_blueprint
 
 bp = Blueprint("admin", __name__, url_prefix="/admin")
 
 ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
-COMPOSE_FILE = os.getenv("DOCKER_COMPOSE_FILE", "docker/docker-compose.yml")
-WORKDIR = os.getenv("COMPOSE_WORKDIR", os.getcwd())
 
 
-def _auth():
-    token = request.headers.get("Authorization", "").replace("Bearer ", "")
-    if not token:
-        token = request.args.get("token", "")
-    payload = verify_token(token)
-    if not payload:
-        return False
-    role = payload.get("role")
-    # acepta si el nombre es "admin" o el id es 1
-    return role == "admin" or role == 1 or role == "1"
-
+# Token de admin en cabecera o ?token=; el panel HTML comprueba el suyo
+protect_blueprint(bp, admin=True, allow_query=True, exempt=("admin.panel",))
 
 
 def _run(cmd):
-    # requiere que el usuario que ejecuta Flask pueda usar docker sin sudo
-    return subprocess.run(cmd, cwd=WORKDIR, capture_output=True, text=True)
+    # Solo para consultas puntuales (logs, stats); las acciones van por docker_admin.get_jobs()
+    return docker_admin.run_command(cmd, timeout=60)
 
-def _parse_docker_ps():
-    """Parsea la salida de docker ps y devuelve lista de contenedores"""
-    res = _run(["docker", "ps", "-a", "--filter", "name=directia_", "--format", "{{.Names}}\t{{.Status}}\t{{.State}}"])
-    if res.returncode != 0:
-        return []
 
-    containers = []
-    for line in res.stdout.strip().split('\n'):
-        if not line:
-            continue
-        parts = line.split('\t')
-        if len(parts) >= 3:
-            containers.append({
-                "name": parts[0],
-                "status": parts[1],
-                "state": parts[2]
-            })
-    return containers
-
-@bp.before_request
-def guard():
-    # Permitir peticiones OPTIONS (CORS preflight) sin autenticación
-    if request.method == "OPTIONS":
-        return jsonify({"status": "ok"}), 200
-    # Permite ver el panel HTML sin header Authorization si llegas con ?token=...
-    if request.endpoint == "admin.panel":
-        return
-    if not _auth():
-        return jsonify({"error":"unauthorized"}), 401
+def _submit_job(action, target, commands):
+    """Encola una acción de docker y responde 202 con el trabajo para consultar su estado"""
+    job = docker_admin.get_jobs().submit(action, target, commands)
+    return jsonify({
+        "ok": True,
+        "msg": f"{action} de {target} en curso",
+        "job": job,
+        "job_url": f"{bp.url_prefix}/jobs/{job['id']}"
+    }), 202
 
 @bp.get("/")
 def panel():
-    qtoken = request.args.get("token", "")
-    payload = verify_token(qtoken)
-    if not payload:
+    # El panel HTML se abre con ?token=... (sin cabecera Authorization)
+    user = current_user(allow_query=True)
+    if user is None:
         abort(401)
-    role = payload.get("role")
-    if role != "admin" and role not in (1, "1"):
+    if not user.is_admin:
         abort(403)
-    return render_template("admin.html", token=qtoken)
+    return render_template("admin.html", token=user.token)
 
 @bp.get("/status")
 def status():
-    res = _run(["docker","compose","-f",COMPOSE_FILE,"ps"])
-    return jsonify({"ok":res.returncode==0,"output":res.stdout or res.stderr})
+    # Última foto del poller en segundo plano (no lanza docker en la petición)
+    snapshot = docker_admin.get_monitor().snapshot()
+    compose = snapshot["compose"]
+    return jsonify({"ok": compose["ok"], "output": compose["output"], "updated_at": snapshot["updated_at"],
+                    "age_s": snapshot["age_s"], "pending": snapshot["pending"], "stale": snapshot["stale"]})
 
 @bp.post("/start")
 def start():
-    res = _run(["docker","compose","-f",COMPOSE_FILE,"up","-d"])
-    return jsonify({"ok":res.returncode==0,"output":res.stdout or res.stderr})
+    return _submit_job("start", "compose", docker_admin.compose_commands("start"))
 
 @bp.post("/stop")
 def stop():
-    res = _run(["docker","compose","-f",COMPOSE_FILE,"down"])
-    return jsonify({"ok":res.returncode==0,"output":res.stdout or res.stderr})
+    return _submit_job("stop", "compose", docker_admin.compose_commands("stop"))
 
 @bp.post("/restart")
 def restart():
-    res = _run(["docker","compose","-f",COMPOSE_FILE,"restart"])
-    return jsonify({"ok":res.returncode==0,"output":res.stdout or res.stderr})
+    return _submit_job("restart", "compose", docker_admin.compose_commands("restart"))
+
+@bp.get("/jobs")
+def list_jobs():
+    """Últimos trabajos de docker (más recientes primero)"""
+    return jsonify({"ok": True, "jobs": docker_admin.get_jobs().list()})
+
+@bp.get("/jobs/<job_id>")
+def get_job(job_id):
+    """Estado de un trabajo: queued, running, succeeded o failed"""
+    job = docker_admin.get_jobs().get(job_id)
+    if job is None:
+        return jsonify({"error": "Trabajo no encontrado"}), 404
+    return jsonify({"ok": True, "job": job})
 
 
 @bp.get("/users")
 def list_users():
+    """Usuarios: ?q=&role=&active=&group_id=&sort=&order=&limit=&cursor= (sin limit ni cursor, todos)"""
     session = current_app.session()
-    users = session.query(User).all()
-    data = [{
-        "id": u.id,
-        "username": u.username,
-        "email": u.email,
-        "active": u.active,
-        "role_id": u.role_id,
-        "role_name": u.role.name if u.role else None
-    } for u in users]
-    return jsonify({"users": data})
+    body, status = admin_listings.list_users(session, request.args)
+    return jsonify(body), status
 
 @bp.put("/users/<int:user_id>")
 def update_user(user_id):
@@ -177,16 +153,10 @@ def create_user():
 
 @bp.get("/grupos")
 def list_grupos():
-    """Lista todos los grupos"""
+    """Lista los grupos con su número de miembros: ?q=&sort=&order=&limit=&cursor= (sin limit ni cursor, todos)"""
     session = current_app.session()
-    grupos = session.query(Group).all()
-    data = [{
-        "id": g.id,
-        "name": g.name,
-        "created_at": g.created_at.isoformat() if g.created_at else None,
-        "member_count": len(g.members)
-    } for g in grupos]
-    return jsonify({"grupos": data})
+    body, status = admin_listings.list_groups(session, request.args)
+    return jsonify(body), status
 
 @bp.post("/grupos")
 def create_grupo():
@@ -261,26 +231,10 @@ def delete_grupo(group_id):
 
 @bp.get("/grupos/<int:group_id>/usuarios")
 def get_group_users(group_id):
-    """Obtiene los usuarios de un grupo"""
+    """Obtiene los usuarios de un grupo (mismos parámetros que /users; sin limit ni cursor, todos)"""
     session = current_app.session()
-    grupo = session.query(Group).get(group_id)
-
-    if not grupo:
-        return jsonify({"error": "Grupo no encontrado"}), 404
-
-    # Obtener usuarios del grupo
-    members = session.query(User).join(GroupMember).filter(GroupMember.group_id == group_id).all()
-
-    data = [{
-        "id": u.id,
-        "username": u.username,
-        "email": u.email,
-        "active": u.active,
-        "role_id": u.role_id,
-        "role_name": u.role.name if u.role else None
-    } for u in members]
-
-    return jsonify({"usuarios": data})
+    body, status = admin_listings.list_group_users(session, group_id, request.args)
+    return jsonify(body), status
 
 @bp.post("/grupos/<int:group_id>/usuarios/<int:user_id>")
 def add_user_to_group(group_id, user_id):
@@ -338,79 +292,31 @@ def remove_user_from_group(group_id, user_id):
 
 @bp.get("/containers")
 def list_containers():
-    """Lista todos los contenedores de DirectIA con su estado"""
-    containers = _parse_docker_ps()
-
-    # Enriquecer con stats si el contenedor está corriendo
-    for container in containers:
-        if container["state"] == "running":
-            res = _run(["docker", "stats", "--no-stream", "--format",
-                       "{{.CPUPerc}}\t{{.MemUsage}}", container["name"]])
-            if res.returncode == 0 and res.stdout.strip():
-                parts = res.stdout.strip().split('\t')
-                if len(parts) >= 2:
-                    container["cpu"] = parts[0]
-                    container["memory"] = parts[1]
-                else:
-                    container["cpu"] = "N/A"
-                    container["memory"] = "N/A"
-        else:
-            container["cpu"] = "N/A"
-            container["memory"] = "N/A"
-
-    return jsonify({"ok": True, "containers": containers})
+    """Lista todos los contenedores de DirectIA con su estado (foto del poller)"""
+    snapshot = docker_admin.get_monitor().snapshot()
+    return jsonify({"ok": True, "containers": snapshot["containers"], "updated_at": snapshot["updated_at"],
+                    "age_s": snapshot["age_s"], "pending": snapshot["pending"], "stale": snapshot["stale"]})
 
 @bp.post("/containers/<container_name>/start")
 def start_container(container_name):
     """Inicia un contenedor específico"""
-    res = _run(["docker", "start", container_name])
-    return jsonify({
-        "ok": res.returncode == 0,
-        "msg": f"Contenedor {container_name} iniciado" if res.returncode == 0 else "Error al iniciar contenedor",
-        "output": res.stdout or res.stderr
-    })
+    return _submit_job("start", container_name, docker_admin.container_commands("start", container_name))
 
 @bp.post("/containers/<container_name>/stop")
 def stop_container(container_name):
     """Detiene un contenedor específico"""
-    res = _run(["docker", "stop", container_name])
-    return jsonify({
-        "ok": res.returncode == 0,
-        "msg": f"Contenedor {container_name} detenido" if res.returncode == 0 else "Error al detener contenedor",
-        "output": res.stdout or res.stderr
-    })
+    return _submit_job("stop", container_name, docker_admin.container_commands("stop", container_name))
 
 @bp.post("/containers/<container_name>/restart")
 def restart_container(container_name):
     """Reinicia un contenedor específico"""
-    res = _run(["docker", "restart", container_name])
-    return jsonify({
-        "ok": res.returncode == 0,
-        "msg": f"Contenedor {container_name} reiniciado" if res.returncode == 0 else "Error al reiniciar contenedor",
-        "output": res.stdout or res.stderr
-    })
+    return _submit_job("restart", container_name, docker_admin.container_commands("restart", container_name))
 
 @bp.post("/containers/<container_name>/recreate")
 def recreate_container(container_name):
     """Recrea un contenedor (útil para aplicar cambios de configuración)"""
-    # Detener y eliminar el contenedor
-    stop_res = _run(["docker", "stop", container_name])
-    if stop_res.returncode != 0:
-        return jsonify({"ok": False, "msg": "Error al detener contenedor", "output": stop_res.stderr})
-
-    remove_res = _run(["docker", "rm", container_name])
-    if remove_res.returncode != 0:
-        return jsonify({"ok": False, "msg": "Error al eliminar contenedor", "output": remove_res.stderr})
-
-    # Recrear con docker-compose
-    service_name = container_name.replace("directia_", "")
-    up_res = _run(["docker", "compose", "-f", COMPOSE_FILE, "up", "-d", service_name])
-
-    return jsonify({
-        "ok": up_res.returncode == 0,
-        "msg": f"Contenedor {container_name} recreado" if up_res.returncode == 0 else "Error al recrear contenedor",
-        "output": up_res.stdout or up_res.stderr
-    })
+    # stop + rm + compose up -d del servicio, en un único trabajo
+    return _submit_job("recreate", container_name, docker_admin.container_commands("recreate", container_name))
 
 @bp.get("/containers/<container_name>/logs")
 def container_logs(container_name):
@@ -4,8 +4,10 @@ Permite a los usuarios corregir clasificaciones incorrectas.
 """
 
 from flask import Blueprint, request, jsonify, current_app
-from datetime import datetime
-import os
+from datetime import datetime, timedelta
+
+from src.ia.log_store import get_feedback_log
+from src.ia.rollups import days_since, get_rollups
 
 bp = Blueprint('feedback', __name__, url_prefix='/api/feedback')
 
@@ -20,11 +22,15 @@ def submit_feedback():
         "file_path": "documento.pdf",
         "predicted_type": "factura",
         "actual_type": "recibo",
+        "document_id": "9f86d08...",
         "confidence": 0.85,
         "username": "user123",
         "comment": "Es un recibo de alquiler, no una factura"
     }
 
+    document_id es opcional: es el que devuelve la clasificación y permite
+    recuperar el texto completo del documento al re-entrenar.
+
     Returns:
         JSON con confirmación
     """
@@ -41,6 +47,7 @@ def submit_feedback():
         feedback_entry = {
             "timestamp": datetime.now().isoformat(),
             "file_path": data['file_path'],
+            "document_id": data.get('document_id'),
             "predicted_type": data['predicted_type'],
             "actual_type": data['actual_type'],
             "confidence": data.get('confidence'),
@@ -57,16 +64,13 @@ def submit_feedback():
             predicted_type=data['predicted_type'],
             confidence=data.get('confidence', 0.0),
             username=data.get('username'),
-            user_feedback=data['actual_type']
+            user_feedback=data['actual_type'],
+            document_id=data.get('document_id')
         )
 
-        # También guardar en archivo separado de feedback
-        feedback_file = "logs/user_feedback.jsonl"
-        os.makedirs(os.path.dirname(feedback_file), exist_ok=True)
-
-        import json
-        with open(feedback_file, 'a', encoding='utf-8') as f:
-            f.write(json.dumps(feedback_entry, ensure_ascii=False) + '\n')
+        # También guardar en el log particionado de feedback y en los agregados diarios
+        get_feedback_log().append([feedback_entry])
+        get_rollups().record_feedback([feedback_entry])
 
         return jsonify({
             "status": "success",
@@ -98,56 +102,8 @@ def get_feedback_stats():
         # Obtener estadísticas generales
         stats = logger.get_stats(days=days)
 
-        # Obtener feedback específico
-        feedback_file = "logs/user_feedback.jsonl"
-        feedback_stats = {
-            "total_feedback": 0,
-            "correct_predictions": 0,
-            "incorrect_predictions": 0,
-            "accuracy": 0.0,
-            "corrections_by_type": {}
-        }
-
-        if os.path.exists(feedback_file):
-            import json
-            from datetime import datetime, timedelta
-
-            cutoff_date = datetime.now() - timedelta(days=days)
-
-            with open(feedback_file, 'r', encoding='utf-8') as f:
-                for line in f:
-                    try:
-                        entry = json.loads(line)
-                        entry_date = datetime.fromisoformat(entry.get("timestamp", ""))
-
-                        if entry_date < cutoff_date:
-                            continue
-
-                        feedback_stats["total_feedback"] += 1
-
-                        if entry.get("was_correct"):
-                            feedback_stats["correct_predictions"] += 1
-                        else:
-                            feedback_stats["incorrect_predictions"] += 1
-
-                            # Track corrections
-                            predicted = entry.get("predicted_type")
-                            actual = entry.get("actual_type")
-                            key = f"{predicted} -> {actual}"
-
-                            if key not in feedback_stats["corrections_by_type"]:
-                                feedback_stats["corrections_by_type"][key] = 0
-                            feedback_stats["corrections_by_type"][key] += 1
-
-                    except Exception:
-                        continue
-
-            # Calcular accuracy
-            if feedback_stats["total_feedback"] > 0:
-                feedback_stats["accuracy"] = round(
-                    feedback_stats["correct_predictions"] / feedback_stats["total_feedback"],
-                    4
-                )
+        # Obtener feedback específico (suma de los agregados diarios)
+        feedback_stats = get_rollups().feedback_stats(since=days_since(days))
 
         return jsonify({
             "period_days": days,
@@ -175,27 +131,24 @@ def export_feedback():
         format_type = request.args.get('format', 'csv').lower()
         days = int(request.args.get('days', 30))
 
-        feedback_file = "logs/user_feedback.jsonl"
+        feedback_log = get_feedback_log()
 
-        if not os.path.exists(feedback_file):
+        if not feedback_log.partitions():
             return jsonify({"error": "No hay feedback disponible"}), 404
 
         import json
-        from datetime import datetime, timedelta
 
         cutoff_date = datetime.now() - timedelta(days=days)
         entries = []
 
-        with open(feedback_file, 'r', encoding='utf-8') as f:
-            for line in f:
-                try:
-                    entry = json.loads(line)
-                    entry_date = datetime.fromisoformat(entry.get("timestamp", ""))
+        for entry in feedback_log.read(since=cutoff_date):
+            try:
+                entry_date = datetime.fromisoformat(entry.get("timestamp", ""))
 
-                    if entry_date >= cutoff_date:
-                        entries.append(entry)
-                except Exception:
-                    continue
+                if entry_date >= cutoff_date:
+                    entries.append(entry)
+            except Exception:
+                continue
 
         if format_type == 'csv':
             import csv
@@ -243,53 +196,48 @@ def get_problematic_cases():
         days = int(request.args.get('days', 7))
         min_occurrences = int(request.args.get('min_occurrences', 2))
 
-        feedback_file = "logs/user_feedback.jsonl"
+        feedback_log = get_feedback_log()
 
-        if not os.path.exists(feedback_file):
+        if not feedback_log.partitions():
             return jsonify({"problematic_cases": []}), 200
 
-        import json
-        from datetime import datetime, timedelta
-
         cutoff_date = datetime.now() - timedelta(days=days)
 
         # Rastrear errores frecuentes
         error_patterns = {}
         low_confidence_errors = []
 
-        with open(feedback_file, 'r', encoding='utf-8') as f:
-            for line in f:
-                try:
-                    entry = json.loads(line)
-                    entry_date = datetime.fromisoformat(entry.get("timestamp", ""))
-
-                    if entry_date < cutoff_date:
-                        continue
-
-                    if not entry.get("was_correct"):
-                        # Rastrear patrón de error
-                        predicted = entry.get("predicted_type")
-                        actual = entry.get("actual_type")
-                        pattern = f"{predicted} -> {actual}"
-
-                        if pattern not in error_patterns:
-                            error_patterns[pattern] = 0
-                        error_patterns[pattern] += 1
-
-                        # Casos de baja confianza
-                        confidence = entry.get("confidence", 0)
-                        if confidence < 0.7:
-                            low_confidence_errors.append({
-                                "file": entry.get("file_path"),
-                                "predicted": predicted,
-                                "actual": actual,
-                                "confidence": confidence,
-                                "timestamp": entry.get("timestamp")
-                            })
-
-                except Exception:
+        for entry in feedback_log.read(since=cutoff_date):
+            try:
+                entry_date = datetime.fromisoformat(entry.get("timestamp", ""))
+
+                if entry_date < cutoff_date:
                     continue
 
+                if not entry.get("was_correct"):
+                    # Rastrear patrón de error
+                    predicted = entry.get("predicted_type")
+                    actual = entry.get("actual_type")
+                    pattern = f"{predicted} -> {actual}"
+
+                    if pattern not in error_patterns:
+                        error_patterns[pattern] = 0
+                    error_patterns[pattern] += 1
+
+                    # Casos de baja confianza
+                    confidence = entry.get("confidence") or 0
+                    if confidence < 0.7:
+                        low_confidence_errors.append({
+                            "file": entry.get("file_path"),
+                            "predicted": predicted,
+                            "actual": actual,
+                            "confidence": confidence,
+                            "timestamp": entry.get("timestamp")
+                        })
+
+            except Exception:
+                continue
+
         # Filtrar patrones frecuentes
         frequent_errors = [
             {"pattern": pattern, "count": count}
@@ -1,12 +1,19 @@
 from flask import Blueprint, request, jsonify, send_from_directory, current_app
 from src.services import files as file_service
-from src.services.token import verify_token
-from src.ia.ocr.ocr import ejecutar_ocr
-from src.ia.clasificadores.beto.inferencia import ejecutar_beto
+from src.utils.auth_helper import current_user
+from src.ia.pipeline import get_pipeline
+from src.ia.search_index import DEFAULT_DB_PATH, get_indexer
 
 bp = Blueprint("files", __name__, url_prefix="/api/files")
 
 
+def _search_indexer():
+    """Indexador de búsqueda, o None si SEARCH_INDEXING está desactivado."""
+    if not current_app.config.get("SEARCH_INDEXING", True):
+        return None
+    return get_indexer(current_app.config.get("SEARCH_INDEX_PATH", DEFAULT_DB_PATH))
+
+
 @bp.route("/list", methods=["GET"])
 def list_files():
     result = file_service.list_files()
@@ -16,6 +23,7 @@ def list_files():
 @bp.route("/upload", methods=["POST"])
 def upload_file():
     ia_activada = request.args.get("ia", "false").lower() == "true"
+    debug_timing = request.args.get("debug") == "timing"
     file = request.files.get("file")
     folder = request.form.get("folder", "").strip()
     user = request.form.get("user", "unknown")
@@ -28,8 +36,9 @@ def upload_file():
         user=user,
         metadata_col=metadata_col,
         ia_activa=ia_activada,
-        ocr_fn=ejecutar_ocr if ia_activada else None,
-        beto_fn=ejecutar_beto if ia_activada else None
+        pipeline=get_pipeline() if ia_activada else None,
+        debug_timing=debug_timing,
+        indexer=_search_indexer()
     )
     return jsonify(result), status
 
@@ -58,12 +67,11 @@ def delete_element(ruta):
     elemento = metadata_col.find_one({"filename": filename, "relative_path": relative_path})
     if elemento and elemento.get("protegida"):
         # Solo los admins pueden eliminar carpetas protegidas
-        token = request.headers.get("Authorization", "").replace("Bearer ", "")
-        payload = verify_token(token)
-        if not payload or (payload.get("role") != 1 and payload.get("role") != "admin"):
+        auth = current_user()
+        if auth is None or not auth.is_admin:
             return jsonify({"error": "Solo los administradores pueden eliminar carpetas protegidas"}), 403
 
-    result, status = file_service.delete_element(ruta, metadata_col)
+    result, status = file_service.delete_element(ruta, metadata_col, indexer=_search_indexer())
     return jsonify(result), status
 
 @bp.route("/create_folder", methods=["POST"])
@@ -80,9 +88,8 @@ def create_folder():
 
     # Solo los admins pueden crear carpetas protegidas
     if protegida:
-        token = request.headers.get("Authorization", "").replace("Bearer ", "")
-        payload = verify_token(token)
-        if not payload or (payload.get("role") != 1 and payload.get("role") != "admin"):
+        auth = current_user()
+        if auth is None or not auth.is_admin:
             return jsonify({"error": "Solo los administradores pueden crear carpetas protegidas"}), 403
 
     metadata_col = current_app.mongo["metadata"]
@@ -105,5 +112,5 @@ def move_file():
     origen_rel = data.get("origen")
     destino_rel = data.get("destino")
     metadata_col = current_app.mongo["metadata"]
-    result, status = file_service.move_file(origen_rel, destino_rel, metadata_col)
+    result, status = file_service.move_file(origen_rel, destino_rel, metadata_col, indexer=_search_indexer())
     return jsonify(result), status
@@ -1,9 +1,10 @@
 import os
-import uuid
-from datetime import datetime, timezone
 from flask import Blueprint, jsonify, request, current_app
 from src.models import FolderTemplate, Group
-from src.services.token import verify_token
+from src.services.folder_templates import (
+    apply_structure, get_tree, invalidate_tree_cache, lineage_group_ids, template_to_dict,
+)
+from src.utils.auth_helper import current_user, protect_blueprint
 
 bp = Blueprint("folder_structure", __name__, url_prefix="/admin/folder-structure")
 
@@ -11,58 +12,23 @@ bp = Blueprint("folder_structure", __name__, url_prefix="/admin/folder-structure
 BASE_STORAGE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../storage/files"))
 UPLOAD_DIR = os.getenv("UPLOAD_DIR", BASE_STORAGE_PATH)
 
-def _auth():
-    token = request.headers.get("Authorization", "").replace("Bearer ", "")
-    if not token:
-        token = request.args.get("token", "")
-    if not token:
-        return False
-    payload = verify_token(token)
-    if not payload:
-        return False
-    role = payload.get("role")
-    return role == "admin" or role == 1 or role == "1"
-
-@bp.before_request
-def guard():
-    if request.method == "OPTIONS":
-        # Permitir peticiones OPTIONS para CORS preflight
-        return jsonify({"status": "ok"}), 200
-    if not _auth():
-        return jsonify({"error": "unauthorized"}), 401
+protect_blueprint(bp, admin=True, allow_query=True)
 
 @bp.get("/")
 def get_folder_structure():
     """Obtener toda la estructura de carpetas"""
     session = current_app.session()
     group_id = request.args.get("group_id")
-
-    # Obtener carpetas raíz (sin parent)
-    query = session.query(FolderTemplate).filter(FolderTemplate.parent_id == None)
-
     if group_id:
-        query = query.filter(FolderTemplate.group_id == group_id)
-
-    root_folders = query.order_by(FolderTemplate.order).all()
-    print(f"[DirectIA Backend] Carpetas raíz encontradas: {len(root_folders)}")
-    for folder in root_folders:
-        print(f"  - {folder.name} (id: {folder.id}, group_id: {folder.group_id}, children: {len(folder.children)})")
-
-    def folder_to_dict(folder):
-        return {
-            "id": folder.id,
-            "name": folder.name,
-            "description": folder.description,
-            "icon": folder.icon,
-            "parent_id": folder.parent_id,
-            "order": folder.order,
-            "protected": folder.protected,
-            "group_id": folder.group_id,
-            "children": [folder_to_dict(child) for child in sorted(folder.children, key=lambda x: x.order)]
-        }
-
-    structure = [folder_to_dict(folder) for folder in root_folders]
-    print(f"[DirectIA Backend] Estructura JSON devuelta: {len(structure)} carpetas raíz")
+        try:
+            group_id = int(group_id)
+        except ValueError:
+            return jsonify({"error": "group_id debe ser un entero"}), 400
+    else:
+        group_id = None
+
+    # Árbol completo del grupo (o de todos) en una consulta, cacheado por grupo
+    structure = get_tree(session, group_id)
 
     return jsonify({"folders": structure})
 
@@ -90,21 +56,14 @@ def create_folder_template():
     session.add(folder)
     session.commit()
 
+    invalidate_tree_cache(*lineage_group_ids(folder))
+
     print(f"[DirectIA Backend] Carpeta creada: {folder.name} (id: {folder.id}, parent_id: {folder.parent_id}, group_id: {folder.group_id})")
 
     return jsonify({
         "ok": True,
         "msg": "Carpeta creada en la estructura",
-        "folder": {
-            "id": folder.id,
-            "name": folder.name,
-            "description": folder.description,
-            "icon": folder.icon,
-            "parent_id": folder.parent_id,
-            "order": folder.order,
-            "protected": folder.protected,
-            "group_id": folder.group_id
-        }
+        "folder": template_to_dict(folder)
     })
 
 @bp.put("/<int:folder_id>")
@@ -117,6 +76,7 @@ def update_folder_template(folder_id):
         return jsonify({"error": "Carpeta no encontrada"}), 404
 
     data = request.get_json() or {}
+    previous_group_id = folder.group_id
 
     if "name" in data:
         folder.name = data["name"]
@@ -132,6 +92,7 @@ def update_folder_template(folder_id):
         folder.group_id = data["group_id"]
 
     session.commit()
+    invalidate_tree_cache(previous_group_id, *lineage_group_ids(folder))
 
     return jsonify({"ok": True, "msg": "Carpeta actualizada"})
 
@@ -144,124 +105,81 @@ def delete_folder_template(folder_id):
     if not folder:
         return jsonify({"error": "Carpeta no encontrada"}), 404
 
+    affected_groups = lineage_group_ids(folder)
     session.delete(folder)
     session.commit()
+    invalidate_tree_cache(*affected_groups)
 
     return jsonify({"ok": True, "msg": "Carpeta eliminada de la estructura"})
 
-@bp.post("/apply/<int:group_id>")
-def apply_folder_structure(group_id):
-    """Aplicar la estructura de carpetas físicamente en el sistema de archivos"""
-    session = current_app.session()
+def _apply_to_groups(session, group_ids):
+    """Aplica la estructura de varios grupos de una vez. Devuelve (grupos, informe) o (None, ids no encontrados)."""
     metadata_col = current_app.mongo.metadata
 
-    # Obtener usuario del token
-    token = request.headers.get("Authorization", "").replace("Bearer ", "")
-    payload = verify_token(token)
-    user = payload.get("username", "admin") if payload else "admin"
+    # Usuario del token (ya verificado por el guard del blueprint)
+    auth_user = current_user(allow_query=True)
+    user = (auth_user.username if auth_user else None) or "admin"
 
-    print(f"[DirectIA Backend] Aplicando estructura para grupo {group_id}")
-    print(f"[DirectIA Backend] Ruta base de almacenamiento: {UPLOAD_DIR}")
-    print(f"[DirectIA Backend] Usuario: {user}")
+    groups = session.query(Group).filter(Group.id.in_(group_ids)).all()
+    missing = sorted(set(group_ids) - {group.id for group in groups})
+    if missing:
+        print(f"[DirectIA Backend] Error: Grupos no encontrados: {missing}")
+        return None, missing
 
     # Asegurar que el directorio base existe
-    if not os.path.exists(UPLOAD_DIR):
-        os.makedirs(UPLOAD_DIR, exist_ok=True)
-        print(f"[DirectIA Backend] Directorio base creado: {UPLOAD_DIR}")
-
-    # Verificar que el grupo existe
-    group = session.query(Group).get(group_id)
-    if not group:
-        print(f"[DirectIA Backend] Error: Grupo {group_id} no encontrado")
-        return jsonify({"error": "Grupo no encontrado"}), 404
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
 
-    print(f"[DirectIA Backend] Grupo encontrado: {group.name}")
+    # Árbol de cada grupo (específicas del grupo + globales), cacheado
+    groups.sort(key=lambda group: group_ids.index(group.id))
+    trees = {group.id: get_tree(session, group.id, include_global=True) for group in groups}
+    report = apply_structure(metadata_col, UPLOAD_DIR, trees, user=user)
 
-    # Obtener estructura de carpetas para este grupo (específicas del grupo + globales)
-    folders = session.query(FolderTemplate).filter(
-        (FolderTemplate.group_id == group_id) | (FolderTemplate.group_id == None)
-    ).order_by(FolderTemplate.order).all()
+    print(f"[DirectIA Backend] Estructura aplicada a {len(groups)} grupo(s) en {UPLOAD_DIR} (usuario: {user}): "
+          f"{len(report['created'])} carpetas creadas, {len(report['inserted'])} registradas, "
+          f"{len(report['updated'])} actualizadas, {len(report['errors'])} errores")
+    return groups, report
 
-    print(f"[DirectIA Backend] Carpetas a aplicar: {len(folders)} total")
-    for folder in folders:
-        group_label = f"grupo {folder.group_id}" if folder.group_id else "global"
-        print(f"  - {folder.name} ({group_label}, parent_id: {folder.parent_id}, protected: {folder.protected})")
 
-    created_folders = []
-    errors = []
+@bp.post("/apply/<int:group_id>")
+def apply_folder_structure(group_id):
+    """Aplicar la estructura de carpetas físicamente en el sistema de archivos"""
+    session = current_app.session()
+    groups, report = _apply_to_groups(session, [group_id])
+    if groups is None:
+        return jsonify({"error": "Grupo no encontrado"}), 404
 
-    def create_physical_folder(folder, parent_path=""):
-        try:
-            # Construir ruta
-            folder_path = os.path.join(parent_path, folder.name) if parent_path else folder.name
-            full_path = os.path.join(UPLOAD_DIR, folder_path)
-            relative_path = "/" + os.path.dirname(folder_path).replace("\\", "/") if parent_path else "/"
-
-            # Verificar si ya existe en MongoDB
-            existing_metadata = metadata_col.find_one({
-                "filename": folder.name,
-                "relative_path": relative_path,
-                "tipo": "carpeta"
-            })
-
-            # Crear carpeta física si no existe
-            if not os.path.exists(full_path):
-                os.makedirs(full_path, exist_ok=True)
-                created_folders.append(folder_path)
-                print(f"[DirectIA Backend] ✓ Creada físicamente: {full_path}")
-            else:
-                print(f"[DirectIA Backend] - Ya existe físicamente: {full_path}")
-
-            # Registrar en MongoDB si no existe
-            if not existing_metadata:
-                metadata_col.insert_one({
-                    "file_id": str(uuid.uuid4()),
-                    "filename": folder.name,
-                    "relative_path": relative_path,
-                    "tipo": "carpeta",
-                    "protegida": folder.protected,  # Usar el valor de protected de la template
-                    "created_at": datetime.now(timezone.utc),
-                    "user": user,
-                    "template_id": folder.id,  # Referencia a la template
-                    "group_id": folder.group_id  # Para saber a qué grupo pertenece
-                })
-                print(f"[DirectIA Backend] ✓ Registrada en MongoDB: {folder.name} (protegida: {folder.protected})")
-            else:
-                # Actualizar protección si es necesario
-                if existing_metadata.get("protegida") != folder.protected:
-                    metadata_col.update_one(
-                        {"_id": existing_metadata["_id"]},
-                        {"$set": {"protegida": folder.protected}}
-                    )
-                    print(f"[DirectIA Backend] ↻ Actualizada protección: {folder.name} (protegida: {folder.protected})")
-                else:
-                    print(f"[DirectIA Backend] - Ya existe en MongoDB: {folder.name}")
-
-            # Crear subcarpetas recursivamente
-            for child in folder.children:
-                create_physical_folder(child, folder_path)
-
-        except Exception as e:
-            error_msg = f"Error creando {folder.name}: {str(e)}"
-            errors.append(error_msg)
-            print(f"[DirectIA Backend] ✗ {error_msg}")
-
-    # Crear carpetas raíz y sus hijos
-    root_folders = [f for f in folders if f.parent_id is None]
-    print(f"[DirectIA Backend] Carpetas raíz a crear: {len(root_folders)}")
-
-    for folder in root_folders:
-        create_physical_folder(folder)
-
-    print(f"[DirectIA Backend] Resultado: {len(created_folders)} carpetas creadas, {len(errors)} errores")
+    group = groups[0]
+    return jsonify({
+        "ok": True,
+        "msg": f"Estructura aplicada al grupo '{group.name}': {len(report['created'])} carpetas creadas",
+        "created": report["created"],
+        "errors": report["errors"],
+        "total_templates": report["groups"][group.id]["total"],
+        "group_name": group.name,
+        "report": report
+    })
+
+@bp.post("/apply")
+def apply_folder_structure_bulk():
+    """Aplicar la estructura de varios grupos: {"group_ids": [1, 2, ...]}"""
+    session = current_app.session()
+    data = request.get_json() or {}
+    try:
+        group_ids = list(dict.fromkeys(int(group_id) for group_id in data.get("group_ids") or []))
+    except (TypeError, ValueError):
+        return jsonify({"error": "group_ids debe ser una lista de ids"}), 400
+    if not group_ids:
+        return jsonify({"error": "group_ids es requerido"}), 400
+
+    groups, report = _apply_to_groups(session, group_ids)
+    if groups is None:
+        return jsonify({"error": "Grupos no encontrados", "missing": report}), 404
 
     return jsonify({
         "ok": True,
-        "msg": f"Estructura aplicada al grupo '{group.name}': {len(created_folders)} carpetas creadas",
-        "created": created_folders,
-        "errors": errors,
-        "total_templates": len(folders),
-        "group_name": group.name
+        "msg": f"Estructura aplicada a {len(groups)} grupos: {len(report['created'])} carpetas creadas",
+        "groups": {group.id: group.name for group in groups},
+        "report": report
     })
 
 @bp.post("/initialize-defaults")
@@ -303,6 +221,7 @@ def initialize_default_structure():
         print(f"[DirectIA Backend] Creando carpeta por defecto: {folder_data['name']} (parent_id=None, group_id=None)")
 
     session.commit()
+    invalidate_tree_cache(None)
     print(f"[DirectIA Backend] Estructura por defecto creada exitosamente: {len(created)} carpetas")
 
     return jsonify({
@@ -116,7 +116,8 @@ def health_check():
             "success": true,
             "status": "operational",
             "classifier_loaded": true,
-            "message": "AI classification system is operational"
+            "message": "AI classification system is operational",
+            "pipeline": {"documents": 12, "cache_hits": 3, ...}
         }
     """
     classifier = ia_service.get_classifier()
@@ -133,7 +134,8 @@ def health_check():
         'success': True,
         'status': 'operational',
         'classifier_loaded': True,
-        'message': 'AI classification system is operational'
+        'message': 'AI classification system is operational',
+        'pipeline': classifier.get_stats()
     }), 200
 
 
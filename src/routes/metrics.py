@@ -0,0 +1,14 @@
+from flask import Blueprint, Response
+from src.utils import metrics
+
+bp = Blueprint("metrics", __name__)
+
+
+@bp.route("/metrics", methods=["GET"])
+def exponer_metricas():
+    """
+    Métricas de ejecución en formato de exposición de Prometheus
+    (latencias HTTP por blueprint, pipeline de IA, OCR, bases de datos
+    y colas en segundo plano).
+    """
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
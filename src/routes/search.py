@@ -0,0 +1,34 @@
+from flask import Blueprint, request, jsonify, current_app
+from src.services import search as search_service
+from src.ia.search_index import DEFAULT_DB_PATH, get_search_index
+
+bp = Blueprint("search", __name__, url_prefix="/api")
+
+
+@bp.route("/search", methods=["GET"])
+def search():
+    """
+    Búsqueda de texto completo en el contenido de los documentos.
+
+    Query: ?q=&folder=&tipo=&limit=&offset=
+
+    Response:
+        {
+            "results": [
+                {
+                    "path": "/Documentos/Facturas/factura_001.pdf",
+                    "tipo": "Factura",
+                    "snippet": "... <mark>factura</mark> nº 2025/001 ...",
+                    "score": 3.21,
+                    ...
+                }
+            ],
+            "total": 42,
+            "limit": 20,
+            "offset": 0,
+            "next_offset": 20
+        }
+    """
+    index = get_search_index(current_app.config.get("SEARCH_INDEX_PATH", DEFAULT_DB_PATH))
+    result, status = search_service.buscar_documentos(request.args, index)
+    return jsonify(result), status
@@ -0,0 +1,224 @@
+"""
+Listados paginados del panel de administración (usuarios y grupos).
+
+Paginación por clave (keyset): cada página devuelve un ``next_cursor`` opaco
+con el valor de la columna de orden y el id de la última fila; la siguiente
+página filtra ``(orden, id) > cursor`` en lugar de usar OFFSET, así que el
+coste no crece con la página pedida. Los listados solo paginan si se pide
+``limit`` o ``cursor``; sin ellos devuelven todas las filas, como antes de
+paginar.
+
+Los roles se cargan con ``joinedload`` y las pertenencias a grupos con
+``selectinload`` (una consulta por página, no una por fila); el número de
+miembros de cada grupo sale de un agregado agrupado.
+"""
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from src.models import Group, GroupMember, Role, User
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 500
+
+USER_SORTS = {
+    "id": User.id,
+    "username": User.username,
+    "email": User.email,
+    "created_at": User.created_at,
+}
+GROUP_SORTS = {
+    "id": Group.id,
+    "name": Group.name,
+    "created_at": Group.created_at,
+}
+
+
+class ListingError(ValueError):
+    """Parámetro de listado inválido (se responde con 400)."""
+
+
+def encode_cursor(value, row_id) -> str:
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([value, row_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, column):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        value, row_id = json.loads(raw)
+        if value is not None and column.type.python_type is datetime:
+            value = datetime.fromisoformat(value)
+        return value, int(row_id)
+    except (ValueError, TypeError):
+        raise ListingError("Cursor inválido")
+
+
+def _page_params(args: dict, sorts: dict):
+    """
+    (columna, descendente, límite, cursor) a partir de ``sort``, ``order``,
+    ``limit`` y ``cursor``. Sin ``limit`` ni ``cursor`` el límite es None
+    (todas las filas).
+    """
+    sort = args.get("sort") or "id"
+    if sort not in sorts:
+        raise ListingError(f"sort debe ser uno de: {', '.join(sorts)}")
+    order = (args.get("order") or "asc").lower()
+    if order not in ("asc", "desc"):
+        raise ListingError("order debe ser 'asc' o 'desc'")
+    if not args.get("limit") and not args.get("cursor"):
+        return sorts[sort], order == "desc", None, None
+    try:
+        limit = int(args.get("limit") or DEFAULT_LIMIT)
+    except (TypeError, ValueError):
+        raise ListingError("limit debe ser un entero")
+    limit = max(1, min(limit, MAX_LIMIT))
+    return sorts[sort], order == "desc", limit, args.get("cursor")
+
+
+def keyset_page(query, column, id_column, descending: bool, limit: int, cursor=None):
+    """
+    Una página de ``query`` ordenada por (column, id); con ``limit`` None,
+    todas las filas.
+
+    Returns:
+        (filas, next_cursor); next_cursor es None en la última página
+    """
+    if cursor:
+        value, last_id = decode_cursor(cursor, column)
+        if descending:
+            query = query.filter(or_(column < value, and_(column == value, id_column < last_id)))
+        else:
+            query = query.filter(or_(column > value, and_(column == value, id_column > last_id)))
+
+    ordering = (column.desc(), id_column.desc()) if descending else (column.asc(), id_column.asc())
+    if limit is None:
+        return query.order_by(*ordering).all(), None
+    rows = query.order_by(*ordering).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        entity = last[0] if hasattr(last, "_fields") else last
+        next_cursor = encode_cursor(getattr(entity, column.key), entity.id)
+    return rows, next_cursor
+
+
+def _parse_bool(value):
+    if value is None or value == "":
+        return None
+    return str(value).lower() in ("1", "true", "yes", "si", "sí")
+
+
+def _user_to_dict(user: User) -> dict:
+    return {
+        "id": user.id,
+        "username": user.username,
+        "email": user.email,
+        "active": user.active,
+        "role_id": user.role_id,
+        "role_name": user.role.name if user.role else None,
+        "group_ids": sorted(member.group_id for member in user.groups),
+    }
+
+
+def _users_page(base_query, args: dict):
+    column, descending, limit, cursor = _page_params(args, USER_SORTS)
+
+    query = base_query.options(joinedload(User.role), selectinload(User.groups))
+    search = args.get("q")
+    if search:
+        pattern = f"%{search}%"
+        query = query.filter(or_(User.username.ilike(pattern), User.email.ilike(pattern)))
+    if args.get("role"):
+        query = query.filter(User.role.has(Role.name == args["role"]))
+    active = _parse_bool(args.get("active"))
+    if active is not None:
+        query = query.filter(User.active == active)
+    if args.get("group_id"):
+        query = query.filter(User.groups.any(GroupMember.group_id == int(args["group_id"])))
+
+    users, next_cursor = keyset_page(query, column, User.id, descending, limit, cursor)
+    return [_user_to_dict(user) for user in users], next_cursor, limit
+
+
+def list_users(session: Session, args: dict):
+    """
+    Usuarios, paginados solo si se pasa ``limit`` o ``cursor``.
+
+    Args:
+        session: Sesión de SQLAlchemy
+        args: Parámetros de la petición: q (username/email), role (nombre),
+            active, group_id, sort (id/username/email/created_at), order,
+            limit y cursor
+
+    Returns:
+        ({"users": [...], "next_cursor", "limit"}, status)
+    """
+    try:
+        users, next_cursor, limit = _users_page(session.query(User), args)
+    except ListingError as e:
+        return {"error": str(e)}, 400
+    except ValueError:
+        return {"error": "group_id debe ser un entero"}, 400
+    return {"users": users, "next_cursor": next_cursor, "limit": limit}, 200
+
+
+def list_group_users(session: Session, group_id: int, args: dict):
+    """
+    Usuarios de un grupo (mismos parámetros que ``list_users``). Solo pagina
+    si se pasa ``limit`` o ``cursor``.
+    """
+    if session.get(Group, group_id) is None:
+        return {"error": "Grupo no encontrado"}, 404
+
+    base_query = session.query(User).join(GroupMember, GroupMember.user_id == User.id) \
+        .filter(GroupMember.group_id == group_id)
+    try:
+        users, next_cursor, limit = _users_page(base_query, args)
+    except ListingError as e:
+        return {"error": str(e)}, 400
+    except ValueError:
+        return {"error": "group_id debe ser un entero"}, 400
+    return {"usuarios": users, "next_cursor": next_cursor, "limit": limit}, 200
+
+
+def list_groups(session: Session, args: dict):
+    """
+    Grupos con su número de miembros. Solo pagina si se pasa ``limit`` o
+    ``cursor``.
+
+    Args:
+        session: Sesión de SQLAlchemy
+        args: q (nombre), sort (id/name/created_at), order, limit y cursor
+
+    Returns:
+        ({"grupos": [...], "next_cursor", "limit"}, status)
+    """
+    try:
+        column, descending, limit, cursor = _page_params(args, GROUP_SORTS)
+
+        member_counts = session.query(GroupMember.group_id, func.count().label("member_count")) \
+            .group_by(GroupMember.group_id).subquery()
+        query = session.query(Group, func.coalesce(member_counts.c.member_count, 0)) \
+            .outerjoin(member_counts, member_counts.c.group_id == Group.id)
+        if args.get("q"):
+            query = query.filter(Group.name.ilike(f"%{args['q']}%"))
+
+        rows, next_cursor = keyset_page(query, column, Group.id, descending, limit, cursor)
+    except ListingError as e:
+        return {"error": str(e)}, 400
+
+    grupos = [{
+        "id": group.id,
+        "name": group.name,
+        "created_at": group.created_at.isoformat() if group.created_at else None,
+        "member_count": member_count,
+    } for group, member_count in rows]
+    return {"grupos": grupos, "next_cursor": next_cursor, "limit": limit}, 200
@@ -0,0 +1,429 @@
+"""
+Estado y control de los contenedores de DirectIA para el panel de admin.
+
+Las peticiones HTTP ya no lanzan ``docker`` dentro del worker:
+
+- ``ContainerMonitor`` refresca en un hilo en segundo plano el estado de los
+  contenedores (``docker ps`` + un único ``docker stats`` para todos los que
+  están corriendo) y la salida de ``docker compose ps``, cada ``interval``
+  segundos, y guarda la última foto en memoria. Solo sondea mientras alguien
+  la consulta: tras ``idle_timeout`` segundos sin lecturas se duerme hasta la
+  siguiente.
+- ``JobManager`` ejecuta start/stop/restart/recreate como trabajos en una
+  cola con un hilo propio; la ruta devuelve el id del trabajo y su estado se
+  consulta después. Al terminar un trabajo se pide un refresco del monitor.
+  El estado de los trabajos vive en SQLite (``DOCKER_JOBS_PATH``), compartido
+  por todos los workers: un trabajo lanzado en uno se consulta desde
+  cualquier otro, y solo uno de ellos ejecuta un trabajo a la vez.
+
+Ambos se crean al primer uso (``get_monitor`` / ``get_jobs``) y se relanzan
+si el proceso se bifurca (gunicorn), como el escritor de predicciones.
+"""
+
+import os
+import queue
+import sqlite3
+import subprocess
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from src.utils import metrics as prom
+
+COMPOSE_FILE = os.getenv("DOCKER_COMPOSE_FILE", "docker/docker-compose.yml")
+WORKDIR = os.getenv("COMPOSE_WORKDIR", os.getcwd())
+CONTAINER_PREFIX = "directia_"
+
+STATUS_INTERVAL = float(os.getenv("DOCKER_STATUS_INTERVAL", "5"))
+JOB_TIMEOUT = float(os.getenv("DOCKER_JOB_TIMEOUT", "600"))
+JOBS_DB_PATH = os.getenv("DOCKER_JOBS_PATH", "logs/docker_jobs.sqlite3")
+
+_STOP = object()
+
+
+def run_command(cmd: List[str], timeout: Optional[float] = None) -> subprocess.CompletedProcess:
+    """Ejecuta un comando de docker (requiere poder usar docker sin sudo)."""
+    try:
+        return subprocess.run(cmd, cwd=WORKDIR, capture_output=True, text=True, timeout=timeout)
+    except FileNotFoundError as e:
+        return subprocess.CompletedProcess(cmd, 127, "", str(e))
+    except subprocess.TimeoutExpired as e:
+        return subprocess.CompletedProcess(cmd, 124, e.stdout or "", f"Tiempo agotado ({timeout}s)")
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+# ---------------------------------------------------------------------------
+# Estado de los contenedores
+# ---------------------------------------------------------------------------
+
+def parse_docker_ps(output: str) -> List[Dict]:
+    """Salida de ``docker ps --format '{{.Names}}\\t{{.Status}}\\t{{.State}}'`` -> contenedores"""
+    containers = []
+    for line in output.strip().split("\n"):
+        parts = line.split("\t")
+        if len(parts) >= 3:
+            containers.append({"name": parts[0], "status": parts[1], "state": parts[2]})
+    return containers
+
+
+def parse_docker_stats(output: str) -> Dict[str, Dict]:
+    """Salida de ``docker stats --format '{{.Name}}\\t{{.CPUPerc}}\\t{{.MemUsage}}'`` -> {nombre: stats}"""
+    stats = {}
+    for line in output.strip().split("\n"):
+        parts = line.split("\t")
+        if len(parts) >= 3:
+            stats[parts[0]] = {"cpu": parts[1], "memory": parts[2]}
+    return stats
+
+
+def collect_status(runner: Callable = run_command) -> Dict:
+    """Una foto completa: contenedores con CPU/memoria y la salida de ``docker compose ps``."""
+    ps = runner(["docker", "ps", "-a", "--filter", f"name={CONTAINER_PREFIX}",
+                 "--format", "{{.Names}}\t{{.Status}}\t{{.State}}"], timeout=60)
+    containers = parse_docker_ps(ps.stdout) if ps.returncode == 0 else []
+
+    running = [container["name"] for container in containers if container["state"] == "running"]
+    stats = {}
+    if running:
+        res = runner(["docker", "stats", "--no-stream", "--format",
+                      "{{.Name}}\t{{.CPUPerc}}\t{{.MemUsage}}", *running], timeout=60)
+        if res.returncode == 0:
+            stats = parse_docker_stats(res.stdout)
+    for container in containers:
+        container.update(stats.get(container["name"], {"cpu": "N/A", "memory": "N/A"}))
+
+    compose = runner(["docker", "compose", "-f", COMPOSE_FILE, "ps"], timeout=60)
+    return {
+        "ok": ps.returncode == 0,
+        "error": None if ps.returncode == 0 else (ps.stderr or "docker ps falló").strip(),
+        "containers": containers,
+        "compose": {"ok": compose.returncode == 0, "output": compose.stdout or compose.stderr},
+        "updated_at": _now(),
+    }
+
+
+class ContainerMonitor:
+    """Última foto del estado de docker, refrescada por un hilo en segundo plano."""
+
+    def __init__(self, runner: Callable = run_command, interval: float = STATUS_INTERVAL,
+                 idle_timeout: float = 60.0):
+        self.runner = runner
+        self.interval = interval
+        self.idle_timeout = idle_timeout
+        self._snapshot: Optional[Dict] = None
+        self._refreshed_at = 0.0
+        self._last_read = 0.0
+        self._lock = threading.Lock()
+        self._pid = None
+        self._wake = threading.Event()
+        self._stopped = False
+
+    def _ensure_started(self) -> bool:
+        """Arranca el poller si no corre en este proceso. True si lo acaba de arrancar."""
+        # Tras un fork el hilo no existe en el hijo
+        if self._pid == os.getpid():
+            return False
+        with self._lock:
+            if self._pid == os.getpid():
+                return False
+            self._pid = os.getpid()
+            self._stopped = False
+            threading.Thread(target=self._run, name="docker-status-poller", daemon=True).start()
+            return True
+
+    def _run(self) -> None:
+        pid = os.getpid()
+        while not self._stopped and self._pid == pid:
+            # Las peticiones de refresco anteriores quedan cubiertas por este
+            self._wake.clear()
+            self.refresh()
+            idle = time.monotonic() - self._last_read > self.idle_timeout
+            # Sin lectores: esperar a la siguiente lectura en lugar de sondear
+            self._wake.wait(None if idle else self.interval)
+
+    def refresh(self) -> Dict:
+        """Toma una foto ahora (en el hilo que llama)."""
+        try:
+            snapshot = collect_status(self.runner)
+        except Exception as e:
+            snapshot = {"ok": False, "error": str(e), "containers": [],
+                        "compose": {"ok": False, "output": str(e)}, "updated_at": _now()}
+        with self._lock:
+            self._snapshot = snapshot
+            self._refreshed_at = time.monotonic()
+        return snapshot
+
+    def request_refresh(self) -> None:
+        """Despierta al poller (p. ej. al terminar un trabajo)."""
+        self._wake.set()
+
+    def snapshot(self) -> Dict:
+        """
+        Última foto, con su antigüedad en ``age_s``. Nunca espera a docker: si
+        el poller aún no ha terminado la primera, devuelve una foto vacía con
+        ``pending`` a True y el cliente vuelve a consultar. ``stale`` indica
+        que la foto tiene más de dos intervalos.
+        """
+        now = time.monotonic()
+        was_idle = now - self._last_read > self.idle_timeout
+        self._last_read = now
+        # Un poller recién arrancado (o con la primera foto en curso) ya está refrescando
+        started = self._ensure_started()
+        stale = now - self._refreshed_at > self.interval * 2
+        if not started and self._snapshot is not None and (was_idle or stale):
+            self._wake.set()
+
+        with self._lock:
+            if self._snapshot is None:
+                return {"ok": False, "error": "Estado aún no disponible", "containers": [],
+                        "compose": {"ok": False, "output": ""}, "updated_at": None, "age_s": None,
+                        "pending": True, "stale": True}
+            snapshot = dict(self._snapshot)
+            age = time.monotonic() - self._refreshed_at
+        snapshot["age_s"] = round(age, 1)
+        snapshot["pending"] = False
+        snapshot["stale"] = age > self.interval * 2
+        return snapshot
+
+    def stop(self) -> None:
+        self._stopped = True
+        self._wake.set()
+
+
+# ---------------------------------------------------------------------------
+# Trabajos asíncronos
+# ---------------------------------------------------------------------------
+
+_JOBS_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS docker_jobs (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        id TEXT NOT NULL UNIQUE,
+        action TEXT NOT NULL,
+        target TEXT NOT NULL,
+        status TEXT NOT NULL,
+        created_at TEXT NOT NULL,
+        started_at TEXT,
+        finished_at TEXT,
+        returncode INTEGER,
+        output TEXT NOT NULL DEFAULT '',
+        expires_at REAL
+    )
+"""
+_JOB_FIELDS = ("id", "action", "target", "status", "created_at", "started_at", "finished_at", "returncode",
+               "output")
+
+
+class JobManager:
+    """
+    Cola de acciones de docker ejecutadas una a una (dos ``docker compose`` a
+    la vez sobre el mismo proyecto se pisan).
+
+    Cada worker ejecuta en su hilo los trabajos que recibe, pero el estado se
+    guarda en SQLite: cualquier worker lo consulta, y un trabajo solo pasa a
+    "running" si ningún otro worker tiene uno en marcha. Un trabajo "running"
+    cuyo plazo (``timeout`` por comando) ha vencido se da por abandonado (su
+    worker murió) y no bloquea a los demás. Conserva los últimos ``keep``
+    trabajos terminados.
+    """
+
+    def __init__(self, runner: Callable = run_command, keep: int = 100, timeout: float = JOB_TIMEOUT,
+                 on_finish: Optional[Callable[[Dict], None]] = None, db_path=JOBS_DB_PATH,
+                 poll_interval: float = 0.5):
+        self.runner = runner
+        self.keep = keep
+        self.timeout = timeout
+        self.on_finish = on_finish
+        self.poll_interval = poll_interval
+        self.db_path = str(db_path)
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue: queue.Queue = queue.Queue()
+
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(_JOBS_SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Transacciones explícitas: la reserva de un trabajo usa BEGIN IMMEDIATE
+        return sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+
+    def _ensure_started(self) -> None:
+        if self._pid == os.getpid():
+            return
+        if self._pid is not None:
+            # Tras un fork el lock pudo copiarse tomado y el hilo no existe en el hijo
+            self._lock = threading.Lock()
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._queue = queue.Queue()
+            threading.Thread(target=self._run, name="docker-jobs", daemon=True).start()
+
+    def qsize(self) -> int:
+        return self._queue.qsize()
+
+    def submit(self, action: str, target: str, commands: List[List[str]]) -> Dict:
+        """
+        Encola una acción.
+
+        Args:
+            action: Nombre de la acción (start, stop, restart, recreate)
+            target: Contenedor o "compose"
+            commands: Comandos a ejecutar en orden; se detiene en el primero que falle
+
+        Returns:
+            Copia del trabajo en estado "queued"
+        """
+        self._ensure_started()
+        job = {
+            "id": uuid.uuid4().hex,
+            "action": action,
+            "target": target,
+            "status": "queued",
+            "created_at": _now(),
+            "started_at": None,
+            "finished_at": None,
+            "returncode": None,
+            "output": "",
+        }
+        conn = self._connect()
+        try:
+            conn.execute("INSERT INTO docker_jobs (id, action, target, status, created_at) VALUES (?, ?, ?, ?, ?)",
+                         (job["id"], action, target, job["status"], job["created_at"]))
+            conn.execute(
+                "DELETE FROM docker_jobs WHERE status IN ('succeeded', 'failed') AND seq NOT IN "
+                "(SELECT seq FROM docker_jobs ORDER BY seq DESC LIMIT ?)", (self.keep,)
+            )
+        finally:
+            conn.close()
+        self._queue.put((job["id"], commands))
+        return job
+
+    def _select(self, where: str = "", params=()) -> List[Dict]:
+        conn = self._connect()
+        try:
+            rows = conn.execute(f"SELECT {', '.join(_JOB_FIELDS)} FROM docker_jobs {where} ORDER BY seq DESC",
+                                params).fetchall()
+        finally:
+            conn.close()
+        return [dict(zip(_JOB_FIELDS, row)) for row in rows]
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        jobs = self._select("WHERE id = ?", (job_id,))
+        return jobs[0] if jobs else None
+
+    def list(self) -> List[Dict]:
+        return self._select()
+
+    def _claim(self, job_id: str, commands: int) -> bool:
+        """Pasa el trabajo a "running" si ningún worker tiene otro en marcha."""
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            busy = conn.execute("SELECT 1 FROM docker_jobs WHERE status = 'running' AND expires_at > ? LIMIT 1",
+                                (now,)).fetchone()
+            if busy:
+                conn.execute("ROLLBACK")
+                return False
+            conn.execute("UPDATE docker_jobs SET status = 'running', started_at = ?, expires_at = ? WHERE id = ?",
+                         (_now(), now + self.timeout * max(commands, 1), job_id))
+            conn.execute("COMMIT")
+            return True
+        finally:
+            conn.close()
+
+    def _finish(self, job_id: str, returncode: int, output: str) -> Dict:
+        conn = self._connect()
+        try:
+            conn.execute("UPDATE docker_jobs SET status = ?, returncode = ?, output = ?, finished_at = ?, "
+                         "expires_at = NULL WHERE id = ?",
+                         ("succeeded" if returncode == 0 else "failed", returncode, output, _now(), job_id))
+        finally:
+            conn.close()
+        return self.get(job_id)
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            job_id, commands = item
+            try:
+                while not self._claim(job_id, len(commands)):
+                    time.sleep(self.poll_interval)
+            except sqlite3.Error as e:
+                print(f"[WARNING] No se pudo iniciar el trabajo de docker {job_id}: {e}")
+                continue
+
+            outputs = []
+            returncode = 0
+            for cmd in commands:
+                res = self.runner(cmd, timeout=self.timeout)
+                outputs.append(res.stdout or res.stderr or "")
+                returncode = res.returncode
+                if returncode != 0:
+                    break
+
+            try:
+                job = self._finish(job_id, returncode, "".join(outputs))
+                if self.on_finish:
+                    self.on_finish(job)
+            except Exception as e:
+                print(f"[WARNING] Error tras el trabajo de docker {job_id}: {e}")
+
+    def close(self) -> None:
+        if self._pid == os.getpid():
+            self._queue.put(_STOP)
+
+
+def compose_commands(action: str) -> List[List[str]]:
+    """Comandos de ``docker compose`` para start/stop/restart de todo el proyecto."""
+    verbs = {"start": ["up", "-d"], "stop": ["down"], "restart": ["restart"]}
+    return [["docker", "compose", "-f", COMPOSE_FILE, *verbs[action]]]
+
+
+def container_commands(action: str, container_name: str) -> List[List[str]]:
+    """Comandos de start/stop/restart/recreate de un contenedor."""
+    if action == "recreate":
+        service_name = container_name.replace(CONTAINER_PREFIX, "")
+        return [
+            ["docker", "stop", container_name],
+            ["docker", "rm", container_name],
+            ["docker", "compose", "-f", COMPOSE_FILE, "up", "-d", service_name],
+        ]
+    return [["docker", action, container_name]]
+
+
+_monitor: Optional[ContainerMonitor] = None
+_jobs: Optional[JobManager] = None
+_singletons_lock = threading.Lock()
+
+
+def get_monitor() -> ContainerMonitor:
+    global _monitor
+    with _singletons_lock:
+        if _monitor is None:
+            _monitor = ContainerMonitor()
+        return _monitor
+
+
+def get_jobs() -> JobManager:
+    global _jobs
+    monitor = get_monitor()
+    with _singletons_lock:
+        if _jobs is None:
+            _jobs = JobManager(on_finish=lambda job: monitor.request_refresh())
+            prom.register_queue("docker_jobs", _jobs.qsize)
+        return _jobs
@@ -44,20 +44,26 @@ def list_files():
             path = os.path.join(root, f)
             file_info = get_file_info(f)
 
+            # El archivo puede borrarse o moverse mientras se recorre el árbol
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+
             elementos.append({
                 "nombre": ruta,
                 "tipo": file_info['type'],
                 "icon": file_info['icon'],
                 "category": file_info['category'],
                 "extension": file_info['extension'],
-                "size": os.path.getsize(path),
-                "modified": datetime.fromtimestamp(os.path.getmtime(path)).isoformat()
+                "size": stat.st_size,
+                "modified": datetime.fromtimestamp(stat.st_mtime).isoformat()
             })
 
     return {"elementos": elementos}
 
 
-def upload_file(file, folder, user, metadata_col, ia_activa=False, ocr_fn=None, beto_fn=None):
+def upload_file(file, folder, user, metadata_col, ia_activa=False, pipeline=None, debug_timing=False, indexer=None):
     if not file:
         return {"error": "No file uploaded"}, 400
 
@@ -113,35 +119,40 @@ def upload_file(file, folder, user, metadata_col, ia_activa=False, ocr_fn=None,
         "status": "uploaded"
     }
 
-    if ia_activa and ocr_fn and beto_fn:
+    timings = None
+    category_id = None
+    tipo_nombre = None
+    if ia_activa and pipeline is not None:
         print(f"[IA] Clasificación activada para '{filename}'")
         try:
-            print(f"[IA] Ejecutando OCR sobre: {file_path}")
-            texto_extraido = ocr_fn(file_path)
-            print(f"[IA] OCR completado. {len(texto_extraido)} caracteres extraídos.")
-            print(f"[IA] Fragmento OCR → {texto_extraido[:300]}")
-
-            print("[IA] Ejecutando BETO...")
-            tipo, confianza, nombre_sugerido, carpeta_sugerida = beto_fn(texto_extraido)
-            print(f"[IA] Resultado BETO → Tipo: {tipo} | Confianza: {confianza:.2f}")
+            resultado = pipeline.classify_file(file_path, username=user)
+            timings = resultado.get("timings")
+            category_id = resultado.get("category_id")
+            tipo_nombre = resultado.get("tipo_documento")
+            print(f"[IA] Resultado → Tipo: {resultado['tipo_documento']} | Confianza: {resultado['confianza']:.2f}")
 
             metadata.update({
                 "clasificacion": {
-                    "tipo": tipo,
-                    "confianza": confianza,
-                    "nombre_sugerido": nombre_sugerido,
-                    "carpeta_sugerida": carpeta_sugerida,
-                    "procesado_por": "BETO"
+                    "tipo": resultado["category_id"],
+                    "confianza": resultado["confianza"],
+                    "nombre_sugerido": resultado.get("nombre_sugerido"),
+                    "carpeta_sugerida": resultado["carpeta_sugerida"],
+                    "procesado_por": resultado["classifier"]
                 }
             })
 
         except Exception as e:
-            print(f"[ERROR IA] Error durante OCR o clasificación: {e}")
+            print(f"[ERROR IA] Error durante extracción o clasificación: {e}")
             metadata["clasificacion_error"] = str(e)
 
     result = metadata_col.insert_one(metadata)
     metadata["_id"] = str(result.inserted_id)
 
+    # Indexado para la búsqueda en segundo plano (reutiliza el texto ya extraído)
+    if indexer is not None:
+        indexer.submit(file_path, relative_path, filename, file_id=file_id,
+                       tipo=tipo_nombre, category_id=category_id, user=user)
+
     response = {"message": "File uploaded successfully", "metadata": metadata}
     if ia_activa:
         response.update({
@@ -150,6 +161,8 @@ def upload_file(file, folder, user, metadata_col, ia_activa=False, ocr_fn=None,
             "nombre_sugerido": metadata.get("clasificacion", {}).get("nombre_sugerido"),
             "carpeta_sugerida": metadata.get("clasificacion", {}).get("carpeta_sugerida")
         })
+        if debug_timing:
+            response["timings"] = timings
 
     print(f"[UPLOAD] Subida completada: {filename}")
     return response, 201
@@ -162,7 +175,7 @@ def download_file(filepath):
     return False, None, None
 
 
-def delete_element(ruta, metadata_col):
+def delete_element(ruta, metadata_col, indexer=None):
     decoded_ruta = unquote(ruta)
     full_path = os.path.join(BASE_STORAGE_PATH, decoded_ruta)
 
@@ -189,6 +202,9 @@ def delete_element(ruta, metadata_col):
         result_children = metadata_col.delete_many({"relative_path": {"$regex": f"^{folder_pattern}"}})
         print(f"[DELETE] Eliminados {result_children.deleted_count} archivos dentro de la carpeta")
 
+    if indexer is not None:
+        indexer.remove(decoded_ruta)
+
     return {"message": "Elemento eliminado correctamente"}, 200
 
 
@@ -244,7 +260,7 @@ def create_file(ruta, user="unknown", metadata_col=None):
     return {"message": "Archivo creado"}, 201
 
 
-def move_file(origen_rel, destino_rel, metadata_col):
+def move_file(origen_rel, destino_rel, metadata_col, indexer=None):
     origen = os.path.join(BASE_STORAGE_PATH, origen_rel)
     destino = os.path.join(BASE_STORAGE_PATH, destino_rel)
 
@@ -271,4 +287,7 @@ def move_file(origen_rel, destino_rel, metadata_col):
         }}
     )
 
+    if indexer is not None:
+        indexer.move(os.path.relpath(origen, BASE_STORAGE_PATH), os.path.relpath(destino, BASE_STORAGE_PATH))
+
     return {"ok": True, "new_path": new_relative, "filename": new_filename}, 200
@@ -0,0 +1,360 @@
+"""
+Árbol de plantillas de carpetas (FolderTemplate).
+
+Las plantillas de un grupo se cargan con una sola consulta recursiva (CTE
+desde las carpetas raíz del grupo hacia sus descendientes) y la jerarquía se
+monta en memoria en O(n), sin los SELECT perezosos de ``folder.children``.
+
+El árbol serializado se cachea por grupo (``FolderTreeCache``); las rutas
+que crean, modifican o eliminan plantillas invalidan los grupos afectados.
+La caché es por proceso, así que además caduca a los ``FOLDER_TREE_CACHE_TTL``
+segundos por si otro worker modificó las plantillas.
+
+``apply_structure`` materializa uno o varios árboles en el almacenamiento:
+calcula todas las rutas de antemano, lee los metadatos existentes con una
+sola consulta ``$in``, crea los directorios que faltan y escribe todas las
+altas y cambios de Mongo en un único ``bulk_write`` no ordenado.
+"""
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
+from sqlalchemy import or_, select
+
+from src.models import FolderTemplate
+
+FOLDER_TREE_CACHE_TTL = float(os.getenv("FOLDER_TREE_CACHE_TTL", "300"))
+
+
+def template_to_dict(folder):
+    """Campos públicos de una plantilla (sin hijos)."""
+    return {
+        "id": folder.id,
+        "name": folder.name,
+        "description": folder.description,
+        "icon": folder.icon,
+        "parent_id": folder.parent_id,
+        "order": folder.order,
+        "protected": folder.protected,
+        "group_id": folder.group_id,
+    }
+
+
+def load_templates(session, group_id=None, include_global=False):
+    """
+    Plantillas de las carpetas raíz seleccionadas y todos sus descendientes.
+
+    Args:
+        session: Sesión de SQLAlchemy
+        group_id: Grupo de las carpetas raíz; None para todas las raíces
+        include_global: Incluir también las raíces globales (group_id NULL)
+
+    Returns:
+        Lista de FolderTemplate ordenada por (order, id)
+    """
+    query = session.query(FolderTemplate)
+
+    if group_id is not None:
+        table = FolderTemplate.__table__
+        condition = table.c.group_id == group_id
+        if include_global:
+            condition = or_(condition, table.c.group_id.is_(None))
+
+        # UNION (no UNION ALL): termina aunque haya un ciclo en parent_id
+        tree = select(table.c.id).where(table.c.parent_id.is_(None), condition).cte("tree", recursive=True)
+        tree = tree.union(select(table.c.id).where(table.c.parent_id == tree.c.id))
+        query = query.filter(FolderTemplate.id.in_(select(tree.c.id)))
+
+    return query.order_by(FolderTemplate.order, FolderTemplate.id).all()
+
+
+def build_tree(templates):
+    """
+    Monta la jerarquía serializada a partir de una lista plana, en O(n).
+
+    Args:
+        templates: FolderTemplate ya ordenadas (cada nivel conserva ese orden)
+
+    Returns:
+        Lista de carpetas raíz, cada una con su lista ``children``
+    """
+    nodes = {}
+    for folder in templates:
+        node = template_to_dict(folder)
+        node["children"] = []
+        nodes[folder.id] = node
+
+    roots = []
+    for folder in templates:
+        if folder.parent_id is None:
+            roots.append(nodes[folder.id])
+        elif folder.parent_id in nodes:
+            nodes[folder.parent_id]["children"].append(nodes[folder.id])
+    return roots
+
+
+def count_nodes(tree):
+    """Número total de carpetas de un árbol serializado."""
+    return sum(1 + count_nodes(node["children"]) for node in tree)
+
+
+def _group_key(group_id):
+    # El group_id llega como int o como texto (query string / JSON)
+    if group_id is None or group_id == "":
+        return None
+    return int(group_id)
+
+
+class FolderTreeCache:
+    """Árboles serializados por (group_id, include_global), con caducidad."""
+
+    def __init__(self, ttl=FOLDER_TREE_CACHE_TTL):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+        # Se incrementa en cada invalidación: un árbol leído antes no se guarda
+        self.generation = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            tree, stored_at = entry
+            if time.monotonic() - stored_at >= self.ttl:
+                del self._entries[key]
+                return None
+            return tree
+
+    def put(self, key, tree, generation=None):
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._entries[key] = (tree, time.monotonic())
+
+    def invalidate(self, *group_ids):
+        """
+        Descarta los árboles de los grupos indicados y la vista de todos los
+        grupos. Una plantilla global (None) aparece en todos: vacía la caché.
+        """
+        group_ids = {_group_key(group_id) for group_id in group_ids}
+        with self._lock:
+            self.generation += 1
+            if None in group_ids:
+                self._entries.clear()
+                return
+            stale = [key for key in self._entries if key[0] is None or key[0] in group_ids]
+            for key in stale:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_tree_cache = FolderTreeCache()
+
+
+def get_tree(session, group_id=None, include_global=False):
+    """
+    Árbol serializado de plantillas (cacheado). No modificar el resultado.
+
+    Args:
+        session: Sesión de SQLAlchemy
+        group_id: Grupo de las carpetas raíz; None para todas las raíces
+        include_global: Incluir también las raíces globales
+
+    Returns:
+        Lista de carpetas raíz con sus ``children``
+    """
+    group_id = _group_key(group_id)
+    key = (group_id, bool(include_global))
+    tree = _tree_cache.get(key)
+    if tree is None:
+        generation = _tree_cache.generation
+        tree = build_tree(load_templates(session, group_id, include_global))
+        _tree_cache.put(key, tree, generation)
+    return tree
+
+
+def invalidate_tree_cache(*group_ids):
+    """Invalida los árboles cacheados de los grupos indicados."""
+    _tree_cache.invalidate(*group_ids)
+
+
+def lineage_group_ids(folder):
+    """
+    Grupos de una plantilla y de todos sus antecesores.
+
+    Una carpeta aparece en el árbol del grupo de su raíz, así que al crearla,
+    modificarla o eliminarla hay que invalidar toda la cadena hasta la raíz.
+
+    Args:
+        folder: FolderTemplate (con ``parent`` accesible)
+
+    Returns:
+        Lista de group_id desde la carpeta hasta su raíz, sin repetidos
+    """
+    group_ids = []
+    seen = set()
+    while folder is not None and folder.id not in seen:
+        seen.add(folder.id)
+        if folder.group_id not in group_ids:
+            group_ids.append(folder.group_id)
+        folder = folder.parent
+    return group_ids
+
+
+def clear_tree_cache():
+    _tree_cache.clear()
+
+
+# ---------------------------------------------------------------------------
+# Aplicación de la estructura al almacenamiento
+# ---------------------------------------------------------------------------
+
+def plan_folders(trees):
+    """
+    Rutas destino de uno o varios árboles, padres antes que hijos.
+
+    Args:
+        trees: Árboles serializados (``get_tree``) en orden de prioridad
+
+    Returns:
+        Lista de dicts con path, filename, relative_path y la plantilla de
+        origen. Una ruta repetida (p. ej. una carpeta global aplicada a varios
+        grupos) aparece una sola vez, con la primera plantilla que la define.
+    """
+    planned = {}
+
+    def visit(node, parent_path):
+        path = f"{parent_path}/{node['name']}" if parent_path else node["name"]
+        if path not in planned:
+            planned[path] = {
+                "path": path,
+                "filename": node["name"],
+                "relative_path": f"/{parent_path}" if parent_path else "/",
+                "protected": node["protected"],
+                "template_id": node["id"],
+                "group_id": node["group_id"],
+            }
+        for child in node["children"]:
+            visit(child, path)
+
+    for tree in trees:
+        for root in tree:
+            visit(root, "")
+    return list(planned.values())
+
+
+def _existing_folders(metadata_col, planned):
+    """Metadatos de carpeta ya registrados para las rutas planificadas, en una consulta."""
+    if not planned:
+        return {}
+    cursor = metadata_col.find({
+        "tipo": "carpeta",
+        "filename": {"$in": sorted({folder["filename"] for folder in planned})},
+        "relative_path": {"$in": sorted({folder["relative_path"] for folder in planned})},
+    }, {"_id": 1, "filename": 1, "relative_path": 1, "protegida": 1})
+
+    existing = {}
+    for document in cursor:
+        key = (document.get("relative_path"), document.get("filename"))
+        existing.setdefault(key, document)
+    return existing
+
+
+def apply_structure(metadata_col, base_dir, trees, user="admin"):
+    """
+    Crea en ``base_dir`` las carpetas de los árboles y sincroniza sus metadatos.
+
+    Args:
+        metadata_col: Colección ``metadata`` de Mongo
+        base_dir: Directorio raíz del almacenamiento
+        trees: Dict {group_id: árbol serializado}; los grupos comparten las
+            carpetas globales, que se aplican una sola vez
+        user: Usuario que figura como creador de los metadatos nuevos
+
+    Returns:
+        Informe tipo diff: listas ``created`` (directorios creados),
+        ``inserted``, ``updated`` (protección cambiada) y ``unchanged``
+        (metadatos), ``errors``, ``diff`` (una línea por carpeta con ``+``,
+        ``~``, ``=`` o ``!``) y un resumen por grupo en ``groups``
+    """
+    planned = plan_folders(trees.values())
+    existing = _existing_folders(metadata_col, planned)
+    now = datetime.now(timezone.utc)
+
+    report = {"created": [], "inserted": [], "updated": [], "unchanged": [], "errors": [], "diff": []}
+    status = {}
+    operations = []
+    failed = []
+
+    # Directorios: los padres van antes que los hijos, así que un fallo se propaga hacia abajo
+    for folder in planned:
+        path = folder["path"]
+        if any(path.startswith(prefix) for prefix in failed):
+            status[path] = "error"
+            report["diff"].append(f"! {path}")
+            continue
+        full_path = os.path.join(base_dir, *path.split("/"))
+        try:
+            if not os.path.isdir(full_path):
+                os.makedirs(full_path, exist_ok=True)
+                report["created"].append(path)
+        except OSError as e:
+            failed.append(path + "/")
+            status[path] = "error"
+            report["errors"].append(f"Error creando {folder['filename']}: {e}")
+            report["diff"].append(f"! {path}")
+            continue
+
+        document = existing.get((folder["relative_path"], folder["filename"]))
+        if document is None:
+            operations.append(InsertOne({
+                "file_id": str(uuid.uuid4()),
+                "filename": folder["filename"],
+                "relative_path": folder["relative_path"],
+                "tipo": "carpeta",
+                "protegida": folder["protected"],
+                "created_at": now,
+                "user": user,
+                "template_id": folder["template_id"],
+                "group_id": folder["group_id"],
+            }))
+            status[path] = "inserted"
+            report["diff"].append(f"+ {path}")
+        elif document.get("protegida") != folder["protected"]:
+            operations.append(UpdateOne({"_id": document["_id"]}, {"$set": {"protegida": folder["protected"]}}))
+            status[path] = "updated"
+            report["diff"].append(f"~ {path} (protegida: {document.get('protegida')} -> {folder['protected']})")
+        else:
+            status[path] = "unchanged"
+            report["diff"].append(f"= {path}")
+        report[status[path]].append(path)
+
+    if operations:
+        try:
+            metadata_col.bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get("writeErrors", []):
+                report["errors"].append(f"Error registrando metadatos: {error.get('errmsg')}")
+
+    # Resumen por grupo: cada grupo cuenta todas las carpetas de su árbol
+    report["groups"] = {}
+    for group_id, tree in trees.items():
+        counts = {"total": 0, "inserted": 0, "updated": 0, "unchanged": 0, "error": 0}
+        for folder in plan_folders([tree]):
+            counts["total"] += 1
+            counts[status[folder["path"]]] += 1
+        report["groups"][group_id] = counts
+
+    return report
@@ -1,43 +1,21 @@
 import os
-import sys
-from pathlib import Path
-from werkzeug.utils import secure_filename
 from flask import request, current_app
 
-# Add ai_directia to path
-sys.path.insert(0, str(Path(__file__).parent.parent.parent / 'ai_directia'))
-
-from ai_directia.inference.classifier import DocumentClassifier
-
-# Initialize classifier (singleton pattern)
-_classifier = None
+from src.ia.pipeline import get_pipeline
 
 
 def get_classifier():
     """
-    Get or initialize the classifier (singleton)
+    Get the shared classification pipeline (singleton)
 
     Returns:
-        DocumentClassifier instance or None if initialization fails
+        DocumentPipeline instance or None if initialization fails
     """
-    global _classifier
-
-    if _classifier is None:
-        try:
-            # Path to model and config relative to FlaskServerTFG root
-            model_dir = str(Path(__file__).parent.parent.parent / 'ai_directia' / 'models' / 'v1_tfidf_svm')
-            config_path = str(Path(__file__).parent.parent.parent / 'ai_directia' / 'config' / 'categories.json')
-
-            _classifier = DocumentClassifier(
-                model_dir=model_dir,
-                config_path=config_path
-            )
-            print("[OK] AI Classifier initialized successfully")
-        except Exception as e:
-            print(f"[ERROR] Could not initialize AI classifier: {e}")
-            _classifier = None
-
-    return _classifier
+    try:
+        return get_pipeline()
+    except Exception as e:
+        print(f"[ERROR] Could not initialize AI classifier: {e}")
+        return None
 
 
 def clasificar_documento(file):
@@ -60,6 +38,7 @@ def clasificar_documento(file):
         - descripcion: descripción de la categoría
         - top_predictions: lista de las 3 mejores predicciones
         - metadata: información sobre el archivo procesado
+        - timings: spans por etapa (solo con ?debug=timing)
     """
     if not file:
         return {"success": False, "error": "No se subió archivo"}, 400
@@ -94,12 +73,17 @@ def clasificar_documento(file):
             return {"success": False, "error": "El archivo no tiene extensión"}, 400
 
         # Classify document
-        resultado = classifier.classify_file_bytes(
-            file_bytes=file_bytes,
-            file_extension=file_extension,
-            file_name=file.filename
+        resultado = classifier.classify_bytes(
+            file_bytes,
+            file_extension,
+            file_name=file.filename,
+            username=username
         )
 
+        # Per-stage timings only when explicitly requested (?debug=timing)
+        if request.args.get('debug') != 'timing':
+            resultado.pop('timings', None)
+
         # Check if classification failed
         if 'error' in resultado:
             return {"success": False, "error": resultado['error']}, 400
@@ -0,0 +1,45 @@
+"""
+Búsqueda de texto completo (``GET /api/search``) sobre el índice de
+``src.ia.search_index``.
+"""
+
+from src.ia.search_index import DEFAULT_LIMIT, MAX_LIMIT, SearchIndex
+
+
+def _int_param(args: dict, name: str, default: int) -> int:
+    try:
+        return int(args.get(name) or default)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} debe ser un entero")
+
+
+def buscar_documentos(args: dict, index: SearchIndex):
+    """
+    Busca documentos por su contenido.
+
+    Args:
+        args: Parámetros de la petición: q (obligatorio), folder (prefijo de
+            carpeta), tipo (tipo o category_id), limit y offset
+        index: Índice de búsqueda
+
+    Returns:
+        ({"results": [...], "total", "limit", "offset", "next_offset"}, status)
+    """
+    q = (args.get("q") or "").strip()
+    if not q:
+        return {"error": "Se requiere el parámetro 'q'"}, 400
+
+    try:
+        limit = max(1, min(_int_param(args, "limit", DEFAULT_LIMIT), MAX_LIMIT))
+        offset = max(0, _int_param(args, "offset", 0))
+    except ValueError as e:
+        return {"error": str(e)}, 400
+
+    try:
+        page = index.search(q, folder=args.get("folder"), tipo=args.get("tipo"), limit=limit, offset=offset)
+    except Exception as e:
+        print(f"[ERROR] Búsqueda fallida: {e}")
+        return {"error": "Error en la búsqueda"}, 500
+
+    next_offset = offset + limit if offset + limit < page["total"] else None
+    return {**page, "limit": limit, "offset": offset, "next_offset": next_offset}, 200
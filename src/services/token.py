@@ -1,4 +1,7 @@
 import jwt, datetime
+import threading
+import time
+from collections import OrderedDict
 from flask import current_app
 
 def _create_access_token(user):
@@ -21,8 +24,75 @@ def create_refresh_token(user_id):
     }
     return jwt.encode(payload, current_app.config["SECRET_KEY"], algorithm="HS256")
 
+class TokenCache:
+    """
+    LRU acotada de tokens ya verificados, indexada por la firma del token.
+
+    Una entrada guarda el token completo, sus claims y su ``exp``: solo se
+    reutiliza si el token es idéntico y no ha expirado, así que un acierto
+    equivale a repetir ``jwt.decode`` sin recalcular el HMAC.
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, token):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            cached_token, claims, exp = entry
+            if cached_token != token:
+                return None
+            if exp is not None and exp <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return claims
+
+    def put(self, key, token, claims):
+        exp = claims.get("exp")
+        with self._lock:
+            self._entries[key] = (token, claims, float(exp) if isinstance(exp, (int, float)) else None)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_token_cache = TokenCache()
+
+
 def verify_token(token):
-    try:
-        return jwt.decode(token, current_app.config["SECRET_KEY"], algorithms=["HS256"])
-    except jwt.ExpiredSignatureError:
+    """
+    Verifica un JWT de acceso (HS256) con la SECRET_KEY de la app.
+
+    Las verificaciones repetidas del mismo token salen de una LRU acotada
+    (``TokenCache``) hasta su ``exp``.
+
+    Returns:
+        Copia de los claims, o None si el token falta, es inválido o expiró
+    """
+    if not token:
         return None
+
+    secret = current_app.config["SECRET_KEY"]
+    # La clave incluye el secreto: cambiarlo invalida lo cacheado
+    key = (secret, token.rsplit(".", 1)[-1])
+
+    claims = _token_cache.get(key, token)
+    if claims is None:
+        try:
+            claims = jwt.decode(token, secret, algorithms=["HS256"])
+        except jwt.InvalidTokenError:
+            return None
+        _token_cache.put(key, token, claims)
+    return dict(claims)
@@ -0,0 +1,167 @@
+"""
+Perfil del arranque en frío de un worker.
+
+Uso:
+    python -m src.startup_profile
+    python -m src.startup_profile --module src.ia.pipeline --min-ms 1
+    python -m src.startup_profile --ocr --json
+
+Importa ``--module`` (por defecto ``src.app``) en un intérprete limpio con
+``python -X importtime`` y muestra el árbol de importaciones con el tiempo
+acumulado de cada módulo, avisando si alguna dependencia pesada (torch, cv2,
+sklearn...) se importa al arrancar. Después mide cuánto tarda la carga de la
+IA (``src.ia.pipeline.warm_up``), que en el servidor ocurre en el primer uso.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# Dependencias que no deben importarse al arrancar un worker
+HEAVY_MODULES = ("torch", "transformers", "tensorflow", "cv2", "pytesseract", "pdf2image",
+                 "sklearn", "scipy", "pandas", "joblib", "numpy")
+
+
+def parse_importtime(output: str) -> List[Dict]:
+    """
+    Convierte la salida de ``-X importtime`` en un árbol.
+
+    La salida lista cada módulo después de los que importa, con la
+    profundidad indicada por la sangría del nombre.
+
+    Returns:
+        Lista de nodos raíz con module, self_ms, cumulative_ms y children
+    """
+    pending = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # cabecera
+        name = fields[2]
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        node = {
+            "module": name.strip(),
+            "self_ms": int(fields[0]) / 1000,
+            "cumulative_ms": int(fields[1]) / 1000,
+            "children": pending.pop(depth + 1, []),
+        }
+        pending.setdefault(depth, []).append(node)
+    return pending.get(0, [])
+
+
+def iter_modules(nodes: List[Dict]):
+    for node in nodes:
+        yield node
+        yield from iter_modules(node["children"])
+
+
+def heavy_imports(nodes: List[Dict]) -> List[str]:
+    """Dependencias pesadas (paquetes de primer nivel) presentes en el árbol."""
+    found = {node["module"].split(".")[0] for node in iter_modules(nodes)}
+    return [name for name in HEAVY_MODULES if name in found]
+
+
+def render_tree(nodes: List[Dict], min_ms: float = 5.0, max_depth: int = 6, depth: int = 0) -> List[str]:
+    """
+    Líneas del árbol ordenado por tiempo acumulado, sin los módulos que
+    tarden menos de ``min_ms`` ni los que pasen de ``max_depth``.
+    """
+    lines = []
+    for node in sorted(nodes, key=lambda n: n["cumulative_ms"], reverse=True):
+        if node["cumulative_ms"] < min_ms or depth > max_depth:
+            continue
+        lines.append(f"{node['cumulative_ms']:>10.1f} {node['self_ms']:>9.1f}  {'  ' * depth}{node['module']}")
+        lines.extend(render_tree(node["children"], min_ms, max_depth, depth + 1))
+    return lines
+
+
+def profile_imports(module: str = "src.app", python: str = sys.executable) -> Dict:
+    """
+    Importa ``module`` en un intérprete nuevo y mide sus importaciones.
+
+    Returns:
+        Dict con total_ms, tree, heavy y (si la importación falla) error
+    """
+    start = time.perf_counter()
+    proc = subprocess.run([python, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=BASE_DIR, capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - start) * 1000
+
+    tree = parse_importtime(proc.stderr)
+    report = {
+        "module": module,
+        "wall_ms": wall_ms,
+        "total_ms": sum(node["cumulative_ms"] for node in tree),
+        "tree": tree,
+        "heavy": heavy_imports(tree),
+    }
+    if proc.returncode != 0:
+        errors = [line for line in proc.stderr.splitlines() if not line.startswith("import time:")]
+        report["error"] = "\n".join(errors[-5:])
+    return report
+
+
+def profile_warm_up(ocr: bool = False) -> Dict:
+    """Segundos de carga de cada componente de IA (modelo, extractores, OCR)."""
+    from src.ia.pipeline import warm_up
+
+    try:
+        return warm_up(ocr=ocr)
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Perfil del arranque en frío de DirectIA")
+    parser.add_argument("--module", default="src.app", help="Módulo a importar (por defecto src.app)")
+    parser.add_argument("--min-ms", type=float, default=5.0, help="Ocultar módulos que tarden menos")
+    parser.add_argument("--depth", type=int, default=6, help="Profundidad máxima del árbol")
+    parser.add_argument("--ocr", action="store_true", help="Medir también la carga del OCR")
+    parser.add_argument("--no-warm-up", action="store_true", help="No medir la carga de la IA")
+    parser.add_argument("--json", action="store_true", help="Salida en JSON")
+    args = parser.parse_args(argv)
+
+    report = profile_imports(args.module)
+    if not args.no_warm_up:
+        report["warm_up"] = profile_warm_up(args.ocr)
+
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+        return 1 if "error" in report else 0
+
+    print(f"\n{'acum. ms':>10} {'propio ms':>9}  módulo")
+    print("-" * 60)
+    for line in render_tree(report["tree"], args.min_ms, args.depth):
+        print(line)
+    print("-" * 60)
+    print(f"Importar {args.module}: {report['total_ms']:.0f} ms ({report['wall_ms']:.0f} ms con el intérprete)")
+
+    if report["heavy"]:
+        print(f"[WARNING] Dependencias pesadas importadas al arrancar: {', '.join(report['heavy'])}")
+    else:
+        print("[OK] Ninguna dependencia pesada se importa al arrancar")
+
+    if "error" in report:
+        print(f"[ERROR] La importación de {args.module} falló:\n{report['error']}")
+
+    warm = report.get("warm_up")
+    if warm is not None:
+        if "error" in warm:
+            print(f"[ERROR] Carga de la IA fallida: {warm['error']}")
+        else:
+            print("Carga de la IA (primer uso): "
+                  + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in warm.items()))
+
+    return 1 if "error" in report else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,81 @@
 """
-Helper para extraer información de autenticación de las peticiones
+Helper para extraer información de autenticación de las peticiones.
+
+El token de cada petición se verifica una sola vez: el resultado se guarda en
+``g.auth_user`` y las comprobaciones posteriores (rol, username) son simples
+lecturas de atributos. Las verificaciones de un mismo token en peticiones
+distintas salen de la caché de ``src.services.token``.
 """
-import jwt
-from flask import request, current_app
+from dataclasses import dataclass
+from functools import wraps
+from typing import Dict, Optional
+
+from flask import g, jsonify, request
+
+from src.services.token import verify_token
+
+
+ADMIN_ROLES = ("admin", 1, "1")
+
+
+@dataclass(frozen=True)
+class AuthUser:
+    """Usuario autenticado de la petición actual."""
+
+    claims: Dict
+    token: str
+
+    @property
+    def user_id(self) -> Optional[str]:
+        return self.claims.get("sub")
+
+    @property
+    def username(self) -> Optional[str]:
+        return self.claims.get("username")
+
+    @property
+    def role(self):
+        return self.claims.get("role")
+
+    @property
+    def is_admin(self) -> bool:
+        # acepta si el nombre es "admin" o el id es 1
+        return self.role in ADMIN_ROLES
+
+
+def request_token(allow_query: bool = False) -> str:
+    """
+    Token de la petición: cabecera ``Authorization`` (con o sin ``Bearer``) y,
+    si se permite, el parámetro ``?token=``.
+    """
+    token = request.headers.get("Authorization", "").strip()
+    if token[:7].lower() == "bearer ":
+        token = token[7:].strip()
+    if not token and allow_query:
+        token = request.args.get("token", "")
+    return token
+
+
+def current_user(allow_query: bool = False) -> Optional[AuthUser]:
+    """
+    Usuario autenticado de la petición actual (o None).
+
+    Args:
+        allow_query: Aceptar el token en ``?token=`` si no hay cabecera
+
+    Returns:
+        AuthUser verificado una sola vez por petición y token
+    """
+    token = request_token(allow_query)
+    cached = g.get("auth_user", False)
+    if cached is not False and g.get("auth_token") == token:
+        return cached
+
+    claims = verify_token(token)
+    user = AuthUser(claims=claims, token=token) if claims else None
+    g.auth_token = token
+    g.auth_user = user
+    return user
 
 
 def get_user_from_token():
@@ -12,32 +85,50 @@ def get_user_from_token():
     Returns:
         str: Username del usuario autenticado, o "unknown" si no hay token válido
     """
-    auth_header = request.headers.get("Authorization")
+    user = current_user()
+    return (user.username if user else None) or "unknown"
+
 
-    if not auth_header:
-        return "unknown"
+def _check(admin: bool, allow_query: bool):
+    """None si la petición está autorizada; si no, la respuesta de error."""
+    user = current_user(allow_query)
+    if user is None or (admin and not user.is_admin):
+        return jsonify({"error": "unauthorized"}), 401
+    return None
 
-    try:
-        # El header debe ser "Bearer <token>"
-        parts = auth_header.split()
-        if len(parts) != 2 or parts[0].lower() != "bearer":
-            return "unknown"
 
-        token = parts[1]
+def require_auth(admin: bool = False, allow_query: bool = False):
+    """
+    Decorador de vistas que exige un token válido (y rol admin si ``admin``).
 
-        # Decodificar el token
-        payload = jwt.decode(
-            token,
-            current_app.config["SECRET_KEY"],
-            algorithms=["HS256"]
-        )
+    Uso:
+        @bp.post("/algo")
+        @require_auth(admin=True)
+        def algo():
+            g.auth_user.username
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            error = _check(admin, allow_query)
+            if error is not None:
+                return error
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
 
-        # Extraer el username del payload
-        return payload.get("username", "unknown")
 
-    except jwt.ExpiredSignatureError:
-        return "unknown"
-    except jwt.InvalidTokenError:
-        return "unknown"
-    except Exception:
-        return "unknown"
\ No newline at end of file
+def protect_blueprint(bp, admin: bool = True, allow_query: bool = True, exempt=()):
+    """
+    Registra en ``bp`` un ``before_request`` que exige autenticación en todas
+    sus rutas, salvo los preflight OPTIONS (CORS) y los endpoints ``exempt``.
+    """
+    @bp.before_request
+    def guard():
+        if request.method == "OPTIONS":
+            return jsonify({"status": "ok"}), 200
+        if request.endpoint in exempt:
+            return None
+        return _check(admin, allow_query)
+
+    return guard
@@ -0,0 +1,598 @@
+"""
+Métricas de ejecución en formato de exposición de Prometheus.
+
+Registro mínimo en proceso (sin dependencias ni servicios externos) con
+contadores, gauges e histogramas etiquetados. ``render()`` genera el texto
+que sirve ``GET /metrics``.
+
+Coste en el hot path: cada serie (combinación de etiquetas) tiene su propio
+lock, de modo que dos peticiones solo compiten si actualizan exactamente la
+misma serie, y la sección crítica es una suma. El lock del registro solo se
+toma al crear una serie nueva o al exportar.
+"""
+
+import math
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+# Límites de los buckets en segundos (convención de Prometheus)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value)) if abs(value) < 1e15 else repr(value)
+    return repr(value)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+# ---------------------------------------------------------------------------
+# Series
+# ---------------------------------------------------------------------------
+
+class _CounterChild:
+    __slots__ = ("_value", "_lock")
+
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self._value += amount
+
+    def get(self) -> float:
+        return self._value
+
+
+class _GaugeChild(_CounterChild):
+    __slots__ = ()
+
+    def dec(self, amount: float = 1) -> None:
+        with self._lock:
+            self._value -= amount
+
+    def set(self, value: float) -> None:
+        self._value = float(value)
+
+
+class _HistogramChild:
+    __slots__ = ("_upper_bounds", "_counts", "_sum", "_lock")
+
+    def __init__(self, upper_bounds: Tuple[float, ...]):
+        self._upper_bounds = upper_bounds
+        self._counts = [0] * (len(upper_bounds) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self._upper_bounds, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def time(self):
+        """Context manager que observa la duración del bloque ``with``."""
+        return _Timer(self)
+
+    def get(self) -> Tuple[List[int], float]:
+        with self._lock:
+            return list(self._counts), self._sum
+
+
+class _Timer:
+    __slots__ = ("_child", "_start")
+
+    def __init__(self, child: _HistogramChild):
+        self._child = child
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._child.observe(time.perf_counter() - self._start)
+        return False
+
+
+# ---------------------------------------------------------------------------
+# Métricas
+# ---------------------------------------------------------------------------
+
+class _Metric:
+    """Familia de series con el mismo nombre y distintas etiquetas."""
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._default = self._child_for(())
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _child_for(self, key: Tuple[str, ...]):
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.get(key)
+                if child is None:
+                    child = self._new_child()
+                    self._children[key] = child
+        return child
+
+    def labels(self, *values, **kwargs):
+        """
+        Devuelve la serie para unas etiquetas (creándola la primera vez).
+        Se recomienda guardar la serie si se usa en un bucle.
+        """
+        if kwargs:
+            values = tuple(kwargs[name] for name in self.labelnames)
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name}: se esperaban etiquetas {self.labelnames}")
+        return self._child_for(tuple(str(value) for value in values))
+
+    def _series(self) -> List[Tuple[Tuple[str, ...], object]]:
+        with self._lock:
+            return sorted(self._children.items())
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        lines.extend(self.samples())
+        return lines
+
+
+class Counter(_Metric):
+    """Contador monótono."""
+
+    type_name = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1) -> None:
+        self._default.inc(amount)
+
+    def get(self) -> float:
+        return self._default.get()
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.get())}"
+            for key, child in self._series()
+        ]
+
+
+class Gauge(Counter):
+    """
+    Valor que sube y baja. Con ``set_function`` el valor se calcula al
+    exportar (p. ej. el tamaño de una cola), sin coste en el hot path.
+    """
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self._functions = {}
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def dec(self, amount: float = 1) -> None:
+        self._default.dec(amount)
+
+    def set(self, value: float) -> None:
+        self._default.set(value)
+
+    def set_function(self, function: Callable[[], float], *labelvalues) -> None:
+        """
+        Registra una función que da el valor de la serie al exportar.
+
+        Args:
+            function: Callable sin argumentos que devuelve un número
+            labelvalues: Valores de las etiquetas de la serie
+        """
+        key = tuple(str(value) for value in labelvalues)
+        if len(key) != len(self.labelnames):
+            raise ValueError(f"{self.name}: se esperaban etiquetas {self.labelnames}")
+        with self._lock:
+            self._functions[key] = function
+
+    def remove_function(self, *labelvalues) -> None:
+        with self._lock:
+            self._functions.pop(tuple(str(value) for value in labelvalues), None)
+
+    def samples(self) -> List[str]:
+        values = {key: child.get() for key, child in self._series()}
+        with self._lock:
+            functions = dict(self._functions)
+        for key, function in functions.items():
+            try:
+                values[key] = float(function())
+            except Exception:
+                continue
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(values.items())
+        ]
+
+
+class Histogram(_Metric):
+    """Histograma con buckets fijos (O(log buckets) por observación)."""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.upper_bounds = tuple(sorted(float(b) for b in buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.upper_bounds)
+
+    def observe(self, value: float) -> None:
+        self._default.observe(value)
+
+    def time(self):
+        return self._default.time()
+
+    def samples(self) -> List[str]:
+        lines = []
+        bounds = self.upper_bounds + (math.inf,)
+        for key, child in self._series():
+            counts, total = child.get()
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+# ---------------------------------------------------------------------------
+# Registro
+# ---------------------------------------------------------------------------
+
+class Registry:
+    """Conjunto de métricas exportadas por ``/metrics``."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Métrica duplicada: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames=()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames=()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+# --- Peticiones HTTP ---
+
+HTTP_REQUEST_DURATION = REGISTRY.histogram(
+    "directia_http_request_duration_seconds",
+    "Latencia de las peticiones HTTP por blueprint.",
+    ("blueprint", "method", "status"),
+)
+HTTP_REQUESTS_IN_FLIGHT = REGISTRY.gauge(
+    "directia_http_requests_in_flight",
+    "Peticiones HTTP en curso.",
+)
+
+# --- Pipeline de IA ---
+
+CLASSIFIER_LATENCY = REGISTRY.histogram(
+    "directia_classifier_latency_seconds",
+    "Latencia de la etapa de clasificación por versión de modelo.",
+    ("model_version", "classifier"),
+)
+EXTRACTION_CACHE_REQUESTS = REGISTRY.counter(
+    "directia_extraction_cache_requests_total",
+    "Consultas a la caché de extracción de texto.",
+    ("result",),
+)
+EXTRACTION_CACHE_HIT_RATIO = REGISTRY.gauge(
+    "directia_extraction_cache_hit_ratio",
+    "Proporción de aciertos de la caché de extracción desde el arranque.",
+)
+OCR_PAGES = REGISTRY.counter(
+    "directia_ocr_pages_total",
+    "Páginas procesadas por OCR.",
+)
+OCR_SECONDS = REGISTRY.counter(
+    "directia_ocr_seconds_total",
+    "Tiempo total dedicado a OCR.",
+)
+OCR_PAGES_PER_SECOND = REGISTRY.gauge(
+    "directia_ocr_pages_per_second",
+    "Páginas de OCR por segundo de OCR desde el arranque.",
+)
+
+# --- Bases de datos ---
+
+DB_CALL_DURATION = REGISTRY.histogram(
+    "directia_db_call_duration_seconds",
+    "Latencia de las llamadas a Mongo y Postgres.",
+    ("database", "operation"),
+)
+DB_CALL_ERRORS = REGISTRY.counter(
+    "directia_db_call_errors_total",
+    "Llamadas a base de datos fallidas.",
+    ("database", "operation"),
+)
+
+DB_POOL_CONNECTIONS = REGISTRY.gauge(
+    "directia_db_pool_connections",
+    "Conexiones de los pools de Postgres y Mongo por estado (open, checked_out, overflow, max).",
+    ("database", "state"),
+)
+DB_POOL_WAIT_TIMEOUTS = REGISTRY.counter(
+    "directia_db_pool_wait_timeouts_total",
+    "Peticiones que agotaron la espera por una conexión libre del pool.",
+    ("database",),
+)
+
+# --- Tareas en segundo plano ---
+
+BACKGROUND_QUEUE_DEPTH = REGISTRY.gauge(
+    "directia_background_queue_depth",
+    "Elementos pendientes en las colas de tareas en segundo plano.",
+    ("queue",),
+)
+
+
+def _ratio(numerator: float, denominator: float) -> float:
+    return numerator / denominator if denominator else 0.0
+
+
+_CACHE_HITS = EXTRACTION_CACHE_REQUESTS.labels("hit")
+_CACHE_MISSES = EXTRACTION_CACHE_REQUESTS.labels("miss")
+
+EXTRACTION_CACHE_HIT_RATIO.set_function(
+    lambda: _ratio(_CACHE_HITS.get(), _CACHE_HITS.get() + _CACHE_MISSES.get())
+)
+OCR_PAGES_PER_SECOND.set_function(lambda: _ratio(OCR_PAGES.get(), OCR_SECONDS.get()))
+
+
+def record_cache_lookup(hit: bool) -> None:
+    (_CACHE_HITS if hit else _CACHE_MISSES).inc()
+
+
+def record_ocr(pages: int, seconds: float) -> None:
+    OCR_PAGES.inc(pages)
+    OCR_SECONDS.inc(seconds)
+
+
+def register_queue(name: str, depth: Callable[[], int]) -> None:
+    """
+    Expone el tamaño de una cola de tareas en segundo plano.
+
+    Args:
+        name: Nombre de la cola (valor de la etiqueta ``queue``)
+        depth: Callable que devuelve el número de elementos pendientes
+    """
+    BACKGROUND_QUEUE_DEPTH.set_function(depth, name)
+
+
+def render() -> str:
+    return REGISTRY.render()
+
+
+# ---------------------------------------------------------------------------
+# Integraciones
+# ---------------------------------------------------------------------------
+
+def init_app(app) -> None:
+    """
+    Mide todas las peticiones de la app: latencia por blueprint, método y
+    estado, y peticiones en curso.
+    """
+    from flask import g, request
+
+    @app.before_request
+    def _start_request_timer():
+        g._metrics_start = time.perf_counter()
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+
+    def _observe(status):
+        HTTP_REQUEST_DURATION.labels(request.blueprint or "none", request.method, status).observe(
+            time.perf_counter() - g._metrics_start
+        )
+        g._metrics_observed = True
+
+    @app.after_request
+    def _observe_request(response):
+        if "_metrics_start" in g:
+            _observe(response.status_code)
+        return response
+
+    @app.teardown_request
+    def _finish_request(exception=None):
+        if "_metrics_start" not in g:
+            return
+        # after_request no llega a ejecutarse si la petición falla sin respuesta
+        if not g.get("_metrics_observed"):
+            _observe(500)
+        HTTP_REQUESTS_IN_FLIGHT.dec()
+        g.pop("_metrics_start")
+
+
+def _sql_operation(statement: str) -> str:
+    words = statement.lstrip().split(None, 1)
+    return words[0].upper() if words else "UNKNOWN"
+
+
+def instrument_engine(engine, database: str = "postgres") -> None:
+    """
+    Registra la latencia de cada sentencia ejecutada por un engine de
+    SQLAlchemy, etiquetada por operación (SELECT, INSERT, ...).
+    """
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("_metrics_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("_metrics_start")
+        if starts:
+            DB_CALL_DURATION.labels(database, _sql_operation(statement)).observe(
+                time.perf_counter() - starts.pop()
+            )
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        conn = exception_context.connection
+        starts = conn.info.get("_metrics_start") if conn is not None else None
+        if starts:
+            starts.pop()
+        DB_CALL_ERRORS.labels(database, _sql_operation(exception_context.statement or "")).inc()
+
+
+def instrument_pool(engine, database: str = "postgres") -> None:
+    """
+    Expone la ocupación del pool de un engine de SQLAlchemy (``QueuePool``):
+    conexiones abiertas, prestadas, de overflow y máximo permitido.
+    """
+    pool = engine.pool
+    if not hasattr(pool, "checkedout"):
+        return
+    max_connections = pool.size() + max(getattr(pool, "_max_overflow", 0), 0)
+    DB_POOL_CONNECTIONS.set_function(lambda: pool.checkedin() + pool.checkedout(), database, "open")
+    DB_POOL_CONNECTIONS.set_function(pool.checkedout, database, "checked_out")
+    DB_POOL_CONNECTIONS.set_function(lambda: max(pool.overflow(), 0), database, "overflow")
+    DB_POOL_CONNECTIONS.set_function(lambda: max_connections, database, "max")
+
+
+try:
+    from pymongo import monitoring as _mongo_monitoring
+
+    _CommandListenerBase = _mongo_monitoring.CommandListener
+    _PoolListenerBase = _mongo_monitoring.ConnectionPoolListener
+except ImportError:  # pragma: no cover - pymongo es dependencia de la app
+    _CommandListenerBase = object
+    _PoolListenerBase = object
+
+
+class MongoCommandMetrics(_CommandListenerBase):
+    """
+    Listener de comandos de PyMongo: latencia por comando (find, insert,
+    update, aggregate...). Se pasa a ``MongoClient(event_listeners=[...])``.
+    """
+
+    database = "mongo"
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        DB_CALL_DURATION.labels(self.database, event.command_name).observe(event.duration_micros / 1e6)
+
+    def failed(self, event):
+        DB_CALL_DURATION.labels(self.database, event.command_name).observe(event.duration_micros / 1e6)
+        DB_CALL_ERRORS.labels(self.database, event.command_name).inc()
+
+
+class MongoPoolMetrics(_PoolListenerBase):
+    """
+    Listener del pool de conexiones de PyMongo: conexiones abiertas y
+    prestadas (sumando todos los servidores) y esperas agotadas.
+    """
+
+    database = "mongo"
+
+    def __init__(self, max_pool_size: Optional[int] = None):
+        self._open = DB_POOL_CONNECTIONS.labels(self.database, "open")
+        self._checked_out = DB_POOL_CONNECTIONS.labels(self.database, "checked_out")
+        self._timeouts = DB_POOL_WAIT_TIMEOUTS.labels(self.database)
+        if max_pool_size:
+            DB_POOL_CONNECTIONS.labels(self.database, "max").set(max_pool_size)
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._open.inc()
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._open.dec()
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        if getattr(event, "reason", None) == "timeout":
+            self._timeouts.inc()
+
+    def connection_checked_out(self, event):
+        self._checked_out.inc()
+
+    def connection_checked_in(self, event):
+        self._checked_out.dec()
@@ -54,4 +54,8 @@ Write-Host ""
 
 # Establecer PYTHONPATH para que encuentre el módulo src
 $env:PYTHONPATH = $PWD
+
+# Esquema y roles (idempotente; no se hace en el arranque de cada worker)
+python -m src.migrate
+if ($LASTEXITCODE -ne 0) { exit 1 }
 python -m src.app
@@ -55,4 +55,7 @@ echo ""
 
 # Establecer PYTHONPATH para que encuentre el módulo src
 export PYTHONPATH=$PWD
+
+# Esquema y roles (idempotente; no se hace en el arranque de cada worker)
+python3 -m src.migrate || exit 1
 python3 -m src.app
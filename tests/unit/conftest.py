@@ -0,0 +1,28 @@
+"""
+Shared fixtures for unit tests that run against an in-memory SQLite database.
+"""
+import pytest
+from sqlalchemy import create_engine, event
+
+from src.models import Base
+
+
+@pytest.fixture
+def engine():
+    """In-memory SQLite engine with every model table created."""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    return engine
+
+
+@pytest.fixture
+def statements(engine):
+    """SQL statements executed on ``engine`` while the test runs."""
+    executed = []
+
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_execute)
+    yield executed
+    event.remove(engine, "before_cursor_execute", before_execute)
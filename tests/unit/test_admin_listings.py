@@ -0,0 +1,140 @@
+"""
+Unit tests for the paginated admin user and group listings.
+"""
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import inspect
+from sqlalchemy.orm import sessionmaker
+
+from src.models import Group, GroupMember, Role, User
+from src.services import admin_listings
+from src.services.admin_listings import list_group_users, list_groups, list_users
+
+
+@pytest.fixture
+def session(engine):
+    session = sessionmaker(bind=engine)()
+    admin, usuario = Role(name="admin"), Role(name="usuario")
+    session.add_all([admin, usuario])
+    session.flush()
+
+    groups = [Group(name=name) for name in ("ventas", "rrhh", "vacio")]
+    session.add_all(groups)
+    session.flush()
+
+    for i in range(25):
+        user = User(username=f"user{i:02d}", email=f"user{i:02d}@example.com", password_hash="x",
+                    role_id=admin.id if i % 5 == 0 else usuario.id, active=i % 2 == 0)
+        session.add(user)
+        session.flush()
+        session.add(GroupMember(group_id=groups[0].id, user_id=user.id))
+        if i < 3:
+            session.add(GroupMember(group_id=groups[1].id, user_id=user.id))
+    session.commit()
+    yield session
+    session.close()
+
+
+def _all_pages(fetch, key, **args):
+    rows, cursor, pages = [], None, 0
+    while True:
+        body, status = fetch({**args, **({"cursor": cursor} if cursor else {})})
+        assert status == 200
+        rows.extend(body[key])
+        pages += 1
+        cursor = body["next_cursor"]
+        if not cursor:
+            return rows, pages
+
+
+class TestUserListing:
+    """Test keyset pagination, filters and eager loading for users."""
+
+    def test_pages_cover_every_user_once(self, session):
+        rows, pages = _all_pages(lambda args: list_users(session, args), "users", limit="10")
+
+        assert pages == 3
+        assert [row["username"] for row in rows] == [f"user{i:02d}" for i in range(25)]
+
+    def test_sort_desc(self, session):
+        rows, _ = _all_pages(lambda args: list_users(session, args), "users",
+                             sort="username", order="desc", limit="7")
+
+        assert [row["username"] for row in rows] == [f"user{i:02d}" for i in reversed(range(25))]
+
+    def test_filters(self, session):
+        body, _ = list_users(session, {"role": "admin", "active": "true"})
+        assert [row["username"] for row in body["users"]] == ["user00", "user10", "user20"]
+        assert all(row["role_name"] == "admin" for row in body["users"])
+
+        body, _ = list_users(session, {"q": "USER0"})
+        assert len(body["users"]) == 10
+
+    def test_fixed_query_count_per_page(self, session, statements):
+        session.expire_all()
+        body, _ = list_users(session, {"limit": "20"})
+
+        # Usuarios con su rol (JOIN) + grupos de la página (selectinload)
+        assert len(statements) == 2
+        assert body["users"][1]["group_ids"] == [1, 2]
+        assert body["users"][1]["role_name"] == "usuario"
+
+    def test_invalid_params(self, session):
+        assert list_users(session, {"cursor": "basura"})[1] == 400
+        assert list_users(session, {"sort": "password_hash"})[1] == 400
+        assert list_users(session, {"order": "sideways"})[1] == 400
+        assert list_users(session, {"group_id": "x"})[1] == 400
+
+    def test_group_users(self, session):
+        rows, pages = _all_pages(lambda args: list_group_users(session, 2, args), "usuarios", limit="2")
+
+        assert pages == 2
+        assert [row["username"] for row in rows] == ["user00", "user01", "user02"]
+        assert list_group_users(session, 99, {})[1] == 404
+
+    def test_unpaginated_by_default(self, session):
+        with patch.object(admin_listings, "DEFAULT_LIMIT", 2):
+            users, status = list_users(session, {"sort": "username"})
+            members, _ = list_group_users(session, 1, {})
+            paged, _ = list_users(session, {"cursor": admin_listings.encode_cursor(0, 0)})
+
+        assert status == 200
+        assert len(users["users"]) == 25 and users["next_cursor"] is None and users["limit"] is None
+        assert len(members["usuarios"]) == 25 and members["next_cursor"] is None
+        # A cursor alone still pages with the default limit
+        assert len(paged["users"]) == 2 and paged["next_cursor"]
+
+
+class TestGroupListing:
+    """Test grouped member counts for groups."""
+
+    def test_member_counts_in_one_query(self, session, statements):
+        body, status = list_groups(session, {})
+
+        assert status == 200
+        assert len(statements) == 1
+        assert {row["name"]: row["member_count"] for row in body["grupos"]} == {
+            "ventas": 25, "rrhh": 3, "vacio": 0,
+        }
+
+    def test_paginate_by_name(self, session):
+        rows, pages = _all_pages(lambda args: list_groups(session, args), "grupos", sort="name", limit="2")
+
+        assert pages == 2
+        assert [row["name"] for row in rows] == ["rrhh", "vacio", "ventas"]
+
+    def test_unpaginated_by_default(self, session):
+        with patch.object(admin_listings, "DEFAULT_LIMIT", 2):
+            body, status = list_groups(session, {"sort": "name", "order": "desc"})
+
+        assert status == 200
+        assert [row["name"] for row in body["grupos"]] == ["ventas", "vacio", "rrhh"]
+        assert body["next_cursor"] is None and body["limit"] is None
+
+
+def test_supporting_indexes(engine):
+    inspector = inspect(engine)
+
+    assert any(index["column_names"] == ["role_id"] for index in inspector.get_indexes("users"))
+    assert any(index["column_names"] == ["user_id"] for index in inspector.get_indexes("group_members"))
@@ -0,0 +1,73 @@
+"""
+Unit tests for the vectorized augmentation engine.
+"""
+import random
+
+import numpy as np
+import pytest
+
+from src.ia.data_generation import augmentation
+from src.ia.data_generation.augmentation_engine import AugmentationEngine, _Batch
+
+
+TEXT = "Factura número 2024-118. Cliente: Construcciones Pérez. Importe total: 1.250,00 EUR. " * 40
+
+
+def _changed_chars(original, modified):
+    return sum(a != b for a, b in zip(original, modified))
+
+
+class TestAugmentationEngine:
+    """Test determinism, batching and agreement with the reference functions."""
+
+    def test_same_seed_same_output(self):
+        first = AugmentationEngine(seed=7).augment_batch([TEXT, TEXT], ["low", "high"])
+        second = AugmentationEngine(seed=7).augment_batch([TEXT, TEXT], ["low", "high"])
+        assert first == second
+
+    def test_generate_variants_keeps_original_first(self):
+        variants = AugmentationEngine(seed=1).generate_variants(TEXT, num_variants=3)
+        assert len(variants) == 4
+        assert variants[0] == TEXT
+
+    def test_ocr_pairs_do_not_cross_documents(self):
+        engine = AugmentationEngine(seed=0)
+        texts = ["r", "n"] * 500
+        for _ in range(5):
+            batch = engine.augment_batch(texts, "high")
+            assert len(batch) == len(texts)
+            assert all(len(text) == 1 for text in batch)
+
+    @pytest.mark.parametrize("texts,expected", [
+        (["", "rn"], ["", "m"]),
+        (["r", "", "n"], ["r", "", "n"]),
+        (["rn", ""], ["m", ""]),
+        (["", "r", "", "n", ""], ["", "r", "", "n", ""]),
+    ])
+    def test_ocr_pairs_with_empty_documents(self, texts, expected):
+        batch = _Batch(texts)
+        AugmentationEngine(seed=0)._ocr(batch, np.ones(len(texts)))
+        assert batch.texts() == expected
+
+    def test_batch_with_empty_documents(self):
+        texts = ["", TEXT, "", TEXT, ""]
+        batch = AugmentationEngine(seed=1).augment_batch(texts, "high")
+        assert [batch[0], batch[2], batch[4]] == ["", "", ""]
+
+    @pytest.mark.parametrize("name,probability", [
+        ("simulate_ocr_errors", 0.05),
+        ("vary_case", 0.05),
+    ])
+    def test_char_rates_match_reference(self, name, probability):
+        random.seed(3)
+        reference = getattr(augmentation, name)(TEXT, probability)
+        engine = getattr(AugmentationEngine(seed=3), name)(TEXT, probability)
+
+        expected = _changed_chars(TEXT, reference)
+        assert abs(_changed_chars(TEXT, engine) - expected) < 0.25 * expected
+
+    def test_noise_rate_matches_reference(self):
+        random.seed(5)
+        reference = len(augmentation.add_noise_characters(TEXT, 0.05)) - len(TEXT)
+        inserted = len(AugmentationEngine(seed=5).add_noise_characters(TEXT, 0.05)) - len(TEXT)
+        assert abs(inserted - reference) < 0.25 * reference
@@ -0,0 +1,207 @@
+"""
+Unit tests for JWT verification caching and the shared auth layer.
+"""
+import datetime
+from unittest.mock import patch
+
+import jwt
+import pytest
+from flask import Flask, g
+
+from src.services import token as token_service
+from src.services.token import TokenCache, verify_token
+from src.utils.auth_helper import current_user, protect_blueprint, require_auth
+
+
+SECRET = "test-secret"
+
+
+def _token(role="admin", minutes=15, secret=SECRET, **claims):
+    payload = {
+        "sub": "1",
+        "role": role,
+        "username": "ana",
+        "exp": datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(minutes=minutes),
+        **claims,
+    }
+    return jwt.encode(payload, secret, algorithm="HS256")
+
+
+@pytest.fixture
+def app():
+    token_service._token_cache.clear()
+    app = Flask(__name__)
+    app.config["SECRET_KEY"] = SECRET
+    return app
+
+
+@pytest.fixture
+def decode_spy():
+    with patch.object(token_service.jwt, "decode", wraps=jwt.decode) as spy:
+        yield spy
+
+
+class TestVerifyToken:
+    """Test the cached verification in src.services.token."""
+
+    def test_repeat_verification_hits_cache(self, app, decode_spy):
+        token = _token()
+        with app.app_context():
+            first = verify_token(token)
+            second = verify_token(token)
+
+        assert first == second
+        assert first["role"] == "admin"
+        assert decode_spy.call_count == 1
+
+    def test_returns_copy_of_claims(self, app):
+        token = _token()
+        with app.app_context():
+            verify_token(token)["role"] = "usuario"
+            assert verify_token(token)["role"] == "admin"
+
+    def test_invalid_tokens(self, app):
+        token = _token()
+        header, payload, _ = token.split(".")
+        with app.app_context():
+            assert verify_token("") is None
+            assert verify_token(None) is None
+            assert verify_token("no-es-un-jwt") is None
+            assert verify_token(_token(secret="otra")) is None
+            # Firma válida pegada a otro payload
+            forged = _token(role="usuario").rsplit(".", 1)[0] + "." + token.rsplit(".", 1)[1]
+            verify_token(token)
+            assert verify_token(forged) is None
+            assert verify_token(f"{header}.{payload}.") is None
+
+    def test_expired_token_rejected(self, app):
+        with app.app_context():
+            assert verify_token(_token(minutes=-1)) is None
+
+    def test_cache_honours_exp(self):
+        cache = TokenCache()
+        cache.put("k", "tok", {"exp": 100})
+
+        with patch.object(token_service.time, "time", return_value=99):
+            assert cache.get("k", "tok") == {"exp": 100}
+        with patch.object(token_service.time, "time", return_value=100):
+            assert cache.get("k", "tok") is None
+        assert len(cache) == 0
+
+    def test_cache_is_bounded_lru(self):
+        cache = TokenCache(max_entries=2)
+        cache.put("a", "ta", {})
+        cache.put("b", "tb", {})
+        cache.get("a", "ta")
+        cache.put("c", "tc", {})
+
+        assert len(cache) == 2
+        assert cache.get("b", "tb") is None
+        assert cache.get("a", "ta") == {}
+        assert cache.get("c", "tc") == {}
+
+    def test_secret_change_invalidates(self, app, decode_spy):
+        token = _token()
+        with app.app_context():
+            assert verify_token(token) is not None
+            app.config["SECRET_KEY"] = "rotada"
+            assert verify_token(token) is None
+        assert decode_spy.call_count == 2
+
+
+class TestAuthLayer:
+    """Test per-request claims on g and the decorators."""
+
+    def test_current_user_once_per_request(self, app, decode_spy):
+        token = _token()
+        with app.test_request_context(headers={"Authorization": f"Bearer {token}"}):
+            with patch("src.utils.auth_helper.verify_token", wraps=verify_token) as verify:
+                user = current_user()
+                assert current_user() is user
+                assert verify.call_count == 1
+            assert g.auth_user.is_admin
+            assert user.username == "ana"
+            assert user.user_id == "1"
+
+    def test_query_token_only_when_allowed(self, app):
+        token = _token()
+        with app.test_request_context(f"/?token={token}"):
+            assert current_user() is None
+            assert current_user(allow_query=True).is_admin
+
+    def test_role_values(self, app):
+        for role, expected in (("admin", True), (1, True), ("1", True), ("usuario", False), (2, False)):
+            with app.test_request_context(headers={"Authorization": _token(role=role)}):
+                assert current_user().is_admin is expected
+
+    def test_require_auth(self, app):
+        @app.get("/perfil")
+        @require_auth()
+        def perfil():
+            return {"username": g.auth_user.username}
+
+        @app.get("/admin")
+        @require_auth(admin=True)
+        def admin():
+            return {"ok": True}
+
+        client = app.test_client()
+        user = {"Authorization": f"Bearer {_token(role='usuario')}"}
+
+        assert client.get("/perfil").status_code == 401
+        assert client.get("/perfil", headers=user).json == {"username": "ana"}
+        assert client.get("/admin", headers=user).status_code == 401
+        assert client.get("/admin", headers={"Authorization": f"Bearer {_token()}"}).status_code == 200
+
+    def test_protect_blueprint(self, app):
+        from flask import Blueprint
+
+        bp = Blueprint("panel", __name__, url_prefix="/panel")
+        protect_blueprint(bp, exempt=("panel.public",))
+
+        @bp.get("/datos")
+        def datos():
+            return {"ok": True}
+
+        @bp.get("/public")
+        def public():
+            return {"public": True}
+
+        app.register_blueprint(bp)
+        client = app.test_client()
+
+        assert client.get("/panel/datos").status_code == 401
+        assert client.get(f"/panel/datos?token={_token()}").status_code == 200
+        assert client.get("/panel/public").status_code == 200
+        assert client.options("/panel/datos").status_code == 200
+
+
+class TestFileRoutes:
+    """Test the admin checks of the file routes."""
+
+    @pytest.fixture
+    def client(self, app, tmp_path):
+        files_routes = pytest.importorskip("src.routes.files", exc_type=ImportError)
+        from loadtest.memory_mongo import MemoryDatabase
+        from src.services import files as file_service
+
+        app.mongo = MemoryDatabase()
+        app.register_blueprint(files_routes.bp)
+        with patch.object(file_service, "BASE_STORAGE_PATH", str(tmp_path)):
+            yield app.test_client()
+
+    def test_admin_creates_protected_folder(self, app, client):
+        response = client.post("/api/files/create_folder", json={"ruta": "Compartida", "protegida": True, "user": "ana"},
+                               headers={"Authorization": f"Bearer {_token()}"})
+
+        assert response.status_code == 201
+        stored = app.mongo["metadata"].find_one({"filename": "Compartida"})
+        assert stored["user"] == "ana"
+        assert stored["protegida"] is True
+
+    def test_user_cannot_create_protected_folder(self, app, client):
+        response = client.post("/api/files/create_folder", json={"ruta": "Compartida", "protegida": True},
+                               headers={"Authorization": f"Bearer {_token(role='usuario')}"})
+
+        assert response.status_code == 403
+        assert app.mongo["metadata"].find_one({"filename": "Compartida"}) is None
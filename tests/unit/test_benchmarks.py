@@ -0,0 +1,71 @@
+"""
+Unit tests for the benchmark harness.
+"""
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from ai_directia.extractors.unified_extractor import extract_text_from_bytes
+from benchmarks.documents import make_docx, make_pdf
+from benchmarks.__main__ import DEFAULT_BASELINE, main
+from benchmarks.harness import compare, measure, percentile
+
+
+def _row(name, p50, throughput):
+    return {"name": name, "latency_ms": {"p50": p50, "p95": p50 * 2}, "throughput": throughput}
+
+
+class TestHarness:
+    """Test percentiles, measurement and baseline comparison."""
+
+    @pytest.mark.parametrize("q", [50, 95, 99])
+    def test_percentile_matches_numpy(self, q):
+        values = [0.3, 5.0, 1.2, 9.9, 2.4, 7.7, 0.1]
+        assert percentile(values, q) == pytest.approx(np.percentile(values, q))
+
+    def test_measure_counts_items_per_batch(self):
+        result = measure("sum", "test", sum, [[1, 2], [3]], mode="batch", items_per_call=[2, 1],
+                         warmup=0, repeat=2)
+
+        assert result.calls == 4
+        assert result.items == 6
+        assert result.latency_ms["p50"] >= 0
+
+    def test_compare_flags_only_regressions(self):
+        baseline = [_row("a", 1.0, 100.0), _row("b", 1.0, 100.0)]
+        current = [_row("a", 1.1, 95.0), _row("b", 2.0, 40.0), _row("c", 9.0, 1.0)]
+
+        regressions = {(row["name"], row["metric"]) for row in compare(current, baseline, 0.25)
+                       if row["regression"]}
+        assert regressions == {("b", "latency_p50"), ("b", "latency_p95"), ("b", "throughput")}
+
+    def test_compare_without_baseline_fails(self, tmp_path):
+        with patch("benchmarks.__main__.run_suite") as run_suite:
+            assert main(["--compare", "--baseline", str(tmp_path / "baseline.json")]) == 2
+
+        run_suite.assert_not_called()
+
+    def test_baseline_is_versioned(self):
+        assert DEFAULT_BASELINE.exists()
+
+    def test_beto_without_model_is_skipped(self):
+        from types import SimpleNamespace
+
+        from benchmarks.suites import _beto_classifier
+
+        fallback = SimpleNamespace(model=None)
+        with patch("src.ia.clasificadores.beto.inferencia.get_classifier", return_value=fallback), \
+                pytest.raises(ImportError):
+            _beto_classifier(["factura"], {"measure": {}})
+
+
+class TestDocuments:
+    """Test that generated fixtures go through the real extractors."""
+
+    @pytest.mark.parametrize("extension,builder", [("pdf", make_pdf), ("docx", make_docx)])
+    def test_generated_documents_are_extractable(self, extension, builder):
+        result = extract_text_from_bytes(builder("FACTURA 2025/001\nTotal: 1.210,00"), extension)
+
+        assert result["success"]
+        assert "FACTURA 2025/001" in result["text"]
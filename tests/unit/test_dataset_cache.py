@@ -0,0 +1,63 @@
+"""
+Unit tests for the columnar (Parquet) cache of processed dataset splits.
+"""
+import pandas as pd
+import pytest
+
+from ai_directia.preprocessing import dataset_cache
+from ai_directia.preprocessing.dataset_cache import (
+    CLEAN_COLUMN,
+    PREPROCESSED_COLUMN,
+    cache_path,
+    load_split,
+)
+from ai_directia.preprocessing.text_cleaner import clean_text, preprocess_text
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "train.csv"
+    pd.DataFrame({
+        "text": ["FACTURA  Nº 1\n\n\n  Total: 100 € http://x.es", "Nómina de JULIO de la empresa"],
+        "label": ["factura", "nomina"],
+    }).to_csv(path, index=False)
+    return path
+
+
+class TestDatasetCache:
+    """Test cached cleaned columns and automatic invalidation."""
+
+    def test_cleaned_columns_match_cleaner(self, csv_path):
+        df = load_split(csv_path)
+
+        assert df[CLEAN_COLUMN].tolist() == [clean_text(text) for text in df["text"]]
+        assert df[PREPROCESSED_COLUMN].tolist() == [preprocess_text(text) for text in df["text"]]
+
+    def test_second_load_reads_parquet(self, csv_path, monkeypatch):
+        load_split(csv_path)
+        assert cache_path(csv_path).exists()
+
+        def fail(df):
+            raise AssertionError("split rebuilt despite a valid cache")
+
+        monkeypatch.setattr(dataset_cache, "build_split", fail)
+        df = load_split(csv_path, columns=["label", PREPROCESSED_COLUMN])
+        assert list(df.columns) == ["label", PREPROCESSED_COLUMN]
+
+    def test_csv_change_invalidates_cache(self, csv_path):
+        first = cache_path(csv_path)
+        load_split(csv_path)
+
+        with open(csv_path, "a", encoding="utf-8") as f:
+            f.write('"Contrato de arrendamiento",contrato\n')
+        df = load_split(csv_path)
+
+        assert len(df) == 3
+        assert cache_path(csv_path) != first
+        assert not first.exists()
+
+    def test_cleaner_change_invalidates_cache(self, csv_path, monkeypatch):
+        first = cache_path(csv_path)
+        monkeypatch.setattr(dataset_cache, "_cleaner_version", "other-cleaner")
+
+        assert cache_path(csv_path) != first
@@ -0,0 +1,130 @@
+"""
+Unit tests for per-process connection pools and the schema migration.
+"""
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from sqlalchemy import inspect, text
+
+from src import db as db_module
+from src.config import Config
+from src.db import MongoConnection, SQLDatabase, engine_options, mongo_options
+from src.migrate import migrate
+from src.models import Role
+from src.utils import metrics
+
+
+def _config(**overrides):
+    config = {key: getattr(Config, key) for key in dir(Config) if key.isupper()}
+    config.update(overrides)
+    return config
+
+
+class TestOptions:
+    """Test config-driven pool options."""
+
+    def test_postgres_pool_options(self):
+        options = engine_options(_config(DB_POOL_SIZE=8, DB_MAX_OVERFLOW=2))
+
+        assert options == {"pool_size": 8, "max_overflow": 2, "pool_timeout": Config.DB_POOL_TIMEOUT,
+                           "pool_recycle": Config.DB_POOL_RECYCLE, "pool_pre_ping": Config.DB_POOL_PRE_PING}
+
+    def test_sqlite_options(self):
+        options = engine_options(_config(SQLALCHEMY_DATABASE_URI="sqlite:///x.sqlite3"))
+
+        assert options == {"connect_args": {"check_same_thread": False}}
+
+    def test_mongo_options(self):
+        options = mongo_options(_config(MONGO_MAX_POOL_SIZE=20))
+
+        assert options["maxPoolSize"] == 20
+        assert options["serverSelectionTimeoutMS"] == Config.MONGO_SERVER_SELECTION_TIMEOUT_MS
+
+
+class TestSQLDatabase:
+    """Test lazy, fork-aware engine creation."""
+
+    def test_engine_created_on_first_use(self, tmp_path):
+        database = SQLDatabase(f"sqlite:///{tmp_path / 'app.sqlite3'}")
+        assert database._engine is None
+
+        session = database()
+        assert session.execute(text("SELECT 1")).scalar() == 1
+        assert database() is session
+        database.remove()
+        assert database() is not session
+
+    def test_new_engine_after_fork(self, tmp_path):
+        database = SQLDatabase(f"sqlite:///{tmp_path / 'app.sqlite3'}")
+        parent_engine = database.engine
+
+        with patch.object(db_module.os, "getpid", return_value=-1), \
+                patch.object(parent_engine, "dispose") as dispose:
+            child_engine = database.engine
+
+        assert child_engine is not parent_engine
+        dispose.assert_called_once_with(close=False)
+
+    def test_pool_metrics(self, tmp_path):
+        database = SQLDatabase(f"sqlite:///{tmp_path / 'metrics.sqlite3'}")
+        session = database()
+        session.execute(text("SELECT 1"))
+
+        rendered = metrics.render()
+        assert 'directia_db_pool_connections{database="sqlite",state="checked_out"} 1' in rendered
+        database.remove()
+        assert 'directia_db_pool_connections{database="sqlite",state="checked_out"} 0' in metrics.render()
+
+
+class TestMongoConnection:
+    """Test lazy, fork-aware Mongo client creation."""
+
+    def test_lazy_client_and_forwarding(self):
+        clients = []
+
+        def create_client(self):
+            clients.append({"directia": {"metadata": "metadata-collection"}})
+            return clients[-1]
+
+        with patch.object(MongoConnection, "_create_client", create_client):
+            mongo = MongoConnection("mongodb://localhost", "directia", {"maxPoolSize": 5})
+            assert clients == []
+
+            assert mongo["metadata"] == "metadata-collection"
+            assert mongo.metadata == "metadata-collection"
+            assert len(clients) == 1
+
+            with patch.object(db_module.os, "getpid", return_value=-1):
+                mongo.metadata
+            assert len(clients) == 2
+
+    def test_pool_listener(self):
+        listener = metrics.MongoPoolMetrics(max_pool_size=7)
+        event = SimpleNamespace(reason="timeout")
+        before = metrics.DB_POOL_WAIT_TIMEOUTS.labels("mongo").get()
+
+        listener.connection_created(event)
+        listener.connection_checked_out(event)
+        listener.connection_check_out_failed(event)
+        rendered = metrics.render()
+        listener.connection_checked_in(event)
+        listener.connection_closed(event)
+
+        assert 'directia_db_pool_connections{database="mongo",state="checked_out"} 1' in rendered
+        assert 'directia_db_pool_connections{database="mongo",state="max"} 7' in rendered
+        assert metrics.DB_POOL_WAIT_TIMEOUTS.labels("mongo").get() == before + 1
+
+
+class TestMigrate:
+    """Test the one-off schema and role bootstrap."""
+
+    def test_migrate_is_idempotent(self, tmp_path):
+        database = SQLDatabase(f"sqlite:///{tmp_path / 'migrate.sqlite3'}")
+
+        first = migrate(database.engine)
+        second = migrate(database.engine)
+
+        assert "users" in first["tables"] and first["roles"] == ["admin", "usuario"]
+        assert second == {"tables": [], "roles": []}
+        assert {role.name for role in database().query(Role)} == {"admin", "usuario"}
+        assert any(index["column_names"] == ["role_id"] for index in inspect(database.engine).get_indexes("users"))
@@ -0,0 +1,209 @@
+"""
+Unit tests for the background docker status poller and the async job queue.
+"""
+import subprocess
+import threading
+import time
+from unittest.mock import patch
+
+from src.services.docker_admin import (
+    ContainerMonitor, JobManager, collect_status, compose_commands, container_commands,
+)
+
+
+class FakeDocker:
+    """Runner that answers docker commands from canned output and records calls."""
+
+    def __init__(self, fail=(), block=None):
+        self.calls = []
+        self.fail = set(fail)
+        self.block = block
+        self._lock = threading.Lock()
+
+    def __call__(self, cmd, timeout=None):
+        with self._lock:
+            self.calls.append(cmd)
+        if self.block is not None:
+            self.block.wait(5)
+        if cmd[1] in self.fail:
+            return subprocess.CompletedProcess(cmd, 1, "", f"{cmd[1]} falló")
+        if cmd[1] == "ps":
+            return subprocess.CompletedProcess(cmd, 0, "directia_mongo\tUp 2 hours\trunning\n"
+                                                       "directia_postgres\tExited (0)\texited\n", "")
+        if cmd[1] == "stats":
+            return subprocess.CompletedProcess(cmd, 0, "directia_mongo\t1.5%\t100MiB / 1GiB\n", "")
+        return subprocess.CompletedProcess(cmd, 0, f"{' '.join(cmd[1:])} ok\n", "")
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TestStatus:
+    """Test status collection and the in-memory snapshot."""
+
+    def test_collect_status(self):
+        docker = FakeDocker()
+        status = collect_status(docker)
+
+        assert status["ok"]
+        assert status["containers"] == [
+            {"name": "directia_mongo", "status": "Up 2 hours", "state": "running", "cpu": "1.5%",
+             "memory": "100MiB / 1GiB"},
+            {"name": "directia_postgres", "status": "Exited (0)", "state": "exited", "cpu": "N/A",
+             "memory": "N/A"},
+        ]
+        # Un solo docker stats para todos los contenedores en marcha
+        assert [cmd[1] for cmd in docker.calls] == ["ps", "stats", "compose"]
+
+    def test_docker_unavailable(self):
+        status = collect_status(FakeDocker(fail={"ps"}))
+
+        assert not status["ok"]
+        assert status["containers"] == []
+        assert "falló" in status["error"]
+
+    def test_reads_do_not_run_docker(self):
+        docker = FakeDocker()
+        monitor = ContainerMonitor(docker, interval=60)
+        try:
+            monitor.snapshot()
+            assert _wait_for(lambda: not monitor.snapshot()["pending"])
+            for _ in range(20):
+                snapshot = monitor.snapshot()
+        finally:
+            monitor.stop()
+
+        assert snapshot["containers"][0]["name"] == "directia_mongo"
+        assert snapshot["age_s"] is not None and not snapshot["stale"]
+        assert len(docker.calls) == 3
+
+    def test_first_read_does_not_wait(self):
+        release = threading.Event()
+        monitor = ContainerMonitor(FakeDocker(block=release), interval=60)
+        try:
+            start = time.monotonic()
+            first = monitor.snapshot()
+            elapsed = time.monotonic() - start
+        finally:
+            release.set()
+            monitor.stop()
+
+        assert elapsed < 1
+        assert first["pending"] and first["stale"]
+        assert first["containers"] == [] and first["age_s"] is None
+
+    def test_request_refresh(self):
+        docker = FakeDocker()
+        monitor = ContainerMonitor(docker, interval=60)
+        try:
+            monitor.snapshot()
+            monitor.request_refresh()
+            assert _wait_for(lambda: len(docker.calls) == 6)
+        finally:
+            monitor.stop()
+
+    def test_idle_poller_sleeps(self):
+        docker = FakeDocker()
+        monitor = ContainerMonitor(docker, interval=0.01, idle_timeout=0)
+        try:
+            monitor.snapshot()
+            time.sleep(0.1)
+            calls = len(docker.calls)
+            time.sleep(0.1)
+            assert len(docker.calls) == calls
+        finally:
+            monitor.stop()
+
+
+class TestJobs:
+    """Test async docker actions."""
+
+    def test_submit_returns_immediately(self, tmp_path):
+        release = threading.Event()
+        finished = []
+        jobs = JobManager(FakeDocker(block=release), on_finish=finished.append, db_path=tmp_path / "jobs.sqlite3")
+        try:
+            job = jobs.submit("restart", "compose", compose_commands("restart"))
+            assert job["status"] == "queued"
+            assert _wait_for(lambda: jobs.get(job["id"])["status"] == "running")
+
+            release.set()
+            assert _wait_for(lambda: jobs.get(job["id"])["status"] == "succeeded")
+        finally:
+            jobs.close()
+
+        done = jobs.get(job["id"])
+        assert done["returncode"] == 0
+        assert done["output"] == "compose -f docker/docker-compose.yml restart ok\n"
+        assert finished[0]["id"] == job["id"]
+
+    def test_multi_step_job_stops_on_failure(self, tmp_path):
+        docker = FakeDocker(fail={"rm"})
+        jobs = JobManager(docker, db_path=tmp_path / "jobs.sqlite3")
+        try:
+            job = jobs.submit("recreate", "directia_mongo", container_commands("recreate", "directia_mongo"))
+            assert _wait_for(lambda: jobs.get(job["id"])["status"] == "failed")
+        finally:
+            jobs.close()
+
+        assert jobs.get(job["id"])["returncode"] == 1
+        assert [cmd[1] for cmd in docker.calls] == ["stop", "rm"]
+
+    def test_history_is_bounded(self, tmp_path):
+        jobs = JobManager(FakeDocker(), keep=3, db_path=tmp_path / "jobs.sqlite3")
+        try:
+            ids = [jobs.submit("start", f"c{i}", [["docker", "start", f"c{i}"]])["id"] for i in range(6)]
+            assert _wait_for(lambda: all(job["status"] == "succeeded" for job in jobs.list()))
+            jobs.submit("start", "c6", [["docker", "start", "c6"]])
+        finally:
+            jobs.close()
+
+        assert len(jobs.list()) <= 4
+        assert jobs.get(ids[0]) is None
+        assert jobs.list()[0]["target"] == "c6"
+
+    def test_jobs_are_shared_between_workers(self, tmp_path):
+        release = threading.Event()
+        first_docker, second_docker = FakeDocker(block=release), FakeDocker()
+        first = JobManager(first_docker, db_path=tmp_path / "jobs.sqlite3", poll_interval=0.01)
+        second = JobManager(second_docker, db_path=tmp_path / "jobs.sqlite3", poll_interval=0.01)
+        try:
+            running = first.submit("restart", "compose", compose_commands("restart"))
+            assert _wait_for(lambda: second.get(running["id"])["status"] == "running")
+
+            # The other worker waits for the running job instead of overlapping it
+            waiting = second.submit("start", "directia_mongo", container_commands("start", "directia_mongo"))
+            time.sleep(0.1)
+            assert second.get(waiting["id"])["status"] == "queued"
+            assert second_docker.calls == []
+
+            release.set()
+            assert _wait_for(lambda: first.get(waiting["id"])["status"] == "succeeded")
+        finally:
+            first.close()
+            second.close()
+
+        assert [job["id"] for job in second.list()] == [waiting["id"], running["id"]]
+        assert second.get(running["id"])["status"] == "succeeded"
+
+    def test_abandoned_running_job_does_not_block(self, tmp_path):
+        # A worker that claimed a job and died before finishing it
+        dead = JobManager(FakeDocker(), timeout=0, db_path=tmp_path / "jobs.sqlite3")
+        with patch.object(dead, "_ensure_started"):
+            orphan = dead.submit("stop", "compose", compose_commands("stop"))
+        assert dead._claim(orphan["id"], 1)
+
+        jobs = JobManager(FakeDocker(), db_path=tmp_path / "jobs.sqlite3")
+        try:
+            job = jobs.submit("start", "compose", compose_commands("start"))
+            assert _wait_for(lambda: jobs.get(job["id"])["status"] == "succeeded")
+        finally:
+            jobs.close()
+
+        assert jobs.get(orphan["id"])["status"] == "running"
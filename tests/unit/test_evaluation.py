@@ -0,0 +1,55 @@
+"""
+Unit tests for the batch evaluation engine.
+"""
+import pandas as pd
+import pytest
+
+from src.ia.evaluation import ModelEvaluator, load_predictions, report_from_predictions
+
+
+TEST_DF = pd.DataFrame({
+    "text": [
+        "Factura número 123 importe total IVA base imponible",
+        "Nómina mensual salario base trabajador retenciones IRPF",
+        "Contrato de arrendamiento entre las partes firmantes",
+        "",
+    ],
+    "label": ["factura", "nomina", "contrato", "otro"],
+})
+
+
+@pytest.fixture(scope="module")
+def evaluator():
+    evaluator = ModelEvaluator()
+    if evaluator.classifier is None or evaluator.classifier.model is None:
+        pytest.skip("Modelo tfidf_svm_v1 no disponible")
+    return evaluator
+
+
+class TestBatchEvaluation:
+    """Test that one prediction pass feeds every report."""
+
+    def test_batch_matches_classify_text(self, evaluator):
+        predictions = evaluator.predict_dataset(TEST_DF)
+
+        for text, predicted, confidence in zip(TEST_DF["text"], predictions["predicted"], predictions["confidence"]):
+            single = evaluator.classifier.classify_text(text)
+            assert single["tipo_documento"] == predicted
+            assert single["confianza"] == pytest.approx(confidence)
+
+    def test_reports_reuse_predictions(self, evaluator, monkeypatch):
+        evaluator.evaluate_on_dataset(TEST_DF)
+
+        def fail(*args, **kwargs):
+            raise AssertionError("el modelo no debe volver a ejecutarse")
+
+        monkeypatch.setattr(evaluator.classifier, "classify_batch", fail)
+        evaluator.identify_weak_categories(TEST_DF)
+        evaluator.evaluate_on_dataset(TEST_DF)
+
+    def test_saved_predictions_rebuild_the_report(self, evaluator, tmp_path):
+        path = tmp_path / "predictions.parquet"
+        results = evaluator.evaluate_on_dataset(TEST_DF, predictions_path=str(path))
+
+        rebuilt = report_from_predictions(load_predictions(path), evaluator.model_name)
+        assert rebuilt == results
@@ -0,0 +1,271 @@
+"""
+Unit tests for the folder-template tree loader, its per-group cache and the
+bulk apply engine.
+"""
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from loadtest.memory_mongo import MemoryDatabase
+from src.models import FolderTemplate, Group
+from src.services import folder_templates
+from src.services.folder_templates import (
+    FolderTreeCache, apply_structure, build_tree, count_nodes, get_tree, invalidate_tree_cache,
+    lineage_group_ids, load_templates, plan_folders,
+)
+
+
+@pytest.fixture
+def session(engine):
+    folder_templates.clear_tree_cache()
+    session = sessionmaker(bind=engine)()
+    session.add_all([Group(id=1, name="ventas"), Group(id=2, name="rrhh")])
+    session.flush()
+
+    def add(name, parent=None, group_id=None, order=0):
+        folder = FolderTemplate(name=name, parent_id=parent.id if parent else None, group_id=group_id,
+                                order=order, protected=True)
+        session.add(folder)
+        session.flush()
+        return folder
+
+    facturas = add("Facturas", group_id=1, order=2)
+    add("2024", parent=facturas, group_id=1, order=1)
+    emitidas = add("Emitidas", parent=facturas, group_id=1, order=0)
+    add("Enero", parent=emitidas, group_id=1)
+    add("Clientes", group_id=1, order=1)
+    add("Nominas", group_id=2)
+    add("Documentos")
+    session.commit()
+    yield session
+    session.close()
+
+
+def _names(tree):
+    return [(node["name"], _names(node["children"])) for node in tree]
+
+
+class TestTreeLoader:
+    """Test the single-query loader and the in-memory assembly."""
+
+    def test_group_tree_in_one_query(self, session, statements):
+        tree = build_tree(load_templates(session, 1))
+
+        assert len(statements) == 1
+        assert _names(tree) == [
+            ("Clientes", []),
+            ("Facturas", [("Emitidas", [("Enero", [])]), ("2024", [])]),
+        ]
+        assert count_nodes(tree) == 5
+
+    def test_include_global(self, session):
+        tree = build_tree(load_templates(session, 2, include_global=True))
+
+        assert [node["name"] for node in tree] == ["Nominas", "Documentos"]
+
+    def test_all_roots(self, session):
+        tree = build_tree(load_templates(session))
+
+        assert count_nodes(tree) == 7
+        assert {node["group_id"] for node in tree} == {1, 2, None}
+
+    def test_descendants_follow_root_group(self, session):
+        # Un hijo con otro group_id sigue colgando de la raíz de su padre
+        documentos = session.query(FolderTemplate).filter_by(name="Documentos").one()
+        session.add(FolderTemplate(name="Compartida", parent_id=documentos.id, group_id=2, order=0))
+        session.commit()
+
+        tree = build_tree(load_templates(session, 2, include_global=True))
+
+        assert _names(tree) == [("Nominas", []), ("Documentos", [("Compartida", [])])]
+
+    def test_serialized_fields(self, session):
+        node = build_tree(load_templates(session, 2))[0]
+
+        assert set(node) == {"id", "name", "description", "icon", "parent_id", "order", "protected",
+                             "group_id", "children"}
+
+
+class TestTreeCache:
+    """Test caching and invalidation of serialised trees."""
+
+    def test_cached_until_invalidated(self, session, statements):
+        first = get_tree(session, 1)
+        assert get_tree(session, "1") is first
+        assert len(statements) == 1
+
+        invalidate_tree_cache(2)
+        assert get_tree(session, 1) is first
+
+        invalidate_tree_cache("1")
+        assert get_tree(session, 1) is not first
+        assert len(statements) == 2
+
+    def test_global_invalidation_clears_all(self, session):
+        get_tree(session, 1)
+        get_tree(session, 2, include_global=True)
+        invalidate_tree_cache(None)
+
+        assert len(folder_templates._tree_cache) == 0
+
+    def test_all_groups_view_invalidated_by_any_group(self, session):
+        get_tree(session)
+        get_tree(session, 2)
+        invalidate_tree_cache(1)
+
+        assert set(folder_templates._tree_cache._entries) == {(2, False)}
+
+    def test_lineage_spans_every_ancestor_group(self, session):
+        # Subtree crossing three groups: Documentos (global) > Compartida (2) > Ventas (1)
+        documentos = session.query(FolderTemplate).filter_by(name="Documentos").one()
+        compartida = FolderTemplate(name="Compartida", parent_id=documentos.id, group_id=2, order=0)
+        session.add(compartida)
+        session.flush()
+        ventas = FolderTemplate(name="Ventas", parent_id=compartida.id, group_id=1, order=0)
+        session.add(ventas)
+        session.commit()
+
+        assert lineage_group_ids(ventas) == [1, 2, None]
+        assert lineage_group_ids(compartida) == [2, None]
+
+    def test_lineage_invalidates_root_group_tree(self, session):
+        # The root's group is two levels up; the folder and its parent share another group
+        nominas = session.query(FolderTemplate).filter_by(name="Nominas").one()
+        anual = FolderTemplate(name="Anual", parent_id=nominas.id, group_id=1, order=0)
+        session.add(anual)
+        session.flush()
+        cierre = FolderTemplate(name="Cierre", parent_id=anual.id, group_id=1, order=0)
+        session.add(cierre)
+        session.commit()
+        first = get_tree(session, 2)
+
+        invalidate_tree_cache(*lineage_group_ids(cierre))
+
+        assert get_tree(session, 2) is not first
+
+    def test_ttl(self):
+        cache = FolderTreeCache(ttl=0)
+        cache.put((1, False), [])
+
+        assert cache.get((1, False)) is None
+
+    def test_stale_put_discarded(self):
+        cache = FolderTreeCache()
+        generation = cache.generation
+        cache.invalidate(1)
+        cache.put((1, False), ["viejo"], generation)
+
+        assert cache.get((1, False)) is None
+
+
+class TestApplyStructure:
+    """Test the bulk apply engine against a temp dir and in-memory Mongo."""
+
+    @pytest.fixture
+    def metadata(self):
+        return MemoryDatabase()["metadata"]
+
+    def _trees(self, session, *group_ids):
+        return {group_id: get_tree(session, group_id, include_global=True) for group_id in group_ids}
+
+    def test_plan_paths(self, session):
+        planned = plan_folders([get_tree(session, 1)])
+
+        assert [(f["relative_path"], f["filename"]) for f in planned] == [
+            ("/", "Clientes"), ("/", "Facturas"), ("/Facturas", "Emitidas"),
+            ("/Facturas/Emitidas", "Enero"), ("/Facturas", "2024"),
+        ]
+
+    def test_first_apply_inserts_everything(self, session, metadata, tmp_path):
+        with patch.object(metadata, "find", wraps=metadata.find) as find, \
+                patch.object(metadata, "bulk_write", wraps=metadata.bulk_write) as bulk_write:
+            report = apply_structure(metadata, str(tmp_path), self._trees(session, 1), user="ana")
+
+        assert find.call_count == 1
+        assert bulk_write.call_count == 1
+        assert bulk_write.call_args.kwargs == {"ordered": False}
+        assert (tmp_path / "Facturas" / "Emitidas" / "Enero").is_dir()
+        assert len(report["created"]) == len(report["inserted"]) == 6
+        assert report["groups"][1] == {"total": 6, "inserted": 6, "updated": 0, "unchanged": 0, "error": 0}
+        assert "+ Facturas/Emitidas/Enero" in report["diff"]
+
+        enero = metadata.find_one({"filename": "Enero"})
+        assert enero["relative_path"] == "/Facturas/Emitidas"
+        assert enero["tipo"] == "carpeta" and enero["protegida"] is True and enero["user"] == "ana"
+
+    def test_reapply_is_a_no_op(self, session, metadata, tmp_path):
+        apply_structure(metadata, str(tmp_path), self._trees(session, 1))
+
+        with patch.object(metadata, "bulk_write") as bulk_write:
+            report = apply_structure(metadata, str(tmp_path), self._trees(session, 1))
+
+        bulk_write.assert_not_called()
+        assert report["created"] == report["inserted"] == report["updated"] == []
+        assert len(report["unchanged"]) == 6
+
+    def test_protection_change_is_updated(self, session, metadata, tmp_path):
+        apply_structure(metadata, str(tmp_path), self._trees(session, 2))
+        metadata.update_one({"filename": "Nominas"}, {"$set": {"protegida": False}})
+
+        report = apply_structure(metadata, str(tmp_path), self._trees(session, 2))
+
+        assert report["updated"] == ["Nominas"]
+        assert "~ Nominas (protegida: False -> True)" in report["diff"]
+        assert metadata.find_one({"filename": "Nominas"})["protegida"] is True
+
+    def test_many_groups_share_global_folders(self, session, metadata, tmp_path):
+        report = apply_structure(metadata, str(tmp_path), self._trees(session, 1, 2))
+
+        assert metadata.count_documents({"filename": "Documentos"}) == 1
+        assert len(report["inserted"]) == 7
+        assert report["groups"][1]["total"] == 6
+        assert report["groups"][2]["total"] == 2
+
+    def test_directory_error_skips_descendants(self, session, metadata, tmp_path):
+        (tmp_path / "Facturas").write_text("no soy una carpeta")
+
+        report = apply_structure(metadata, str(tmp_path), self._trees(session, 1))
+
+        assert len(report["errors"]) == 1
+        assert report["groups"][1]["error"] == 4
+        assert metadata.count_documents({"relative_path": {"$regex": "^/Facturas"}}) == 0
+        assert "! Facturas/2024" in report["diff"]
+
+
+class TestFolderStructureRoute:
+    """Test query validation and cache invalidation of /admin/folder-structure/."""
+
+    @pytest.fixture
+    def client(self, session):
+        routes = pytest.importorskip("src.routes.folder_structure", exc_type=ImportError)
+        from flask import Flask
+
+        app = Flask(__name__)
+        app.session = lambda: session
+        app.register_blueprint(routes.bp)
+        with patch("src.utils.auth_helper._check", return_value=None):
+            yield app.test_client()
+
+    def test_group_filter(self, client):
+        response = client.get("/admin/folder-structure/?group_id=2")
+
+        assert response.status_code == 200
+        assert _names(response.get_json()["folders"]) == [("Nominas", [])]
+
+    def test_invalid_group_id(self, client):
+        response = client.get("/admin/folder-structure/?group_id=ventas")
+
+        assert response.status_code == 400
+        assert "group_id" in response.get_json()["error"]
+
+    def test_create_invalidates_root_group(self, client, session):
+        nominas = session.query(FolderTemplate).filter_by(name="Nominas").one()
+        anual = client.post("/admin/folder-structure/", json={"name": "Anual", "parent_id": nominas.id, "group_id": 1})
+        client.get("/admin/folder-structure/?group_id=2")
+
+        client.post("/admin/folder-structure/",
+                    json={"name": "Cierre", "parent_id": anual.get_json()["folder"]["id"], "group_id": 1})
+        response = client.get("/admin/folder-structure/?group_id=2")
+
+        assert _names(response.get_json()["folders"]) == [("Nominas", [("Anual", [("Cierre", [])])])]
@@ -0,0 +1,107 @@
+"""
+Unit tests for the incremental (HashingVectorizer + SGD) training mode.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.ia.document_store import DocumentStore
+from src.ia.log_store import PartitionedLog
+from src.ia.pipeline import ModelBundle
+from src.ia.retraining import RetrainingPipeline
+from src.ia.training.incremental import IncrementalModel, IncrementalTrainer
+
+
+CLASSES = ["factura", "contrato", "nomina"]
+
+CORPUS = {
+    "factura": "Factura número {i} importe total IVA base imponible cliente pago",
+    "contrato": "Contrato de prestación de servicios {i} cláusulas partes firmantes duración",
+    "nomina": "Nómina mensual {i} salario base trabajador devengos retenciones IRPF",
+}
+
+
+def _corpus(n=20):
+    texts, labels = [], []
+    for label, template in CORPUS.items():
+        for i in range(n):
+            texts.append(template.format(i=i))
+            labels.append(label)
+    return texts, labels
+
+
+@pytest.fixture
+def trainer(tmp_path):
+    trainer = IncrementalTrainer(tmp_path / "incremental", model=IncrementalModel(classes=CLASSES),
+                                 checkpoint_every=5)
+    texts, labels = _corpus()
+    trainer.full_refit(texts, labels, epochs=3)
+    return trainer
+
+
+class TestIncrementalModel:
+    """Test partial updates and checkpoints."""
+
+    def test_full_refit_learns_corpus(self, trainer):
+        texts, labels = _corpus(3)
+        assert trainer.model.predict(texts) == labels
+
+    def test_checkpoint_is_a_model_bundle(self, trainer):
+        bundle = ModelBundle(trainer.model_dir)
+
+        assert sorted(bundle.labels) == sorted(CLASSES)
+        assert bundle.version.startswith("hashing_sgd_")
+        features = bundle.vectorizer.transform(["factura importe total iva"])
+        assert bundle.model.predict_proba(features).shape == (1, 3)
+
+    def test_update_moves_model_towards_feedback(self, trainer):
+        text = "documento extraño sin palabras conocidas xyz"
+        for _ in range(20):
+            trainer.update([text], ["contrato"], sample_weight=[5.0])
+
+        assert trainer.model.predict([text]) == ["contrato"]
+
+    def test_unknown_labels_are_skipped(self, trainer):
+        result = trainer.update(["texto"], ["categoria_inexistente"])
+        assert result["samples"] == 0
+
+    def test_checkpoint_policy_and_reload(self, trainer):
+        seen = trainer.model.samples_seen
+        results = [trainer.update(["factura importe"], ["factura"], watermark=f"2026-10-0{i}") for i in range(1, 6)]
+
+        assert [r["checkpointed"] for r in results] == [False, False, False, False, True]
+        reloaded = IncrementalTrainer(trainer.model_dir)
+        assert reloaded.model.samples_seen == seen + 5
+        assert reloaded.watermark == "2026-10-05"
+
+    def test_update_requires_fitted_model(self, tmp_path):
+        trainer = IncrementalTrainer(tmp_path / "empty", model=IncrementalModel(classes=CLASSES))
+        with pytest.raises(RuntimeError):
+            trainer.update(["texto"], ["factura"])
+
+
+class TestIncrementalRetraining:
+    """Test that only feedback newer than the checkpoint is folded in."""
+
+    def test_feedback_is_applied_once(self, trainer, tmp_path):
+        documents = DocumentStore(tmp_path / "documents.sqlite3")
+        feedback = PartitionedLog(str(tmp_path / "user_feedback"))
+        retraining = RetrainingPipeline(feedback_log=feedback, predictions_log=PartitionedLog(str(tmp_path / "p")),
+                                        documents=documents)
+
+        documents.put("doc1", "Contrato de arrendamiento de local", "a.pdf")
+        timestamp = (datetime.now() - timedelta(minutes=1)).isoformat()
+        feedback.append([{
+            "timestamp": timestamp,
+            "document_id": "doc1",
+            "predicted_type": "factura",
+            "actual_type": "contrato",
+            "was_correct": False,
+        }])
+
+        first = retraining.incremental_update(trainer=trainer)
+        second = retraining.incremental_update(trainer=trainer)
+
+        assert first["samples"] == 1
+        assert first["feedback_watermark"] == timestamp
+        assert second["samples"] == 0
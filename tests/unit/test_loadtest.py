@@ -0,0 +1,78 @@
+"""
+Unit tests for the load-test harness and its in-memory Mongo stand-in.
+"""
+import re
+
+from pymongo import DeleteMany, InsertOne, UpdateOne
+
+from loadtest.harness import Recorder, parse_mix
+from loadtest.memory_mongo import MemoryDatabase
+
+
+def _collection():
+    col = MemoryDatabase()["metadata"]
+    col.insert_many([
+        {"filename": "a.pdf", "relative_path": "/u1/", "size": 10, "clasificacion": {"tipo": "factura"}},
+        {"filename": "b.pdf", "relative_path": "/u1/sub/", "size": 20},
+        {"filename": "c.txt", "relative_path": "/u2/", "size": 30, "protegida": True},
+    ])
+    return col
+
+
+class TestMemoryMongo:
+    """Test the query and update subset used by the services."""
+
+    def test_filters(self):
+        col = _collection()
+
+        assert col.count_documents({"relative_path": {"$regex": "^/u1/"}}) == 2
+        assert col.count_documents({"filename": {"$in": ["a.pdf", "c.txt"]}}) == 2
+        assert col.count_documents({"size": {"$gte": 20}, "protegida": {"$exists": False}}) == 1
+        assert col.count_documents({"clasificacion.tipo": "factura"}) == 1
+        assert col.count_documents({"filename": re.compile(r"\.txt$")}) == 1
+        assert col.find_one({"$or": [{"size": 99}, {"filename": "b.pdf"}]})["size"] == 20
+
+    def test_find_sort_skip_limit(self):
+        names = [doc["filename"] for doc in _collection().find().sort("size", -1).skip(1).limit(1)]
+        assert names == ["b.pdf"]
+
+    def test_updates_and_deletes(self):
+        col = _collection()
+
+        assert col.update_one({"filename": "a.pdf"}, {"$set": {"relative_path": "/u3/"}, "$inc": {"size": 1}}).matched_count == 1
+        assert col.find_one({"filename": "a.pdf"}, {"size": 1, "_id": 0}) == {"size": 11}
+        assert col.update_one({"filename": "z"}, {"$set": {"size": 0}}, upsert=True).upserted_id is not None
+        assert col.delete_many({"relative_path": {"$regex": "^/u1/"}}).deleted_count == 1
+
+    def test_bulk_write(self):
+        col = _collection()
+        result = col.bulk_write([
+            InsertOne({"filename": "d.pdf"}),
+            UpdateOne({"filename": "d.pdf"}, {"$set": {"size": 5}}),
+            DeleteMany({"relative_path": "/u2/"}),
+        ], ordered=False)
+
+        assert (result.inserted_count, result.modified_count, result.deleted_count) == (1, 1, 1)
+        assert col.find_one({"filename": "d.pdf"})["size"] == 5
+
+
+class TestRecorder:
+    """Test per-endpoint aggregation."""
+
+    def test_report_per_endpoint(self):
+        recorder = Recorder()
+        for latency in (10.0, 20.0, 30.0):
+            recorder.record("list", latency, 200)
+        recorder.record("upload", 50.0, 500)
+        recorder.record("upload", 60.0, None)
+
+        report = recorder.report(elapsed_s=2.0)
+
+        assert report["requests"] == 5
+        assert report["errors"] == 2
+        assert report["endpoints"]["list"]["latency_ms"]["p50"] == 20.0
+        assert report["endpoints"]["list"]["throughput_rps"] == 1.5
+        assert report["endpoints"]["upload"]["statuses"] == {"500": 1}
+
+    def test_parse_mix(self):
+        assert parse_mix("list=3, upload=1") == {"list": 3, "upload": 1}
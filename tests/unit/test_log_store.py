@@ -0,0 +1,119 @@
+"""
+Unit tests for the day-partitioned log store.
+"""
+import gzip
+import os
+from datetime import date
+from unittest.mock import patch
+
+import pytest
+
+from src.ia.log_store import PartitionedLog
+
+
+def _entry(day, name, **extra):
+    entry = {"timestamp": f"{day}T10:00:00", "date": day, "file": name, "predicted": "factura", "confidence": 0.9}
+    entry.update(extra)
+    return entry
+
+
+class TestPartitionedLog:
+    """Test partitioned writes, date-filtered reads and compaction."""
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        return PartitionedLog(str(tmp_path / "predictions"))
+
+    def test_entries_go_to_their_day(self, store):
+        store.append([_entry("2026-10-01", "a.pdf"), _entry("2026-10-02", "b.pdf")])
+        store.append([_entry("2026-10-02", "c.pdf")])
+
+        assert [path.name for path in store.partitions()] == ["2026-10-01.jsonl.gz", "2026-10-02.jsonl.gz"]
+        assert [entry["file"] for entry in store.read(since="2026-10-02")] == ["b.pdf", "c.pdf"]
+
+    def test_feedback_entries_without_date_use_timestamp(self, store):
+        store.append([{"timestamp": "2026-09-30T23:59:59", "actual_type": "recibo"}])
+
+        assert store.partitions()[0].name == "2026-09-30.jsonl.gz"
+
+    def test_reads_only_the_requested_range(self, store, monkeypatch):
+        for day in range(1, 31):
+            store.append([_entry(f"2026-09-{day:02d}", f"{day}.pdf")])
+
+        opened = []
+        real_open = gzip.open
+        monkeypatch.setattr(gzip, "open", lambda path, *a, **k: opened.append(path.name) or real_open(path, *a, **k))
+
+        entries = list(store.read(since=date(2026, 9, 24), until="2026-09-30"))
+        assert len(entries) == 7
+        assert len(opened) == 7
+
+    def test_column_projection(self, store):
+        store.append([_entry("2026-10-01", "a.pdf", username="ana")])
+
+        assert list(store.read(columns=["file", "missing"])) == [{"file": "a.pdf", "missing": None}]
+
+    def test_compaction_to_parquet(self, store):
+        pytest.importorskip("pyarrow")
+        store.append([
+            _entry("2026-09-01", "a.pdf", timings=[{"stage": "extract", "cache_hit": False}]),
+            {"timestamp": "2026-09-01T11:00:00", "date": "2026-09-01", "type": "error", "error_message": "x"},
+        ])
+        store.append([_entry("2026-10-18", "recent.pdf")])
+
+        compacted = store.compact(older_than_days=7, today=date(2026, 10, 19))
+
+        assert compacted == ["2026-09-01"]
+        assert [path.name for path in store.partitions()] == ["2026-09-01.parquet", "2026-10-18.jsonl.gz"]
+        entries = list(store.read(until="2026-09-01"))
+        assert entries[0]["file"] == "a.pdf"
+        assert entries[0]["timings"][0]["stage"] == "extract"
+        assert entries[1]["type"] == "error"
+        assert list(store.read(until="2026-09-01", columns=["file"])) == [{"file": "a.pdf"}, {"file": None}]
+
+    def test_compaction_keeps_mixed_type_fields(self, store):
+        pytest.importorskip("pyarrow")
+        store.append([_entry("2026-09-01", "a.pdf", extra="text"), _entry("2026-09-01", "b.pdf", extra={"k": 1})])
+        store.compact(older_than_days=1, today=date(2026, 10, 19))
+
+        assert [entry["extra"] for entry in store.read()] == ["text", {"k": 1}]
+
+    def test_compaction_keeps_concurrent_appends(self, store):
+        pytest.importorskip("pyarrow")
+        store.append([_entry("2026-09-01", "a.pdf")])
+        read_jsonl = store._read_jsonl
+
+        def read_then_append(path, columns):
+            entries = list(read_jsonl(path, columns))
+            # Another worker appends to the same day while it is being compacted
+            store.append([_entry("2026-09-01", "late.pdf")])
+            return entries
+
+        with patch.object(store, "_read_jsonl", side_effect=read_then_append):
+            store.compact(older_than_days=7, today=date(2026, 10, 19))
+
+        assert sorted(path.name for path in store.partitions()) == ["2026-09-01.jsonl.gz", "2026-09-01.parquet"]
+        assert store.compact(older_than_days=7, today=date(2026, 10, 19)) == ["2026-09-01"]
+        assert [entry["file"] for entry in store.read()] == ["a.pdf", "late.pdf"]
+
+    def test_compaction_resumes_interrupted_day(self, store):
+        pytest.importorskip("pyarrow")
+        store.append([_entry("2026-09-01", "a.pdf")])
+        partition = store.partition_path("2026-09-01")
+        os.replace(partition, partition.with_name(f".{partition.name}.compacting"))
+
+        assert store.compact(older_than_days=7, today=date(2026, 10, 19)) == ["2026-09-01"]
+        assert [entry["file"] for entry in store.read()] == ["a.pdf"]
+        assert list(store.directory.iterdir()) == [store.partition_path("2026-09-01", ".parquet")]
+
+    def test_import_legacy_file(self, store, tmp_path):
+        legacy = tmp_path / "predictions.jsonl"
+        legacy.write_text(
+            '{"timestamp": "2025-11-14T18:22:02", "date": "2025-11-14", "file": "a.png"}\n'
+            'not json\n'
+            '{"timestamp": "2025-11-15T09:00:00", "date": "2025-11-15", "file": "b.png"}\n',
+            encoding="utf-8",
+        )
+
+        assert store.import_jsonl(str(legacy)) == 2
+        assert len(store.partitions()) == 2
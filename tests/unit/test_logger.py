@@ -0,0 +1,113 @@
+"""
+Unit tests for the buffered prediction logger.
+"""
+import multiprocessing
+import time
+
+import pytest
+
+from src.ia.log_store import PartitionedLog
+from src.ia.logger import PredictionLogger
+
+
+def _read_entries(path):
+    return list(PartitionedLog(path).read())
+
+
+def _write_from_worker(path, worker, count):
+    logger = PredictionLogger(path, batch_size=16, flush_interval=0.05)
+    for i in range(count):
+        logger.log_prediction(f"w{worker}_{i}.pdf", "factura", 0.9, text_preview="x" * 150)
+    logger.close()
+
+
+class TestPredictionLogger:
+    """Test the queue-backed log writer."""
+
+    @pytest.fixture
+    def log_dir(self, tmp_path):
+        return str(tmp_path / "logs" / "predictions")
+
+    def test_entry_fields(self, log_dir):
+        """Test that entries keep the original schema."""
+        logger = PredictionLogger(log_dir)
+        logger.log_prediction("/tmp/Factura.PDF", "factura", 0.912345, username="ana",
+                              processing_time=0.1234, timings=[{"stage": "extract"}])
+        logger.log_error("/tmp/x.pdf", "boom", username="ana")
+        assert logger.flush()
+
+        prediction, error = _read_entries(log_dir)
+        assert prediction["file"] == "Factura.PDF"
+        assert prediction["file_extension"] == ".pdf"
+        assert prediction["confidence"] == 0.9123
+        assert prediction["date"] == prediction["timestamp"][:10]
+        assert prediction["time"] == prediction["timestamp"][11:19]
+        assert prediction["timings"] == [{"stage": "extract"}]
+        assert error["type"] == "error"
+        assert error["error_message"] == "boom"
+
+    def test_writes_are_deferred_until_flush(self, log_dir):
+        """Test that logging does not touch the file on the caller thread."""
+        logger = PredictionLogger(log_dir, batch_size=1000, flush_interval=60)
+        logger.log_prediction("a.pdf", "factura", 0.9)
+
+        assert _read_entries(log_dir) == []
+        assert logger.flush()
+        assert len(_read_entries(log_dir)) == 1
+
+    def test_batch_size_triggers_write(self, log_dir):
+        """Test that a full batch is written without waiting for the interval."""
+        logger = PredictionLogger(log_dir, batch_size=10, flush_interval=60)
+        for i in range(10):
+            logger.log_prediction(f"{i}.pdf", "factura", 0.9)
+
+        for _ in range(100):
+            if PartitionedLog(log_dir).partitions():
+                break
+            time.sleep(0.01)
+        assert len(_read_entries(log_dir)) == 10
+        logger.close()
+
+    def test_close_flushes_pending_entries(self, log_dir):
+        """Test that shutdown drains the queue."""
+        logger = PredictionLogger(log_dir, batch_size=1000, flush_interval=60, fsync_policy="never")
+        for i in range(50):
+            logger.log_prediction(f"{i}.pdf", "recibo", 0.5)
+        logger.close()
+
+        assert [entry["file"] for entry in _read_entries(log_dir)] == [f"{i}.pdf" for i in range(50)]
+
+    def test_unbuffered_mode(self, log_dir):
+        """Test that buffered=False writes synchronously."""
+        logger = PredictionLogger(log_dir, buffered=False)
+        logger.log_prediction("a.pdf", "factura", 0.9)
+
+        assert len(_read_entries(log_dir)) == 1
+
+    def test_invalid_fsync_policy(self, log_dir):
+        with pytest.raises(ValueError):
+            PredictionLogger(log_dir, fsync_policy="sometimes")
+
+    def test_stats_see_buffered_entries(self, log_dir):
+        """Test that get_stats flushes before reading."""
+        logger = PredictionLogger(log_dir, batch_size=1000, flush_interval=60)
+        logger.log_prediction("a.pdf", "factura", 0.9)
+        logger.log_prediction("b.pdf", "recibo", 0.4)
+
+        stats = logger.get_stats()
+        assert stats["total_predictions"] == 2
+        assert stats["by_type"] == {"factura": 1, "recibo": 1}
+
+    def test_concurrent_processes_do_not_interleave(self, log_dir):
+        """Test that several workers can append to the same file."""
+        PartitionedLog(log_dir)
+        context = multiprocessing.get_context("fork")
+        workers = [context.Process(target=_write_from_worker, args=(log_dir, w, 200)) for w in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(30)
+
+        entries = _read_entries(log_dir)
+        assert len(entries) == 800
+        assert len({entry["file"] for entry in entries}) == 800
@@ -0,0 +1,159 @@
+"""
+Unit tests for the Prometheus metrics registry.
+"""
+import threading
+from types import SimpleNamespace
+
+import pytest
+from flask import Blueprint, Flask, Response
+
+from src.utils import metrics
+from src.utils.metrics import Registry
+
+
+def _sample(text, line_prefix):
+    """Return the value of the first exposition line starting with a prefix."""
+    for line in text.splitlines():
+        if line.startswith(line_prefix + " "):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"{line_prefix} not found in:\n{text}")
+
+
+class TestRegistry:
+    """Test counters, gauges and histograms."""
+
+    def test_counter_with_labels(self):
+        registry = Registry()
+        counter = registry.counter("jobs_total", "Jobs.", ("queue",))
+        counter.labels("ocr").inc()
+        counter.labels(queue="ocr").inc(2)
+        text = registry.render()
+
+        assert "# TYPE jobs_total counter" in text
+        assert _sample(text, 'jobs_total{queue="ocr"}') == 3
+
+    def test_gauge_function_is_read_on_render(self):
+        registry = Registry()
+        gauge = registry.gauge("queue_depth", "Depth.", ("queue",))
+        items = [1, 2]
+        gauge.set_function(lambda: len(items), "logger")
+
+        assert _sample(registry.render(), 'queue_depth{queue="logger"}') == 2
+        items.append(3)
+        assert _sample(registry.render(), 'queue_depth{queue="logger"}') == 3
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = Registry()
+        histogram = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 2.0):
+            histogram.observe(value)
+        text = registry.render()
+
+        assert _sample(text, 'latency_seconds_bucket{le="0.1"}') == 2
+        assert _sample(text, 'latency_seconds_bucket{le="1"}') == 3
+        assert _sample(text, 'latency_seconds_bucket{le="+Inf"}') == 4
+        assert _sample(text, "latency_seconds_count") == 4
+        assert _sample(text, "latency_seconds_sum") == pytest.approx(2.65)
+
+    def test_label_values_are_escaped(self):
+        registry = Registry()
+        registry.counter("errors_total", "Errors.", ("op",)).labels('a"b\\c').inc()
+
+        assert 'errors_total{op="a\\"b\\\\c"} 1' in registry.render()
+
+    def test_wrong_labels_raise(self):
+        registry = Registry()
+        counter = registry.counter("calls_total", "Calls.", ("db", "op"))
+
+        with pytest.raises(ValueError):
+            counter.labels("mongo")
+
+    def test_duplicate_metric_raises(self):
+        registry = Registry()
+        registry.counter("dup_total", "Dup.")
+
+        with pytest.raises(ValueError):
+            registry.counter("dup_total", "Dup.")
+
+    def test_concurrent_increments_are_not_lost(self):
+        registry = Registry()
+        counter = registry.counter("hits_total", "Hits.")
+
+        def work():
+            for _ in range(10000):
+                counter.inc()
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert counter.get() == 80000
+
+
+class TestIntegrations:
+    """Test the Flask, SQLAlchemy and PyMongo hooks."""
+
+    @pytest.fixture
+    def app(self):
+        app = Flask(__name__)
+        metrics.init_app(app)
+        bp = Blueprint("probe", __name__)
+
+        @bp.route("/probe")
+        def probe():
+            assert metrics.HTTP_REQUESTS_IN_FLIGHT.get() >= 1
+            return "ok"
+
+        @bp.route("/boom")
+        def boom():
+            raise RuntimeError("boom")
+
+        @bp.route("/metrics")
+        def exposition():
+            return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+        app.register_blueprint(bp)
+        return app
+
+    def test_request_latency_per_blueprint(self, app):
+        client = app.test_client()
+        before = metrics.HTTP_REQUESTS_IN_FLIGHT.get()
+
+        assert client.get("/probe").status_code == 200
+        assert client.get("/boom").status_code == 500
+        response = client.get("/metrics")
+        text = response.get_data(as_text=True)
+
+        assert response.content_type.startswith("text/plain; version=0.0.4")
+        assert _sample(text, 'directia_http_request_duration_seconds_count{blueprint="probe",method="GET",status="200"}') >= 1
+        assert _sample(text, 'directia_http_request_duration_seconds_count{blueprint="probe",method="GET",status="500"}') >= 1
+        assert metrics.HTTP_REQUESTS_IN_FLIGHT.get() == before
+
+    def test_sqlalchemy_calls_are_timed(self):
+        from sqlalchemy import create_engine, text
+
+        engine = create_engine("sqlite:///:memory:")
+        metrics.instrument_engine(engine, database="sqlite")
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+        assert _sample(metrics.render(), 'directia_db_call_duration_seconds_count{database="sqlite",operation="SELECT"}') >= 1
+
+    def test_mongo_listener(self):
+        listener = metrics.MongoCommandMetrics()
+        listener.succeeded(SimpleNamespace(command_name="find", duration_micros=1500))
+        listener.failed(SimpleNamespace(command_name="insert", duration_micros=300))
+        text = metrics.render()
+
+        assert _sample(text, 'directia_db_call_duration_seconds_count{database="mongo",operation="find"}') >= 1
+        assert _sample(text, 'directia_db_call_errors_total{database="mongo",operation="insert"}') >= 1
+
+    def test_ocr_and_cache_ratios(self):
+        metrics.record_ocr(4, 2.0)
+        metrics.record_cache_lookup(True)
+        text = metrics.render()
+
+        assert _sample(text, "directia_ocr_pages_per_second") > 0
+        assert 0 < _sample(text, "directia_extraction_cache_hit_ratio") <= 1
@@ -8,6 +8,21 @@ from src.ia.pipeline import analizar_documento
 from src.ia.utils import clean_text
 
 
+@pytest.fixture
+def pipeline(tmp_path):
+    from src.ia.logger import PredictionLogger
+    from src.ia.pipeline import build_pipeline
+
+    logger = PredictionLogger(str(tmp_path / "predictions"))
+    return build_pipeline(logger=logger)
+
+
+@pytest.fixture
+def factura_bytes():
+    fixture = Path(__file__).parent.parent / "fixtures" / "sample_factura.txt"
+    return fixture.read_bytes()
+
+
 class TestTextCleaning:
     """Test text cleaning utilities."""
 
@@ -193,3 +208,135 @@ class TestPipelineErrorHandling:
 
         assert 'tipo_documento' in result
         assert isinstance(result, dict)
+
+
+class TestDocumentPipeline:
+    """Test the staged classification pipeline."""
+
+    def test_classify_bytes_result_structure(self, pipeline, factura_bytes):
+        """Test that the pipeline returns the public result fields."""
+        result = pipeline.classify_bytes(factura_bytes, "txt", file_name="factura.txt")
+
+        for key in ("tipo_documento", "category_id", "confianza", "confidence_level",
+                    "carpeta_sugerida", "nombre_sugerido", "top_predictions", "document_id"):
+            assert key in result
+        assert result["category_id"] == "factura"
+        assert result["metadata"]["file_name"] == "factura.txt"
+
+    def test_extraction_cache_hit(self, pipeline, factura_bytes):
+        """Test that the same content is extracted only once."""
+        first = pipeline.classify_bytes(factura_bytes, ".txt")
+        second = pipeline.classify_bytes(factura_bytes, ".txt")
+
+        assert first["metadata"]["cache_hit"] is False
+        assert second["metadata"]["cache_hit"] is True
+        assert first["document_id"] == second["document_id"]
+        assert pipeline.get_stats()["cache_hits"] == 1
+
+    def test_classify_file_matches_bytes(self, pipeline, tmp_path, factura_bytes):
+        """Test that file and byte entry points share the same stages."""
+        txt_file = tmp_path / "factura.txt"
+        txt_file.write_bytes(factura_bytes)
+
+        from_file = pipeline.classify_file(str(txt_file))
+        from_bytes = pipeline.classify_bytes(factura_bytes, "txt")
+
+        assert from_file["category_id"] == from_bytes["category_id"]
+        assert from_file["confianza"] == from_bytes["confianza"]
+
+    def test_empty_document(self, pipeline):
+        """Test that documents without text are reported, not classified."""
+        result = pipeline.classify_bytes(b"   ", "txt")
+
+        assert result["category_id"] == "desconocido"
+        assert "error" in result
+
+    def test_unsupported_format_raises(self, pipeline):
+        """Test that extraction failures raise PipelineError."""
+        from src.ia.pipeline import PipelineError
+
+        with pytest.raises(PipelineError):
+            pipeline.classify_bytes(b"data", "xyz")
+
+    def test_label_comes_from_predict(self):
+        """Test that the label is model.predict even when the probability argmax differs."""
+        from types import SimpleNamespace
+
+        import numpy as np
+
+        from src.ia.pipeline import ModelClassificationStage
+
+        class CalibratedModel:
+            classes_ = np.array([0, 1, 2])
+
+            def predict(self, features):
+                return np.array([1])
+
+            def predict_proba(self, features):
+                return np.array([[0.2, 0.35, 0.45]])
+
+        bundle = SimpleNamespace(model=CalibratedModel(), labels=["contrato", "factura", "recibo"])
+        ctx = SimpleNamespace(features=None, prediction=None)
+        ModelClassificationStage(bundle).run(ctx)
+
+        assert ctx.prediction["category_id"] == "factura"
+        assert ctx.prediction["confidence"] == 0.35
+        assert ctx.prediction["top"][0] == ("recibo", 0.45)
+
+    def test_custom_classifier_stage(self, pipeline, factura_bytes):
+        """Test that stages can be replaced."""
+        class FixedStage:
+            name = "classify"
+            classifier_type = "fixed"
+
+            def run(self, ctx):
+                ctx.prediction = {"category_id": "recibo", "confidence": 1.0, "top": [("recibo", 1.0)]}
+
+        pipeline.featurizer = None
+        pipeline.classifier = FixedStage()
+        result = pipeline.classify_bytes(factura_bytes, "txt")
+
+        assert result["category_id"] == "recibo"
+        assert result["classifier"] == "fixed"
+        assert result["carpeta_sugerida"] == "/Documentos/Recibos/"
+
+
+class TestPipelineTiming:
+    """Test per-stage latency spans."""
+
+    def test_result_has_one_span_per_stage(self, pipeline, factura_bytes):
+        """Test that every stage is timed in execution order."""
+        result = pipeline.classify_bytes(factura_bytes, "txt")
+        stages = [span["stage"] for span in result["timings"]]
+
+        assert stages == ["extract", "normalise", "featurise", "classify", "postprocess"]
+        assert all(span["duration_ms"] >= 0 for span in result["timings"])
+        assert result["processing_time_ms"] >= sum(span["duration_ms"] for span in result["timings"])
+
+    def test_extract_span_reports_bytes_and_cache(self, pipeline, factura_bytes):
+        """Test that the extract span records input size and cache hits."""
+        first = pipeline.classify_bytes(factura_bytes, "txt")["timings"][0]
+        second = pipeline.classify_bytes(factura_bytes, "txt")["timings"][0]
+
+        assert first["bytes_in"] == len(factura_bytes)
+        assert first["bytes_out"] > 0
+        assert first["cache_hit"] is False
+        assert second["cache_hit"] is True
+
+    def test_stage_histograms_in_stats(self, pipeline, factura_bytes):
+        """Test that spans are aggregated per stage."""
+        pipeline.classify_bytes(factura_bytes, "txt")
+        pipeline.classify_bytes(factura_bytes, "txt")
+        stages = pipeline.get_stats()["stages"]
+
+        assert stages["extract"]["count"] == 2
+        assert stages["total"]["count"] == 2
+        assert sum(stages["classify"]["buckets"].values()) == 2
+
+    def test_timings_are_logged(self, pipeline, factura_bytes):
+        """Test that the prediction log keeps the spans."""
+        pipeline.classify_bytes(factura_bytes, "txt")
+        pipeline.logger.flush()
+
+        entry = list(pipeline.logger.store.read())[-1]
+        assert [span["stage"] for span in entry["timings"]][0] == "extract"
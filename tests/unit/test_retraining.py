@@ -0,0 +1,97 @@
+"""
+Unit tests for the feedback → document text join used by retraining.
+"""
+from datetime import datetime
+
+import pytest
+
+from src.ia.document_store import DocumentStore
+from src.ia.log_store import PartitionedLog
+from src.ia.logger import PredictionLogger
+from src.ia.retraining import RetrainingPipeline
+
+
+def _feedback(file_path, actual, document_id=None):
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "file_path": file_path,
+        "document_id": document_id,
+        "predicted_type": "factura",
+        "actual_type": actual,
+        "was_correct": actual == "factura",
+    }
+
+
+class TestDocumentStore:
+    """Test the content-addressed text store."""
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        return DocumentStore(tmp_path / "documents.sqlite3")
+
+    def test_text_is_stored_once_and_normalised(self, store):
+        store.put("abc", "FACTURA  Nº 1\n\n\n  Total:   100 €", "factura.pdf")
+        store.put("abc", "otro texto", "copia.pdf")
+
+        assert store.get_text("abc") == "FACTURA Nº 1\n\nTotal: 100 €"
+        assert store.find_by_files(["factura.pdf", "copia.pdf", "missing.pdf"]) == {
+            "factura.pdf": "abc",
+            "copia.pdf": "abc",
+        }
+
+    def test_batch_lookup_beyond_chunk_size(self, store):
+        store.put_many((f"id{i}", f"texto {i}", None) for i in range(1200))
+
+        texts = store.get_texts(f"id{i}" for i in range(1300))
+        assert len(texts) == 1200
+        assert texts["id1199"] == "texto 1199"
+
+
+class TestFeedbackJoin:
+    """Test that retraining recovers full documents for feedback."""
+
+    @pytest.fixture
+    def setup(self, tmp_path):
+        documents = DocumentStore(tmp_path / "documents.sqlite3")
+        logger = PredictionLogger(str(tmp_path / "predictions"), documents=documents)
+        feedback = PartitionedLog(str(tmp_path / "user_feedback"))
+        retraining = RetrainingPipeline(feedback_log=feedback, predictions_log=logger.store, documents=documents)
+        return logger, feedback, retraining
+
+    def test_prediction_log_keeps_id_not_text(self, setup):
+        logger, _, _ = setup
+        full_text = "RECIBO de alquiler " * 50
+        logger.log_prediction("recibo.pdf", "recibo", 0.9, text_preview=full_text,
+                              document_id="doc1", document_text=full_text)
+        logger.flush()
+
+        entry = list(logger.store.read())[0]
+        assert entry["document_id"] == "doc1"
+        assert "_document_text" not in entry
+        assert logger.documents.get_text("doc1") == full_text.strip()
+
+    def test_feedback_gets_full_text_by_document_id(self, setup):
+        logger, feedback, retraining = setup
+        full_text = "CONTRATO DE ARRENDAMIENTO " * 40
+        logger.log_prediction("doc.pdf", "factura", 0.7, document_id="doc1", document_text=full_text)
+        logger.flush()
+        feedback.append([_feedback("/uploads/otro_nombre.pdf", "contrato", document_id="doc1")])
+
+        df = retraining.collect_feedback_data()
+
+        assert df["text"].tolist() == [full_text.strip()]
+        assert df["label"].tolist() == ["contrato"]
+
+    def test_legacy_feedback_falls_back_to_file_name(self, setup):
+        logger, feedback, retraining = setup
+        logger.log_prediction("nomina.pdf", "factura", 0.6, document_id="doc2", document_text="NÓMINA completa")
+        logger.store.append([{
+            "timestamp": datetime.now().isoformat(), "file": "viejo.pdf", "text_preview": "preview antiguo",
+        }])
+        logger.flush()
+        feedback.append([_feedback("nomina.pdf", "nomina"), _feedback("viejo.pdf", "recibo"),
+                         _feedback("desconocido.pdf", "otro")])
+
+        df = retraining.collect_feedback_data()
+
+        assert dict(zip(df["label"], df["text"])) == {"nomina": "NÓMINA completa", "recibo": "preview antiguo"}
@@ -0,0 +1,116 @@
+"""
+Unit tests for the daily rollup store.
+"""
+import pytest
+
+from src.ia.log_store import PartitionedLog
+from src.ia.rollups import RollupStore
+
+
+def _prediction(day, predicted, confidence, **extra):
+    entry = {"timestamp": f"{day}T12:00:00", "date": day, "predicted": predicted, "confidence": confidence}
+    entry.update(extra)
+    return entry
+
+
+def _feedback(day, predicted, actual):
+    return {
+        "timestamp": f"{day}T12:00:00",
+        "predicted_type": predicted,
+        "actual_type": actual,
+        "was_correct": predicted == actual,
+    }
+
+
+PREDICTIONS = [
+    _prediction("2026-10-01", "factura", 0.95),
+    _prediction("2026-10-01", "recibo", 0.5),
+    _prediction("2026-10-02", "factura", 0.7, user_feedback="recibo"),
+    {"timestamp": "2026-10-02T13:00:00", "date": "2026-10-02", "type": "error", "error_message": "x"},
+    _prediction("2026-10-03", "nomina", 0.9),
+]
+
+FEEDBACK = [
+    _feedback("2026-10-01", "factura", "factura"),
+    _feedback("2026-10-02", "factura", "recibo"),
+    _feedback("2026-10-03", "factura", "recibo"),
+]
+
+
+def _scan_prediction_stats(entries):
+    """Reference: recompute the stats from raw entries."""
+    predictions = [e for e in entries if e.get("type") != "error"]
+    confidences = [e["confidence"] for e in predictions]
+    by_type = {}
+    for e in predictions:
+        by_type[e["predicted"]] = by_type.get(e["predicted"], 0) + 1
+    return {
+        "total_predictions": len(predictions),
+        "by_type": by_type,
+        "by_confidence": {
+            "low": sum(c < 0.6 for c in confidences),
+            "medium": sum(0.6 <= c < 0.8 for c in confidences),
+            "high": sum(c >= 0.8 for c in confidences),
+        },
+        "avg_confidence": round(sum(confidences) / len(confidences), 4) if confidences else 0.0,
+        "errors": len(entries) - len(predictions),
+        "with_feedback": sum(bool(e.get("user_feedback")) for e in predictions),
+    }
+
+
+class TestRollupStore:
+    """Test incremental rollups and range queries."""
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        return RollupStore(tmp_path / "rollups.sqlite3")
+
+    def test_prediction_stats_match_full_scan(self, store):
+        store.record_predictions(PREDICTIONS[:2])
+        store.record_predictions(PREDICTIONS[2:])
+
+        assert store.prediction_stats() == _scan_prediction_stats(PREDICTIONS)
+
+    def test_day_range(self, store):
+        store.record_predictions(PREDICTIONS)
+        in_range = [e for e in PREDICTIONS if "2026-10-02" <= e["date"] <= "2026-10-03"]
+
+        assert store.prediction_stats(since="2026-10-02", until="2026-10-03") == _scan_prediction_stats(in_range)
+
+    def test_feedback_stats(self, store):
+        store.record_feedback(FEEDBACK)
+        stats = store.feedback_stats(since="2026-10-02")
+
+        assert stats["total_feedback"] == 2
+        assert stats["incorrect_predictions"] == 2
+        assert stats["accuracy"] == 0.0
+        assert stats["corrections_by_type"] == {"factura -> recibo": 2}
+        assert store.feedback_stats()["accuracy"] == round(1 / 3, 4)
+
+    def test_empty_store(self, store):
+        stats = store.prediction_stats()
+
+        assert stats["total_predictions"] == 0
+        assert stats["avg_confidence"] == 0.0
+        assert store.feedback_stats()["total_feedback"] == 0
+
+    def test_backfill_is_idempotent(self, store, tmp_path):
+        predictions = PartitionedLog(str(tmp_path / "predictions"))
+        feedback = PartitionedLog(str(tmp_path / "user_feedback"))
+        predictions.append(PREDICTIONS)
+        feedback.append(FEEDBACK)
+
+        assert store.backfill(predictions, feedback) == 3
+        store.backfill(predictions, feedback)
+
+        assert store.prediction_stats() == _scan_prediction_stats(PREDICTIONS)
+        assert store.feedback_stats()["total_feedback"] == 3
+
+    def test_backfill_does_not_touch_other_log(self, store, tmp_path):
+        predictions = PartitionedLog(str(tmp_path / "predictions"))
+        predictions.append(PREDICTIONS)
+        store.record_feedback(FEEDBACK)
+
+        store.backfill(predictions)
+
+        assert store.feedback_stats()["total_feedback"] == 3
@@ -0,0 +1,64 @@
+"""
+Unit tests for the parallel hyperparameter search.
+"""
+import pandas as pd
+import pytest
+
+from ai_directia.training.search import build_experiments, run_search, vectorizer_key
+
+
+TEMPLATES = {
+    "factura": "Factura número {i} importe total IVA base imponible cliente pago",
+    "contrato": "Contrato de prestación de servicios {i} cláusulas partes firmantes duración",
+    "nomina": "Nómina mensual {i} salario base trabajador devengos retenciones IRPF",
+}
+
+
+def _frame(n):
+    return pd.DataFrame(
+        [{"text": template.format(i=i), "category": label} for label, template in TEMPLATES.items() for i in range(n)]
+    )
+
+
+class TestExperiments:
+    """Test the search space expansion."""
+
+    def test_grid_covers_every_combination(self):
+        experiments = build_experiments(
+            {"max_features": [100, 200], "ngram_range": [(1, 1)]},
+            {"linear_svc": {"C": [0.1, 1.0]}, "naive_bayes": {"alpha": [1.0]}},
+        )
+        assert len(experiments) == 2 * 3
+
+    def test_random_search_is_reproducible(self):
+        first = build_experiments(search="random", n_iter=5, seed=7)
+        second = build_experiments(search="random", n_iter=5, seed=7)
+
+        assert len(first) == 5
+        assert first == second
+
+
+class TestRunSearch:
+    """Test the leaderboard produced by a small search."""
+
+    @pytest.fixture
+    def leaderboard(self, tmp_path):
+        experiments = build_experiments(
+            {"max_features": [50], "ngram_range": [(1, 1), (1, 2)]},
+            {"linear_svc": {"C": [1.0]}, "naive_bayes": {"alpha": [1.0]}},
+        )
+        return run_search(_frame(10), _frame(3), experiments, output_dir=tmp_path, workers=1)
+
+    def test_leaderboard_columns_and_files(self, leaderboard, tmp_path):
+        assert len(leaderboard) == 4
+        for column in ("accuracy", "f1_macro", "latency_ms_p50", "model_size_kb"):
+            assert column in leaderboard.columns
+        assert (tmp_path / "leaderboard.csv").exists()
+        assert (tmp_path / "leaderboard.json").exists()
+
+    def test_each_vectorizer_is_cached_once(self, leaderboard, tmp_path):
+        cached = sorted(path.name for path in (tmp_path / "cache").glob("*.vectorizer.pkl"))
+        assert cached == sorted(
+            f"{vectorizer_key({'max_features': 50, 'ngram_range': ngram})}.vectorizer.pkl"
+            for ngram in ((1, 1), (1, 2))
+        )
@@ -0,0 +1,233 @@
+"""
+Unit tests for the full-text search index, the background indexer and the search service.
+"""
+import hashlib
+import io
+from unittest.mock import patch
+
+import pytest
+from werkzeug.datastructures import FileStorage
+
+from loadtest.memory_mongo import MemoryDatabase
+from src.ia.pipeline import ExtractionCache
+from src.ia.search_index import (
+    SearchIndex, SearchIndexer, close_indexer, folder_key, get_indexer, match_query, split_path,
+)
+from src.services import files as file_service
+from src.services.search import buscar_documentos
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = SearchIndex(tmp_path / "search.sqlite3")
+    index.index_many([
+        {"folder": "/ana/Facturas/", "filename": "f1.pdf", "tipo": "Factura", "category_id": "factura",
+         "text": "FACTURA nº 2025/001. Cliente: Construcciones Cádiz. Total factura 1.210 €"},
+        {"folder": "/ana/Facturas/2024", "filename": "f2.pdf", "tipo": "Factura", "category_id": "factura",
+         "text": "Factura de suministro eléctrico"},
+        {"folder": "ana/Facturasviejas", "filename": "f3.pdf", "tipo": "Factura", "category_id": "factura",
+         "text": "Factura antigua"},
+        {"folder": "/ana/Contratos/", "filename": "c1.docx", "tipo": "Contrato", "category_id": "contrato",
+         "text": "Contrato de arrendamiento. Se adjunta la factura de la fianza <b>pagada</b>"},
+    ])
+    return index
+
+
+class TestPaths:
+    """Test folder normalisation and query sanitisation."""
+
+    def test_folder_key(self):
+        assert folder_key("a/b") == folder_key("/a/b") == folder_key("/a/b/") == "/a/b/"
+        assert folder_key("") == folder_key("/.") == "/"
+
+    def test_split_path(self):
+        assert split_path("a/b/c.pdf") == ("/a/b/", "c.pdf")
+        assert split_path("c.pdf") == ("/", "c.pdf")
+
+    def test_match_query_strips_operators(self):
+        assert match_query('factura" OR NEAR(x') == '"factura" "or" "near" "x"'
+        assert match_query("  ¿? ") is None
+
+
+class TestSearchIndex:
+    """Test BM25 search, scoping, highlighting and index maintenance."""
+
+    def test_accent_and_case_insensitive(self, index):
+        page = index.search("cadiz FACTURA")
+
+        assert page["total"] == 1
+        assert page["results"][0]["path"] == "/ana/Facturas/f1.pdf"
+        assert "<mark>Cádiz</mark>" in page["results"][0]["snippet"]
+
+    def test_ranking(self, index):
+        page = index.search("factura")
+
+        assert page["total"] == 4
+        # The contract mentions "factura" once in a longer text
+        assert page["results"][-1]["filename"] == "c1.docx"
+        scores = [result["score"] for result in page["results"]]
+        assert scores == sorted(scores, reverse=True)
+
+    def test_folder_prefix_excludes_siblings(self, index):
+        page = index.search("factura", folder="ana/Facturas")
+
+        assert sorted(result["filename"] for result in page["results"]) == ["f1.pdf", "f2.pdf"]
+
+    def test_tipo_filter_by_name_or_id(self, index):
+        by_name = index.search("factura", tipo="contrato")
+        by_id = index.search("factura", tipo="Contrato")
+
+        assert [r["filename"] for r in by_name["results"]] == [r["filename"] for r in by_id["results"]] == ["c1.docx"]
+
+    def test_snippet_is_escaped(self, index):
+        snippet = index.search("pagada")["results"][0]["snippet"]
+
+        assert "&lt;b&gt;<mark>pagada</mark>&lt;/b&gt;" in snippet
+
+    def test_pagination(self, index):
+        first = index.search("factura", limit=3)
+        second = index.search("factura", limit=3, offset=3)
+
+        assert first["total"] == second["total"] == 4
+        assert len(first["results"]) == 3 and len(second["results"]) == 1
+        assert second["results"][0]["filename"] not in {r["filename"] for r in first["results"]}
+
+    def test_reindex_replaces_text(self, index):
+        index.index_many([{"folder": "/ana/Facturas/", "filename": "f1.pdf", "text": "Recibo de la luz"}])
+
+        assert len(index) == 4
+        assert index.search("cadiz")["total"] == 0
+        assert index.search("recibo")["results"][0]["filename"] == "f1.pdf"
+
+    def test_remove_file_and_folder(self, index):
+        assert index.remove("ana/Contratos/c1.docx") == 1
+        assert index.remove("ana/Facturas") == 2
+
+        assert [r["filename"] for r in index.search("factura")["results"]] == ["f3.pdf"]
+
+    def test_move_file_and_folder(self, index):
+        index.move("ana/Facturas/f1.pdf", "ana/Archivo/factura_cadiz.pdf")
+        index.move("ana/Facturas", "luis/Facturas")
+
+        assert index.search("cadiz")["results"][0]["path"] == "/ana/Archivo/factura_cadiz.pdf"
+        assert index.search("suministro")["results"][0]["path"] == "/luis/Facturas/2024/f2.pdf"
+        assert index.search("factura", folder="ana/Facturas")["total"] == 0
+
+
+class TestSearchIndexer:
+    """Test background indexing through the pipeline extraction stage."""
+
+    def test_reuses_extraction_cache(self, tmp_path):
+        data = b"contenido original"
+        document = tmp_path / "doc.txt"
+        document.write_bytes(data)
+        cache = ExtractionCache()
+        cache.put(hashlib.sha256(data).hexdigest(), {"text": "texto ya extraido por el pipeline", "pages": 1})
+
+        indexer = SearchIndexer(SearchIndex(tmp_path / "search.sqlite3"), cache=cache, buffered=False)
+        indexer.submit(str(document), "/ana/", "doc.txt", tipo="Otro")
+
+        assert indexer.index.search("pipeline")["total"] == 1
+        assert indexer.index.search("original")["total"] == 0
+
+    def test_background_operations_in_order(self, tmp_path):
+        document = tmp_path / "nota.txt"
+        document.write_text("Nota de entrega del pedido", encoding="utf-8")
+        indexer = SearchIndexer(SearchIndex(tmp_path / "search.sqlite3"), cache=ExtractionCache())
+        try:
+            indexer.submit(str(document), "/ana/", "nota.txt")
+            indexer.move("ana/nota.txt", "ana/Entregas/nota.txt")
+            indexer.submit(str(tmp_path / "borrado.txt"), "/ana/", "borrado.txt")
+            assert indexer.flush()
+        finally:
+            indexer.close()
+
+        results = indexer.index.search("pedido")["results"]
+        assert [r["path"] for r in results] == ["/ana/Entregas/nota.txt"]
+        assert len(indexer.index) == 1
+
+    def test_bad_entry_does_not_drop_batch(self, tmp_path):
+        unreadable = tmp_path / "carpeta.txt"
+        unreadable.mkdir()
+        document = tmp_path / "nota.txt"
+        document.write_text("Nota de entrega del pedido", encoding="utf-8")
+        index = SearchIndex(tmp_path / "search.sqlite3")
+        index.index_many([{"folder": "/ana/", "filename": "vieja.txt", "text": "albaran antiguo"},
+                          {"folder": "/ana/", "filename": "movida.txt", "text": "presupuesto"}])
+        indexer = SearchIndexer(index, cache=ExtractionCache(), buffered=False)
+
+        with patch.object(index, "remove", side_effect=RuntimeError("fila corrupta")):
+            indexer._apply_batch([
+                {"op": "index", "file_path": str(unreadable), "folder": "/ana/", "filename": "carpeta.txt"},
+                {"op": "index", "file_path": str(document), "folder": "/ana/", "filename": "nota.txt"},
+                {"op": "remove", "path": "ana/vieja.txt"},
+                {"op": "move", "source": "ana/movida.txt", "target": "luis/movida.txt"},
+            ])
+
+        assert index.search("pedido")["results"][0]["path"] == "/ana/nota.txt"
+        assert index.search("presupuesto")["results"][0]["path"] == "/luis/movida.txt"
+        assert len(index) == 3
+
+    def test_close_indexer_applies_pending(self, tmp_path):
+        document = tmp_path / "nota.txt"
+        document.write_text("Nota de entrega del pedido", encoding="utf-8")
+        db_path = tmp_path / "search.sqlite3"
+        indexer = get_indexer(db_path)
+        indexer.submit(str(document), "/ana/", "nota.txt")
+
+        assert close_indexer(db_path)
+        assert SearchIndex(db_path).search("pedido")["total"] == 1
+        assert get_indexer(db_path) is not indexer
+        close_indexer(db_path)
+
+    def test_unsupported_format_indexes_name(self, tmp_path):
+        indexer = SearchIndexer(SearchIndex(tmp_path / "search.sqlite3"), cache=ExtractionCache(), buffered=False)
+        indexer.submit(str(tmp_path / "no-existe.zip"), "/", "presupuesto_obra.zip")
+
+        assert indexer.index.search("presupuesto_obra")["results"][0]["snippet"] == ""
+
+    def test_upload_submits_file(self, tmp_path):
+        indexer = SearchIndexer(SearchIndex(tmp_path / "search.sqlite3"), cache=ExtractionCache(), buffered=False)
+        upload = FileStorage(io.BytesIO(b"Presupuesto de reforma de cocina"), filename="presupuesto.txt")
+
+        with patch.object(file_service, "BASE_STORAGE_PATH", str(tmp_path / "storage")):
+            result, status = file_service.upload_file(upload, "ana/Obras", "ana", MemoryDatabase()["metadata"],
+                                                      indexer=indexer)
+
+        assert status == 201
+        hit = indexer.index.search("reforma")["results"][0]
+        assert hit["path"] == "/ana/Obras/presupuesto.txt"
+        assert hit["file_id"] == result["metadata"]["file_id"]
+
+    def test_upload_with_ia_stores_category_id(self, tmp_path):
+        class FakePipeline:
+            def classify_file(self, file_path, username=None):
+                return {"tipo_documento": "Factura", "category_id": "factura", "confianza": 0.9,
+                        "nombre_sugerido": None, "carpeta_sugerida": "/Documentos/Facturas/", "classifier": "ml"}
+
+        indexer = SearchIndexer(SearchIndex(tmp_path / "search.sqlite3"), cache=ExtractionCache(), buffered=False)
+        metadata = MemoryDatabase()["metadata"]
+        upload = FileStorage(io.BytesIO(b"Factura de la reforma"), filename="factura.txt")
+
+        with patch.object(file_service, "BASE_STORAGE_PATH", str(tmp_path / "storage")):
+            file_service.upload_file(upload, "ana", "ana", metadata, ia_activa=True, pipeline=FakePipeline(),
+                                     indexer=indexer)
+
+        # Mongo keeps the category id; the search index keeps the display name
+        assert metadata.find_one({"filename": "factura.txt"})["clasificacion"]["tipo"] == "factura"
+        assert indexer.index.search("reforma")["results"][0]["tipo"] == "Factura"
+
+
+class TestSearchService:
+    """Test request validation and pagination of GET /api/search."""
+
+    def test_requires_query(self, index):
+        assert buscar_documentos({}, index)[1] == 400
+        assert buscar_documentos({"q": "factura", "limit": "x"}, index)[1] == 400
+
+    def test_next_offset(self, index):
+        page, status = buscar_documentos({"q": "factura", "limit": "3"}, index)
+        last, _ = buscar_documentos({"q": "factura", "limit": "3", "offset": "3"}, index)
+
+        assert status == 200
+        assert page["next_offset"] == 3 and last["next_offset"] is None
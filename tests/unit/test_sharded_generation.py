@@ -0,0 +1,54 @@
+"""
+Unit tests for the sharded, deterministic synthetic dataset generator.
+"""
+import pandas as pd
+
+from src.ia.data_generation.sharded import generate_sharded_dataset, plan_shards, shard_seed
+
+
+def _generate(output_dir, workers, source="src"):
+    return generate_sharded_dataset(
+        output_dir=output_dir,
+        source=source,
+        docs_per_category=6,
+        variants=1,
+        chunk_size=2,
+        categories=["factura", "nomina"],
+        workers=workers,
+    )
+
+
+class TestShardPlan:
+    """Test shard planning and seed derivation."""
+
+    def test_chunks_cover_every_document(self):
+        shards = plan_shards("src", docs_per_category=5, chunk_size=2, categories=["factura"])
+        assert [(shard.start, shard.count) for shard in shards] == [(0, 2), (2, 2), (4, 1)]
+
+    def test_seeds_depend_on_category_and_chunk(self):
+        assert shard_seed(42, "factura", 0) == shard_seed(42, "factura", 0)
+        assert shard_seed(42, "factura", 0) != shard_seed(42, "factura", 1)
+        assert shard_seed(42, "factura", 0) != shard_seed(42, "nomina", 0)
+
+
+class TestShardedGeneration:
+    """Test that output does not depend on the worker count."""
+
+    def test_output_is_identical_with_any_worker_count(self, tmp_path):
+        _generate(tmp_path / "one", workers=1)
+        _generate(tmp_path / "two", workers=2)
+
+        for split in ("train", "val", "test"):
+            assert (tmp_path / "one" / f"{split}.csv").read_bytes() == (tmp_path / "two" / f"{split}.csv").read_bytes()
+        assert not (tmp_path / "one" / "shards").exists()
+
+    def test_variants_stay_in_the_split_of_their_document(self, tmp_path):
+        result = _generate(tmp_path, workers=1, source="ai_directia")
+
+        frames = {split: pd.read_csv(path) for split, path in result["paths"].items()}
+        assert sum(len(df) for df in frames.values()) == 2 * 6 * 2
+        seen = {}
+        for split, df in frames.items():
+            for doc_id in df["doc_id"]:
+                base = doc_id.rsplit("_", 1)[0]
+                assert seen.setdefault(base, split) == split
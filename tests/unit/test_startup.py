@@ -0,0 +1,70 @@
+"""
+Unit tests for lazy IA imports and the startup profiler.
+"""
+from unittest.mock import patch
+
+from src import startup_profile
+from src.ia import pipeline
+from src.startup_profile import heavy_imports, parse_importtime, render_tree
+
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       100 |        100 |       numpy.core
+import time:       400 |        500 |     numpy
+import time:       200 |        200 |     joblib.disk
+import time:      1000 |       1700 |   joblib
+import time:        50 |         50 |   src.ia.timing
+import time:       300 |       2050 | src.ia.pipeline
+import time:        10 |         10 | json
+"""
+
+
+class TestImportTree:
+    """Test parsing and rendering of -X importtime output."""
+
+    def test_parse_tree(self):
+        roots = parse_importtime(IMPORTTIME)
+
+        assert [node["module"] for node in roots] == ["src.ia.pipeline", "json"]
+        pipeline_node = roots[0]
+        assert pipeline_node["cumulative_ms"] == 2.05
+        assert [child["module"] for child in pipeline_node["children"]] == ["joblib", "src.ia.timing"]
+        joblib_node = pipeline_node["children"][0]
+        assert [child["module"] for child in joblib_node["children"]] == ["numpy", "joblib.disk"]
+        assert joblib_node["children"][0]["children"][0]["module"] == "numpy.core"
+
+    def test_heavy_imports(self):
+        assert heavy_imports(parse_importtime(IMPORTTIME)) == ["joblib", "numpy"]
+
+    def test_render_prunes_fast_modules(self):
+        lines = render_tree(parse_importtime(IMPORTTIME), min_ms=0.3, max_depth=1)
+
+        assert [line.split()[-1] for line in lines] == ["src.ia.pipeline", "joblib"]
+        assert lines[1].endswith("  joblib")
+
+
+class TestColdStart:
+    """Test that serving modules import without the heavy IA dependencies."""
+
+    def test_serving_modules_are_light(self):
+        report = startup_profile.profile_imports(
+            "src.ia.pipeline, src.services.ia, src.ia.ocr, src.ia.clasificadores.beto.inferencia"
+        )
+
+        assert "error" not in report
+        assert report["heavy"] == []
+
+    def test_feature_extractor_is_lazy(self):
+        from ai_directia import preprocessing
+
+        assert preprocessing.TfidfFeatureExtractor.__name__ == "TfidfFeatureExtractor"
+        assert "TfidfFeatureExtractor" in vars(preprocessing)
+
+    def test_warm_up(self):
+        with patch.object(pipeline, "get_pipeline") as get_pipeline, \
+                patch("src.ia.ocr.ocr.load_backends") as load_backends:
+            timings = pipeline.warm_up(ocr=True)
+
+        get_pipeline.assert_called_once_with()
+        load_backends.assert_called_once_with()
+        assert set(timings) == {"pipeline", "extractors", "ocr"}
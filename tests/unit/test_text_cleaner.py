@@ -0,0 +1,201 @@
+"""
+Unit tests for the ai_directia text cleaner.
+
+The golden tests compare the compiled/fused cleaner against the original
+multi-pass implementation (reproduced below) on every document of the
+processed training CSVs.
+"""
+import csv
+import re
+import sys
+import unicodedata
+from pathlib import Path
+
+import pytest
+
+from ai_directia.preprocessing.text_cleaner import (
+    DEFAULT_OPERATIONS,
+    clean_text,
+    clean_text_batch,
+    normalize_tokens,
+    preprocess_batch,
+    preprocess_text,
+    remove_accents,
+    remove_special_characters,
+    remove_stopwords,
+)
+from ai_directia.preprocessing.stopwords import get_stopwords
+
+
+ROOT = Path(__file__).resolve().parents[2]
+CSV_FILES = [
+    ROOT / 'ai_directia' / 'datasets' / 'processed' / name
+    for name in ('train.csv', 'val.csv', 'test.csv')
+] + [
+    ROOT / 'src' / 'ia' / 'datasets' / 'processed' / name
+    for name in ('train.csv', 'val.csv', 'test.csv')
+]
+
+
+# --- Original implementation (reference) ---
+
+def _legacy_normalize_whitespace(text):
+    text = re.sub(r'[ \t]+', ' ', text)
+    text = re.sub(r'\n\s*\n+', '\n\n', text)
+    lines = [line.strip() for line in text.split('\n')]
+    return '\n'.join(lines).strip()
+
+
+def _legacy_remove_special_characters(text, keep_punctuation=True):
+    if keep_punctuation:
+        return re.sub(r'[^a-záéíóúüñA-ZÁÉÍÓÚÜÑ0-9\s.,;:!?\-€$%]', '', text)
+    return re.sub(r'[^a-záéíóúüñA-ZÁÉÍÓÚÜÑ0-9\s]', '', text)
+
+
+def _legacy_remove_accents(text):
+    nfd = unicodedata.normalize('NFD', text)
+    return ''.join(char for char in nfd if unicodedata.category(char) != 'Mn')
+
+
+_LEGACY_OPERATIONS = {
+    'normalize_whitespace': _legacy_normalize_whitespace,
+    'normalize_unicode': lambda text: unicodedata.normalize('NFC', text),
+    'remove_special_chars': _legacy_remove_special_characters,
+    'remove_special_chars_all': lambda text: _legacy_remove_special_characters(text, False),
+    'remove_urls': lambda text: re.sub(
+        r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', '', text),
+    'remove_emails': lambda text: re.sub(
+        r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', '', text),
+    'remove_numbers': lambda text: re.sub(r'\d+', '', text),
+    'remove_accents': _legacy_remove_accents,
+    'lowercase': lambda text: text.lower(),
+    'remove_extra_lines': lambda text: re.sub(r'\n{3,}', '\n\n', text),
+}
+
+
+def _legacy_clean_text(text, operations):
+    for op in operations:
+        text = _LEGACY_OPERATIONS[op](text)
+    return text
+
+
+def _legacy_tokens(text):
+    cleaned = _legacy_clean_text(text, [
+        'normalize_unicode',
+        'normalize_whitespace',
+        'remove_urls',
+        'remove_emails',
+        'lowercase',
+    ])
+    return re.findall(r'\b\w+\b', cleaned.lower())
+
+
+def _load_corpus():
+    csv.field_size_limit(sys.maxsize)
+    texts = []
+    for path in CSV_FILES:
+        if not path.exists():
+            continue
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            texts.extend(row['text'] for row in csv.DictReader(f))
+    return texts
+
+
+@pytest.fixture(scope='module')
+def corpus():
+    texts = _load_corpus()
+    if not texts:
+        pytest.skip("Processed datasets not available")
+    return texts
+
+
+EDGE_CASES = [
+    "",
+    "   \n\n\t\t   ",
+    "FACTURA N.º 2025/001 - Total: 1.000,00€ (IVA incl.)",
+    "Contacto: facturacion@empresa.es o https://empresa.es/pago?id=12",
+    "a@b.cohttp://x.y.com resto",
+    "Café Niño ÅNGSTRÖM ǅemal ﬁnanzas Ελληνικά 中文字符",
+    "e͏́ x̣́ İstanbul",
+    "Línea 1\n\n\n\nLínea 2  \n   \nfin",
+]
+
+
+class TestGoldenEquivalence:
+    """The fused cleaner must reproduce the original output exactly."""
+
+    def test_tokens_match_on_corpus(self, corpus):
+        for text in corpus:
+            assert normalize_tokens(text) == _legacy_tokens(text)
+
+    def test_default_clean_text_matches_on_corpus(self, corpus):
+        expected = [_legacy_clean_text(text, DEFAULT_OPERATIONS) for text in corpus]
+        assert clean_text_batch(corpus) == expected
+
+    @pytest.mark.parametrize("operations", [
+        ['remove_special_chars'],
+        ['remove_special_chars_all'],
+        ['remove_accents', 'lowercase'],
+        ['remove_numbers', 'normalize_whitespace'],
+    ])
+    def test_operations_match_on_corpus(self, corpus, operations):
+        expected = [_legacy_clean_text(text, operations) for text in corpus]
+        assert clean_text_batch(corpus, operations) == expected
+
+    @pytest.mark.parametrize("text", EDGE_CASES)
+    def test_edge_cases(self, text):
+        assert normalize_tokens(text) == _legacy_tokens(text)
+        assert remove_accents(text) == _legacy_remove_accents(text)
+        assert remove_special_characters(text) == _legacy_remove_special_characters(text)
+        assert clean_text(text) == _legacy_clean_text(text, DEFAULT_OPERATIONS)
+
+    def test_remove_accents_matches_for_latin_blocks(self):
+        text = ''.join(chr(cp) for cp in range(0x00A0, 0x0370))
+        text += ''.join(chr(cp) for cp in range(0x1E00, 0x1F00))
+        assert remove_accents(text) == _legacy_remove_accents(text)
+
+
+class TestBatchAPI:
+    """Test batch helpers."""
+
+    def test_preprocess_batch_matches_single(self):
+        texts = EDGE_CASES + ["NÓMINA DEL MES DE MARZO 2025\nIRPF: 225,00€"]
+        assert preprocess_batch(texts, remove_stop=False) == [
+            preprocess_text(text, remove_stop=False) for text in texts
+        ]
+
+    def test_clean_text_batch_empty(self):
+        assert clean_text_batch([]) == []
+
+
+class TestStopwords:
+    """Test cached stopword lists."""
+
+    def test_spanish_list_is_vendored(self):
+        stop_words = get_stopwords('spanish')
+
+        assert isinstance(stop_words, frozenset)
+        assert {'de', 'la', 'que', 'estábamos'} <= stop_words
+        assert 'factura' not in stop_words
+
+    def test_list_is_loaded_once(self):
+        assert get_stopwords('spanish') is get_stopwords('spanish')
+
+    def test_unknown_language_is_empty(self):
+        assert get_stopwords('klingon') == frozenset()
+
+    def test_never_downloads(self, monkeypatch):
+        nltk = pytest.importorskip('nltk')
+
+        def fail(*args, **kwargs):
+            raise AssertionError("nltk.download called on the request path")
+
+        monkeypatch.setattr(nltk, 'download', fail)
+        assert preprocess_text("La factura de marzo", language='spanish') == 'factura marzo'
+
+    def test_filtering_matches_remove_stopwords(self):
+        texts = EDGE_CASES + ["El contrato de la empresa es para los trabajadores"]
+        for text in texts:
+            tokens = remove_stopwords(normalize_tokens(text), language='spanish')
+            assert preprocess_text(text) == ' '.join(tokens)
+        assert preprocess_batch(texts) == [preprocess_text(text) for text in texts]